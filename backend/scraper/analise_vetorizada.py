@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Motor de análise histórica vetorizado com NumPy
+
+O histórico de uma roleta é carregado uma vez como dois arrays compactos (números em
+uint8 e timestamps em int64, milissegundos) e todas as estatísticas são calculadas
+com operações vetorizadas: frequências com bincount, classificação por dimensão com
+tabelas de 37 posições, codificação de execuções (run-length) com a mesma regra de
+analytics.detectar_sequencias (o zero não interrompe a sequência e conta no
+comprimento), histogramas de sequências e números quentes/frios.
+
+Uso:
+    python analise_vetorizada.py [--dias 365] [--roleta-id ID]
+"""
+
+import sys
+import time
+import argparse
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+from pymongo.database import Database
+
+from classificacao import COR, PARIDADE, DUZIA, COLUNA, METADE, NEUTRO
+from config import logger
+
+EPOCA = datetime(1970, 1, 1)
+
+# Documentos por lote na leitura do histórico
+LOTE_LEITURA = 10000
+
+# Comprimento mínimo de sequência, como em analytics.detectar_sequencias
+COMPRIMENTO_MINIMO_SEQUENCIA = 3
+
+def _codificar(tabela: Tuple[str, ...]) -> Tuple[np.ndarray, List[str]]:
+    """Converte uma tabela de classificação em códigos uint8 e a lista de nomes"""
+    nomes = list(dict.fromkeys(tabela))
+    return np.array([nomes.index(valor) for valor in tabela], dtype=np.uint8), nomes
+
+# tipo -> (códigos por número, nomes dos códigos, código neutro)
+DIMENSOES_VETORIZADAS: Dict[str, Tuple[np.ndarray, List[str], int]] = {}
+for _tipo, _tabela in (('cor', COR), ('paridade', PARIDADE), ('duzia', DUZIA), ('coluna', COLUNA), ('metade', METADE)):
+    _codigos, _nomes = _codificar(_tabela)
+    DIMENSOES_VETORIZADAS[_tipo] = (_codigos, _nomes, _nomes.index(NEUTRO[_tipo]))
+
+class Historico:
+    """Números e timestamps de uma roleta em ordem cronológica"""
+
+    __slots__ = ('roleta_id', 'numeros', 'timestamps')
+
+    def __init__(self, roleta_id: str, numeros: np.ndarray, timestamps: np.ndarray):
+        self.roleta_id = roleta_id
+        self.numeros = numeros
+        self.timestamps = timestamps
+
+    def __len__(self) -> int:
+        return len(self.numeros)
+
+def para_milissegundos(valor: datetime) -> int:
+    """Converte um datetime (sem fuso, como gravado pelo sistema) em milissegundos"""
+    return (valor.replace(tzinfo=None) - EPOCA) // timedelta(milliseconds=1)
+
+def de_milissegundos(valor: int) -> datetime:
+    """Converte milissegundos de volta em datetime"""
+    return EPOCA + timedelta(milliseconds=int(valor))
+
+def carregar_historico(db: Database, roleta_id: str, inicio: Optional[datetime] = None,
+                       fim: Optional[datetime] = None) -> Historico:
+    """
+    Carrega o histórico de uma roleta em arrays NumPy
+
+    Args:
+        db (Database): Banco de dados
+        roleta_id (str): ID da roleta
+        inicio (datetime, optional): Início do intervalo (inclusivo)
+        fim (datetime, optional): Fim do intervalo (exclusivo)
+
+    Returns:
+        Historico: Números (uint8) e timestamps (int64, ms) em ordem cronológica
+    """
+    filtro: Dict[str, Any] = {'roleta_id': roleta_id}
+    if inicio is not None or fim is not None:
+        filtro['timestamp'] = {}
+        if inicio is not None:
+            filtro['timestamp']['$gte'] = inicio
+        if fim is not None:
+            filtro['timestamp']['$lt'] = fim
+
+    numeros: List[int] = []
+    timestamps: List[int] = []
+    cursor = (db.roleta_numeros.find(filtro, {'numero': 1, 'timestamp': 1, '_id': 0})
+              .sort('timestamp', 1)
+              .batch_size(LOTE_LEITURA))
+    for documento in cursor:
+        numero = documento.get('numero')
+        timestamp = documento.get('timestamp')
+        if isinstance(numero, int) and 0 <= numero <= 36 and isinstance(timestamp, datetime):
+            numeros.append(numero)
+            timestamps.append(para_milissegundos(timestamp))
+
+    return Historico(roleta_id, np.array(numeros, dtype=np.uint8), np.array(timestamps, dtype=np.int64))
+
+def frequencias(numeros: np.ndarray) -> np.ndarray:
+    """Contagem de cada número de 0 a 36"""
+    return np.bincount(numeros, minlength=37)
+
+def distribuicoes(numeros: np.ndarray) -> Dict[str, Dict[str, int]]:
+    """
+    Contagem por valor em cada dimensão (cor, paridade, dúzia, coluna e metade)
+
+    Args:
+        numeros (np.ndarray): Números sorteados
+
+    Returns:
+        Dict[str, Dict[str, int]]: Contagens por dimensão e valor
+    """
+    contagem_numeros = frequencias(numeros)
+    resultado = {}
+    for tipo, (codigos, nomes, _) in DIMENSOES_VETORIZADAS.items():
+        contagens = np.bincount(codigos, weights=contagem_numeros, minlength=len(nomes))
+        resultado[tipo] = {nome: int(contagens[i]) for i, nome in enumerate(nomes)}
+    return resultado
+
+def codificar_execucoes(numeros: np.ndarray, tipo: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Codificação run-length das sequências de uma dimensão
+
+    O zero (valor neutro) é absorvido pela sequência em andamento; zeros antes da
+    primeira sequência são descartados.
+
+    Args:
+        numeros (np.ndarray): Números em ordem cronológica
+        tipo (str): Dimensão ('cor', 'paridade', 'duzia', 'coluna' ou 'metade')
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Índice inicial, comprimento e código de cada sequência
+    """
+    codigos, _, neutro = DIMENSOES_VETORIZADAS[tipo]
+    classes = codigos[numeros]
+    if len(classes) == 0:
+        vazio = np.array([], dtype=np.int64)
+        return vazio, vazio, np.array([], dtype=np.uint8)
+
+    # Propagar o último valor não neutro sobre os zeros
+    posicoes = np.where(classes != neutro, np.arange(len(classes)), -1)
+    np.maximum.accumulate(posicoes, out=posicoes)
+    validos = posicoes >= 0
+    primeiro = int(np.argmax(validos)) if validos.any() else len(classes)
+    preenchidas = classes[posicoes[primeiro:]]
+
+    if len(preenchidas) == 0:
+        vazio = np.array([], dtype=np.int64)
+        return vazio, vazio, np.array([], dtype=np.uint8)
+
+    inicios = np.flatnonzero(np.concatenate(([True], preenchidas[1:] != preenchidas[:-1])))
+    comprimentos = np.diff(np.append(inicios, len(preenchidas)))
+    return inicios + primeiro, comprimentos, preenchidas[inicios]
+
+def histograma_sequencias(numeros: np.ndarray, tipo: str) -> Dict[str, Any]:
+    """
+    Histograma de comprimentos de sequência por valor de uma dimensão
+
+    Args:
+        numeros (np.ndarray): Números em ordem cronológica
+        tipo (str): Dimensão
+
+    Returns:
+        Dict[str, Any]: Por valor, a maior sequência e a contagem por comprimento
+            (histograma[k] = sequências de comprimento k); a sequência em andamento
+            entra no histograma, mas não em `encerradas_minimas`
+    """
+    _, nomes, neutro = DIMENSOES_VETORIZADAS[tipo]
+    _, comprimentos, valores = codificar_execucoes(numeros, tipo)
+
+    resultado = {}
+    for codigo, nome in enumerate(nomes):
+        if codigo == neutro:
+            continue
+        do_valor = comprimentos[valores == codigo]
+        encerradas = comprimentos[:-1][valores[:-1] == codigo] if len(comprimentos) else do_valor
+        resultado[nome] = {
+            'maior': int(do_valor.max()) if len(do_valor) else 0,
+            'histograma': np.bincount(do_valor).tolist() if len(do_valor) else [],
+            'encerradas_minimas': int(np.count_nonzero(encerradas >= COMPRIMENTO_MINIMO_SEQUENCIA))
+        }
+    return resultado
+
+def quentes_frios(numeros: np.ndarray, quantidade: int = 5, janela: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Números quentes e frios pela frequência e pela ausência
+
+    Args:
+        numeros (np.ndarray): Números em ordem cronológica
+        quantidade (int, optional): Números por lista. Defaults to 5.
+        janela (int, optional): Considerar apenas os últimos `janela` números. Defaults to None (todos).
+
+    Returns:
+        Dict[str, Any]: quentes e frios (número, contagem e desvio em relação ao esperado)
+            e atrasados (número e giros desde a última ocorrência)
+    """
+    if janela is not None:
+        numeros = numeros[-janela:]
+    total = len(numeros)
+    contagens = frequencias(numeros)
+    esperado = total / 37.0
+    desvio_padrao = np.sqrt(esperado * (36.0 / 37.0)) if total else 1.0
+
+    # Ordenação estável: empates resolvidos pelo menor número
+    ordem = np.argsort(-contagens, kind='stable')
+    ordem_frios = np.argsort(contagens, kind='stable')
+
+    def item(numero: int) -> Dict[str, Any]:
+        return {
+            'numero': int(numero),
+            'contagem': int(contagens[numero]),
+            'desvio': round(float((contagens[numero] - esperado) / desvio_padrao), 3) if total else 0.0
+        }
+
+    # Giros desde a última ocorrência (total para números que não saíram)
+    ausencia = np.full(37, total, dtype=np.int64)
+    vistos, primeira_no_reverso = np.unique(numeros[::-1], return_index=True)
+    ausencia[vistos] = primeira_no_reverso
+    atrasados = np.argsort(-ausencia, kind='stable')[:quantidade]
+
+    return {
+        'total': total,
+        'quentes': [item(n) for n in ordem[:quantidade]],
+        'frios': [item(n) for n in ordem_frios[:quantidade]],
+        'atrasados': [{'numero': int(n), 'giros': int(ausencia[n])} for n in atrasados]
+    }
+
+def estatisticas_intervalo(historico: Historico, quantidade: int = 5) -> Dict[str, Any]:
+    """
+    Estatísticas completas de um histórico
+
+    Args:
+        historico (Historico): Histórico carregado
+        quantidade (int, optional): Tamanho das listas de quentes/frios. Defaults to 5.
+
+    Returns:
+        Dict[str, Any]: Frequências, distribuições, sequências e quentes/frios
+    """
+    numeros = historico.numeros
+    resultado = {
+        'roleta_id': historico.roleta_id,
+        'total_numeros': len(numeros),
+        'inicio': de_milissegundos(historico.timestamps[0]).isoformat() if len(numeros) else None,
+        'fim': de_milissegundos(historico.timestamps[-1]).isoformat() if len(numeros) else None,
+        'frequencias': frequencias(numeros).tolist(),
+        'distribuicoes': distribuicoes(numeros),
+        'sequencias': {tipo: histograma_sequencias(numeros, tipo) for tipo in DIMENSOES_VETORIZADAS}
+    }
+    resultado.update(quentes_frios(numeros, quantidade))
+    return resultado
+
+def calcular_intervalo(db: Database, roleta_id: str, inicio: Optional[datetime] = None,
+                       fim: Optional[datetime] = None, quantidade: int = 5) -> Dict[str, Any]:
+    """
+    Carrega e analisa o histórico de uma roleta em um intervalo
+
+    Returns:
+        Dict[str, Any]: Estatísticas do intervalo, ou {'erro': ...} em caso de falha
+    """
+    try:
+        return estatisticas_intervalo(carregar_historico(db, roleta_id, inicio, fim), quantidade)
+    except Exception as e:
+        logger.error(f"Erro ao calcular estatísticas do intervalo para roleta {roleta_id}: {str(e)}")
+        return {'roleta_id': roleta_id, 'erro': str(e)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalcula as estatísticas históricas de todas as roletas")
+    parser.add_argument('--dias', type=int, default=365, help="Dias de histórico (padrão: 365)")
+    parser.add_argument('--roleta-id', action='append', help="Roleta a analisar (padrão: todas)")
+    args = parser.parse_args()
+
+    from mongo_config import conectar_mongodb
+    client, db = conectar_mongodb()
+
+    inicio = datetime.now() - timedelta(days=args.dias)
+    total_numeros = 0
+    tempo_leitura = tempo_calculo = 0.0
+    for roleta_id in args.roleta_id or db.roleta_numeros.distinct('roleta_id'):
+        t0 = time.perf_counter()
+        historico = carregar_historico(db, roleta_id, inicio)
+        t1 = time.perf_counter()
+        estatisticas = estatisticas_intervalo(historico)
+        t2 = time.perf_counter()
+        tempo_leitura += t1 - t0
+        tempo_calculo += t2 - t1
+        total_numeros += len(historico)
+        print(f"{roleta_id}: {len(historico)} números, leitura {(t1 - t0) * 1000:.0f} ms, "
+              f"cálculo {(t2 - t1) * 1000:.1f} ms, quentes {[q['numero'] for q in estatisticas['quentes']]}")
+
+    print(f"Total: {total_numeros} números, leitura {tempo_leitura:.2f} s, cálculo {tempo_calculo:.2f} s")
+    sys.exit(0)
+
+if __name__ == "__main__":
+    main()
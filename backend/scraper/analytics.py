@@ -10,12 +10,89 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
 from collections import Counter, defaultdict
 
+from pymongo import UpdateOne, ReturnDocument
+from pymongo.errors import BulkWriteError
+
+from classificacao import DIMENSOES, NEUTRO, COR, PARIDADE, DUZIA, COLUNA, METADE
 from config import logger
 from mongo_config import conectar_mongodb
 
+# Campos removidos dos documentos no formato antigo (listas recalculadas a cada giro)
+CAMPOS_FORMATO_ANTIGO = ('distribuicao_numeros', 'numeros_mais_frequentes', 'numeros_menos_frequentes')
+
+def incrementos(numeros) -> Dict[str, int]:
+    """
+    Contadores das estatísticas diárias para uma sequência de números, em notação de ponto
+
+    Args:
+        numeros: Números sorteados
+
+    Returns:
+        Dict[str, int]: Campos de contador e incrementos (ex.: 'distribuicao_cores.vermelho')
+    """
+    contadores = defaultdict(int)
+    for numero in numeros:
+        contadores['total_numeros'] += 1
+        contadores[f'contagem_numeros.{numero}'] += 1
+        for campo, tabela in DIMENSOES.items():
+            contadores[f'{campo}.{tabela[numero]}'] += 1
+    return dict(contadores)
+
+def contadores_completos(numeros) -> Dict[str, Any]:
+    """
+    Contadores das estatísticas diárias para uma sequência de números, como subdocumentos
+
+    Args:
+        numeros: Números sorteados
+
+    Returns:
+        Dict[str, Any]: total_numeros, contagem_numeros e um subdocumento por distribuição
+    """
+    contadores = {"total_numeros": 0, "contagem_numeros": {}}
+    contadores.update({campo: {} for campo in DIMENSOES})
+    for chave, valor in incrementos(numeros).items():
+        if '.' in chave:
+            campo, subcampo = chave.split('.', 1)
+            contadores[campo][subcampo] = valor
+        else:
+            contadores[chave] = valor
+    return contadores
+
+def montar_estatisticas(documento: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Converte o documento de contadores no formato retornado pela API, derivando a
+    distribuição por número e os mais/menos frequentes na leitura
+
+    Args:
+        documento (Dict[str, Any]): Documento de roleta_estatisticas_diarias
+
+    Returns:
+        Dict[str, Any]: Estatísticas diárias
+    """
+    estatisticas = {k: v for k, v in documento.items() if k not in ('_id', 'formato', 'contagem_numeros')}
+    if documento.get('formato') != 'contadores':
+        # Documento gravado antes dos contadores incrementais
+        return estatisticas
+
+    contagens = [(int(numero), contagem) for numero, contagem in documento.get('contagem_numeros', {}).items()
+                 if contagem > 0]
+    contagens.sort()
+    por_frequencia = sorted(contagens, key=lambda item: -item[1])
+
+    estatisticas['distribuicao_numeros'] = [{"numero": num, "contagem": cont} for num, cont in contagens]
+    estatisticas['numeros_mais_frequentes'] = [{"numero": num, "contagem": cont} for num, cont in por_frequencia[:5]]
+    estatisticas['numeros_menos_frequentes'] = [{"numero": num, "contagem": cont} for num, cont in por_frequencia[:-6:-1]]
+    estatisticas['total_numeros'] = documento.get('total_numeros', 0)
+    for campo, tabela in DIMENSOES.items():
+        estatisticas[campo] = {valor: documento.get(campo, {}).get(valor, 0) for valor in dict.fromkeys(tabela)}
+    return estatisticas
+
 def calcular_estatisticas_diarias(roleta_id: str, data: datetime = None) -> Dict[str, Any]:
     """
-    Calcula estatísticas diárias para uma roleta específica
+    Recalcula do zero as estatísticas diárias de uma roleta a partir de roleta_numeros
+    
+    Com ESTATISTICAS_INCREMENTAIS ativo, os contadores são mantidos por
+    `incrementar_estatisticas` a cada inserção e esta função serve como reparo.
     
     Args:
         roleta_id (str): ID da roleta
@@ -39,68 +116,28 @@ def calcular_estatisticas_diarias(roleta_id: str, data: datetime = None) -> Dict
         # Formatar data como string YYYY-MM-DD
         data_str = data.strftime("%Y-%m-%d")
         
-        # Buscar números da roleta para a data especificada
-        numeros = list(db.roleta_numeros.find({
+        # Buscar apenas os números da roleta para a data especificada
+        numeros = [n["numero"] for n in db.roleta_numeros.find({
             "roleta_id": roleta_id,
             "timestamp": {"$gte": inicio_dia, "$lte": fim_dia}
-        }))
+        }, {"numero": 1, "_id": 0})]
         
-        # Se não houver números, retornar estatísticas vazias
-        if not numeros:
-            estatisticas = {
-                "roleta_id": roleta_id,
-                "data": data_str,
-                "total_numeros": 0,
-                "distribuicao_numeros": [],
-                "distribuicao_cores": {"vermelho": 0, "preto": 0, "verde": 0},
-                "numeros_mais_frequentes": [],
-                "numeros_menos_frequentes": [],
-                "criado_em": datetime.now(),
-                "atualizado_em": datetime.now()
-            }
-        else:
-            # Extrair apenas os números
-            lista_numeros = [n["numero"] for n in numeros]
-            
-            # Contar frequência dos números
-            contador = Counter(lista_numeros)
-            
-            # Distribuição de cores
-            cores = {"vermelho": 0, "preto": 0, "verde": 0}
-            for n in numeros:
-                cor = n.get("cor", "")
-                if cor in cores:
-                    cores[cor] += 1
-            
-            # Números mais e menos frequentes (limitados a 5)
-            mais_frequentes = contador.most_common(5)
-            menos_frequentes = contador.most_common()[:-6:-1]  # 5 menos frequentes
-            
-            # Distribuição completa
-            distribuicao = [{"numero": num, "contagem": cont} for num, cont in contador.items()]
-            
-            # Criar documento de estatísticas
-            estatisticas = {
-                "roleta_id": roleta_id,
-                "data": data_str,
-                "total_numeros": len(lista_numeros),
-                "distribuicao_numeros": distribuicao,
-                "distribuicao_cores": cores,
-                "numeros_mais_frequentes": [{"numero": num, "contagem": cont} for num, cont in mais_frequentes],
-                "numeros_menos_frequentes": [{"numero": num, "contagem": cont} for num, cont in menos_frequentes],
-                "criado_em": datetime.now(),
-                "atualizado_em": datetime.now()
-            }
+        # Contadores completos (os campos pontuados viram subdocumentos)
+        contadores = contadores_completos(numeros)
         
-        # Atualizar ou inserir estatísticas
-        db.roleta_estatisticas_diarias.update_one(
+        documento = db.roleta_estatisticas_diarias.find_one_and_update(
             {"roleta_id": roleta_id, "data": data_str},
-            {"$set": estatisticas},
-            upsert=True
+            {
+                "$set": dict(contadores, formato="contadores", atualizado_em=datetime.now()),
+                "$setOnInsert": {"criado_em": datetime.now()},
+                "$unset": {campo: "" for campo in CAMPOS_FORMATO_ANTIGO}
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
         )
         
-        logger.debug(f"Estatísticas diárias atualizadas para roleta {roleta_id} na data {data_str}")
-        return estatisticas
+        logger.debug(f"Estatísticas diárias recalculadas para roleta {roleta_id} na data {data_str}")
+        return montar_estatisticas(documento)
     except Exception as e:
         logger.error(f"Erro ao calcular estatísticas diárias: {str(e)}")
         return {
@@ -109,326 +146,193 @@ def calcular_estatisticas_diarias(roleta_id: str, data: datetime = None) -> Dict
             "erro": str(e)
         }
 
+def incrementar_estatisticas(db, documentos: List[Dict[str, Any]]) -> bool:
+    """
+    Soma aos contadores diários os números inseridos, com um upsert $inc por roleta e dia
+    
+    Um documento do dia ainda no formato antigo (sem contadores) é convertido pelo
+    recálculo completo, que já inclui os números recém-inseridos.
+    
+    Args:
+        db: Banco de dados
+        documentos (List[Dict[str, Any]]): Documentos inseridos em roleta_numeros
+        
+    Returns:
+        bool: True se os contadores foram atualizados
+    """
+    grupos = defaultdict(list)
+    for documento in documentos:
+        grupos[(documento['roleta_id'], documento['timestamp'].strftime("%Y-%m-%d"))].append(documento['numero'])
+    
+    operacoes = [
+        UpdateOne(
+            {"roleta_id": roleta_id, "data": data_str, "formato": "contadores"},
+            {
+                "$inc": incrementos(numeros),
+                "$set": {"atualizado_em": datetime.now()},
+                "$setOnInsert": {"criado_em": datetime.now()}
+            },
+            upsert=True
+        )
+        for (roleta_id, data_str), numeros in grupos.items()
+    ]
+    if not operacoes:
+        return True
+    
+    try:
+        db.roleta_estatisticas_diarias.bulk_write(operacoes, ordered=False)
+        return True
+    except BulkWriteError as e:
+        # Conflito no índice único (roleta_id, data): documento do dia no formato antigo
+        for erro in e.details.get('writeErrors', []):
+            if erro.get('code') != 11000:
+                logger.error(f"Erro ao incrementar estatísticas diárias: {erro.get('errmsg')}")
+                continue
+            roleta_id, data_str = list(grupos)[erro['index']]
+            calcular_estatisticas_diarias(roleta_id, datetime.strptime(data_str, "%Y-%m-%d"))
+        return True
+    except Exception as e:
+        logger.error(f"Erro ao incrementar estatísticas diárias: {str(e)}")
+        return False
+
+# Dimensões das sequências: (tipo, tabela de classificação, valor neutro)
+DIMENSOES_SEQUENCIA = tuple((tipo, tabela, NEUTRO[tipo]) for tipo, tabela in (
+    ('paridade', PARIDADE), ('cor', COR), ('duzia', DUZIA), ('coluna', COLUNA), ('metade', METADE)
+))
+
+# Comprimento mínimo de uma sequência registrada
+COMPRIMENTO_MINIMO_SEQUENCIA = 3
+
+# Último fim_timestamp gravado por (roleta_id, tipo) neste processo
+_marcas_sequencias: Dict[Tuple[str, str], datetime] = {}
+
+def sequencias_fechadas(roleta_id: str, numeros: List[Dict], janela_completa: bool = True) -> List[Dict[str, Any]]:
+    """
+    Encontra em uma passada as sequências encerradas em todas as dimensões
+    
+    O zero não interrompe a sequência em andamento (e conta no comprimento); só
+    sequências encerradas por um valor diferente e com pelo menos
+    COMPRIMENTO_MINIMO_SEQUENCIA números são retornadas.
+    
+    Args:
+        roleta_id (str): ID da roleta
+        numeros (List[Dict]): Documentos em ordem cronológica
+        janela_completa (bool, optional): False se a lista pode ter cortado o início de
+            uma sequência; nesse caso a sequência que começa no primeiro número é
+            ignorada. Defaults to True.
+        
+    Returns:
+        List[Dict[str, Any]]: Sequências em ordem de encerramento
+    """
+    dimensoes = len(DIMENSOES_SEQUENCIA)
+    atuais = [None] * dimensoes
+    inicios = [0] * dimensoes
+    sequencias = []
+    
+    for i, num in enumerate(numeros):
+        numero = num["numero"]
+        for d, (tipo, tabela, neutro) in enumerate(DIMENSOES_SEQUENCIA):
+            valor = tabela[numero]
+            if valor == atuais[d] or (valor == neutro and atuais[d] is not None):
+                continue
+            
+            # Encerrar a sequência anterior se for longa o suficiente
+            inicio = inicios[d]
+            if atuais[d] is not None and i - inicio >= COMPRIMENTO_MINIMO_SEQUENCIA \
+                    and (janela_completa or inicio > 0):
+                sequencias.append({
+                    "roleta_id": roleta_id,
+                    "tipo": tipo,
+                    "valor": atuais[d],
+                    "comprimento": i - inicio,
+                    "inicio": inicio,
+                    "fim": i - 1,
+                    "inicio_timestamp": numeros[inicio]["timestamp"],
+                    "fim_timestamp": numeros[i - 1]["timestamp"]
+                })
+            
+            if valor != neutro:
+                atuais[d] = valor
+                inicios[d] = i
+    
+    return sequencias
+
 def detectar_sequencias(roleta_id: str, limite: int = 100) -> List[Dict[str, Any]]:
     """
-    Detecta sequências de números, cores e paridades para uma roleta
+    Detecta sequências de paridade, cores, dúzias, colunas e metades para uma roleta
+    
+    As sequências encerradas são encontradas em uma única passada sobre os últimos
+    números; só as que ainda não foram gravadas por este processo vão para o banco,
+    em um único bulk_write.
     
     Args:
         roleta_id (str): ID da roleta
         limite (int, optional): Limite de números a analisar. Defaults to 100.
         
     Returns:
-        List[Dict[str, Any]]: Lista de sequências detectadas
+        List[Dict[str, Any]]: Sequências novas gravadas
     """
     try:
         # Conectar ao MongoDB
         client, db = conectar_mongodb()
         
         # Buscar os últimos números da roleta
-        numeros = list(db.roleta_numeros.find({
-            "roleta_id": roleta_id
-        }).sort("timestamp", -1).limit(limite))
+        numeros = list(db.roleta_numeros.find(
+            {"roleta_id": roleta_id},
+            {"numero": 1, "timestamp": 1, "_id": 0}
+        ).sort("timestamp", -1).limit(limite))
         
         # Inverter para ordem cronológica
         numeros.reverse()
         
         # Se não houver números suficientes, retornar lista vazia
-        if len(numeros) < 3:  # Mínimo para uma sequência interessante
+        if len(numeros) <= COMPRIMENTO_MINIMO_SEQUENCIA:
             return []
         
-        # Listas de sequências detectadas
-        sequencias = []
-        
-        # Detectar sequências de números pares/ímpares
-        detectar_sequencia_paridade(roleta_id, numeros, db, sequencias)
-        
-        # Detectar sequências de cores
-        detectar_sequencia_cores(roleta_id, numeros, db, sequencias)
-        
-        # Detectar sequências de dúzias
-        detectar_sequencia_duzias(roleta_id, numeros, db, sequencias)
+        novas = [
+            sequencia for sequencia in sequencias_fechadas(roleta_id, numeros, janela_completa=len(numeros) < limite)
+            if sequencia["fim_timestamp"] > _marcas_sequencias.get((roleta_id, sequencia["tipo"]), datetime.min)
+        ]
+        if not novas:
+            return []
         
-        # Detectar sequências de colunas
-        detectar_sequencia_colunas(roleta_id, numeros, db, sequencias)
+        agora = datetime.now()
+        db.roleta_sequencias.bulk_write([
+            UpdateOne(
+                {
+                    "roleta_id": roleta_id,
+                    "tipo": sequencia["tipo"],
+                    "valor": sequencia["valor"],
+                    "inicio_timestamp": sequencia["inicio_timestamp"]
+                },
+                {"$set": dict(sequencia, atualizado_em=agora), "$setOnInsert": {"criado_em": agora}},
+                upsert=True
+            )
+            for sequencia in novas
+        ], ordered=False)
         
-        # Detectar sequências de altos/baixos
-        detectar_sequencia_metades(roleta_id, numeros, db, sequencias)
+        for sequencia in novas:
+            chave = (roleta_id, sequencia["tipo"])
+            _marcas_sequencias[chave] = max(sequencia["fim_timestamp"], _marcas_sequencias.get(chave, datetime.min))
         
-        logger.debug(f"Detectadas {len(sequencias)} sequências para roleta {roleta_id}")
-        return sequencias
+        logger.debug(f"Gravadas {len(novas)} sequências novas para roleta {roleta_id}")
+        return novas
     except Exception as e:
         logger.error(f"Erro ao detectar sequências: {str(e)}")
         return []
 
-def detectar_sequencia_paridade(roleta_id: str, numeros: List[Dict], db, sequencias: List):
-    """Detecta sequências de números pares/ímpares"""
-    seq_atual = None
-    inicio = None
-    inicio_timestamp = None
-    
-    for i, num in enumerate(numeros):
-        numero = num["numero"]
-        # Determinar paridade (0 é considerado neutro, nem par nem ímpar)
-        if numero == 0:
-            paridade = "zero"
-        else:
-            paridade = "par" if numero % 2 == 0 else "impar"
-        
-        # Iniciar nova sequência ou continuar a atual
-        if seq_atual is None or (paridade != seq_atual and paridade != "zero"):
-            # Salvar sequência anterior se existir e for longa o suficiente
-            if seq_atual and i - inicio >= 3:
-                fim = i - 1
-                fim_timestamp = numeros[fim]["timestamp"]
-                
-                sequencia = {
-                    "roleta_id": roleta_id,
-                    "tipo": "paridade",
-                    "valor": seq_atual,
-                    "comprimento": fim - inicio + 1,
-                    "inicio": inicio,
-                    "fim": fim,
-                    "inicio_timestamp": inicio_timestamp,
-                    "fim_timestamp": fim_timestamp,
-                    "criado_em": datetime.now(),
-                    "atualizado_em": datetime.now()
-                }
-                
-                db.roleta_sequencias.update_one(
-                    {
-                        "roleta_id": roleta_id,
-                        "tipo": "paridade",
-                        "valor": seq_atual,
-                        "inicio_timestamp": inicio_timestamp
-                    },
-                    {"$set": sequencia},
-                    upsert=True
-                )
-                
-                sequencias.append(sequencia)
-            
-            # Iniciar nova sequência (se não for zero)
-            if paridade != "zero":
-                seq_atual = paridade
-                inicio = i
-                inicio_timestamp = num["timestamp"]
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Recalcula do zero as estatísticas diárias (reparo dos contadores)")
+    parser.add_argument('--roleta-id', action='append', help="Roleta a recalcular (padrão: todas)")
+    parser.add_argument('--data', default=None, help="Dia no formato YYYY-MM-DD (padrão: hoje)")
+    args = parser.parse_args()
 
-def detectar_sequencia_cores(roleta_id: str, numeros: List[Dict], db, sequencias: List):
-    """Detecta sequências de cores"""
-    seq_atual = None
-    inicio = None
-    inicio_timestamp = None
-    
-    for i, num in enumerate(numeros):
-        cor = num.get("cor", "")
-        
-        # Iniciar nova sequência ou continuar a atual
-        if seq_atual is None or (cor != seq_atual and cor != "verde"):
-            # Salvar sequência anterior se existir e for longa o suficiente
-            if seq_atual and i - inicio >= 3:
-                fim = i - 1
-                fim_timestamp = numeros[fim]["timestamp"]
-                
-                sequencia = {
-                    "roleta_id": roleta_id,
-                    "tipo": "cor",
-                    "valor": seq_atual,
-                    "comprimento": fim - inicio + 1,
-                    "inicio": inicio,
-                    "fim": fim,
-                    "inicio_timestamp": inicio_timestamp,
-                    "fim_timestamp": fim_timestamp,
-                    "criado_em": datetime.now(),
-                    "atualizado_em": datetime.now()
-                }
-                
-                db.roleta_sequencias.update_one(
-                    {
-                        "roleta_id": roleta_id,
-                        "tipo": "cor",
-                        "valor": seq_atual,
-                        "inicio_timestamp": inicio_timestamp
-                    },
-                    {"$set": sequencia},
-                    upsert=True
-                )
-                
-                sequencias.append(sequencia)
-            
-            # Iniciar nova sequência (se não for verde/0)
-            if cor not in ["", "verde"]:
-                seq_atual = cor
-                inicio = i
-                inicio_timestamp = num["timestamp"]
+    data = datetime.strptime(args.data, "%Y-%m-%d") if args.data else datetime.now()
+    client, db = conectar_mongodb()
+    for roleta_id in args.roleta_id or db.roleta_numeros.distinct('roleta_id'):
+        estatisticas = calcular_estatisticas_diarias(roleta_id, data)
+        print(f"{roleta_id} {estatisticas['data']}: {estatisticas.get('total_numeros', estatisticas.get('erro'))}")
 
-def detectar_sequencia_duzias(roleta_id: str, numeros: List[Dict], db, sequencias: List):
-    """Detecta sequências de dúzias"""
-    seq_atual = None
-    inicio = None
-    inicio_timestamp = None
-    
-    for i, num in enumerate(numeros):
-        numero = num["numero"]
-        
-        # Determinar dúzia
-        if numero == 0:
-            duzia = "zero"
-        elif 1 <= numero <= 12:
-            duzia = "primeira"
-        elif 13 <= numero <= 24:
-            duzia = "segunda"
-        else:
-            duzia = "terceira"
-        
-        # Iniciar nova sequência ou continuar a atual
-        if seq_atual is None or (duzia != seq_atual and duzia != "zero"):
-            # Salvar sequência anterior se existir e for longa o suficiente
-            if seq_atual and i - inicio >= 3:
-                fim = i - 1
-                fim_timestamp = numeros[fim]["timestamp"]
-                
-                sequencia = {
-                    "roleta_id": roleta_id,
-                    "tipo": "duzia",
-                    "valor": seq_atual,
-                    "comprimento": fim - inicio + 1,
-                    "inicio": inicio,
-                    "fim": fim,
-                    "inicio_timestamp": inicio_timestamp,
-                    "fim_timestamp": fim_timestamp,
-                    "criado_em": datetime.now(),
-                    "atualizado_em": datetime.now()
-                }
-                
-                db.roleta_sequencias.update_one(
-                    {
-                        "roleta_id": roleta_id,
-                        "tipo": "duzia",
-                        "valor": seq_atual,
-                        "inicio_timestamp": inicio_timestamp
-                    },
-                    {"$set": sequencia},
-                    upsert=True
-                )
-                
-                sequencias.append(sequencia)
-            
-            # Iniciar nova sequência (se não for zero)
-            if duzia != "zero":
-                seq_atual = duzia
-                inicio = i
-                inicio_timestamp = num["timestamp"]
-
-def detectar_sequencia_colunas(roleta_id: str, numeros: List[Dict], db, sequencias: List):
-    """Detecta sequências de colunas"""
-    seq_atual = None
-    inicio = None
-    inicio_timestamp = None
-    
-    for i, num in enumerate(numeros):
-        numero = num["numero"]
-        
-        # Determinar coluna
-        if numero == 0:
-            coluna = "zero"
-        else:
-            # Números por coluna:
-            # Coluna 1: 1, 4, 7, 10, 13, 16, 19, 22, 25, 28, 31, 34
-            # Coluna 2: 2, 5, 8, 11, 14, 17, 20, 23, 26, 29, 32, 35
-            # Coluna 3: 3, 6, 9, 12, 15, 18, 21, 24, 27, 30, 33, 36
-            coluna = f"coluna_{(numero - 1) % 3 + 1}"
-        
-        # Iniciar nova sequência ou continuar a atual
-        if seq_atual is None or (coluna != seq_atual and coluna != "zero"):
-            # Salvar sequência anterior se existir e for longa o suficiente
-            if seq_atual and i - inicio >= 3:
-                fim = i - 1
-                fim_timestamp = numeros[fim]["timestamp"]
-                
-                sequencia = {
-                    "roleta_id": roleta_id,
-                    "tipo": "coluna",
-                    "valor": seq_atual,
-                    "comprimento": fim - inicio + 1,
-                    "inicio": inicio,
-                    "fim": fim,
-                    "inicio_timestamp": inicio_timestamp,
-                    "fim_timestamp": fim_timestamp,
-                    "criado_em": datetime.now(),
-                    "atualizado_em": datetime.now()
-                }
-                
-                db.roleta_sequencias.update_one(
-                    {
-                        "roleta_id": roleta_id,
-                        "tipo": "coluna",
-                        "valor": seq_atual,
-                        "inicio_timestamp": inicio_timestamp
-                    },
-                    {"$set": sequencia},
-                    upsert=True
-                )
-                
-                sequencias.append(sequencia)
-            
-            # Iniciar nova sequência (se não for zero)
-            if coluna != "zero":
-                seq_atual = coluna
-                inicio = i
-                inicio_timestamp = num["timestamp"]
-
-def detectar_sequencia_metades(roleta_id: str, numeros: List[Dict], db, sequencias: List):
-    """Detecta sequências de números altos/baixos (metades)"""
-    seq_atual = None
-    inicio = None
-    inicio_timestamp = None
-    
-    for i, num in enumerate(numeros):
-        numero = num["numero"]
-        
-        # Determinar metade
-        if numero == 0:
-            metade = "zero"
-        elif 1 <= numero <= 18:
-            metade = "baixo"
-        else:
-            metade = "alto"
-        
-        # Iniciar nova sequência ou continuar a atual
-        if seq_atual is None or (metade != seq_atual and metade != "zero"):
-            # Salvar sequência anterior se existir e for longa o suficiente
-            if seq_atual and i - inicio >= 3:
-                fim = i - 1
-                fim_timestamp = numeros[fim]["timestamp"]
-                
-                sequencia = {
-                    "roleta_id": roleta_id,
-                    "tipo": "metade",
-                    "valor": seq_atual,
-                    "comprimento": fim - inicio + 1,
-                    "inicio": inicio,
-                    "fim": fim,
-                    "inicio_timestamp": inicio_timestamp,
-                    "fim_timestamp": fim_timestamp,
-                    "criado_em": datetime.now(),
-                    "atualizado_em": datetime.now()
-                }
-                
-                db.roleta_sequencias.update_one(
-                    {
-                        "roleta_id": roleta_id,
-                        "tipo": "metade",
-                        "valor": seq_atual,
-                        "inicio_timestamp": inicio_timestamp
-                    },
-                    {"$set": sequencia},
-                    upsert=True
-                )
-                
-                sequencias.append(sequencia)
-            
-            # Iniciar nova sequência (se não for zero)
-            if metade != "zero":
-                seq_atual = metade
-                inicio = i
-                inicio_timestamp = num["timestamp"] 
\ No newline at end of file
+if __name__ == "__main__":
+    main()
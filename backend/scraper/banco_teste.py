@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Apoio aos scripts de teste que usam MongoDB: o banco real, quando acessível, ou o
+mongomock no lugar do MongoClient de mongo_config, sem afetar os testes seguintes
+"""
+
+import unittest
+from contextlib import contextmanager
+
+import mongo_config
+import persistencia_estrategia
+
+def exigir_mongodb() -> None:
+    """
+    Ignora o teste se não há MongoDB acessível em MONGODB_URI
+
+    Raises:
+        unittest.SkipTest: Sem servidor (o pytest conta o teste como ignorado)
+    """
+    try:
+        mongo_config.conectar_mongodb()
+    except Exception as e:
+        raise unittest.SkipTest(f"MongoDB indisponível: {str(e)}")
+
+@contextmanager
+def mongodb_em_memoria():
+    """
+    Dentro do bloco, mongo_config conecta no mongomock e as fontes de dados MongoDB não usam
+    o spool local. Ao sair, o MongoClient real, as conexões em cache e a configuração do
+    spool voltam ao que eram.
+    """
+    import mongomock
+    import data_source_mongo
+
+    originais = (mongo_config.MongoClient, mongo_config._client, mongo_config._db, mongo_config._colecoes,
+                 persistencia_estrategia._persistencia, data_source_mongo.SPOOL_ATIVO)
+    mongo_config.MongoClient = mongomock.MongoClient
+    mongo_config._client = mongo_config._db = mongo_config._colecoes = None
+    persistencia_estrategia._persistencia = None
+    # O banco em memória nunca cai: o spool local não entra nestes testes
+    data_source_mongo.SPOOL_ATIVO = False
+    try:
+        yield
+    finally:
+        (mongo_config.MongoClient, mongo_config._client, mongo_config._db, mongo_config._colecoes,
+         persistencia_estrategia._persistencia, data_source_mongo.SPOOL_ATIVO) = originais
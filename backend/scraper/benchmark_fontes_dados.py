@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark das fontes de dados: latência de escrita e leitura por implementação
+
+Uso:
+    python benchmark_fontes_dados.py [--fontes memoria,sqlite,mongo] [--numeros 2000] [--roletas 4] [--cenarios]
+
+A fonte SQLite usa um arquivo temporário; a fonte MongoDB usa o banco configurado
+e remove as roletas de teste ao final. Com --cenarios também são medidos o
+processamento do scraper (processar_numeros), o StrategyAnalyzer e o caminho de
+leitura da API de números; na fonte em memória esses números medem só CPU.
+"""
+
+import os
+import sys
+import time
+import uuid
+import random
+import argparse
+import tempfile
+import contextlib
+import io
+from typing import Dict, List, Callable, Tuple
+
+def _percentis(amostras: List[float]) -> Dict[str, float]:
+    """Resume uma lista de latências (em segundos) em milissegundos"""
+    ordenadas = sorted(amostras)
+    if not ordenadas:
+        return {"p50": 0.0, "p99": 0.0, "media": 0.0}
+    return {
+        "p50": ordenadas[len(ordenadas) // 2] * 1000,
+        "p99": ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * 0.99))] * 1000,
+        "media": sum(ordenadas) / len(ordenadas) * 1000
+    }
+
+def _cronometrar(funcao: Callable, repeticoes: int) -> List[float]:
+    """Executa a função várias vezes e retorna a duração de cada execução"""
+    amostras = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        amostras.append(time.perf_counter() - inicio)
+    return amostras
+
+def executar_benchmark(fonte, numeros: int, roletas: int) -> Tuple[Dict[str, Dict[str, float]], List[str]]:
+    """
+    Mede inserção individual, inserção em lote e leituras em uma fonte de dados
+
+    Args:
+        fonte: Implementação de DataSourceInterface
+        numeros (int): Quantidade de números inseridos (distribuídos entre as roletas)
+        roletas (int): Quantidade de roletas de teste
+
+    Returns:
+        Tuple[Dict[str, Dict[str, float]], List[str]]: Percentis por operação e IDs das roletas de teste
+    """
+    ids = [fonte.garantir_roleta_existe(f"benchmark-{uuid.uuid4()}", f"Benchmark {i}") for i in range(roletas)]
+    resultados = {}
+
+    # Inserção individual (caminho do scraper)
+    amostras = []
+    for i in range(numeros):
+        roleta_id = ids[i % roletas]
+        numero = random.randint(0, 36)
+        inicio = time.perf_counter()
+        fonte.inserir_numero(roleta_id, "Benchmark", numero)
+        amostras.append(time.perf_counter() - inicio)
+    resultados["inserir_numero"] = _percentis(amostras)
+
+    # Inserção em lote, quando a fonte oferece
+    if hasattr(fonte, 'inserir_numeros'):
+        lote = [{'roleta_id': ids[i % roletas], 'roleta_nome': "Benchmark", 'numero': random.randint(0, 36)}
+                for i in range(numeros)]
+        inicio = time.perf_counter()
+        fonte.inserir_numeros(lote)
+        duracao = time.perf_counter() - inicio
+        resultados["inserir_numeros (por número)"] = {"p50": duracao / numeros * 1000, "p99": 0.0,
+                                                     "media": duracao / numeros * 1000}
+
+    # Leituras da API e da estratégia
+    resultados["obter_ultimos_numeros(10)"] = _percentis(
+        _cronometrar(lambda: fonte.obter_ultimos_numeros(random.choice(ids), 10), numeros))
+    resultados["obter_ultimos_numeros(500)"] = _percentis(
+        _cronometrar(lambda: fonte.obter_ultimos_numeros(random.choice(ids), 500), max(numeros // 10, 1)))
+    resultados["obter_timestamp_numero"] = _percentis(
+        _cronometrar(lambda: fonte.obter_timestamp_numero(random.choice(ids), random.randint(0, 36), 0), numeros))
+
+    return resultados, ids
+
+def executar_cenarios(fonte, numeros: int, roletas: int) -> Tuple[Dict[str, Dict[str, float]], List[str]]:
+    """
+    Mede os consumidores da fonte de dados: scraper, estratégia e API
+
+    Args:
+        fonte: Implementação de DataSourceInterface
+        numeros (int): Quantidade de números processados
+        roletas (int): Quantidade de roletas de teste
+
+    Returns:
+        Tuple[Dict[str, Dict[str, float]], List[str]]: Percentis por cenário e IDs das roletas de teste
+    """
+    import run_real_scraper
+    from scraper_mongodb import processar_numeros
+    from strategy_analyzer import StrategyAnalyzer
+
+    ids = [fonte.garantir_roleta_existe(f"benchmark-{uuid.uuid4()}", f"Benchmark {i}") for i in range(roletas)]
+    resultados = {}
+
+    # process_new_number grava a estratégia direto no MongoDB e notifica o WebSocket;
+    # durante a medição essas saídas passam pela fonte em teste
+    def atualizar_estrategia(roleta_id, roleta_nome, estado, numero_gatilho, terminais_gatilho, vitorias, derrotas):
+        return fonte.atualizar_dados_estrategia(roleta_id, roleta_nome, estado, numero_gatilho, -1,
+                                                terminais_gatilho, [], vitorias, derrotas, -1)
+    originais = (run_real_scraper.atualizar_estrategia, run_real_scraper.notify_websocket)
+    run_real_scraper.atualizar_estrategia = atualizar_estrategia
+    run_real_scraper.notify_websocket = lambda tipo, dados: None
+
+    # processar_numeros imprime cada número aceito; a saída não entra na medição
+    amostras = []
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(numeros):
+                roleta_id = ids[i % roletas]
+                lote = [str(random.randint(0, 36))]
+                inicio = time.perf_counter()
+                processar_numeros(fonte, roleta_id, "Benchmark", lote)
+                amostras.append(time.perf_counter() - inicio)
+    finally:
+        run_real_scraper.atualizar_estrategia, run_real_scraper.notify_websocket = originais
+    resultados["processar_numeros"] = _percentis(amostras)
+
+    analisadores = {roleta_id: StrategyAnalyzer("Benchmark") for roleta_id in ids}
+    amostras = []
+    for i in range(numeros):
+        analisador = analisadores[ids[i % roletas]]
+        numero = random.randint(0, 36)
+        inicio = time.perf_counter()
+        analisador.add_number(numero)
+        analisador.get_data()
+        amostras.append(time.perf_counter() - inicio)
+    resultados["StrategyAnalyzer"] = _percentis(amostras)
+
+    # Mesmo caminho de leitura de GET /api/roletas/<id>/numeros (limite padrão 50)
+    def leitura_api():
+        roleta_id = random.choice(ids)
+        return [{"numero": num, "cor": fonte.obter_cor_numero(num),
+                 "timestamp": fonte.obter_timestamp_numero(roleta_id, num, i)}
+                for i, num in enumerate(fonte.obter_ultimos_numeros(roleta_id, 50))]
+    resultados["API GET numeros (50)"] = _percentis(_cronometrar(leitura_api, max(numeros // 10, 1)))
+
+    return resultados, ids
+
+def _fonte_memoria(diretorio: str):
+    from data_source_memoria import InMemoryDataSource
+    return InMemoryDataSource()
+
+def _fonte_sqlite(diretorio: str):
+    from data_source_sqlite import SqliteDataSource
+    return SqliteDataSource(os.path.join(diretorio, "benchmark.db"))
+
+def _fonte_mongo(diretorio: str):
+    from data_source_mongo import MongoDataSource
+    return MongoDataSource()
+
+def _limpar_mongo(fonte, ids: List[str]) -> None:
+    filtro = {'roleta_id': {'$in': ids}}
+    for colecao in ('roleta_numeros', 'roleta_estatisticas_diarias', 'roleta_sequencias'):
+        fonte.db[colecao].delete_many(filtro)
+    fonte.db['roletas'].delete_many({'_id': {'$in': ids}})
+
+FONTES = {
+    'memoria': (_fonte_memoria, None),
+    'sqlite': (_fonte_sqlite, None),
+    'mongo': (_fonte_mongo, _limpar_mongo),
+}
+
+def main():
+    """
+    Função principal da linha de comando
+    """
+    parser = argparse.ArgumentParser(description="Benchmark das fontes de dados")
+    parser.add_argument('--fontes', default='memoria,sqlite,mongo',
+                        help="Fontes separadas por vírgula (memoria, sqlite, mongo)")
+    parser.add_argument('--numeros', type=int, default=2000, help="Números inseridos por fonte")
+    parser.add_argument('--roletas', type=int, default=4, help="Quantidade de roletas de teste")
+    parser.add_argument('--cenarios', action='store_true', help="Medir também scraper, estratégia e API")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        for nome in [f.strip() for f in args.fontes.split(',') if f.strip()]:
+            if nome not in FONTES:
+                print(f"Fonte desconhecida: {nome}")
+                continue
+            criar, limpar = FONTES[nome]
+            try:
+                fonte = criar(diretorio)
+            except Exception as e:
+                print(f"\n{nome}: indisponível ({str(e)})")
+                continue
+
+            resultados, ids = executar_benchmark(fonte, args.numeros, args.roletas)
+            if args.cenarios:
+                resultados_cenarios, ids_cenarios = executar_cenarios(fonte, args.numeros, args.roletas)
+                resultados.update(resultados_cenarios)
+                ids.extend(ids_cenarios)
+            print(f"\n{nome} ({args.numeros} números, {args.roletas} roletas)")
+            print(f"  {'operação':<32}{'p50 (ms)':>10}{'p99 (ms)':>10}{'média (ms)':>12}")
+            for operacao, valores in resultados.items():
+                print(f"  {operacao:<32}{valores['p50']:>10.3f}{valores['p99']:>10.3f}{valores['media']:>12.3f}")
+
+            if limpar is not None:
+                limpar(fonte, ids)
+            if hasattr(fonte, 'fechar'):
+                fonte.fechar()
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cache em memória dos últimos números (documentos) de cada roleta
+"""
+
+import time
+import threading
+from collections import deque
+from typing import Dict, List, Any, Optional
+
+class CacheNumerosRecentes:
+    """
+    Mantém, por roleta, um deque com os últimos N documentos de números,
+    do mais recente para o mais antigo.
+
+    Uma roleta marcada como "completa" tem todo o seu histórico no deque
+    (o banco retornou menos documentos do que a profundidade do cache),
+    então qualquer leitura para ela pode ser respondida sem consultar o banco.
+
+    Escritas de outros processos que não passaram por `adicionar` deixariam o cache
+    desatualizado para sempre: passados `validade` segundos da última confirmação,
+    `expirado` pede à fonte de dados que compare o topo do cache com o do banco.
+    Os documentos são copiados na entrada e na saída.
+    """
+
+    def __init__(self, profundidade: int = 500, validade: float = 5.0):
+        self.profundidade = profundidade
+        self.validade = validade
+        self._numeros: Dict[str, deque] = {}
+        self._completas = set()
+        self._validado_em: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def carregar(self, roleta_id: str, documentos: List[Dict[str, Any]]) -> None:
+        """
+        Substitui o conteúdo do cache para uma roleta
+
+        Args:
+            roleta_id (str): ID da roleta
+            documentos (List[Dict[str, Any]]): Documentos do mais recente para o mais antigo,
+                obtidos com limite igual à profundidade do cache
+        """
+        with self._lock:
+            self._numeros[roleta_id] = deque((dict(documento) for documento in documentos[:self.profundidade]),
+                                             maxlen=self.profundidade)
+            self._validado_em[roleta_id] = time.monotonic()
+            if len(documentos) < self.profundidade:
+                self._completas.add(roleta_id)
+            else:
+                self._completas.discard(roleta_id)
+
+    def adicionar(self, roleta_id: str, documento: Dict[str, Any]) -> None:
+        """
+        Adiciona um documento recém-inserido no topo do cache da roleta.
+        Roletas que não estão no cache são ignoradas (serão carregadas na próxima leitura).
+
+        Args:
+            roleta_id (str): ID da roleta
+            documento (Dict[str, Any]): Documento inserido
+        """
+        with self._lock:
+            numeros = self._numeros.get(roleta_id)
+            if numeros is None:
+                return
+
+            # O mesmo documento pode chegar pela inserção local e pelo change stream
+            if documento.get('_id') is not None and any(
+                    numeros[i].get('_id') == documento['_id'] for i in range(min(10, len(numeros)))):
+                return
+
+            # Um documento fora de ordem invalidaria a ordenação por timestamp
+            if numeros and documento.get('timestamp') and numeros[0].get('timestamp') \
+                    and documento['timestamp'] < numeros[0]['timestamp']:
+                del self._numeros[roleta_id]
+                self._completas.discard(roleta_id)
+                return
+
+            if len(numeros) == numeros.maxlen:
+                self._completas.discard(roleta_id)
+            numeros.appendleft(dict(documento))
+
+    def obter(self, roleta_id: str, limite: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Obtém os últimos documentos de uma roleta se o cache puder responder
+
+        Args:
+            roleta_id (str): ID da roleta
+            limite (int): Quantidade de documentos desejada
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: Cópias dos documentos ou None se o cache não cobre a leitura
+        """
+        with self._lock:
+            numeros = self._numeros.get(roleta_id)
+            if numeros is not None and (limite <= len(numeros) or roleta_id in self._completas):
+                self.acertos += 1
+                return [dict(numeros[i]) for i in range(min(limite, len(numeros)))]
+            self.falhas += 1
+            return None
+
+    def obter_por_numero(self, roleta_id: str, numero: int, indice: int) -> Optional[Dict[str, Any]]:
+        """
+        Obtém a ocorrência de índice `indice` (0 = mais recente) de um número em uma roleta
+
+        Returns:
+            Optional[Dict[str, Any]]: Cópia do documento, {} se a roleta está completa e a
+                ocorrência não existe, ou None se o cache não cobre a leitura
+        """
+        with self._lock:
+            numeros = self._numeros.get(roleta_id)
+            if numeros is not None:
+                ocorrencias = 0
+                for documento in numeros:
+                    if documento.get('numero') == numero:
+                        if ocorrencias == indice:
+                            self.acertos += 1
+                            return dict(documento)
+                        ocorrencias += 1
+                if roleta_id in self._completas:
+                    self.acertos += 1
+                    return {}
+            self.falhas += 1
+            return None
+
+    def expirado(self, roleta_id: str) -> Optional[int]:
+        """
+        Indica se o conteúdo de uma roleta precisa ser conferido com o banco
+
+        Returns:
+            Optional[int]: Maior `sequencia` do topo do cache (0 sem sequência) se a roleta está
+                no cache e a validade passou, ou None se não há o que conferir
+        """
+        with self._lock:
+            numeros = self._numeros.get(roleta_id)
+            if numeros is None or time.monotonic() - self._validado_em.get(roleta_id, 0.0) < self.validade:
+                return None
+            return max((int(numeros[i].get('sequencia') or 0) for i in range(min(10, len(numeros)))), default=0)
+
+    def confirmar(self, roleta_id: str) -> None:
+        """Registra que o topo do cache de uma roleta coincide com o do banco"""
+        with self._lock:
+            if roleta_id in self._numeros:
+                self._validado_em[roleta_id] = time.monotonic()
+
+    def contem(self, roleta_id: str) -> bool:
+        """Verifica se a roleta está carregada no cache"""
+        with self._lock:
+            return roleta_id in self._numeros
+
+    def invalidar(self, roleta_id: str = None) -> None:
+        """
+        Descarta o cache de uma roleta, ou de todas se roleta_id for None.
+        Deve ser chamado quando outro processo escreve diretamente no banco.
+        """
+        with self._lock:
+            if roleta_id is None:
+                self._numeros.clear()
+                self._completas.clear()
+                self._validado_em.clear()
+            else:
+                self._numeros.pop(roleta_id, None)
+                self._completas.discard(roleta_id)
+                self._validado_em.pop(roleta_id, None)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Retorna contadores de acertos e falhas do cache"""
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                "profundidade": self.profundidade,
+                "roletas": len(self._numeros),
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "taxa_acerto": (self.acertos / total) if total else 0.0
+            }
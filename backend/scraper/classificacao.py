@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tabelas de classificação dos números da roleta europeia (0 a 36)
+
+Cada dimensão é uma tupla de 37 posições indexada pelo número, calculada uma vez na
+importação: classificar um giro é uma leitura por dimensão, sem condicionais. O zero
+recebe 'verde' na cor e 'zero' nas demais dimensões; no setor da roda (roda.py) ele
+pertence a 'voisins', como na mesa.
+"""
+
+from typing import Dict
+
+from roda import SETOR
+
+NUMEROS_VERMELHOS = frozenset({1, 3, 5, 7, 9, 12, 14, 16, 18, 19, 21, 23, 25, 27, 30, 32, 34, 36})
+
+COR = tuple('verde' if n == 0 else 'vermelho' if n in NUMEROS_VERMELHOS else 'preto' for n in range(37))
+
+PARIDADE = tuple('zero' if n == 0 else 'par' if n % 2 == 0 else 'impar' for n in range(37))
+
+DUZIA = tuple('zero' if n == 0 else ('primeira', 'segunda', 'terceira')[(n - 1) // 12] for n in range(37))
+
+COLUNA = tuple('zero' if n == 0 else f"coluna_{(n - 1) % 3 + 1}" for n in range(37))
+
+METADE = tuple('zero' if n == 0 else 'baixo' if n <= 18 else 'alto' for n in range(37))
+
+# Dimensões por nome do campo de distribuição nas estatísticas diárias
+DIMENSOES = {
+    'distribuicao_cores': COR,
+    'distribuicao_paridade': PARIDADE,
+    'distribuicao_duzias': DUZIA,
+    'distribuicao_colunas': COLUNA,
+    'distribuicao_metades': METADE,
+    'distribuicao_setores': SETOR,
+}
+
+# Valor neutro de cada tabela (não interrompe sequências); o setor não tem valor neutro
+NEUTRO = {'cor': 'verde', 'paridade': 'zero', 'duzia': 'zero', 'coluna': 'zero', 'metade': 'zero',
+          'setor': None}
+
+def classificar(numero: int) -> Dict[str, str]:
+    """
+    Classifica um número em todas as dimensões
+
+    Args:
+        numero (int): Número sorteado (0 a 36)
+
+    Returns:
+        Dict[str, str]: cor, paridade, duzia, coluna, metade e setor
+    """
+    return {
+        'cor': COR[numero],
+        'paridade': PARIDADE[numero],
+        'duzia': DUZIA[numero],
+        'coluna': COLUNA[numero],
+        'metade': METADE[numero],
+        'setor': SETOR[numero]
+    }
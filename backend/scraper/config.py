@@ -53,6 +53,59 @@ MONGODB_URI = os.environ.get('MONGODB_URI', 'mongodb://localhost:27017/runcash')
 MONGODB_DB_NAME = os.environ.get('MONGODB_DB_NAME', 'runcash')
 MONGODB_ENABLED = os.environ.get('MONGODB_ENABLED', '').lower() in ('true', '1', 't')
 
+# Remover índices não declarados em gerenciador_indices.py ao inicializar as coleções
+MONGODB_REMOVER_INDICES_NAO_USADOS = os.environ.get('MONGODB_REMOVER_INDICES_NAO_USADOS', '').lower() in ('true', '1', 't')
+
+# Cache em memória dos últimos números por roleta (0 desativa)
+CACHE_NUMEROS_PROFUNDIDADE = int(os.environ.get('CACHE_NUMEROS_PROFUNDIDADE', '500'))
+
+# Segundos até o topo do cache de uma roleta ser conferido de novo com o banco (uma consulta indexada)
+CACHE_NUMEROS_VALIDADE_SEGUNDOS = float(os.environ.get('CACHE_NUMEROS_VALIDADE_SEGUNDOS', '5'))
+
+# Consumir o change stream do MongoDB na API para enviar eventos SSE (requer replica set)
+CONSUMIDOR_ALTERACOES_ATIVO = os.environ.get('CONSUMIDOR_ALTERACOES_ATIVO', 'true').lower() in ('true', '1', 't')
+
+# Retenção do histórico: idade máxima no banco, diretório dos arquivos e tamanho do lote de remoção
+RETENCAO_DIAS = int(os.environ.get('RETENCAO_DIAS', '90'))
+RETENCAO_ARQUIVO_DIR = os.environ.get('RETENCAO_ARQUIVO_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'arquivo'))
+RETENCAO_LOTE = int(os.environ.get('RETENCAO_LOTE', '1000'))
+
+# Janela (em segundos) para agrupar as gravações do estado da estratégia por roleta
+ESTRATEGIA_JANELA_SEGUNDOS = float(os.environ.get('ESTRATEGIA_JANELA_SEGUNDOS', '1.0'))
+
+# Arquivo do banco SQLite usado por data_source_sqlite.py (implantações de um só nó e testes)
+SQLITE_CAMINHO = os.environ.get('SQLITE_CAMINHO', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'runcash.db'))
+
+# Estatísticas diárias por contadores $inc a cada inserção (false recalcula o dia inteiro a cada número)
+ESTATISTICAS_INCREMENTAIS = os.environ.get('ESTATISTICAS_INCREMENTAIS', 'true').lower() in ('true', '1', 't')
+
+# Spool local de números quando o MongoDB está indisponível: ativação, diretório e intervalo de fsync (ms)
+SPOOL_ATIVO = os.environ.get('SPOOL_ATIVO', 'true').lower() in ('true', '1', 't')
+SPOOL_DIR = os.environ.get('SPOOL_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'spool'))
+SPOOL_FSYNC_MS = int(os.environ.get('SPOOL_FSYNC_MS', '100'))
+
+# Agregados de rollups.py: horas mantidas antes de virar dia e dias mantidos antes de virar semana
+ROLLUPS_HORAS_COMPACTAR = int(os.environ.get('ROLLUPS_HORAS_COMPACTAR', '48'))
+ROLLUPS_DIAS_COMPACTAR = int(os.environ.get('ROLLUPS_DIAS_COMPACTAR', '14'))
+
+# Janelas (em giros) dos números quentes/frios mantidos em memória por janelas_frequencia.py
+JANELAS_FREQUENCIA = tuple(int(j) for j in os.environ.get('JANELAS_FREQUENCIA', '50,100,500').split(','))
+
+# Monitor de aleatoriedade: janela dos testes, janela curta da deriva (em giros) e p-valor de alerta
+MONITOR_JANELA = int(os.environ.get('MONITOR_JANELA', '1000'))
+MONITOR_JANELA_CURTA = int(os.environ.get('MONITOR_JANELA_CURTA', '100'))
+MONITOR_P_ALERTA = float(os.environ.get('MONITOR_P_ALERTA', '0.001'))
+# P-valor acima do qual um alerta termina (padrão: 10× MONITOR_P_ALERTA) e giros até ele poder voltar
+MONITOR_P_RESOLUCAO = float(os.environ.get('MONITOR_P_RESOLUCAO', str(10 * MONITOR_P_ALERTA)))
+MONITOR_ESPERA_ALERTA = int(os.environ.get('MONITOR_ESPERA_ALERTA', '100'))
+
+# Tempo (segundos) que as páginas de /sequencias ficam em cache no servidor e no cliente (max-age)
+SEQUENCIAS_CACHE_SEGUNDOS = int(os.environ.get('SEQUENCIAS_CACHE_SEGUNDOS', '5'))
+
+# Matrizes de transição (matriz_transicao.py): contagens de segunda ordem e intervalo (segundos) de gravação
+MATRIZ_SEGUNDA_ORDEM = os.environ.get('MATRIZ_SEGUNDA_ORDEM', '').lower() in ('true', '1', 't')
+MATRIZ_PERSISTENCIA_SEGUNDOS = float(os.environ.get('MATRIZ_PERSISTENCIA_SEGUNDOS', '60'))
+
 # Configuração de segurança
 API_KEY = os.environ.get('API_KEY', 'dev_key')
 
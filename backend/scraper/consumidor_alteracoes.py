@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Consumidor de change streams do MongoDB para eventos SSE
+
+Acompanha inserções em `roleta_numeros` e atualizações dos campos de estratégia em
+`roletas`, feitas por qualquer processo (scraper, scripts, outras instâncias da API),
+e as repassa ao EventManager. A posição no fluxo (resume token) é persistida para
+retomar sem perder eventos após reinícios.
+
+Change streams exigem replica set; para desenvolvimento local basta um nó:
+    mongod --replSet rs0 --dbpath /tmp/rs0 --port 27017
+    mongosh --eval "rs.initiate()"
+
+Num MongoDB sem replica set o consumidor passa a consultar o banco a cada
+INTERVALO_CONSULTA: números gravados depois da última posição `sequencia` vista de
+cada roleta e roletas com estado de estratégia atualizado (`modo` = 'consulta').
+"""
+
+import time
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from pymongo.database import Database
+from pymongo.errors import OperationFailure, PyMongoError
+
+from config import logger
+from event_manager import event_manager as gerenciador_padrao
+
+# Coleção onde os resume tokens são guardados, um documento por consumidor
+COLECAO_TOKENS = 'consumidor_alteracoes_tokens'
+
+# Intervalo mínimo entre gravações do resume token (em segundos)
+INTERVALO_GRAVACAO_TOKEN = 1.0
+
+# Modo de consulta (sem replica set): intervalo entre consultas, em segundos, máximo de
+# números lidos por roleta em cada uma e consultas entre atualizações da lista de roletas
+INTERVALO_CONSULTA = 1.0
+LIMITE_CONSULTA = 500
+CONSULTAS_POR_LISTAGEM = 30
+
+# Códigos de erro do servidor
+ERRO_SEM_REPLICA_SET = 40573
+ERRO_HISTORICO_PERDIDO = 286
+ERRO_FLUXO_FATAL = 280
+
+# Inserções de números e gravações de estratégia (strategy_helper e MongoDataSource). O fluxo
+# é aberto com full_document='updateLookup': no MongoDB 5.0+ `updatedFields` só lista os campos
+# cujo valor mudou, então uma atualização que muda só vitórias/derrotas não traria o estado e
+# os campos inalterados chegariam vazios. O evento sai sempre do documento completo da roleta.
+PIPELINE = [
+    {'$match': {'$or': [
+        {'ns.coll': 'roleta_numeros', 'operationType': 'insert'},
+        {'ns.coll': 'roletas', 'operationType': {'$in': ['insert', 'update', 'replace']},
+         'fullDocument.estado_estrategia': {'$exists': True}},
+    ]}}
+]
+
+def _iso(valor: Any) -> Any:
+    """Converte datetime para string ISO, mantendo outros valores"""
+    return valor.isoformat() if isinstance(valor, datetime) else valor
+
+def evento_de_alteracao(alteracao: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Converte uma alteração do change stream no evento SSE correspondente
+
+    Args:
+        alteracao (Dict[str, Any]): Documento de alteração do change stream
+
+    Returns:
+        Optional[Dict[str, Any]]: Evento no formato enviado aos clientes, ou None
+    """
+    colecao = alteracao.get('ns', {}).get('coll')
+
+    if colecao == 'roleta_numeros':
+        documento = alteracao.get('fullDocument') or {}
+        return {
+            "type": "new_number",
+            "roleta_id": documento.get('roleta_id'),
+            "roleta_nome": documento.get('roleta_nome'),
+            "numero": documento.get('numero'),
+            "cor": documento.get('cor'),
+            "timestamp": _iso(documento.get('timestamp'))
+        }
+
+    if colecao == 'roletas':
+        campos = alteracao.get('fullDocument') or {}
+        return {
+            "type": "strategy_update",
+            "roleta_id": alteracao.get('documentKey', {}).get('_id'),
+            "roleta_nome": campos.get('roleta_nome') or campos.get('nome'),
+            "estado": campos.get('estado_estrategia'),
+            "numero_gatilho": campos.get('numero_gatilho'),
+            "terminais_gatilho": (campos.get('terminais_gatilho') or [])[:3],
+            "vitorias": campos.get('vitorias'),
+            "derrotas": campos.get('derrotas'),
+            "sugestao_display": campos.get('sugestao_display', '')
+        }
+
+    return None
+
+class ConsumidorAlteracoes:
+    """Thread que acompanha o change stream do banco e notifica os clientes SSE"""
+
+    def __init__(self, db: Database, nome: str = 'api', data_source=None, gerenciador_eventos=None):
+        """
+        Args:
+            db (Database): Banco de dados
+            nome (str, optional): Identificador do consumidor (chave do resume token)
+            data_source (optional): Fonte de dados cujo cache deve refletir escritas externas
+            gerenciador_eventos (optional): EventManager a notificar. Defaults to o singleton.
+        """
+        self.db = db
+        self.nome = nome
+        self.data_source = data_source
+        self.gerenciador_eventos = gerenciador_eventos or gerenciador_padrao
+        self.ativo = False
+        # 'change_stream' ou 'consulta' enquanto ativo
+        self.modo: Optional[str] = None
+        self.eventos_processados = 0
+        self._parar = threading.Event()
+        self._thread = None
+        self._ultima_gravacao_token = 0.0
+
+    def carregar_token(self) -> Optional[Dict[str, Any]]:
+        """Obtém o último resume token persistido para este consumidor"""
+        documento = self.db[COLECAO_TOKENS].find_one({'_id': self.nome})
+        return documento.get('token') if documento else None
+
+    def gravar_token(self, token: Optional[Dict[str, Any]], forcar: bool = False) -> None:
+        """Persiste o resume token, no máximo uma vez por INTERVALO_GRAVACAO_TOKEN"""
+        if token is None:
+            return
+        agora = time.time()
+        if not forcar and agora - self._ultima_gravacao_token < INTERVALO_GRAVACAO_TOKEN:
+            return
+        self.db[COLECAO_TOKENS].update_one(
+            {'_id': self.nome},
+            {'$set': {'token': token, 'atualizado_em': datetime.now()}},
+            upsert=True
+        )
+        self._ultima_gravacao_token = agora
+
+    def iniciar(self, consulta: bool = False) -> 'ConsumidorAlteracoes':
+        """
+        Inicia o consumo em uma thread daemon
+
+        Args:
+            consulta (bool, optional): Consultar o banco desde o início, sem tentar o
+                change stream (MongoDB sabidamente sem replica set). Defaults to False.
+        """
+        self._parar.clear()
+        self.ativo = True
+        alvo = self._executar_consulta if consulta else self._executar
+        self._thread = threading.Thread(target=alvo, name=f"consumidor-{self.nome}", daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self, timeout: float = 5.0) -> None:
+        """Interrompe o consumo e aguarda a thread terminar"""
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.ativo = False
+        self.modo = None
+
+    def processar(self, alteracao: Dict[str, Any]) -> None:
+        """Repassa uma alteração ao cache da fonte de dados e aos clientes SSE"""
+        if self.data_source is not None and alteracao.get('ns', {}).get('coll') == 'roleta_numeros':
+            documento = alteracao.get('fullDocument')
+            if documento:
+                self.data_source.aplicar_numero_externo(documento)
+
+        evento = evento_de_alteracao(alteracao)
+        if evento is not None:
+            self.gerenciador_eventos.notify_clients(evento)
+            self.eventos_processados += 1
+
+    def _executar(self) -> None:
+        token = self.carregar_token()
+        espera = 1
+
+        while not self._parar.is_set():
+            try:
+                with self.db.watch(PIPELINE, resume_after=token, full_document='updateLookup',
+                                   max_await_time_ms=1000) as fluxo:
+                    espera = 1
+                    self.modo = 'change_stream'
+                    while not self._parar.is_set() and fluxo.alive:
+                        alteracao = fluxo.try_next()
+                        if alteracao is not None:
+                            self._processar_seguro(alteracao)
+                        token = fluxo.resume_token
+                        self.gravar_token(token)
+                    self.gravar_token(token, forcar=True)
+            except OperationFailure as e:
+                if e.code == ERRO_SEM_REPLICA_SET:
+                    logger.warning("Change streams indisponíveis (o MongoDB não é um replica set): "
+                                   f"consultando o banco a cada {INTERVALO_CONSULTA}s")
+                    self._executar_consulta()
+                    return
+                if e.code in (ERRO_HISTORICO_PERDIDO, ERRO_FLUXO_FATAL):
+                    # O token é antigo demais para o oplog: recomeçar a partir de agora
+                    logger.warning(f"Resume token do consumidor '{self.nome}' descartado: {str(e)}")
+                    token = None
+                    continue
+                logger.error(f"Erro no change stream: {str(e)}")
+            except PyMongoError as e:
+                logger.error(f"Erro de conexão no change stream: {str(e)}")
+
+            # Aguardar antes de reabrir o fluxo (backoff exponencial até 30s)
+            self._parar.wait(espera)
+            espera = min(espera * 2, 30)
+
+        self.ativo = False
+        self.modo = None
+
+    def _processar_seguro(self, alteracao: Dict[str, Any]) -> None:
+        try:
+            self.processar(alteracao)
+        except Exception as e:
+            logger.error(f"Erro ao processar alteração: {str(e)}")
+
+    def _executar_consulta(self) -> None:
+        """
+        Alternativa ao change stream: consulta os números de cada roleta depois da última
+        posição vista (índice (roleta_id, sequencia)) e as roletas com estratégia atualizada
+        """
+        self.modo = 'consulta'
+        # Como um change stream sem token, começar do que já está gravado
+        posicoes: Dict[str, int] = {}
+        ultima_estrategia = datetime.now().isoformat()
+        consultas = 0
+
+        while not self._parar.is_set():
+            try:
+                if consultas % CONSULTAS_POR_LISTAGEM == 0:
+                    for roleta_id in self.db.roleta_numeros.distinct('roleta_id'):
+                        if roleta_id not in posicoes:
+                            # Roletas que surgem depois da partida são lidas desde o início
+                            topo = self.db.roleta_numeros.find_one(
+                                {'roleta_id': roleta_id, 'sequencia': {'$exists': True}}, {'sequencia': 1},
+                                sort=[('sequencia', -1)]) if consultas == 0 else None
+                            posicoes[roleta_id] = int((topo or {}).get('sequencia') or 0)
+                consultas += 1
+
+                for roleta_id, posicao in posicoes.items():
+                    documentos = (self.db.roleta_numeros
+                        .find({'roleta_id': roleta_id, 'sequencia': {'$exists': True, '$gt': posicao}})
+                        .sort('sequencia', 1)
+                        .limit(LIMITE_CONSULTA))
+                    for documento in documentos:
+                        posicoes[roleta_id] = documento['sequencia']
+                        self._processar_seguro({'ns': {'coll': 'roleta_numeros'}, 'operationType': 'insert',
+                                                'fullDocument': documento})
+
+                for roleta in self.db.roletas.find({'updated_at': {'$gt': ultima_estrategia},
+                                                    'estado_estrategia': {'$exists': True}}):
+                    ultima_estrategia = max(ultima_estrategia, roleta['updated_at'])
+                    self._processar_seguro({'ns': {'coll': 'roletas'}, 'operationType': 'replace',
+                                            'documentKey': {'_id': roleta['_id']}, 'fullDocument': roleta})
+            except PyMongoError as e:
+                logger.error(f"Erro ao consultar alterações: {str(e)}")
+
+            self._parar.wait(INTERVALO_CONSULTA)
+
+        self.ativo = False
+        self.modo = None
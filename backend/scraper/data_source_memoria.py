@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Implementação de fonte de dados em memória
+
+Cada roleta guarda seus números em um array('B') e os timestamps em um array('d')
+(segundos desde a época), em ordem cronológica. Sem I/O, serve de base para
+benchmarks e replays determinísticos, e pode atuar como réplica de leitura dentro
+do processo da API. O estado completo pode ser salvo e restaurado de um único
+arquivo binário.
+"""
+
+import os
+import json
+import struct
+import hashlib
+import threading
+import uuid
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
+
+# Importações locais
+from scraper_core import DataSourceInterface, determinar_cor_numero
+from idempotencia import planejar_insercao, PROFUNDIDADE_ALINHAMENTO
+from config import logger
+
+# Cabeçalho do arquivo de snapshot: assinatura e tamanho do bloco de metadados (JSON)
+ASSINATURA_SNAPSHOT = b'RCMEM001'
+CABECALHO_SNAPSHOT = struct.Struct('<8sI')
+
+def _para_datetime(timestamp) -> datetime:
+    """Normaliza um timestamp (string ISO, datetime ou None) para datetime local sem fuso"""
+    if isinstance(timestamp, datetime):
+        return timestamp.replace(tzinfo=None)
+    if timestamp:
+        try:
+            return datetime.fromisoformat(str(timestamp).replace('Z', '+00:00')).replace(tzinfo=None)
+        except ValueError:
+            pass
+    return datetime.now()
+
+class _Mesa:
+    """Histórico de uma roleta em arrays compactos"""
+
+    __slots__ = ('nome', 'ativa', 'criado_em', 'estrategia', 'numeros', 'timestamps')
+
+    def __init__(self, nome: str, criado_em: float = None):
+        self.nome = nome
+        self.ativa = True
+        self.criado_em = criado_em if criado_em is not None else datetime.now().timestamp()
+        self.estrategia: Dict[str, Any] = {}
+        self.numeros = array('B')
+        self.timestamps = array('d')
+
+class InMemoryDataSource(DataSourceInterface):
+    """Implementação de fonte de dados mantida inteiramente em memória"""
+
+    def __init__(self):
+        """
+        Inicializa a fonte de dados vazia
+        """
+        self._mesas: Dict[str, _Mesa] = {}
+        self._lock = threading.RLock()
+
+    def garantir_roleta_existe(self, roleta_id: str, roleta_nome: str) -> str:
+        """
+        Verifica se a roleta existe, e a insere caso não exista
+
+        Args:
+            roleta_id (str): ID da roleta
+            roleta_nome (str): Nome da roleta
+
+        Returns:
+            str: ID da roleta (mesmo UUID determinístico do MongoDB)
+        """
+        roleta_uuid = str(uuid.UUID(hashlib.md5(str(roleta_id).encode()).hexdigest()))
+        with self._lock:
+            if roleta_uuid not in self._mesas:
+                self._mesas[roleta_uuid] = _Mesa(roleta_nome)
+        return roleta_uuid
+
+    def _mesa(self, roleta_id: str, roleta_nome: str = None) -> _Mesa:
+        """Obtém a mesa de uma roleta, criando-a com o ID informado se necessário"""
+        mesa = self._mesas.get(roleta_id)
+        if mesa is None:
+            mesa = _Mesa(roleta_nome or roleta_id)
+            self._mesas[roleta_id] = mesa
+        return mesa
+
+    def obter_roletas(self) -> List[Dict[str, Any]]:
+        """
+        Obtém todas as roletas ativas
+
+        Returns:
+            List[Dict[str, Any]]: Lista de roletas
+        """
+        with self._lock:
+            roletas = []
+            for roleta_id, mesa in self._mesas.items():
+                if not mesa.ativa:
+                    continue
+                roleta = {'id': roleta_id, 'nome': mesa.nome, 'ativa': True,
+                          'criado_em': datetime.fromtimestamp(mesa.criado_em)}
+                roleta.update(mesa.estrategia)
+                roletas.append(roleta)
+            return roletas
+
+    def obter_ultimos_numeros(self, roleta_id: str, limite: int = 10) -> List[int]:
+        """
+        Obtém os últimos números para uma roleta específica
+
+        Args:
+            roleta_id (str): ID da roleta
+            limite (int, optional): Limite de números. Defaults to 10.
+
+        Returns:
+            List[int]: Lista dos últimos números (do mais recente para o mais antigo)
+        """
+        with self._lock:
+            mesa = self._mesas.get(roleta_id)
+            if mesa is None or limite <= 0:
+                return []
+            inicio = max(len(mesa.numeros) - limite, 0)
+            return mesa.numeros[inicio:].tolist()[::-1]
+
+    def obter_numeros_recentes(self, roleta_id: str, limite: int = 10) -> List[Dict[str, Any]]:
+        """
+        Obtém os documentos dos últimos números de uma roleta
+
+        Args:
+            roleta_id (str): ID da roleta
+            limite (int, optional): Limite de números. Defaults to 10.
+
+        Returns:
+            List[Dict[str, Any]]: Documentos do mais recente para o mais antigo
+        """
+        with self._lock:
+            mesa = self._mesas.get(roleta_id)
+            if mesa is None:
+                return []
+            total = len(mesa.numeros)
+            return [{
+                '_id': f"{roleta_id}:{posicao + 1}",
+                'roleta_id': roleta_id,
+                'roleta_nome': mesa.nome,
+                'numero': mesa.numeros[posicao],
+                'cor': determinar_cor_numero(mesa.numeros[posicao]),
+                'timestamp': datetime.fromtimestamp(mesa.timestamps[posicao]),
+                'sequencia': posicao + 1
+            } for posicao in range(total - 1, max(total - limite, 0) - 1, -1)]
+
+    def obter_cor_numero(self, numero: int) -> str:
+        """
+        Obtém a cor de um número
+
+        Args:
+            numero (int): Número da roleta
+
+        Returns:
+            str: Cor do número (verde, vermelho ou preto)
+        """
+        return determinar_cor_numero(numero)
+
+    def obter_timestamp_numero(self, roleta_id: str, numero: int, indice: int) -> str:
+        """
+        Obtém o timestamp de um número específico
+
+        Args:
+            roleta_id (str): ID da roleta
+            numero (int): Número da roleta
+            indice (int): Índice da ocorrência do número (0 = mais recente)
+
+        Returns:
+            str: Timestamp em formato ISO
+        """
+        with self._lock:
+            mesa = self._mesas.get(roleta_id)
+            if mesa is not None:
+                ocorrencias = 0
+                for posicao in range(len(mesa.numeros) - 1, -1, -1):
+                    if mesa.numeros[posicao] == numero:
+                        if ocorrencias == indice:
+                            return datetime.fromtimestamp(mesa.timestamps[posicao]).isoformat()
+                        ocorrencias += 1
+        return datetime.now().isoformat()
+
+    def inserir_numero(self, roleta_id: str, roleta_nome: str, numero: int,
+                       cor: str = None, timestamp: str = None, historico: List[int] = None) -> bool:
+        """
+        Insere um novo número para uma roleta de forma idempotente
+        (mesmas regras de releitura de MongoDataSource.inserir_numero)
+
+        Args:
+            roleta_id (str): ID da roleta
+            roleta_nome (str): Nome da roleta
+            numero (int): Número sorteado
+            cor (str, optional): Ignorado; a cor é derivada do número. Defaults to None.
+            timestamp (str, optional): Timestamp do evento. Defaults to None.
+            historico (List[int], optional): Números visíveis na página, começando por `numero`
+                e do mais recente para o mais antigo. Defaults to None.
+
+        Returns:
+            bool: True se inserido com sucesso, False se releitura ou inválido
+        """
+        return self.inserir_numeros([{'roleta_id': roleta_id, 'roleta_nome': roleta_nome, 'numero': numero,
+                                      'timestamp': timestamp, 'historico': historico}]) > 0
+
+    def inserir_numeros(self, numeros: List[Dict[str, Any]],
+                        falhas: Optional[List[Dict[str, Any]]] = None) -> int:
+        """
+        Insere vários números com as mesmas garantias de `inserir_numero`
+
+        Args:
+            numeros (List[Dict[str, Any]]): Itens com roleta_id, roleta_nome, numero e,
+                opcionalmente, timestamp e historico, em ordem cronológica
+            falhas (List[Dict[str, Any]], optional): Recebe os itens recusados (números inválidos)
+
+        Returns:
+            int: Quantidade de números inseridos
+        """
+        por_roleta = {}
+        for item in numeros:
+            if not 0 <= int(item['numero']) <= 36:
+                logger.error(f"Número inválido para roleta {item.get('roleta_nome')}: {item['numero']}")
+                if falhas is not None:
+                    falhas.append(item)
+                continue
+            por_roleta.setdefault(item['roleta_id'], []).append(
+                dict(item, numero=int(item['numero']), timestamp=_para_datetime(item.get('timestamp'))))
+
+        inseridos = 0
+        with self._lock:
+            for roleta_id, itens in por_roleta.items():
+                mesa = self._mesa(roleta_id, itens[-1].get('roleta_nome'))
+                profundidade = max([PROFUNDIDADE_ALINHAMENTO] + [2 * len(item.get('historico') or []) for item in itens])
+                gravados = [{'numero': mesa.numeros[posicao],
+                             'timestamp': datetime.fromtimestamp(mesa.timestamps[posicao]),
+                             'sequencia': posicao + 1}
+                            for posicao in range(len(mesa.numeros) - 1,
+                                                 max(len(mesa.numeros) - profundidade, 0) - 1, -1)]
+                for planejado in planejar_insercao(gravados, itens):
+                    # Timestamps não podem recuar: as consultas por dia dependem da ordem dos arrays
+                    instante = planejado['timestamp'].timestamp()
+                    if mesa.timestamps and instante < mesa.timestamps[-1]:
+                        instante = mesa.timestamps[-1]
+                    mesa.numeros.append(planejado['numero'])
+                    mesa.timestamps.append(instante)
+                    inseridos += 1
+        return inseridos
+
+    def aplicar_numero_externo(self, documento: Dict[str, Any]) -> None:
+        """
+        Replica um documento de número gravado em outra fonte (ex.: change stream do MongoDB),
+        permitindo usar esta fonte como réplica de leitura
+
+        Args:
+            documento (Dict[str, Any]): Documento de roleta_numeros
+        """
+        try:
+            self.inserir_numero(documento['roleta_id'], documento.get('roleta_nome'),
+                                documento['numero'], timestamp=documento.get('timestamp'))
+        except Exception as e:
+            logger.error(f"Erro ao replicar número na fonte em memória: {str(e)}")
+
+    def obter_estatisticas_diarias(self, roleta_id: str, data: datetime = None) -> Dict[str, Any]:
+        """
+        Calcula estatísticas diárias para uma roleta (mesmo formato de analytics.calcular_estatisticas_diarias)
+
+        Args:
+            roleta_id (str): ID da roleta
+            data (datetime, optional): Data das estatísticas. Defaults to None (hoje).
+
+        Returns:
+            Dict[str, Any]: Estatísticas diárias
+        """
+        if data is None:
+            data = datetime.now()
+        inicio_dia = datetime(data.year, data.month, data.day)
+        fim_dia = inicio_dia + timedelta(days=1)
+
+        with self._lock:
+            mesa = self._mesas.get(roleta_id)
+            if mesa is None:
+                contador = Counter()
+            else:
+                # Timestamps crescem com a posição: o dia é uma fatia contígua
+                inicio = bisect_left(mesa.timestamps, inicio_dia.timestamp())
+                fim = bisect_left(mesa.timestamps, fim_dia.timestamp())
+                contador = Counter(mesa.numeros[inicio:fim])
+
+        cores = {"vermelho": 0, "preto": 0, "verde": 0}
+        for numero, contagem in contador.items():
+            cores[determinar_cor_numero(numero)] += contagem
+
+        return {
+            "roleta_id": roleta_id,
+            "data": data.strftime("%Y-%m-%d"),
+            "total_numeros": sum(contador.values()),
+            "distribuicao_numeros": [{"numero": num, "contagem": cont} for num, cont in contador.items()],
+            "distribuicao_cores": cores,
+            "numeros_mais_frequentes": [{"numero": num, "contagem": cont} for num, cont in contador.most_common(5)],
+            "numeros_menos_frequentes": [{"numero": num, "contagem": cont} for num, cont in contador.most_common()[:-6:-1]],
+            "atualizado_em": datetime.now()
+        }
+
+    def atualizar_dados_estrategia(
+        self,
+        roleta_id: str,
+        roleta_nome: str,
+        estado: str,
+        numero_gatilho: int,
+        numero_gatilho_anterior: int,
+        terminais_gatilho: List[int],
+        terminais_gatilho_anterior: List[int],
+        vitorias: int,
+        derrotas: int,
+        ultimo_numero: int
+    ) -> bool:
+        """
+        Atualiza os dados da estratégia para uma roleta
+
+        Returns:
+            bool: True se atualizado com sucesso
+        """
+        with self._lock:
+            mesa = self._mesa(roleta_id, roleta_nome)
+            mesa.estrategia = {
+                'estado_estrategia': estado,
+                'numero_gatilho': numero_gatilho,
+                'numero_gatilho_anterior': numero_gatilho_anterior,
+                'terminais_gatilho': list(terminais_gatilho or []),
+                'terminais_gatilho_anterior': list(terminais_gatilho_anterior or []),
+                'vitorias': vitorias,
+                'derrotas': derrotas,
+                'ultimo_numero': ultimo_numero,
+                'updated_at': datetime.now().isoformat()
+            }
+        return True
+
+    def salvar_snapshot(self, caminho: str) -> bool:
+        """
+        Salva todo o estado em um único arquivo binário
+
+        Formato: assinatura, tamanho e bloco JSON de metadados (roletas, estratégias e
+        quantidade de números), seguidos dos bytes dos arrays de cada roleta na ordem dos
+        metadados. O arquivo é escrito ao lado e renomeado, nunca fica pela metade.
+
+        Args:
+            caminho (str): Caminho do arquivo
+
+        Returns:
+            bool: True se salvo com sucesso, False caso contrário
+        """
+        try:
+            with self._lock:
+                metadados = [{
+                    'id': roleta_id,
+                    'nome': mesa.nome,
+                    'ativa': mesa.ativa,
+                    'criado_em': mesa.criado_em,
+                    'estrategia': mesa.estrategia,
+                    'total': len(mesa.numeros)
+                } for roleta_id, mesa in self._mesas.items()]
+                bloco = json.dumps(metadados).encode('utf-8')
+
+                temporario = f"{caminho}.tmp"
+                with open(temporario, 'wb') as arquivo:
+                    arquivo.write(CABECALHO_SNAPSHOT.pack(ASSINATURA_SNAPSHOT, len(bloco)))
+                    arquivo.write(bloco)
+                    for mesa in self._mesas.values():
+                        mesa.numeros.tofile(arquivo)
+                        mesa.timestamps.tofile(arquivo)
+                    arquivo.flush()
+                    os.fsync(arquivo.fileno())
+                os.replace(temporario, caminho)
+
+            logger.info(f"Snapshot da fonte em memória salvo em {caminho}")
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao salvar snapshot em {caminho}: {str(e)}")
+            return False
+
+    def restaurar_snapshot(self, caminho: str) -> bool:
+        """
+        Substitui o estado atual pelo conteúdo de um arquivo salvo com `salvar_snapshot`
+
+        Args:
+            caminho (str): Caminho do arquivo
+
+        Returns:
+            bool: True se restaurado com sucesso, False caso contrário
+        """
+        try:
+            with open(caminho, 'rb') as arquivo:
+                assinatura, tamanho = CABECALHO_SNAPSHOT.unpack(arquivo.read(CABECALHO_SNAPSHOT.size))
+                if assinatura != ASSINATURA_SNAPSHOT:
+                    raise ValueError("assinatura de snapshot inválida")
+
+                mesas = {}
+                for item in json.loads(arquivo.read(tamanho).decode('utf-8')):
+                    mesa = _Mesa(item['nome'], item['criado_em'])
+                    mesa.ativa = item['ativa']
+                    mesa.estrategia = item['estrategia']
+                    mesa.numeros.fromfile(arquivo, item['total'])
+                    mesa.timestamps.fromfile(arquivo, item['total'])
+                    mesas[item['id']] = mesa
+
+            with self._lock:
+                self._mesas = mesas
+
+            logger.info(f"Snapshot restaurado de {caminho}: {len(mesas)} roletas")
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao restaurar snapshot de {caminho}: {str(e)}")
+            return False
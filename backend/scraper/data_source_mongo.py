@@ -7,11 +7,13 @@ Implementação de fonte de dados MongoDB para o sistema
 
 import logging
 import hashlib
+import base64
 import uuid
 from datetime import datetime
-from typing import List, Dict, Any, Optional
-import os
+from typing import List, Dict, Any, Optional, Tuple, Sequence
 import pymongo
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, ConnectionFailure
 
 # Importações locais
 from scraper_core import DataSourceInterface, determinar_cor_numero
@@ -19,42 +21,271 @@ from mongo_config import (
     conectar_mongodb, inicializar_colecoes, 
     roleta_para_documento, numero_para_documento
 )
-from analytics import calcular_estatisticas_diarias, detectar_sequencias
-from config import logger
+from cache_numeros import CacheNumerosRecentes
+from resumos import atualizar_resumo
+from rastreador_sequencias import RastreadorSequencias, PROFUNDIDADE_RECONSTRUCAO
+from janelas_frequencia import JanelasFrequencia
+from monitor_aleatoriedade import MonitorAleatoriedade
+from rollups import incrementar_rollups
+from persistencia_estrategia import obter_persistencia
+from spool_local import SpoolLocal
+from idempotencia import planejar_insercao, PROFUNDIDADE_ALINHAMENTO
+from config import (logger, CACHE_NUMEROS_PROFUNDIDADE, CACHE_NUMEROS_VALIDADE_SEGUNDOS, SPOOL_ATIVO,
+                    ESTATISTICAS_INCREMENTAIS)
+
+# Tentativas de inserção quando outro processo ocupa a mesma posição de sequência
+MAX_TENTATIVAS_SEQUENCIA = 3
+
+def codificar_cursor_sequencias(sequencia: Dict[str, Any]) -> str:
+    """
+    Cursor de paginação das sequências a partir do último item de uma página
+    
+    Args:
+        sequencia (Dict[str, Any]): Documento de roleta_sequencias (com _id e fim_timestamp)
+        
+    Returns:
+        str: Cursor opaco (base64 de fim_timestamp e _id)
+    """
+    chave = f"{sequencia['fim_timestamp'].isoformat()}|{sequencia['_id']}"
+    return base64.urlsafe_b64encode(chave.encode('utf-8')).decode('ascii')
+
+def decodificar_cursor_sequencias(cursor: str) -> Tuple[datetime, ObjectId]:
+    """
+    Decodifica o cursor gerado por `codificar_cursor_sequencias`
+    
+    Args:
+        cursor (str): Cursor recebido do cliente
+        
+    Returns:
+        Tuple[datetime, ObjectId]: fim_timestamp e _id do último item da página anterior
+        
+    Raises:
+        ValueError: Se o cursor for inválido
+    """
+    try:
+        fim_timestamp, id_sequencia = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|')
+        return datetime.fromisoformat(fim_timestamp), ObjectId(id_sequencia)
+    except Exception as e:
+        raise ValueError(f"Cursor inválido: {cursor}") from e
 
 class MongoDataSource(DataSourceInterface):
     """Implementação de fonte de dados usando MongoDB"""
     
-    def __init__(self):
-        """Inicializa a fonte de dados MongoDB"""
+    def __init__(self, gravar_matrizes: bool = True):
+        """
+        Inicializa a fonte de dados MongoDB
+        
+        Args:
+            gravar_matrizes (bool, optional): Gravar periodicamente as matrizes de transição.
+                Só o processo que grava os números (o scraper) deve gravá-las; os demais
+                (a API) só as leem. Defaults to True.
+        """
         # Silenciar pymongo
         logging.getLogger("pymongo").setLevel(logging.CRITICAL)
         
-        mongodb_uri = os.environ.get('MONGODB_URI', 'mongodb://localhost:27017/runcash')
-        db_name = os.environ.get('MONGODB_DB_NAME', 'runcash')
-        
-        # Conectar ao MongoDB sem configuração de pool
-        self.client = pymongo.MongoClient(
-            mongodb_uri, 
-            serverSelectionTimeoutMS=5000
-        )
-        self.db = self.client[db_name]
-        
-        # Verificar conexão sem logs
+        # Cliente compartilhado do processo (conectado na primeira fonte de dados criada)
         try:
-            self.client.server_info()
-            # Sem logging aqui
+            self.client, self.db = conectar_mongodb()
         except Exception as e:
             # Erro crítico, exibir apenas se for fatal
             raise Exception(f"Falha na conexão com MongoDB: {str(e)}")
         
         try:
-            # Conectar ao MongoDB e inicializar coleções
+            # Inicializar coleções (índices verificados uma vez por processo)
             self.colecoes = inicializar_colecoes()
             logger.info("Fonte de dados MongoDB inicializada com sucesso")
         except Exception as e:
             logger.error(f"Erro ao inicializar fonte de dados MongoDB: {str(e)}")
             raise
+        
+        # Gravação em lote do estado da estratégia, compartilhada com strategy_helper
+        self.persistencia = obter_persistencia(self.db)
+        
+        # Sequências em andamento por roleta, atualizadas a cada número
+        self.rastreador = RastreadorSequencias()
+        
+        # Números quentes/frios nas últimas jogadas, por janela
+        self.janelas = JanelasFrequencia()
+        
+        # Qui-quadrado, teste de sequências e deriva por roleta, com alertas
+        self.monitor = MonitorAleatoriedade()
+        
+        # Matriz de transição por roleta, gravada periodicamente (importada aqui: usa NumPy)
+        from matriz_transicao import MatrizesTransicao
+        self.matrizes = MatrizesTransicao(self.db)
+        
+        # Cache dos últimos números por roleta, aquecido a partir do banco
+        self.cache = None
+        if CACHE_NUMEROS_PROFUNDIDADE > 0:
+            self.cache = CacheNumerosRecentes(CACHE_NUMEROS_PROFUNDIDADE, CACHE_NUMEROS_VALIDADE_SEGUNDOS)
+        self.aquecer_cache()
+        if gravar_matrizes:
+            self.matrizes.iniciar()
+        
+        # Roletas já confirmadas no banco: garantir_roleta_existe não consulta de novo
+        self._roletas_conhecidas = set()
+        
+        # Números gravados em disco enquanto o banco não responde, regravados quando ele volta
+        self.spool = SpoolLocal().iniciar_drenagem(self) if SPOOL_ATIVO else None
+    
+    def disponivel(self) -> bool:
+        """
+        Verifica se o MongoDB está respondendo
+        
+        Returns:
+            bool: True se o ping foi respondido
+        """
+        try:
+            self.client.admin.command('ping')
+            return True
+        except Exception:
+            return False
+    
+    def aquecer_cache(self) -> None:
+        """
+        Carrega no cache os últimos números de todas as roletas com números registrados
+        e reconstrói a partir deles as sequências em andamento, as janelas de quentes/frios
+        e o monitor de aleatoriedade; as matrizes de transição voltam da última gravação
+        numa thread, sem atrasar a inicialização
+        """
+        profundidade = max(self.cache.profundidade if self.cache is not None else PROFUNDIDADE_RECONSTRUCAO,
+                           self.janelas.tamanho_maximo, self.monitor.janela)
+        
+        try:
+            roleta_ids = self.colecoes['roleta_numeros'].distinct('roleta_id')
+            for roleta_id in roleta_ids:
+                documentos = list(self.colecoes['roleta_numeros']
+                    .find({"roleta_id": roleta_id})
+                    .sort("timestamp", -1)
+                    .limit(profundidade))
+                if self.cache is not None:
+                    self.cache.carregar(roleta_id, documentos)
+                self.rastreador.reconstruir(roleta_id, reversed(documentos))
+                self.janelas.reconstruir(roleta_id, reversed(documentos))
+                self.monitor.reconstruir(roleta_id, reversed(documentos))
+            self.matrizes.carregar_em_segundo_plano(roleta_ids)
+            if self.cache is not None:
+                logger.info(f"Cache de números aquecido: {self.cache.estatisticas()['roletas']} roletas")
+        except Exception as e:
+            logger.error(f"Erro ao aquecer cache de números: {str(e)}")
+            if self.cache is not None:
+                self.cache.invalidar()
+    
+    def invalidar_cache(self, roleta_id: str = None) -> None:
+        """
+        Invalida o cache de números após escritas externas (outros processos ou scripts)
+        
+        Args:
+            roleta_id (str, optional): ID da roleta. Defaults to None (todas as roletas).
+        """
+        if self.cache is not None:
+            self.cache.invalidar(roleta_id)
+    
+    def _validar_cache(self, roleta_id: str) -> None:
+        """
+        Confere, passada a validade, o topo do cache de uma roleta com o do banco (consulta
+        indexada em (roleta_id, sequencia)) e descarta o cache se outro processo gravou depois
+        """
+        topo = self.cache.expirado(roleta_id)
+        if topo is None:
+            return
+        # O índice é parcial: o filtro precisa declarar que `sequencia` existe
+        documento = self.colecoes['roleta_numeros'].find_one(
+            {"roleta_id": roleta_id, "sequencia": {"$exists": True}}, {"sequencia": 1}, sort=[("sequencia", -1)])
+        if int((documento or {}).get('sequencia') or 0) == topo:
+            self.cache.confirmar(roleta_id)
+        else:
+            self.cache.invalidar(roleta_id)
+    
+    def aplicar_numero_externo(self, documento: Dict[str, Any]) -> None:
+        """
+        Reflete no cache um número inserido por outro processo (ex.: via change stream)
+        
+        Args:
+            documento (Dict[str, Any]): Documento completo inserido em roleta_numeros
+        """
+        if self.cache is not None and documento.get('roleta_id') is not None:
+            self.cache.adicionar(documento['roleta_id'], documento)
+        self.rastreador.registrar(documento)
+        self.janelas.registrar(documento)
+        self.monitor.registrar(documento)
+        self.matrizes.registrar(documento)
+    
+    def obter_sequencias_atuais(self, roleta_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtém as sequências em andamento de uma roleta (cor, paridade, dúzia, coluna e metade)
+        
+        Args:
+            roleta_id (str): ID da roleta
+            
+        Returns:
+            Optional[Dict[str, Any]]: Valor, comprimento e início por dimensão, ou None se não houver números
+        """
+        return self.rastreador.obter(roleta_id)
+    
+    def obter_quentes_frios(self, roleta_id: str, quantidade: int = 5) -> Optional[Dict[str, Any]]:
+        """
+        Obtém os números quentes e frios das últimas jogadas (janelas de JANELAS_FREQUENCIA), sem ler o banco
+        
+        Args:
+            roleta_id (str): ID da roleta
+            quantidade (int, optional): Números quentes e frios por janela. Defaults to 5.
+            
+        Returns:
+            Optional[Dict[str, Any]]: Quentes, frios e contagens por janela, ou None se não houver números
+        """
+        return self.janelas.obter(roleta_id, quantidade)
+    
+    def obter_roda(self, roleta_id: str, casas: Sequence[int] = (1, 2, 3, 4)) -> Optional[Dict[str, Any]]:
+        """
+        Obtém setores da roda e acertos de vizinhos das últimas jogadas (janelas de JANELAS_FREQUENCIA), sem ler o banco
+        
+        Args:
+            roleta_id (str): ID da roleta
+            casas (Sequence[int], optional): Quantidades de vizinhos avaliadas. Defaults to (1, 2, 3, 4).
+        
+        Returns:
+            Optional[Dict[str, Any]]: Setores, distâncias e vizinhos por janela, ou None se não houver números
+        """
+        return self.janelas.obter_roda(roleta_id, casas)
+    
+    def obter_aleatoriedade(self, roleta_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtém os indicadores do monitor de aleatoriedade de uma roleta (qui-quadrado, sequências e deriva)
+        
+        Args:
+            roleta_id (str): ID da roleta
+            
+        Returns:
+            Optional[Dict[str, Any]]: Indicadores e alertas ativos, ou None se não houver números
+        """
+        return self.monitor.obter(roleta_id)
+    
+    def obter_transicoes(self, roleta_id: str, numero: Optional[int] = None,
+                         anterior: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Obtém a matriz de transição da roleta (ou a linha de um número), sem ler o banco
+        
+        Args:
+            roleta_id (str): ID da roleta
+            numero (int, optional): Número cuja linha é devolvida. Defaults to None (matriz inteira).
+            anterior (int, optional): Número antes de `numero`, para a contagem de segunda ordem. Defaults to None.
+        
+        Returns:
+            Optional[Dict[str, Any]]: Contagens de transição, ou None se não houver números
+        """
+        return self.matrizes.obter(roleta_id, numero, anterior)
+    
+    def estatisticas_cache(self) -> Dict[str, Any]:
+        """
+        Obtém os contadores de acertos e falhas do cache de números
+        
+        Returns:
+            Dict[str, Any]: Estatísticas do cache (vazio se o cache estiver desativado)
+        """
+        if self.cache is None:
+            return {}
+        return self.cache.estatisticas()
     
     def garantir_roleta_existe(self, roleta_id: str, roleta_nome: str) -> str:
         """
@@ -72,6 +303,11 @@ class MongoDataSource(DataSourceInterface):
             roleta_id_hash = hashlib.md5(str(roleta_id).encode()).hexdigest()
             roleta_uuid = str(uuid.UUID(roleta_id_hash))
             
+            # Chamado a cada giro: só a primeira chamada por roleta vai ao banco, e nenhuma
+            # enquanto o spool local está ativo (o banco fora do ar custaria o timeout)
+            if roleta_uuid in self._roletas_conhecidas or (self.spool is not None and self.spool.ativo()):
+                return roleta_uuid
+            
             # Verificar se a roleta já existe
             if not self.colecoes['roletas'].find_one({"_id": roleta_uuid}):
                 # Criar documento e inserir
@@ -79,6 +315,7 @@ class MongoDataSource(DataSourceInterface):
                 self.colecoes['roletas'].insert_one(documento)
                 logger.info(f"Roleta {roleta_nome} (ID: {roleta_uuid}) criada no MongoDB")
             
+            self._roletas_conhecidas.add(roleta_uuid)
             return roleta_uuid
         except Exception as e:
             logger.error(f"Erro ao garantir existência da roleta {roleta_nome}: {str(e)}")
@@ -115,23 +352,45 @@ class MongoDataSource(DataSourceInterface):
         Returns:
             List[int]: Lista dos últimos números
         """
+        # Extrair apenas os números
+        return [doc['numero'] for doc in self.obter_numeros_recentes(roleta_id, limite)]
+    
+    def obter_numeros_recentes(self, roleta_id: str, limite: int = 10) -> List[Dict[str, Any]]:
+        """
+        Obtém os documentos dos últimos números de uma roleta, usando o cache quando possível
+        
+        Args:
+            roleta_id (str): ID da roleta
+            limite (int, optional): Limite de números. Defaults to 10.
+            
+        Returns:
+            List[Dict[str, Any]]: Documentos do mais recente para o mais antigo
+        """
         try:
+            if self.cache is not None:
+                self._validar_cache(roleta_id)
+                documentos = self.cache.obter(roleta_id, limite)
+                if documentos is not None:
+                    return documentos
+            
             # Remover completamente a conversão UUID
             # Usar o ID exatamente como foi passado
             print(f"[DATA] Buscando números para roleta ID: {roleta_id}")
             
-            # Consultar os últimos números da roleta
-            numeros_docs = list(self.colecoes['roleta_numeros']
+            # Buscar pelo menos a profundidade do cache para recarregá-lo na mesma consulta
+            limite_consulta = max(limite, self.cache.profundidade) if self.cache is not None else limite
+            documentos = list(self.colecoes['roleta_numeros']
                 .find({"roleta_id": roleta_id})
                 .sort("timestamp", -1)
-                .limit(limite))
+                .limit(limite_consulta))
             
-            # Extrair apenas os números
-            numeros = [doc['numero'] for doc in numeros_docs]
-            print(f"[DATA] Encontrados {len(numeros)} números para roleta ID: {roleta_id}")
-            return numeros
+            if self.cache is not None:
+                self.cache.carregar(roleta_id, documentos)
+            
+            print(f"[DATA] Encontrados {len(documentos)} números para roleta ID: {roleta_id}")
+            return documentos[:limite]
         except Exception as e:
-            logger.error(f"Erro ao obter últimos números para roleta {roleta_id}: {str(e)}")
+            logger.error(f"Erro ao obter números recentes para roleta {roleta_id}: {str(e)}")
             return []
     
     def obter_cor_numero(self, numero: int) -> str:
@@ -159,33 +418,44 @@ class MongoDataSource(DataSourceInterface):
             str: Timestamp em formato ISO
         """
         try:
-            # Remover a conversão UUID e usar o ID original
-            print(f"[DATA] Buscando timestamp para roleta ID: {roleta_id}, número: {numero}")
-            
-            # Tentar obter o timestamp do número
-            numero_doc = self.colecoes['roleta_numeros'].find_one(
-                {"roleta_id": roleta_id, "numero": numero},
-                sort=[("timestamp", -1)],
-                skip=indice
-            )
+            # Tentar responder pelo cache ({} indica que a ocorrência não existe)
+            numero_doc = None
+            if self.cache is not None:
+                self._validar_cache(roleta_id)
+                numero_doc = self.cache.obter_por_numero(roleta_id, numero, indice)
+            
+            if numero_doc is None:
+                # Remover a conversão UUID e usar o ID original
+                print(f"[DATA] Buscando timestamp para roleta ID: {roleta_id}, número: {numero}")
+                
+                # Tentar obter o timestamp do número
+                numero_doc = self.colecoes['roleta_numeros'].find_one(
+                    {"roleta_id": roleta_id, "numero": numero},
+                    sort=[("timestamp", -1)],
+                    skip=indice
+                )
             
             if numero_doc and 'timestamp' in numero_doc:
                 # Converter para string ISO
-                timestamp = numero_doc['timestamp'].isoformat()
-                print(f"[DATA] Timestamp encontrado: {timestamp}")
-                return timestamp
+                return numero_doc['timestamp'].isoformat()
             
             # Fallback: usar timestamp atual
-            print(f"[DATA] Nenhum timestamp encontrado, usando timestamp atual")
             return datetime.now().isoformat()
         except Exception as e:
             logger.error(f"Erro ao obter timestamp para número {numero} da roleta {roleta_id}: {str(e)}")
             return datetime.now().isoformat()
     
     def inserir_numero(self, roleta_id: str, roleta_nome: str, numero: int, 
-                      cor: str = None, timestamp: str = None) -> bool:
+                      cor: str = None, timestamp: str = None, historico: List[int] = None) -> bool:
         """
-        Insere um novo número para uma roleta
+        Insere um novo número para uma roleta de forma idempotente
+        
+        Cada número recebe a sua posição na sequência da roleta (campo `sequencia`),
+        protegida pelo índice único (roleta_id, sequencia). Com o histórico visível na
+        página, a posição vem do alinhamento dele com os últimos números gravados
+        (idempotencia.planejar_insercao): releituras, inclusive de scrapers atrasados, não
+        geram números novos e repetições legítimas são gravadas. Dois processos que leem o
+        mesmo sorteio disputam a mesma posição e o índice único fica com uma só gravação.
         
         Args:
             roleta_id (str): ID da roleta
@@ -193,55 +463,250 @@ class MongoDataSource(DataSourceInterface):
             numero (int): Número sorteado
             cor (str, optional): Cor do número. Defaults to None.
             timestamp (str, optional): Timestamp do evento. Defaults to None.
+            historico (List[int], optional): Números visíveis na página, começando por `numero`
+                e do mais recente para o mais antigo. Defaults to None.
             
         Returns:
-            bool: True se inserido com sucesso, False caso contrário
+            bool: True se inserido (ou enfileirado no spool local), False se releitura ou em caso de erro
         """
+        # O horário é fixado na leitura, não na gravação
+        documento = numero_para_documento(roleta_id, roleta_nome, numero, cor, timestamp)
+        item = {
+            'roleta_id': roleta_id,
+            'roleta_nome': roleta_nome,
+            'numero': numero,
+            'cor': documento['cor'],
+            'timestamp': documento['timestamp'],
+            'historico': historico
+        }
+        
+        # Com o circuito aberto ou números pendentes no spool, manter a ordem gravando nele
+        if self.spool is not None and self.spool.ativo():
+            return self._enfileirar_spool(item)
+        
         try:
-            # Criar documento
-            documento = numero_para_documento(
-                roleta_id=roleta_id,
-                roleta_nome=roleta_nome,
-                numero=numero,
-                cor=cor,
-                timestamp=timestamp
-            )
-            
-            # Inserir no MongoDB
-            result = self.colecoes['roleta_numeros'].insert_one(documento)
-            
-            if result.inserted_id:
-                logger.info(f"Número {numero} inserido para roleta {roleta_nome}")
-                
-                # Atualizar estatísticas (em thread separada para não bloquear)
-                try:
-                    import threading
-                    threading.Thread(
-                        target=self.atualizar_estatisticas_e_sequencias,
-                        args=(roleta_id, roleta_nome),
-                        daemon=True
-                    ).start()
-                except Exception as e:
-                    logger.error(f"Erro ao iniciar thread de atualização de estatísticas: {str(e)}")
-                
-                return True
-            
-            return False
+            return self._gravar_roleta(roleta_id, [item]) > 0
+        except ConnectionFailure as e:
+            if self.spool is None:
+                logger.error(f"Erro ao inserir número {numero} para roleta {roleta_nome}: {str(e)}")
+                return False
+            self.spool.abrir_circuito(str(e))
+            return self._enfileirar_spool(item)
         except Exception as e:
             logger.error(f"Erro ao inserir número {numero} para roleta {roleta_nome}: {str(e)}")
             return False
     
-    def atualizar_estatisticas_e_sequencias(self, roleta_id: str, roleta_nome: str) -> None:
+    def inserir_numeros(self, numeros: List[Dict[str, Any]],
+                        falhas: Optional[List[Dict[str, Any]]] = None) -> int:
+        """
+        Insere vários números em lote com as mesmas garantias de `inserir_numero`
+        
+        Grava direto no MongoDB, sem passar pelo spool local (é o caminho da drenagem).
+        
+        Args:
+            numeros (List[Dict[str, Any]]): Itens com roleta_id, roleta_nome, numero e,
+                opcionalmente, cor, timestamp e historico, em ordem cronológica
+            falhas (List[Dict[str, Any]], optional): Recebe os itens das roletas cuja gravação
+                falhou por outro motivo que não a conexão
+            
+        Returns:
+            int: Quantidade de números inseridos
+            
+        Raises:
+            ConnectionFailure: Se o MongoDB ficar indisponível (usado pela drenagem do spool)
+        """
+        inseridos = 0
+        
+        # Agrupar por roleta preservando a ordem cronológica
+        por_roleta = {}
+        for item in numeros:
+            documento = numero_para_documento(item['roleta_id'], item.get('roleta_nome'), item['numero'],
+                                              item.get('cor'), item.get('timestamp'))
+            por_roleta.setdefault(item['roleta_id'], []).append(
+                dict(item, cor=documento['cor'], timestamp=documento['timestamp']))
+        
+        for roleta_id, itens in por_roleta.items():
+            try:
+                inseridos += self._gravar_roleta(roleta_id, itens)
+            except ConnectionFailure:
+                # Quem regrava o spool local precisa saber que o banco caiu no meio do lote
+                raise
+            except Exception as e:
+                logger.error(f"Erro ao inserir lote de números para roleta {roleta_id}: {str(e)}")
+                if falhas is not None:
+                    falhas.extend(itens)
+        
+        return inseridos
+    
+    def _gravar_roleta(self, roleta_id: str, itens: List[Dict[str, Any]]) -> int:
+        """
+        Grava em ordem as leituras de uma roleta, com as posições de `planejar_insercao`
+        
+        O lote vai num insert_many ordenado. Se outro processo já gravou uma das posições,
+        o MongoDB para nela: os documentos anteriores ficam, o topo é relido e o restante
+        do lote, a partir da leitura em conflito, é planejado de novo.
+        
+        Args:
+            roleta_id (str): ID da roleta
+            itens (List[Dict[str, Any]]): Leituras em ordem cronológica (timestamp como datetime)
+            
+        Returns:
+            int: Quantidade de números inseridos
+        """
+        inseridos = 0
+        profundidade = max([PROFUNDIDADE_ALINHAMENTO] + [2 * len(item.get('historico') or []) for item in itens])
+        
+        for tentativa in range(MAX_TENTATIVAS_SEQUENCIA):
+            if tentativa == 0:
+                gravados = self.obter_numeros_recentes(roleta_id, limite=profundidade)
+            else:
+                # Depois de um conflito, o topo vem do banco pela ordem de sequência (índice parcial)
+                gravados = list(self.colecoes['roleta_numeros']
+                    .find({"roleta_id": roleta_id, "sequencia": {"$exists": True}})
+                    .sort("sequencia", -1)
+                    .limit(profundidade))
+            planejados = planejar_insercao(gravados, itens)
+            if not planejados:
+                return inseridos
+            
+            documentos = []
+            for planejado in planejados:
+                item = itens[planejado['item']]
+                documento = numero_para_documento(
+                    roleta_id=roleta_id,
+                    roleta_nome=item.get('roleta_nome'),
+                    numero=planejado['numero'],
+                    cor=item.get('cor') if planejado['numero'] == item['numero'] else None,
+                    timestamp=planejado['timestamp']
+                )
+                documento['sequencia'] = planejado['sequencia']
+                documentos.append(documento)
+            
+            conflito = None
+            try:
+                self.colecoes['roleta_numeros'].insert_many(documentos, ordered=True)
+            except BulkWriteError as e:
+                erros = e.details.get('writeErrors', [])
+                if not erros or any(erro.get('code') != 11000 for erro in erros):
+                    raise
+                conflito = erros[0]['index']
+                # A sequência em memória ficou desatualizada
+                self.invalidar_cache(roleta_id)
+            
+            gravados = documentos if conflito is None else documentos[:conflito]
+            inseridos += len(gravados)
+            if gravados:
+                for documento in gravados:
+                    logger.info(f"Número {documento['numero']} inserido para roleta {documento['roleta_nome']}")
+                self._apos_insercao(roleta_id, gravados[-1]['roleta_nome'], gravados,
+                                    atualizar_cache=conflito is None)
+            if conflito is None:
+                return inseridos
+            itens = itens[planejados[conflito]['item']:]
+        
+        logger.warning(f"Números não inseridos para roleta {roleta_id}: conflito de sequência persistente")
+        return inseridos
+    
+    def _enfileirar_spool(self, item: Dict[str, Any]) -> bool:
+        """
+        Grava uma leitura no spool local, com a mesma detecção de releitura de `inserir_numero`
+        
+        O alinhamento usa os números pendentes no spool seguidos dos últimos do cache. Cada
+        número novo vai para o spool com o histórico visível nele, para que a drenagem
+        possa alinhá-lo de novo com o que estiver no banco.
+        
+        Returns:
+            bool: True se enfileirado, False se releitura ou em caso de erro
+        """
+        roleta_id = item['roleta_id']
+        try:
+            gravados = (self.cache.obter(roleta_id, PROFUNDIDADE_ALINHAMENTO) or []) if self.cache is not None else []
+            pendentes = self.spool.recentes(roleta_id)
+            # Os pendentes vêm depois do topo conhecido do banco, na ordem em que foram enfileirados
+            topo = int(gravados[0].get('sequencia') or 0) if gravados else 0
+            gravados = [dict(pendente, sequencia=topo + len(pendentes) - i)
+                        for i, pendente in enumerate(pendentes)] + gravados
+            planejados = planejar_insercao(gravados, [item])
+            if not planejados:
+                logger.debug(f"Número {item['numero']} já registrado para roleta {item['roleta_nome']}")
+                return False
+            
+            for planejado in planejados:
+                self.spool.adicionar({
+                    'roleta_id': roleta_id,
+                    'roleta_nome': item['roleta_nome'],
+                    'numero': planejado['numero'],
+                    'cor': item['cor'] if planejado['numero'] == item['numero'] else None,
+                    'timestamp': planejado['timestamp'].isoformat(),
+                    'historico': planejado['historico']
+                })
+            logger.info(f"Número {item['numero']} da roleta {item['roleta_nome']} gravado no spool local")
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao gravar número {item['numero']} da roleta {item['roleta_nome']} no spool local: {str(e)}")
+            return False
+    
+    def _apos_insercao(self, roleta_id: str, roleta_nome: str, documentos: List[Dict[str, Any]],
+                       atualizar_cache: bool = True) -> None:
+        """
+        Atualiza o estado derivado após a inserção de números
+        
+        Args:
+            roleta_id (str): ID da roleta
+            roleta_nome (str): Nome da roleta
+            documentos (List[Dict[str, Any]]): Documentos inseridos, em ordem cronológica
+            atualizar_cache (bool, optional): Acrescentar os documentos ao cache. Defaults to True.
+        """
+        # Manter o cache de números recentes em dia
+        if atualizar_cache and self.cache is not None:
+            for documento in documentos:
+                self.cache.adicionar(roleta_id, documento)
+        
+        # Resumo da roleta, no mesmo caminho de escrita
+        atualizar_resumo(self.db, documentos)
+        
+        # Sequências em andamento
+        for documento in documentos:
+            self.rastreador.registrar(documento)
+            self.janelas.registrar(documento)
+            self.monitor.registrar(documento)
+            self.matrizes.registrar(documento)
+        
+        # Atualizar estatísticas (em thread separada para não bloquear)
+        try:
+            import threading
+            threading.Thread(
+                target=self.atualizar_estatisticas_e_sequencias,
+                args=(roleta_id, roleta_nome, documentos),
+                daemon=True
+            ).start()
+        except Exception as e:
+            logger.error(f"Erro ao iniciar thread de atualização de estatísticas: {str(e)}")
+    
+    def atualizar_estatisticas_e_sequencias(self, roleta_id: str, roleta_nome: str,
+                                            documentos: Optional[List[Dict[str, Any]]] = None) -> None:
         """
         Atualiza estatísticas e sequências para uma roleta
         
         Args:
             roleta_id (str): ID da roleta
             roleta_nome (str): Nome da roleta
+            documentos (Optional[List[Dict[str, Any]]], optional): Números recém-inseridos.
+                Defaults to None (recalcula o dia inteiro).
         """
         try:
-            # Calcular estatísticas diárias para a data atual
-            calcular_estatisticas_diarias(roleta_id)
+            # Importado aqui para não carregar analytics na inicialização do processo
+            from analytics import calcular_estatisticas_diarias, incrementar_estatisticas, detectar_sequencias
+            
+            # Somar os novos números aos contadores do dia, ou recalcular o dia inteiro
+            if ESTATISTICAS_INCREMENTAIS and documentos:
+                incrementar_estatisticas(self.db, documentos)
+            else:
+                calcular_estatisticas_diarias(roleta_id)
+            
+            # Somar os novos números aos agregados por hora
+            if documentos:
+                incrementar_rollups(self.db, documentos)
             
             # Detectar sequências
             detectar_sequencias(roleta_id)
@@ -282,44 +747,79 @@ class MongoDataSource(DataSourceInterface):
             
             if not estatisticas:
                 # Se não existirem estatísticas, calculá-las
+                from analytics import calcular_estatisticas_diarias
                 return calcular_estatisticas_diarias(roleta_id, data)
             
-            # Remover _id do documento
-            if '_id' in estatisticas:
-                del estatisticas['_id']
-            
-            return estatisticas
+            # Distribuição e mais/menos frequentes derivados dos contadores
+            from analytics import montar_estatisticas
+            return montar_estatisticas(estatisticas)
         except Exception as e:
             logger.error(f"Erro ao obter estatísticas diárias para roleta {roleta_id}: {str(e)}")
             return None
     
-    def obter_sequencias(self, roleta_id: str, tipo: Optional[str] = None) -> List[Dict[str, Any]]:
+    def obter_sequencias(self, roleta_id: str, tipo: Optional[str] = None, valor: Optional[str] = None,
+                         comprimento_minimo: Optional[int] = None, inicio: Optional[datetime] = None,
+                         fim: Optional[datetime] = None, limite: int = 100,
+                         apos: Optional[Tuple[datetime, ObjectId]] = None) -> Dict[str, Any]:
         """
-        Obtém as sequências detectadas para uma roleta
+        Obtém as sequências detectadas para uma roleta, das mais recentes para as mais antigas
+        
+        A paginação é por chave (fim_timestamp, _id): cada página continua depois do último
+        item da anterior, usando o índice (roleta_id, tipo, fim_timestamp, _id) sem `skip`.
         
         Args:
             roleta_id: ID da roleta
-            tipo: Tipo de sequência (opcional, se None retorna todas)
+            tipo: Tipo de sequência (cor, paridade, duzia, coluna, metade); None para todos
+            valor: Valor da sequência (ex.: 'vermelho')
+            comprimento_minimo: Comprimento mínimo
+            inicio: Sequências encerradas a partir deste instante
+            fim: Sequências encerradas antes deste instante
+            limite: Tamanho da página
+            apos: Cursor decodificado da página anterior (ver `decodificar_cursor_sequencias`)
             
         Returns:
-            Lista de sequências
+            Dict com `sequencias` (datas em ISO) e `proximo_cursor` (None na última página)
         """
         try:
-            colecao_sequencias = self.db[self.colecoes['sequencias']]
             filtro = {'roleta_id': roleta_id}
-            
             if tipo:
                 filtro['tipo'] = tipo
-                
-            sequencias = list(colecao_sequencias.find(
-                filtro,
-                {'_id': 0}
-            ).sort('timestamp', pymongo.DESCENDING).limit(100))
-            
-            return sequencias
+            if valor:
+                filtro['valor'] = valor
+            if comprimento_minimo:
+                filtro['comprimento'] = {'$gte': comprimento_minimo}
+            if inicio or fim:
+                filtro['fim_timestamp'] = {}
+                if inicio:
+                    filtro['fim_timestamp']['$gte'] = inicio
+                if fim:
+                    filtro['fim_timestamp']['$lt'] = fim
+            if apos:
+                fim_anterior, id_anterior = apos
+                filtro['$or'] = [
+                    {'fim_timestamp': {'$lt': fim_anterior}},
+                    {'fim_timestamp': fim_anterior, '_id': {'$lt': id_anterior}}
+                ]
+            
+            sequencias = list(self.colecoes['roleta_sequencias'].find(filtro).sort(
+                [('fim_timestamp', pymongo.DESCENDING), ('_id', pymongo.DESCENDING)]
+            ).limit(limite + 1))
+            
+            proximo_cursor = None
+            if len(sequencias) > limite:
+                sequencias = sequencias[:limite]
+                proximo_cursor = codificar_cursor_sequencias(sequencias[-1])
+            
+            for sequencia in sequencias:
+                sequencia.pop('_id')
+                for campo in ('inicio_timestamp', 'fim_timestamp', 'criado_em', 'atualizado_em'):
+                    if isinstance(sequencia.get(campo), datetime):
+                        sequencia[campo] = sequencia[campo].isoformat()
+            
+            return {'sequencias': sequencias, 'proximo_cursor': proximo_cursor}
         except Exception as e:
             logger.error(f"Erro ao obter sequências: {str(e)}")
-            return []
+            return {'sequencias': [], 'proximo_cursor': None, 'erro': str(e)}
     
     def atualizar_dados_estrategia(
         self, 
@@ -383,27 +883,8 @@ class MongoDataSource(DataSourceInterface):
                 'roleta_nome': roleta_nome_str  # Manter compatibilidade com ambos os campos
             }
             
-            # Atualizar a coleção de roletas
-            colecao_roletas = self.db[self.colecoes['roletas']]
-            resultado = colecao_roletas.update_one(
-                {'_id': roleta_id},
-                {'$set': dados_estrategia},
-                upsert=True
-            )
-            
-            # Também salvar o histórico de análise da estratégia para análise posterior
-            try:
-                colecao_estrategia = self.db['estrategia_historico']
-                dados_historico = dados_estrategia.copy()
-                dados_historico['roleta_id'] = roleta_id
-                dados_historico['roleta_nome'] = roleta_nome_str
-                dados_historico['timestamp'] = datetime.now().isoformat()
-                colecao_estrategia.insert_one(dados_historico)
-                logger.info(f"Histórico de estratégia salvo para roleta {roleta_nome_str}")
-            except Exception as e:
-                logger.error(f"Erro ao salvar histórico de estratégia: {str(e)}")
-            
-            return resultado.acknowledged
+            # Estado gravado em lote; histórico apenas nas transições da máquina de estados
+            return self.persistencia.registrar(roleta_id, roleta_nome_str, dados_estrategia)
         
         except Exception as e:
             logger.error(f"Erro ao atualizar dados de estratégia: {str(e)}")
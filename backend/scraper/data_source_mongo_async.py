@@ -0,0 +1,642 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Implementação assíncrona (asyncio) da fonte de dados MongoDB, sobre o driver Motor
+
+Espelha os métodos de leitura e escrita de MongoDataSource usados pela API e pela
+ingestão, como corrotinas. Uma camada de API assíncrona pode atender muitas leituras
+concorrentes em um único event loop, sem ocupar uma thread por requisição ou cliente SSE.
+
+Uso:
+    fonte = AsyncMongoDataSource()
+    await fonte.inicializar()
+    numeros = await fonte.obter_ultimos_numeros(roleta_id, 50)
+"""
+
+import asyncio
+import hashlib
+import logging
+import uuid
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Sequence
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import DESCENDING
+from pymongo.errors import BulkWriteError
+
+# Importações locais
+from scraper_core import determinar_cor_numero
+from mongo_config import roleta_para_documento, numero_para_documento
+from data_source_mongo import MAX_TENTATIVAS_SEQUENCIA
+from idempotencia import planejar_insercao, PROFUNDIDADE_ALINHAMENTO
+from cache_numeros import CacheNumerosRecentes
+from persistencia_estrategia import obter_persistencia
+from resumos import COLECAO_RESUMOS, operacao_resumo
+from rastreador_sequencias import RastreadorSequencias, PROFUNDIDADE_RECONSTRUCAO
+from janelas_frequencia import JanelasFrequencia
+from monitor_aleatoriedade import MonitorAleatoriedade
+from rollups import incrementar_rollups
+from config import (logger, MONGODB_URI, MONGODB_DB_NAME, CACHE_NUMEROS_PROFUNDIDADE,
+                    CACHE_NUMEROS_VALIDADE_SEGUNDOS, ESTATISTICAS_INCREMENTAIS)
+
+class AsyncMongoDataSource:
+    """Fonte de dados MongoDB com métodos assíncronos (Motor)"""
+
+    def __init__(self, uri: str = None, db_name: str = None, max_conexoes: int = 100,
+                 gravar_matrizes: bool = True):
+        """
+        Cria o cliente assíncrono. Nenhuma operação de rede é feita aqui;
+        chame `inicializar()` dentro do event loop.
+
+        Args:
+            uri (str, optional): URI do MongoDB. Defaults to MONGODB_URI.
+            db_name (str, optional): Nome do banco. Defaults to MONGODB_DB_NAME.
+            max_conexoes (int, optional): Tamanho máximo do pool de conexões. Defaults to 100.
+            gravar_matrizes (bool, optional): Gravar periodicamente as matrizes de transição;
+                só o processo que grava os números deve gravá-las. Defaults to True.
+        """
+        logging.getLogger("pymongo").setLevel(logging.CRITICAL)
+
+        self.client = AsyncIOMotorClient(uri or MONGODB_URI, serverSelectionTimeoutMS=5000,
+                                         maxPoolSize=max_conexoes)
+        self.db = self.client[db_name or MONGODB_DB_NAME]
+        self.colecoes = {
+            'roletas': self.db.roletas,
+            'roleta_numeros': self.db.roleta_numeros,
+            'roleta_estatisticas_diarias': self.db.roleta_estatisticas_diarias,
+            'roleta_sequencias': self.db.roleta_sequencias
+        }
+
+        self.cache = (CacheNumerosRecentes(CACHE_NUMEROS_PROFUNDIDADE, CACHE_NUMEROS_VALIDADE_SEGUNDOS)
+                      if CACHE_NUMEROS_PROFUNDIDADE > 0 else None)
+        # Roletas já confirmadas no banco: garantir_roleta_existe não consulta de novo
+        self._roletas_conhecidas = set()
+        self.rastreador = RastreadorSequencias()
+        self.janelas = JanelasFrequencia()
+        self.monitor = MonitorAleatoriedade()
+        # Carga e gravação com pymongo síncrono, fora do event loop (importada aqui: usa NumPy)
+        from matriz_transicao import MatrizesTransicao
+        self.matrizes = MatrizesTransicao()
+        self.gravar_matrizes = gravar_matrizes
+        self._tarefas = set()
+
+    async def inicializar(self) -> 'AsyncMongoDataSource':
+        """
+        Verifica a conexão e aquece o cache de números recentes
+
+        Returns:
+            AsyncMongoDataSource: A própria fonte de dados
+        """
+        try:
+            await self.client.admin.command('ping')
+        except Exception as e:
+            raise Exception(f"Falha na conexão com MongoDB: {str(e)}")
+
+        await self.aquecer_cache()
+        if self.gravar_matrizes:
+            self.matrizes.iniciar()
+        logger.info("Fonte de dados MongoDB assíncrona inicializada com sucesso")
+        return self
+
+    def fechar(self) -> None:
+        """Fecha o cliente e as conexões do pool"""
+        self.client.close()
+
+    async def aquecer_cache(self) -> None:
+        """
+        Carrega no cache os últimos números de todas as roletas, com as consultas em paralelo,
+        e reconstrói a partir deles as sequências em andamento, as janelas de quentes/frios
+        e o monitor de aleatoriedade; as matrizes de transição voltam da última gravação
+        numa thread, sem atrasar a inicialização
+        """
+        profundidade = max(self.cache.profundidade if self.cache is not None else PROFUNDIDADE_RECONSTRUCAO,
+                           self.janelas.tamanho_maximo, self.monitor.janela)
+        try:
+            roleta_ids = await self.colecoes['roleta_numeros'].distinct('roleta_id')
+            for roleta_id, documentos in zip(roleta_ids, await asyncio.gather(
+                    *(self._recarregar_cache(roleta_id, profundidade) for roleta_id in roleta_ids))):
+                self.rastreador.reconstruir(roleta_id, reversed(documentos))
+                self.janelas.reconstruir(roleta_id, reversed(documentos))
+                self.monitor.reconstruir(roleta_id, reversed(documentos))
+            self.matrizes.carregar_em_segundo_plano(roleta_ids)
+            if self.cache is not None:
+                logger.info(f"Cache de números aquecido: {self.cache.estatisticas()['roletas']} roletas")
+        except Exception as e:
+            logger.error(f"Erro ao aquecer cache de números: {str(e)}")
+            if self.cache is not None:
+                self.cache.invalidar()
+
+    async def _recarregar_cache(self, roleta_id: str, profundidade: int = None) -> List[Dict[str, Any]]:
+        if profundidade is None:
+            profundidade = self.cache.profundidade if self.cache is not None else PROFUNDIDADE_RECONSTRUCAO
+        documentos = await (self.colecoes['roleta_numeros']
+            .find({"roleta_id": roleta_id})
+            .sort("timestamp", DESCENDING)
+            .limit(profundidade)
+            .to_list(length=profundidade))
+        if self.cache is not None:
+            self.cache.carregar(roleta_id, documentos)
+        return documentos
+
+    async def _validar_cache(self, roleta_id: str) -> None:
+        """Confere o topo do cache com o do banco (mesma regra de MongoDataSource._validar_cache)"""
+        topo = self.cache.expirado(roleta_id)
+        if topo is None:
+            return
+        documento = await self.colecoes['roleta_numeros'].find_one(
+            {"roleta_id": roleta_id, "sequencia": {"$exists": True}}, {"sequencia": 1},
+            sort=[("sequencia", DESCENDING)])
+        if int((documento or {}).get('sequencia') or 0) == topo:
+            self.cache.confirmar(roleta_id)
+        else:
+            self.cache.invalidar(roleta_id)
+
+    def invalidar_cache(self, roleta_id: str = None) -> None:
+        """
+        Invalida o cache de números após escritas externas
+
+        Args:
+            roleta_id (str, optional): ID da roleta. Defaults to None (todas as roletas).
+        """
+        if self.cache is not None:
+            self.cache.invalidar(roleta_id)
+
+    def aplicar_numero_externo(self, documento: Dict[str, Any]) -> None:
+        """
+        Reflete no cache um número inserido por outro processo (ex.: via change stream)
+
+        Args:
+            documento (Dict[str, Any]): Documento completo inserido em roleta_numeros
+        """
+        if self.cache is not None and documento.get('roleta_id') is not None:
+            self.cache.adicionar(documento['roleta_id'], documento)
+        self.rastreador.registrar(documento)
+        self.janelas.registrar(documento)
+        self.monitor.registrar(documento)
+        self.matrizes.registrar(documento)
+
+    def obter_sequencias_atuais(self, roleta_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtém as sequências em andamento de uma roleta (cor, paridade, dúzia, coluna e metade)
+
+        Args:
+            roleta_id (str): ID da roleta
+
+        Returns:
+            Optional[Dict[str, Any]]: Valor, comprimento e início por dimensão, ou None se não houver números
+        """
+        return self.rastreador.obter(roleta_id)
+
+    def obter_quentes_frios(self, roleta_id: str, quantidade: int = 5) -> Optional[Dict[str, Any]]:
+        """
+        Obtém os números quentes e frios das últimas jogadas (janelas de JANELAS_FREQUENCIA), sem ler o banco
+
+        Args:
+            roleta_id (str): ID da roleta
+            quantidade (int, optional): Números quentes e frios por janela. Defaults to 5.
+
+        Returns:
+            Optional[Dict[str, Any]]: Quentes, frios e contagens por janela, ou None se não houver números
+        """
+        return self.janelas.obter(roleta_id, quantidade)
+
+    def obter_roda(self, roleta_id: str, casas: Sequence[int] = (1, 2, 3, 4)) -> Optional[Dict[str, Any]]:
+        """
+        Obtém setores da roda e acertos de vizinhos das últimas jogadas (janelas de JANELAS_FREQUENCIA), sem ler o banco
+
+        Args:
+            roleta_id (str): ID da roleta
+            casas (Sequence[int], optional): Quantidades de vizinhos avaliadas. Defaults to (1, 2, 3, 4).
+
+        Returns:
+            Optional[Dict[str, Any]]: Setores, distâncias e vizinhos por janela, ou None se não houver números
+        """
+        return self.janelas.obter_roda(roleta_id, casas)
+
+    def obter_aleatoriedade(self, roleta_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtém os indicadores do monitor de aleatoriedade de uma roleta (qui-quadrado, sequências e deriva)
+
+        Args:
+            roleta_id (str): ID da roleta
+
+        Returns:
+            Optional[Dict[str, Any]]: Indicadores e alertas ativos, ou None se não houver números
+        """
+        return self.monitor.obter(roleta_id)
+
+    def obter_transicoes(self, roleta_id: str, numero: Optional[int] = None,
+                         anterior: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Obtém a matriz de transição da roleta (ou a linha de um número), sem ler o banco
+
+        Args:
+            roleta_id (str): ID da roleta
+            numero (int, optional): Número cuja linha é devolvida. Defaults to None (matriz inteira).
+            anterior (int, optional): Número antes de `numero`, para a contagem de segunda ordem. Defaults to None.
+
+        Returns:
+            Optional[Dict[str, Any]]: Contagens de transição, ou None se não houver números
+        """
+        return self.matrizes.obter(roleta_id, numero, anterior)
+
+    def estatisticas_cache(self) -> Dict[str, Any]:
+        """
+        Obtém os contadores de acertos e falhas do cache de números
+
+        Returns:
+            Dict[str, Any]: Estatísticas do cache (vazio se o cache estiver desativado)
+        """
+        return self.cache.estatisticas() if self.cache is not None else {}
+
+    async def garantir_roleta_existe(self, roleta_id: str, roleta_nome: str) -> str:
+        """
+        Verifica se a roleta existe, e a insere caso não exista
+
+        Args:
+            roleta_id (str): ID da roleta
+            roleta_nome (str): Nome da roleta
+
+        Returns:
+            str: ID da roleta no MongoDB
+        """
+        try:
+            roleta_uuid = str(uuid.UUID(hashlib.md5(str(roleta_id).encode()).hexdigest()))
+            if roleta_uuid in self._roletas_conhecidas:
+                return roleta_uuid
+
+            # Upsert com $setOnInsert: uma única ida ao banco, sem corrida entre verificação e inserção
+            documento = roleta_para_documento(roleta_uuid, roleta_nome)
+            documento.pop('_id')
+            resultado = await self.colecoes['roletas'].update_one(
+                {"_id": roleta_uuid}, {"$setOnInsert": documento}, upsert=True)
+            if resultado.upserted_id is not None:
+                logger.info(f"Roleta {roleta_nome} (ID: {roleta_uuid}) criada no MongoDB")
+
+            self._roletas_conhecidas.add(roleta_uuid)
+            return roleta_uuid
+        except Exception as e:
+            logger.error(f"Erro ao garantir existência da roleta {roleta_nome}: {str(e)}")
+            return roleta_id
+
+    async def obter_roletas(self) -> List[Dict[str, Any]]:
+        """
+        Obtém todas as roletas ativas
+
+        Returns:
+            List[Dict[str, Any]]: Lista de roletas
+        """
+        try:
+            roletas = await self.colecoes['roletas'].find({"ativa": True}).to_list(length=None)
+            for roleta in roletas:
+                roleta['id'] = roleta.pop('_id')
+            return roletas
+        except Exception as e:
+            logger.error(f"Erro ao obter roletas: {str(e)}")
+            return []
+
+    async def obter_roleta(self, roleta_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtém uma roleta pelo campo `id`, como os handlers da API
+
+        Args:
+            roleta_id (str): ID da roleta
+
+        Returns:
+            Optional[Dict[str, Any]]: Documento da roleta (sem _id) ou None
+        """
+        try:
+            return await self.colecoes['roletas'].find_one({'id': roleta_id}, {'_id': 0})
+        except Exception as e:
+            logger.error(f"Erro ao obter roleta {roleta_id}: {str(e)}")
+            return None
+
+    async def obter_ultimos_numeros(self, roleta_id: str, limite: int = 10) -> List[int]:
+        """
+        Obtém os últimos números para uma roleta específica
+
+        Args:
+            roleta_id (str): ID da roleta
+            limite (int, optional): Limite de números. Defaults to 10.
+
+        Returns:
+            List[int]: Lista dos últimos números
+        """
+        return [doc['numero'] for doc in await self.obter_numeros_recentes(roleta_id, limite)]
+
+    async def obter_numeros_recentes(self, roleta_id: str, limite: int = 10) -> List[Dict[str, Any]]:
+        """
+        Obtém os documentos dos últimos números de uma roleta, usando o cache quando possível
+
+        Args:
+            roleta_id (str): ID da roleta
+            limite (int, optional): Limite de números. Defaults to 10.
+
+        Returns:
+            List[Dict[str, Any]]: Documentos do mais recente para o mais antigo
+        """
+        try:
+            if self.cache is not None:
+                await self._validar_cache(roleta_id)
+                documentos = self.cache.obter(roleta_id, limite)
+                if documentos is not None:
+                    return documentos
+
+                if limite <= self.cache.profundidade:
+                    return (await self._recarregar_cache(roleta_id))[:limite]
+
+            return await (self.colecoes['roleta_numeros']
+                .find({"roleta_id": roleta_id})
+                .sort("timestamp", DESCENDING)
+                .limit(limite)
+                .to_list(length=limite))
+        except Exception as e:
+            logger.error(f"Erro ao obter números recentes para roleta {roleta_id}: {str(e)}")
+            return []
+
+    def obter_cor_numero(self, numero: int) -> str:
+        """
+        Obtém a cor de um número (sem acesso ao banco, por isso síncrono)
+
+        Args:
+            numero (int): Número da roleta
+
+        Returns:
+            str: Cor do número (verde, vermelho ou preto)
+        """
+        return determinar_cor_numero(numero)
+
+    async def obter_timestamp_numero(self, roleta_id: str, numero: int, indice: int) -> str:
+        """
+        Obtém o timestamp de um número específico
+
+        Args:
+            roleta_id (str): ID da roleta
+            numero (int): Número da roleta
+            indice (int): Índice do número na lista
+
+        Returns:
+            str: Timestamp em formato ISO
+        """
+        try:
+            numero_doc = None
+            if self.cache is not None:
+                await self._validar_cache(roleta_id)
+                numero_doc = self.cache.obter_por_numero(roleta_id, numero, indice)
+
+            if numero_doc is None:
+                numero_doc = await self.colecoes['roleta_numeros'].find_one(
+                    {"roleta_id": roleta_id, "numero": numero},
+                    sort=[("timestamp", DESCENDING)],
+                    skip=indice
+                )
+
+            if numero_doc and 'timestamp' in numero_doc:
+                return numero_doc['timestamp'].isoformat()
+            return datetime.now().isoformat()
+        except Exception as e:
+            logger.error(f"Erro ao obter timestamp para número {numero} da roleta {roleta_id}: {str(e)}")
+            return datetime.now().isoformat()
+
+    async def inserir_numero(self, roleta_id: str, roleta_nome: str, numero: int,
+                             cor: str = None, timestamp: str = None, historico: List[int] = None) -> bool:
+        """
+        Insere um novo número para uma roleta de forma idempotente
+        (mesmas regras de sequência de MongoDataSource.inserir_numero)
+
+        Args:
+            roleta_id (str): ID da roleta
+            roleta_nome (str): Nome da roleta
+            numero (int): Número sorteado
+            cor (str, optional): Cor do número. Defaults to None.
+            timestamp (str, optional): Timestamp do evento. Defaults to None.
+            historico (List[int], optional): Números visíveis na página, começando por `numero`
+                e do mais recente para o mais antigo. Defaults to None.
+
+        Returns:
+            bool: True se inserido com sucesso, False se releitura ou em caso de erro
+        """
+        try:
+            return await self._inserir_lote_roleta(roleta_id, [{
+                'roleta_id': roleta_id,
+                'roleta_nome': roleta_nome,
+                'numero': numero,
+                'cor': cor,
+                'timestamp': timestamp,
+                'historico': historico
+            }]) > 0
+        except Exception as e:
+            logger.error(f"Erro ao inserir número {numero} para roleta {roleta_nome}: {str(e)}")
+            return False
+
+    async def inserir_numeros(self, numeros: List[Dict[str, Any]]) -> int:
+        """
+        Insere vários números em lote, com as roletas gravadas em paralelo
+
+        Args:
+            numeros (List[Dict[str, Any]]): Itens com roleta_id, roleta_nome, numero e,
+                opcionalmente, cor, timestamp e historico, em ordem cronológica
+
+        Returns:
+            int: Quantidade de números inseridos
+        """
+        por_roleta = {}
+        for item in numeros:
+            por_roleta.setdefault(item['roleta_id'], []).append(item)
+
+        resultados = await asyncio.gather(*(self._inserir_lote_roleta(roleta_id, itens)
+                                            for roleta_id, itens in por_roleta.items()))
+        return sum(resultados)
+
+    async def _inserir_lote_roleta(self, roleta_id: str, itens: List[Dict[str, Any]]) -> int:
+        """
+        Grava em ordem as leituras de uma roleta (mesmas regras de MongoDataSource._gravar_roleta)
+        """
+        inseridos = 0
+        try:
+            normalizados = []
+            for item in itens:
+                # O horário é fixado na leitura, não na gravação
+                documento = numero_para_documento(roleta_id, item.get('roleta_nome'), item['numero'],
+                                                  item.get('cor'), item.get('timestamp'))
+                normalizados.append(dict(item, cor=documento['cor'], timestamp=documento['timestamp']))
+            itens = normalizados
+            profundidade = max([PROFUNDIDADE_ALINHAMENTO] + [2 * len(item.get('historico') or []) for item in itens])
+
+            for tentativa in range(MAX_TENTATIVAS_SEQUENCIA):
+                if tentativa == 0:
+                    gravados = await self.obter_numeros_recentes(roleta_id, limite=profundidade)
+                else:
+                    # Depois de um conflito, o topo vem do banco pela ordem de sequência (índice parcial)
+                    gravados = await (self.colecoes['roleta_numeros']
+                        .find({"roleta_id": roleta_id, "sequencia": {"$exists": True}})
+                        .sort("sequencia", DESCENDING)
+                        .limit(profundidade)
+                        .to_list(length=profundidade))
+                planejados = planejar_insercao(gravados, itens)
+                if not planejados:
+                    return inseridos
+
+                documentos = []
+                for planejado in planejados:
+                    item = itens[planejado['item']]
+                    documento = numero_para_documento(roleta_id, item.get('roleta_nome'), planejado['numero'],
+                                                      item.get('cor') if planejado['numero'] == item['numero'] else None,
+                                                      planejado['timestamp'])
+                    documento['sequencia'] = planejado['sequencia']
+                    documentos.append(documento)
+
+                conflito = None
+                try:
+                    await self.colecoes['roleta_numeros'].insert_many(documentos, ordered=True)
+                except BulkWriteError as e:
+                    erros = e.details.get('writeErrors', [])
+                    if not erros or any(erro.get('code') != 11000 for erro in erros):
+                        raise
+                    conflito = erros[0]['index']
+                    self.invalidar_cache(roleta_id)
+
+                gravados = documentos if conflito is None else documentos[:conflito]
+                inseridos += len(gravados)
+                if gravados:
+                    for documento in gravados:
+                        logger.info(f"Número {documento['numero']} inserido para roleta {documento['roleta_nome']}")
+                    await self._apos_insercao(roleta_id, gravados[-1]['roleta_nome'], gravados,
+                                              atualizar_cache=conflito is None)
+                if conflito is None:
+                    return inseridos
+                itens = itens[planejados[conflito]['item']:]
+
+            logger.warning(f"Números não inseridos para roleta {roleta_id}: conflito de sequência persistente")
+            return inseridos
+        except Exception as e:
+            logger.error(f"Erro ao inserir lote de números para roleta {roleta_id}: {str(e)}")
+            return inseridos
+
+    async def _apos_insercao(self, roleta_id: str, roleta_nome: str, documentos: List[Dict[str, Any]],
+                             atualizar_cache: bool = True) -> None:
+        """
+        Atualiza o cache e o resumo da roleta e agenda estatísticas e sequências fora do
+        event loop (as rotinas de analytics usam pymongo síncrono)
+        """
+        if atualizar_cache and self.cache is not None:
+            for documento in documentos:
+                self.cache.adicionar(roleta_id, documento)
+        for documento in documentos:
+            self.rastreador.registrar(documento)
+            self.janelas.registrar(documento)
+            self.monitor.registrar(documento)
+            self.matrizes.registrar(documento)
+
+        try:
+            await self.db[COLECAO_RESUMOS].bulk_write([operacao_resumo(doc) for doc in documentos], ordered=True)
+        except Exception as e:
+            logger.error(f"Erro ao atualizar resumo da roleta {roleta_nome}: {str(e)}")
+
+        tarefa = asyncio.get_running_loop().run_in_executor(
+            None, self._atualizar_estatisticas_e_sequencias, roleta_id, roleta_nome, documentos)
+        self._tarefas.add(tarefa)
+        tarefa.add_done_callback(self._tarefas.discard)
+
+    @staticmethod
+    def _atualizar_estatisticas_e_sequencias(roleta_id: str, roleta_nome: str,
+                                             documentos: List[Dict[str, Any]]) -> None:
+        try:
+            from analytics import calcular_estatisticas_diarias, incrementar_estatisticas, detectar_sequencias
+            from mongo_config import conectar_mongodb
+            db = conectar_mongodb()[1]
+            if ESTATISTICAS_INCREMENTAIS:
+                incrementar_estatisticas(db, documentos)
+            else:
+                calcular_estatisticas_diarias(roleta_id)
+            incrementar_rollups(db, documentos)
+            detectar_sequencias(roleta_id)
+        except Exception as e:
+            logger.error(f"Erro ao atualizar estatísticas e sequências para roleta {roleta_nome}: {str(e)}")
+
+    async def obter_estatisticas_diarias(self, roleta_id: str, data: datetime = None) -> Dict[str, Any]:
+        """
+        Obtém estatísticas diárias para uma roleta, calculando-as se ainda não existirem
+
+        Args:
+            roleta_id (str): ID da roleta
+            data (datetime, optional): Data para obter estatísticas. Defaults to None (hoje).
+
+        Returns:
+            Dict[str, Any]: Estatísticas diárias
+        """
+        try:
+            if len(roleta_id) != 36:
+                roleta_id = str(uuid.UUID(hashlib.md5(str(roleta_id).encode()).hexdigest()))
+
+            if data is None:
+                data = datetime.now()
+
+            estatisticas = await self.colecoes['roleta_estatisticas_diarias'].find_one(
+                {"roleta_id": roleta_id, "data": data.strftime("%Y-%m-%d")}, {'_id': 0})
+
+            if not estatisticas:
+                from analytics import calcular_estatisticas_diarias
+                return await asyncio.get_running_loop().run_in_executor(
+                    None, calcular_estatisticas_diarias, roleta_id, data)
+
+            from analytics import montar_estatisticas
+            return montar_estatisticas(estatisticas)
+        except Exception as e:
+            logger.error(f"Erro ao obter estatísticas diárias para roleta {roleta_id}: {str(e)}")
+            return None
+
+    async def atualizar_dados_estrategia(
+        self,
+        roleta_id: str,
+        roleta_nome: str,
+        estado: str,
+        numero_gatilho: int,
+        numero_gatilho_anterior: int,
+        terminais_gatilho: List[int],
+        terminais_gatilho_anterior: List[int],
+        vitorias: int,
+        derrotas: int,
+        ultimo_numero: int
+    ) -> bool:
+        """
+        Atualiza os dados da estratégia para uma roleta (gravação em lote, histórico nas transições)
+
+        Returns:
+            bool: True se atualizado com sucesso, False caso contrário
+        """
+        try:
+            roleta_nome_str = str(roleta_nome) if roleta_nome is not None else "Roleta Desconhecida"
+
+            sugestao_display = ""
+            if estado == "NEUTRAL":
+                sugestao_display = "AGUARDANDO GATILHO"
+            elif estado == "TRIGGER" and terminais_gatilho:
+                sugestao_display = f"APOSTAR EM: {','.join(map(str, terminais_gatilho))}"
+            elif estado == "POST_GALE_NEUTRAL" and terminais_gatilho_anterior:
+                sugestao_display = f"GALE EM: {','.join(map(str, terminais_gatilho_anterior))}"
+            elif estado == "MORTO":
+                sugestao_display = "AGUARDANDO PRÓXIMO CICLO"
+
+            dados_estrategia = {
+                'estado_estrategia': estado,
+                'numero_gatilho': numero_gatilho,
+                'numero_gatilho_anterior': numero_gatilho_anterior,
+                'terminais_gatilho': terminais_gatilho,
+                'terminais_gatilho_anterior': terminais_gatilho_anterior,
+                'vitorias': vitorias,
+                'derrotas': derrotas,
+                'sugestao_display': sugestao_display,
+                'ultimo_numero': ultimo_numero,
+                'updated_at': datetime.now().isoformat(),
+                'nome': roleta_nome_str,
+                'roleta_nome': roleta_nome_str
+            }
+
+            # Mesma persistência em lote da fonte síncrona (pymongo), fora do event loop
+            return await asyncio.get_running_loop().run_in_executor(
+                None, lambda: obter_persistencia().registrar(roleta_id, roleta_nome_str, dados_estrategia))
+        except Exception as e:
+            logger.error(f"Erro ao atualizar dados de estratégia: {str(e)}")
+            return False
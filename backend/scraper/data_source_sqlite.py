@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Implementação de fonte de dados SQLite para implantações de um só nó e testes
+"""
+
+import json
+import sqlite3
+import hashlib
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
+
+# Importações locais
+from scraper_core import DataSourceInterface, determinar_cor_numero
+from idempotencia import planejar_insercao, PROFUNDIDADE_ALINHAMENTO
+from config import logger, SQLITE_CAMINHO
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS roletas (
+    id TEXT PRIMARY KEY,
+    nome TEXT NOT NULL,
+    ativa INTEGER NOT NULL DEFAULT 1,
+    criado_em TEXT NOT NULL,
+    atualizado_em TEXT NOT NULL,
+    estrategia TEXT
+);
+
+CREATE TABLE IF NOT EXISTS roleta_numeros (
+    id INTEGER PRIMARY KEY,
+    roleta_id TEXT NOT NULL,
+    roleta_nome TEXT,
+    numero INTEGER NOT NULL,
+    cor TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    criado_em TEXT NOT NULL,
+    sequencia INTEGER NOT NULL,
+    UNIQUE (roleta_id, sequencia)
+);
+
+-- Índice de cobertura: últimos números, timestamps e intervalos de datas sem acessar a tabela
+CREATE INDEX IF NOT EXISTS roleta_numeros_roleta_timestamp
+    ON roleta_numeros (roleta_id, timestamp DESC, numero, cor, sequencia, roleta_nome);
+
+CREATE TABLE IF NOT EXISTS estrategia_historico (
+    id INTEGER PRIMARY KEY,
+    roleta_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    dados TEXT NOT NULL
+);
+"""
+
+SQL_ROLETA_EXISTE = "SELECT 1 FROM roletas WHERE id = ?"
+SQL_INSERIR_ROLETA = "INSERT OR IGNORE INTO roletas (id, nome, ativa, criado_em, atualizado_em) VALUES (?, ?, 1, ?, ?)"
+SQL_ROLETAS_ATIVAS = "SELECT id, nome, ativa, criado_em, atualizado_em, estrategia FROM roletas WHERE ativa = 1"
+SQL_ULTIMOS_NUMEROS = (
+    "SELECT numero, timestamp, sequencia FROM roleta_numeros "
+    "WHERE roleta_id = ? ORDER BY sequencia DESC LIMIT ?"
+)
+SQL_NUMEROS_RECENTES = (
+    "SELECT id, roleta_id, roleta_nome, numero, cor, timestamp, sequencia FROM roleta_numeros "
+    "WHERE roleta_id = ? ORDER BY timestamp DESC LIMIT ?"
+)
+SQL_TIMESTAMP_NUMERO = (
+    "SELECT timestamp FROM roleta_numeros WHERE roleta_id = ? AND numero = ? "
+    "ORDER BY timestamp DESC LIMIT 1 OFFSET ?"
+)
+SQL_INSERIR_NUMERO = (
+    "INSERT INTO roleta_numeros (roleta_id, roleta_nome, numero, cor, timestamp, criado_em, sequencia) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+SQL_CONTAGEM_DIA = (
+    "SELECT numero, cor, COUNT(*) FROM roleta_numeros "
+    "WHERE roleta_id = ? AND timestamp >= ? AND timestamp < ? GROUP BY numero, cor"
+)
+SQL_ATUALIZAR_ESTRATEGIA = (
+    "INSERT INTO roletas (id, nome, ativa, criado_em, atualizado_em, estrategia) VALUES (?, ?, 1, ?, ?, ?) "
+    "ON CONFLICT(id) DO UPDATE SET nome = excluded.nome, atualizado_em = excluded.atualizado_em, "
+    "estrategia = excluded.estrategia"
+)
+SQL_INSERIR_HISTORICO = "INSERT INTO estrategia_historico (roleta_id, timestamp, dados) VALUES (?, ?, ?)"
+
+def _timestamp_iso(timestamp) -> str:
+    """Normaliza um timestamp (string ISO, datetime ou None) para string ISO local"""
+    if timestamp is None or timestamp == "":
+        return datetime.now().isoformat()
+    if isinstance(timestamp, datetime):
+        return timestamp.replace(tzinfo=None).isoformat()
+    try:
+        return datetime.fromisoformat(str(timestamp).replace('Z', '+00:00')).replace(tzinfo=None).isoformat()
+    except ValueError:
+        return datetime.now().isoformat()
+
+class SqliteDataSource(DataSourceInterface):
+    """Implementação de fonte de dados usando SQLite (modo WAL, sem rede)"""
+
+    def __init__(self, caminho: str = None):
+        """
+        Inicializa a fonte de dados SQLite
+
+        Args:
+            caminho (str, optional): Arquivo do banco. Defaults to SQLITE_CAMINHO (":memory:" também é aceito).
+        """
+        self.caminho = caminho or SQLITE_CAMINHO
+
+        # Transações explícitas (isolation_level=None) e conexão compartilhada entre threads
+        self.conexao = sqlite3.connect(self.caminho, isolation_level=None, check_same_thread=False,
+                                       cached_statements=64)
+        self._lock = threading.RLock()
+
+        with self._lock:
+            self.conexao.execute("PRAGMA journal_mode=WAL")
+            self.conexao.execute("PRAGMA synchronous=NORMAL")
+            self.conexao.execute("PRAGMA busy_timeout=5000")
+            self.conexao.executescript(ESQUEMA)
+
+        logger.info(f"Fonte de dados SQLite inicializada: {self.caminho}")
+
+    def fechar(self) -> None:
+        """Fecha a conexão com o banco"""
+        with self._lock:
+            self.conexao.close()
+
+    def garantir_roleta_existe(self, roleta_id: str, roleta_nome: str) -> str:
+        """
+        Verifica se a roleta existe, e a insere caso não exista
+
+        Args:
+            roleta_id (str): ID da roleta
+            roleta_nome (str): Nome da roleta
+
+        Returns:
+            str: ID da roleta no SQLite
+        """
+        try:
+            # Gerar UUID determinístico (mesmo formato do MongoDB)
+            roleta_id_hash = hashlib.md5(str(roleta_id).encode()).hexdigest()
+            roleta_uuid = str(uuid.UUID(roleta_id_hash))
+
+            with self._lock:
+                if self.conexao.execute(SQL_ROLETA_EXISTE, (roleta_uuid,)).fetchone() is None:
+                    agora = datetime.now().isoformat()
+                    self.conexao.execute(SQL_INSERIR_ROLETA, (roleta_uuid, roleta_nome, agora, agora))
+                    logger.info(f"Roleta {roleta_nome} (ID: {roleta_uuid}) criada no SQLite")
+
+            return roleta_uuid
+        except Exception as e:
+            logger.error(f"Erro ao garantir existência da roleta {roleta_nome}: {str(e)}")
+            return roleta_id
+
+    def obter_roletas(self) -> List[Dict[str, Any]]:
+        """
+        Obtém todas as roletas ativas
+
+        Returns:
+            List[Dict[str, Any]]: Lista de roletas
+        """
+        try:
+            with self._lock:
+                linhas = self.conexao.execute(SQL_ROLETAS_ATIVAS).fetchall()
+
+            roletas = []
+            for roleta_id, nome, ativa, criado_em, atualizado_em, estrategia in linhas:
+                roleta = {
+                    'id': roleta_id,
+                    'nome': nome,
+                    'ativa': bool(ativa),
+                    'criado_em': datetime.fromisoformat(criado_em),
+                    'atualizado_em': datetime.fromisoformat(atualizado_em)
+                }
+                if estrategia:
+                    roleta.update(json.loads(estrategia))
+                roletas.append(roleta)
+            return roletas
+        except Exception as e:
+            logger.error(f"Erro ao obter roletas: {str(e)}")
+            return []
+
+    def obter_ultimos_numeros(self, roleta_id: str, limite: int = 10) -> List[int]:
+        """
+        Obtém os últimos números para uma roleta específica
+
+        Args:
+            roleta_id (str): ID da roleta
+            limite (int, optional): Limite de números. Defaults to 10.
+
+        Returns:
+            List[int]: Lista dos últimos números
+        """
+        return [doc['numero'] for doc in self.obter_numeros_recentes(roleta_id, limite)]
+
+    def obter_numeros_recentes(self, roleta_id: str, limite: int = 10) -> List[Dict[str, Any]]:
+        """
+        Obtém os documentos dos últimos números de uma roleta
+
+        Args:
+            roleta_id (str): ID da roleta
+            limite (int, optional): Limite de números. Defaults to 10.
+
+        Returns:
+            List[Dict[str, Any]]: Documentos do mais recente para o mais antigo
+        """
+        try:
+            with self._lock:
+                linhas = self.conexao.execute(SQL_NUMEROS_RECENTES, (roleta_id, limite)).fetchall()
+
+            return [{
+                '_id': linha_id,
+                'roleta_id': rid,
+                'roleta_nome': roleta_nome,
+                'numero': numero,
+                'cor': cor,
+                'timestamp': datetime.fromisoformat(timestamp),
+                'sequencia': sequencia
+            } for linha_id, rid, roleta_nome, numero, cor, timestamp, sequencia in linhas]
+        except Exception as e:
+            logger.error(f"Erro ao obter números recentes para roleta {roleta_id}: {str(e)}")
+            return []
+
+    def obter_cor_numero(self, numero: int) -> str:
+        """
+        Obtém a cor de um número
+
+        Args:
+            numero (int): Número da roleta
+
+        Returns:
+            str: Cor do número (verde, vermelho ou preto)
+        """
+        return determinar_cor_numero(numero)
+
+    def obter_timestamp_numero(self, roleta_id: str, numero: int, indice: int) -> str:
+        """
+        Obtém o timestamp de um número específico
+
+        Args:
+            roleta_id (str): ID da roleta
+            numero (int): Número da roleta
+            indice (int): Índice do número na lista
+
+        Returns:
+            str: Timestamp em formato ISO
+        """
+        try:
+            with self._lock:
+                linha = self.conexao.execute(SQL_TIMESTAMP_NUMERO, (roleta_id, numero, indice)).fetchone()
+            return linha[0] if linha else datetime.now().isoformat()
+        except Exception as e:
+            logger.error(f"Erro ao obter timestamp para número {numero} da roleta {roleta_id}: {str(e)}")
+            return datetime.now().isoformat()
+
+    def inserir_numero(self, roleta_id: str, roleta_nome: str, numero: int,
+                       cor: str = None, timestamp: str = None, historico: List[int] = None) -> bool:
+        """
+        Insere um novo número para uma roleta de forma idempotente
+        (mesmas regras de sequência de MongoDataSource.inserir_numero)
+
+        Args:
+            roleta_id (str): ID da roleta
+            roleta_nome (str): Nome da roleta
+            numero (int): Número sorteado
+            cor (str, optional): Cor do número. Defaults to None.
+            timestamp (str, optional): Timestamp do evento. Defaults to None.
+            historico (List[int], optional): Números visíveis na página, começando por `numero`
+                e do mais recente para o mais antigo. Defaults to None.
+
+        Returns:
+            bool: True se inserido com sucesso, False se releitura ou em caso de erro
+        """
+        return self.inserir_numeros([{
+            'roleta_id': roleta_id,
+            'roleta_nome': roleta_nome,
+            'numero': numero,
+            'cor': cor,
+            'timestamp': timestamp,
+            'historico': historico
+        }]) > 0
+
+    def inserir_numeros(self, numeros: List[Dict[str, Any]],
+                        falhas: Optional[List[Dict[str, Any]]] = None) -> int:
+        """
+        Insere vários números em uma única transação
+
+        Args:
+            numeros (List[Dict[str, Any]]): Itens com roleta_id, roleta_nome, numero e,
+                opcionalmente, cor, timestamp e historico, em ordem cronológica
+            falhas (List[Dict[str, Any]], optional): Recebe os itens se a transação falhar
+
+        Returns:
+            int: Quantidade de números inseridos
+        """
+        por_roleta = {}
+        for item in numeros:
+            por_roleta.setdefault(item['roleta_id'], []).append(
+                dict(item, timestamp=datetime.fromisoformat(_timestamp_iso(item.get('timestamp')))))
+
+        try:
+            with self._lock:
+                # BEGIN IMMEDIATE reserva a escrita: outros processos não intercalam sequências
+                self.conexao.execute("BEGIN IMMEDIATE")
+                try:
+                    linhas = []
+                    agora = datetime.now().isoformat()
+                    for roleta_id, itens in por_roleta.items():
+                        profundidade = max([PROFUNDIDADE_ALINHAMENTO] +
+                                           [2 * len(item.get('historico') or []) for item in itens])
+                        gravados = [{'numero': numero, 'timestamp': datetime.fromisoformat(instante),
+                                     'sequencia': sequencia}
+                                    for numero, instante, sequencia in
+                                    self.conexao.execute(SQL_ULTIMOS_NUMEROS, (roleta_id, profundidade))]
+
+                        for planejado in planejar_insercao(gravados, itens):
+                            item = itens[planejado['item']]
+                            cor = item.get('cor') if planejado['numero'] == item['numero'] else None
+                            linhas.append((
+                                roleta_id,
+                                item.get('roleta_nome'),
+                                planejado['numero'],
+                                cor or determinar_cor_numero(planejado['numero']),
+                                planejado['timestamp'].isoformat(),
+                                agora,
+                                planejado['sequencia']
+                            ))
+
+                    self.conexao.executemany(SQL_INSERIR_NUMERO, linhas)
+                    self.conexao.execute("COMMIT")
+                except Exception:
+                    self.conexao.execute("ROLLBACK")
+                    raise
+
+            return len(linhas)
+        except Exception as e:
+            logger.error(f"Erro ao inserir números no SQLite: {str(e)}")
+            if falhas is not None:
+                falhas.extend(numeros)
+            return 0
+
+    def obter_estatisticas_diarias(self, roleta_id: str, data: datetime = None) -> Dict[str, Any]:
+        """
+        Calcula estatísticas diárias para uma roleta (mesmo formato de analytics.calcular_estatisticas_diarias)
+
+        Args:
+            roleta_id (str): ID da roleta
+            data (datetime, optional): Data das estatísticas. Defaults to None (hoje).
+
+        Returns:
+            Dict[str, Any]: Estatísticas diárias
+        """
+        try:
+            if data is None:
+                data = datetime.now()
+            inicio_dia = datetime(data.year, data.month, data.day)
+            fim_dia = inicio_dia + timedelta(days=1)
+
+            with self._lock:
+                linhas = self.conexao.execute(
+                    SQL_CONTAGEM_DIA, (roleta_id, inicio_dia.isoformat(), fim_dia.isoformat())
+                ).fetchall()
+
+            contador = Counter()
+            cores = {"vermelho": 0, "preto": 0, "verde": 0}
+            for numero, cor, contagem in linhas:
+                contador[numero] += contagem
+                if cor in cores:
+                    cores[cor] += contagem
+
+            mais_frequentes = contador.most_common(5)
+            menos_frequentes = contador.most_common()[:-6:-1]
+
+            return {
+                "roleta_id": roleta_id,
+                "data": data.strftime("%Y-%m-%d"),
+                "total_numeros": sum(contador.values()),
+                "distribuicao_numeros": [{"numero": num, "contagem": cont} for num, cont in contador.items()],
+                "distribuicao_cores": cores,
+                "numeros_mais_frequentes": [{"numero": num, "contagem": cont} for num, cont in mais_frequentes],
+                "numeros_menos_frequentes": [{"numero": num, "contagem": cont} for num, cont in menos_frequentes],
+                "atualizado_em": datetime.now()
+            }
+        except Exception as e:
+            logger.error(f"Erro ao obter estatísticas diárias para roleta {roleta_id}: {str(e)}")
+            return None
+
+    def atualizar_dados_estrategia(
+        self,
+        roleta_id: str,
+        roleta_nome: str,
+        estado: str,
+        numero_gatilho: int,
+        numero_gatilho_anterior: int,
+        terminais_gatilho: List[int],
+        terminais_gatilho_anterior: List[int],
+        vitorias: int,
+        derrotas: int,
+        ultimo_numero: int
+    ) -> bool:
+        """
+        Atualiza os dados da estratégia para uma roleta e registra o histórico
+
+        Returns:
+            bool: True se atualizado com sucesso, False caso contrário
+        """
+        try:
+            roleta_nome_str = str(roleta_nome) if roleta_nome is not None else "Roleta Desconhecida"
+            agora = datetime.now().isoformat()
+            dados_estrategia = {
+                'estado_estrategia': estado,
+                'numero_gatilho': numero_gatilho,
+                'numero_gatilho_anterior': numero_gatilho_anterior,
+                'terminais_gatilho': terminais_gatilho,
+                'terminais_gatilho_anterior': terminais_gatilho_anterior,
+                'vitorias': vitorias,
+                'derrotas': derrotas,
+                'ultimo_numero': ultimo_numero,
+                'updated_at': agora
+            }
+            dados_json = json.dumps(dados_estrategia)
+
+            with self._lock:
+                self.conexao.execute("BEGIN IMMEDIATE")
+                try:
+                    self.conexao.execute(SQL_ATUALIZAR_ESTRATEGIA, (roleta_id, roleta_nome_str, agora, agora, dados_json))
+                    self.conexao.execute(SQL_INSERIR_HISTORICO, (roleta_id, agora, dados_json))
+                    self.conexao.execute("COMMIT")
+                except Exception:
+                    self.conexao.execute("ROLLBACK")
+                    raise
+
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao atualizar dados de estratégia: {str(e)}")
+            return False
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Estatísticas de todas as roletas com uma única agregação no servidor
+
+Em vez de um `calcular_estatisticas_diarias` por roleta (uma conexão e todos os
+documentos trazidos para o Python em cada chamada), um só pipeline agrupa os números do
+intervalo por (roleta, número) e um $facet deriva desse agrupamento as contagens e as
+distribuições de cada roleta e do conjunto. Só os agregados voltam do servidor; o
+resultado tem o formato de `analytics.montar_estatisticas`.
+
+Uso:
+    python estatisticas_globais.py [--dias 1] [--comparar]
+"""
+
+import sys
+import time
+import argparse
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional
+
+from pymongo.database import Database
+
+from classificacao import DIMENSOES
+from config import logger
+
+def pipeline_estatisticas(inicio: datetime, fim: datetime, roleta_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Monta o pipeline das estatísticas por roleta e globais de um intervalo
+
+    Args:
+        inicio (datetime): Início do intervalo (inclusivo)
+        fim (datetime): Fim do intervalo (exclusivo)
+        roleta_ids (List[str], optional): Roletas consideradas. Defaults to None (todas).
+
+    Returns:
+        List[Dict[str, Any]]: Pipeline de agregação sobre roleta_numeros
+    """
+    filtro = {'timestamp': {'$gte': inicio, '$lt': fim}, 'numero': {'$gte': 0, '$lte': 36}}
+    if roleta_ids:
+        filtro['roleta_id'] = {'$in': list(roleta_ids)}
+
+    facetas = {
+        'numeros': [{'$group': {'_id': '$_id.roleta_id',
+                                'contagens': {'$push': {'numero': '$_id.numero', 'contagem': '$contagem'}}}}],
+        'global': [{'$group': {'_id': '$_id.numero', 'contagem': {'$sum': '$contagem'}}}],
+    }
+    # Classificação no servidor: a tabela de cada dimensão vira um array indexado pelo número
+    for campo, tabela in DIMENSOES.items():
+        valor = {'$arrayElemAt': [{'$literal': list(tabela)}, '$_id.numero']}
+        facetas[campo] = [{'$group': {'_id': {'roleta_id': '$_id.roleta_id', 'valor': valor},
+                                      'contagem': {'$sum': '$contagem'}}}]
+
+    return [
+        {'$match': filtro},
+        {'$group': {'_id': {'roleta_id': '$roleta_id', 'numero': '$numero'}, 'contagem': {'$sum': 1}}},
+        {'$facet': facetas}
+    ]
+
+def _documento_vazio(roleta_id: Optional[str]) -> Dict[str, Any]:
+    documento = {'roleta_id': roleta_id, 'formato': 'contadores', 'total_numeros': 0, 'contagem_numeros': {}}
+    documento.update({campo: {} for campo in DIMENSOES})
+    return documento
+
+def calcular_estatisticas_globais(db: Database, inicio: datetime, fim: datetime,
+                                  roleta_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Calcula as estatísticas de cada roleta e do conjunto com uma única agregação
+
+    Args:
+        db (Database): Banco de dados
+        inicio (datetime): Início do intervalo (inclusivo)
+        fim (datetime): Fim do intervalo (exclusivo)
+        roleta_ids (List[str], optional): Roletas consideradas. Defaults to None (todas).
+
+    Returns:
+        Dict[str, Any]: Intervalo, estatísticas globais e estatísticas por roleta, ou {'erro': ...}
+    """
+    try:
+        from analytics import montar_estatisticas
+
+        # O filtro por roleta_id ($in) permite usar o índice (roleta_id, timestamp)
+        roleta_ids = roleta_ids or db.roleta_numeros.distinct('roleta_id')
+        resultado = next(db.roleta_numeros.aggregate(pipeline_estatisticas(inicio, fim, roleta_ids),
+                                                     allowDiskUse=True), None) or {}
+
+        roletas: Dict[str, Dict[str, Any]] = {}
+        for grupo in resultado.get('numeros', []):
+            documento = roletas.setdefault(grupo['_id'], _documento_vazio(grupo['_id']))
+            for item in grupo['contagens']:
+                documento['contagem_numeros'][str(item['numero'])] = item['contagem']
+                documento['total_numeros'] += item['contagem']
+
+        total = _documento_vazio(None)
+        del total['roleta_id']
+        for item in resultado.get('global', []):
+            total['contagem_numeros'][str(item['_id'])] = item['contagem']
+            total['total_numeros'] += item['contagem']
+
+        for campo in DIMENSOES:
+            for item in resultado.get(campo, []):
+                valor = item['_id']['valor']
+                roletas[item['_id']['roleta_id']][campo][valor] = item['contagem']
+                total[campo][valor] = total[campo].get(valor, 0) + item['contagem']
+
+        return {
+            'inicio': inicio.isoformat(),
+            'fim': fim.isoformat(),
+            'total_roletas': len(roletas),
+            'global': montar_estatisticas(total),
+            'roletas': {roleta_id: montar_estatisticas(documento) for roleta_id, documento in sorted(roletas.items())}
+        }
+    except Exception as e:
+        logger.error(f"Erro ao calcular estatísticas globais: {str(e)}")
+        return {'inicio': inicio.isoformat(), 'fim': fim.isoformat(), 'erro': str(e)}
+
+def calcular_estatisticas_por_roleta(db: Database, inicio: datetime, fim: datetime,
+                                     roleta_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Mesmo resultado de `calcular_estatisticas_globais` pelo caminho em Python, roleta a
+    roleta (referência para a comparação e o benchmark)
+    """
+    from analytics import contadores_completos, montar_estatisticas
+
+    todos = []
+    roletas = {}
+    for roleta_id in roleta_ids or db.roleta_numeros.distinct('roleta_id'):
+        numeros = [n['numero'] for n in db.roleta_numeros.find(
+            {'roleta_id': roleta_id, 'timestamp': {'$gte': inicio, '$lt': fim}, 'numero': {'$gte': 0, '$lte': 36}},
+            {'numero': 1, '_id': 0})]
+        if numeros:
+            roletas[roleta_id] = montar_estatisticas(dict(contadores_completos(numeros), roleta_id=roleta_id,
+                                                          formato='contadores'))
+            todos.extend(numeros)
+
+    return {
+        'inicio': inicio.isoformat(),
+        'fim': fim.isoformat(),
+        'total_roletas': len(roletas),
+        'global': montar_estatisticas(dict(contadores_completos(todos), formato='contadores')),
+        'roletas': dict(sorted(roletas.items()))
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Estatísticas de todas as roletas em uma agregação")
+    parser.add_argument('--dias', type=int, default=1, help="Tamanho do intervalo até agora")
+    parser.add_argument('--comparar', action='store_true',
+                        help="Compara resultado e tempo com o cálculo roleta a roleta em Python")
+    args = parser.parse_args()
+
+    from mongo_config import conectar_mongodb
+    client, db = conectar_mongodb()
+    fim = datetime.now()
+    inicio = fim - timedelta(days=args.dias)
+
+    t0 = time.perf_counter()
+    agregado = calcular_estatisticas_globais(db, inicio, fim)
+    t1 = time.perf_counter()
+    if 'erro' in agregado:
+        print(f"Falha: {agregado['erro']}")
+        sys.exit(1)
+    print(f"Agregação: {agregado['total_roletas']} roletas, {agregado['global']['total_numeros']} números "
+          f"em {(t1 - t0) * 1000:.1f} ms")
+
+    if args.comparar:
+        referencia = calcular_estatisticas_por_roleta(db, inicio, fim)
+        t2 = time.perf_counter()
+        iguais = referencia == agregado
+        print(f"Python roleta a roleta: {(t2 - t1) * 1000:.1f} ms, resultados {'iguais' if iguais else 'DIFERENTES'}")
+        sys.exit(0 if iguais else 1)
+
+    sys.exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Exportação e importação em fluxo do histórico de números (roleta_numeros)
+
+Os documentos são lidos com cursores em lotes e escritos à medida que chegam, e a
+importação grava lotes com insert_many em workers paralelos com um número limitado
+de lotes em andamento: o uso de memória não depende do tamanho do histórico.
+
+Formatos: NDJSON e CSV (com .gz opcional) e Parquet (requer pyarrow).
+
+Uso:
+    python ferramentas_dados.py exportar --saida numeros.ndjson.gz [--roleta-id ID] [--inicio 2024-01-01] [--fim 2024-02-01]
+    python ferramentas_dados.py importar --entrada numeros.parquet [--workers 4]
+"""
+
+import os
+import sys
+import csv
+import gzip
+import json
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Any, Iterator, Optional
+
+from bson import ObjectId
+from pymongo.database import Database
+from pymongo.errors import BulkWriteError
+
+from config import logger
+
+COLECAO = 'roleta_numeros'
+
+# Campos exportados, na ordem das colunas de CSV e Parquet
+CAMPOS = ['_id', 'roleta_id', 'roleta_nome', 'numero', 'cor', 'timestamp', 'sequencia', 'criado_em']
+
+FORMATOS = ('ndjson', 'csv', 'parquet')
+
+def _formato_do_caminho(caminho: str) -> str:
+    """Deduz o formato pela extensão do arquivo (ignorando .gz)"""
+    nome = caminho[:-3] if caminho.endswith('.gz') else caminho
+    extensao = os.path.splitext(nome)[1].lstrip('.').lower()
+    if extensao in ('json', 'jsonl'):
+        return 'ndjson'
+    if extensao in FORMATOS:
+        return extensao
+    raise ValueError(f"Não foi possível deduzir o formato de '{caminho}'; use --formato")
+
+def _abrir_texto(caminho: str, modo: str):
+    """Abre um arquivo de texto, comprimido se terminar em .gz ('-' é a entrada/saída padrão)"""
+    if caminho == '-':
+        return sys.stdout if modo == 'w' else sys.stdin
+    if caminho.endswith('.gz'):
+        return gzip.open(caminho, modo + 't', encoding='utf-8', newline='')
+    return open(caminho, modo, encoding='utf-8', newline='')
+
+def _pyarrow():
+    """Importa pyarrow sob demanda (dependência opcional, usada só para Parquet)"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        raise RuntimeError("O formato Parquet requer o pacote pyarrow (pip install pyarrow)")
+
+def documento_para_linha(documento: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Converte um documento do MongoDB em uma linha plana (valores JSON)
+
+    Args:
+        documento (Dict[str, Any]): Documento de roleta_numeros
+
+    Returns:
+        Dict[str, Any]: Linha com os CAMPOS, datas em ISO e _id em texto
+    """
+    linha = {}
+    for campo in CAMPOS:
+        valor = documento.get(campo)
+        if isinstance(valor, datetime):
+            valor = valor.isoformat()
+        elif isinstance(valor, ObjectId):
+            valor = str(valor)
+        linha[campo] = valor
+    return linha
+
+def linha_para_documento(linha: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Converte uma linha importada de volta em documento
+
+    Args:
+        linha (Dict[str, Any]): Linha lida de NDJSON, CSV ou Parquet
+
+    Returns:
+        Optional[Dict[str, Any]]: Documento para inserção, ou None se a linha for inválida
+    """
+    try:
+        documento = {
+            'roleta_id': str(linha['roleta_id']),
+            'roleta_nome': linha.get('roleta_nome') or None,
+            'numero': int(linha['numero']),
+            'cor': linha.get('cor') or None,
+            'timestamp': datetime.fromisoformat(str(linha['timestamp']))
+        }
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    # O mesmo _id torna a reimportação idempotente (duplicados são ignorados)
+    identificador = linha.get('_id')
+    if identificador:
+        identificador = str(identificador)
+        documento['_id'] = ObjectId(identificador) if ObjectId.is_valid(identificador) else identificador
+    if linha.get('sequencia') not in (None, ''):
+        documento['sequencia'] = int(linha['sequencia'])
+    if linha.get('criado_em'):
+        documento['criado_em'] = datetime.fromisoformat(str(linha['criado_em']))
+    return documento
+
+def percorrer_numeros(db: Database, roleta_ids: List[str] = None, inicio: datetime = None,
+                      fim: datetime = None, lote: int = 5000) -> Iterator[Dict[str, Any]]:
+    """
+    Percorre os números de uma ou mais roletas em ordem cronológica, roleta por roleta,
+    usando o índice (roleta_id, timestamp)
+
+    Args:
+        db (Database): Banco de dados
+        roleta_ids (List[str], optional): Roletas a exportar. Defaults to None (todas).
+        inicio (datetime, optional): Início do intervalo (inclusivo)
+        fim (datetime, optional): Fim do intervalo (exclusivo)
+        lote (int, optional): Tamanho do lote do cursor
+
+    Yields:
+        Dict[str, Any]: Documentos de roleta_numeros
+    """
+    if not roleta_ids:
+        roleta_ids = sorted(db[COLECAO].distinct('roleta_id'))
+
+    for roleta_id in roleta_ids:
+        filtro: Dict[str, Any] = {'roleta_id': roleta_id}
+        if inicio is not None or fim is not None:
+            filtro['timestamp'] = {}
+            if inicio is not None:
+                filtro['timestamp']['$gte'] = inicio
+            if fim is not None:
+                filtro['timestamp']['$lt'] = fim
+        cursor = db[COLECAO].find(filtro, {campo: 1 for campo in CAMPOS}).sort('timestamp', 1).batch_size(lote)
+        for documento in cursor:
+            yield documento
+
+def exportar(db: Database, saida: str, formato: str = None, roleta_ids: List[str] = None,
+             inicio: datetime = None, fim: datetime = None, lote: int = 5000) -> int:
+    """
+    Exporta números para um arquivo, em fluxo
+
+    Args:
+        db (Database): Banco de dados
+        saida (str): Caminho do arquivo ('-' para a saída padrão, exceto Parquet)
+        formato (str, optional): ndjson, csv ou parquet. Defaults to None (pela extensão).
+        roleta_ids (List[str], optional): Roletas a exportar. Defaults to None (todas).
+        inicio (datetime, optional): Início do intervalo (inclusivo)
+        fim (datetime, optional): Fim do intervalo (exclusivo)
+        lote (int, optional): Documentos por lote
+
+    Returns:
+        int: Quantidade de documentos exportados
+    """
+    formato = formato or _formato_do_caminho(saida)
+    documentos = percorrer_numeros(db, roleta_ids, inicio, fim, lote)
+    total = 0
+
+    if formato == 'parquet':
+        pa = _pyarrow()
+        esquema = pa.schema([
+            ('_id', pa.string()), ('roleta_id', pa.string()), ('roleta_nome', pa.string()),
+            ('numero', pa.int8()), ('cor', pa.string()), ('timestamp', pa.string()),
+            ('sequencia', pa.int64()), ('criado_em', pa.string())
+        ])
+        with pa.parquet.ParquetWriter(saida, esquema, compression='zstd') as escritor:
+            linhas = []
+            for documento in documentos:
+                linhas.append(documento_para_linha(documento))
+                if len(linhas) >= lote:
+                    escritor.write_table(pa.Table.from_pylist(linhas, schema=esquema))
+                    total += len(linhas)
+                    linhas = []
+            if linhas:
+                escritor.write_table(pa.Table.from_pylist(linhas, schema=esquema))
+                total += len(linhas)
+    else:
+        arquivo = _abrir_texto(saida, 'w')
+        try:
+            escritor_csv = None
+            if formato == 'csv':
+                escritor_csv = csv.DictWriter(arquivo, fieldnames=CAMPOS)
+                escritor_csv.writeheader()
+            for documento in documentos:
+                linha = documento_para_linha(documento)
+                if escritor_csv is not None:
+                    escritor_csv.writerow(linha)
+                else:
+                    arquivo.write(json.dumps(linha, ensure_ascii=False) + "\n")
+                total += 1
+        finally:
+            if arquivo is not sys.stdout:
+                arquivo.close()
+
+    logger.info(f"{total} números exportados para {saida} ({formato})")
+    return total
+
+def ler_lotes(entrada: str, formato: str = None, lote: int = 5000) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Lê um arquivo exportado em lotes de documentos
+
+    Args:
+        entrada (str): Caminho do arquivo ('-' para a entrada padrão, exceto Parquet)
+        formato (str, optional): ndjson, csv ou parquet. Defaults to None (pela extensão).
+        lote (int, optional): Documentos por lote
+
+    Yields:
+        List[Dict[str, Any]]: Lotes de documentos prontos para inserção
+    """
+    formato = formato or _formato_do_caminho(entrada)
+
+    if formato == 'parquet':
+        pa = _pyarrow()
+        for bloco in pa.parquet.ParquetFile(entrada).iter_batches(batch_size=lote):
+            documentos = [linha_para_documento(linha) for linha in bloco.to_pylist()]
+            yield [documento for documento in documentos if documento is not None]
+        return
+
+    arquivo = _abrir_texto(entrada, 'r')
+    try:
+        linhas = csv.DictReader(arquivo) if formato == 'csv' else (
+            json.loads(texto) for texto in arquivo if texto.strip())
+        documentos = []
+        for linha in linhas:
+            documento = linha_para_documento(linha)
+            if documento is None:
+                continue
+            documentos.append(documento)
+            if len(documentos) >= lote:
+                yield documentos
+                documentos = []
+        if documentos:
+            yield documentos
+    finally:
+        if arquivo is not sys.stdin:
+            arquivo.close()
+
+def _inserir_lote(db: Database, documentos: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Insere um lote ignorando documentos já existentes (mesmo _id ou mesma sequência)"""
+    try:
+        resultado = db[COLECAO].insert_many(documentos, ordered=False)
+        return {'inseridos': len(resultado.inserted_ids), 'duplicados': 0}
+    except BulkWriteError as e:
+        erros = e.details.get('writeErrors', [])
+        if any(erro.get('code') != 11000 for erro in erros):
+            raise
+        return {'inseridos': e.details.get('nInserted', 0), 'duplicados': len(erros)}
+
+def importar(db: Database, entrada: str, formato: str = None, lote: int = 5000,
+             workers: int = 4) -> Dict[str, int]:
+    """
+    Importa um arquivo exportado, gravando lotes em paralelo
+
+    Args:
+        db (Database): Banco de dados
+        entrada (str): Caminho do arquivo
+        formato (str, optional): ndjson, csv ou parquet. Defaults to None (pela extensão).
+        lote (int, optional): Documentos por lote de insert_many
+        workers (int, optional): Lotes gravados em paralelo
+
+    Returns:
+        Dict[str, int]: Totais de documentos inseridos e duplicados ignorados
+    """
+    totais = {'inseridos': 0, 'duplicados': 0}
+    # No máximo dois lotes por worker em memória ao mesmo tempo
+    vagas = threading.BoundedSemaphore(workers * 2)
+    lock = threading.Lock()
+    erros: List[Exception] = []
+
+    def concluir(futuro):
+        vagas.release()
+        try:
+            resultado = futuro.result()
+        except Exception as e:
+            erros.append(e)
+            return
+        with lock:
+            totais['inseridos'] += resultado['inseridos']
+            totais['duplicados'] += resultado['duplicados']
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for documentos in ler_lotes(entrada, formato, lote):
+            if erros:
+                break
+            vagas.acquire()
+            executor.submit(_inserir_lote, db, documentos).add_done_callback(concluir)
+
+    if erros:
+        raise erros[0]
+
+    logger.info(f"Importação de {entrada}: {totais['inseridos']} inseridos, {totais['duplicados']} duplicados ignorados")
+    return totais
+
+def _data(valor: str) -> datetime:
+    """Converte um argumento de data/hora ISO para datetime"""
+    return datetime.fromisoformat(valor)
+
+def main():
+    """
+    Função principal da linha de comando
+    """
+    parser = argparse.ArgumentParser(description="Exportação e importação do histórico de números")
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+
+    parser_exportar = subcomandos.add_parser('exportar', help="Exportar números para arquivo")
+    parser_exportar.add_argument('--saida', required=True, help="Arquivo de saída ('-' para stdout)")
+    parser_exportar.add_argument('--roleta-id', action='append', dest='roleta_ids', help="Roleta (pode repetir)")
+    parser_exportar.add_argument('--inicio', type=_data, help="Início do intervalo (ISO, inclusivo)")
+    parser_exportar.add_argument('--fim', type=_data, help="Fim do intervalo (ISO, exclusivo)")
+
+    parser_importar = subcomandos.add_parser('importar', help="Importar números de arquivo")
+    parser_importar.add_argument('--entrada', required=True, help="Arquivo de entrada ('-' para stdin)")
+    parser_importar.add_argument('--workers', type=int, default=4, help="Lotes gravados em paralelo")
+
+    for subparser in (parser_exportar, parser_importar):
+        subparser.add_argument('--formato', choices=FORMATOS, help="Formato (padrão: pela extensão)")
+        subparser.add_argument('--lote', type=int, default=5000, help="Documentos por lote")
+
+    args = parser.parse_args()
+
+    from mongo_config import conectar_mongodb
+    client, db = conectar_mongodb()
+
+    if args.comando == 'exportar':
+        total = exportar(db, args.saida, args.formato, args.roleta_ids, args.inicio, args.fim, args.lote)
+        print(f"{total} números exportados", file=sys.stderr)
+    else:
+        totais = importar(db, args.entrada, args.formato, args.lote, args.workers)
+        print(f"{totais['inseridos']} inseridos, {totais['duplicados']} duplicados ignorados", file=sys.stderr)
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Gerenciador declarativo de índices do MongoDB
+
+Lista os índices necessários por coleção, cria os que faltam, remove (opcionalmente)
+os que não são declarados e verifica com explain() que todas as consultas emitidas
+pelo código usam índice, sem COLLSCAN e sem ordenação em memória.
+
+Uso:
+    python gerenciador_indices.py --aplicar [--remover-nao-usados]
+    python gerenciador_indices.py --verificar
+"""
+
+import sys
+import json
+import hashlib
+import argparse
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Iterator
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+from pymongo.database import Database
+
+from config import logger
+
+# Índices necessários por coleção. O nome segue a convenção padrão do MongoDB.
+INDICES_REQUERIDOS: Dict[str, List[Dict[str, Any]]] = {
+    'roletas': [
+        # Consultas da API e do servidor WebSocket por {'id': ...}
+        {'nome': 'id_1', 'chaves': [('id', ASCENDING)]},
+    ],
+    'roleta_numeros': [
+        # Últimos números, timestamps e intervalos de datas por roleta
+        {'nome': 'roleta_id_1_timestamp_-1', 'chaves': [('roleta_id', ASCENDING), ('timestamp', DESCENDING)]},
+        # Chave de idempotência das inserções e topo por sequência. O índice é parcial (números
+        # antigos não têm `sequencia`): só é usado por consultas com {'sequencia': {'$exists': True}}
+        {'nome': 'roleta_id_1_sequencia_1', 'chaves': [('roleta_id', ASCENDING), ('sequencia', ASCENDING)],
+         'opcoes': {'unique': True, 'partialFilterExpression': {'sequencia': {'$exists': True}}}},
+    ],
+    'roleta_estatisticas_diarias': [
+        {'nome': 'roleta_id_1_data_1', 'chaves': [('roleta_id', ASCENDING), ('data', ASCENDING)],
+         'opcoes': {'unique': True}},
+    ],
+    'roleta_sequencias': [
+        # Upserts da detecção de sequências
+        {'nome': 'roleta_id_1_tipo_1_comprimento_-1',
+         'chaves': [('roleta_id', ASCENDING), ('tipo', ASCENDING), ('comprimento', DESCENDING)]},
+        # Consulta paginada por chave (fim_timestamp, _id), com e sem filtro de tipo
+        {'nome': 'roleta_id_1_fim_timestamp_-1__id_-1',
+         'chaves': [('roleta_id', ASCENDING), ('fim_timestamp', DESCENDING), ('_id', DESCENDING)]},
+        {'nome': 'roleta_id_1_tipo_1_fim_timestamp_-1__id_-1',
+         'chaves': [('roleta_id', ASCENDING), ('tipo', ASCENDING), ('fim_timestamp', DESCENDING),
+                    ('_id', DESCENDING)]},
+    ],
+    'roleta_rollups': [
+        # Agregados de um intervalo por roleta
+        {'nome': 'roleta_id_1_inicio_1', 'chaves': [('roleta_id', ASCENDING), ('inicio', ASCENDING)]},
+        # Seleção dos agregados a compactar
+        {'nome': 'granularidade_1_inicio_1', 'chaves': [('granularidade', ASCENDING), ('inicio', ASCENDING)]},
+    ],
+    'estrategia_transicoes': [
+        # Histórico de transições por roleta
+        {'nome': 'roleta_id_1_timestamp_-1', 'chaves': [('roleta_id', ASCENDING), ('timestamp', DESCENDING)]},
+    ],
+}
+
+def versao_indices() -> str:
+    """
+    Versão do esquema de índices, derivada das declarações em INDICES_REQUERIDOS.
+    Qualquer índice adicionado, removido ou alterado gera uma nova versão.
+
+    Returns:
+        str: Hash curto das declarações
+    """
+    declaracao = json.dumps(INDICES_REQUERIDOS, sort_keys=True, default=str)
+    return hashlib.sha1(declaracao.encode('utf-8')).hexdigest()[:12]
+
+def formas_consulta(roleta_id: str) -> List[Dict[str, Any]]:
+    """
+    Formas de consulta emitidas pelo código, com valores de exemplo
+
+    Args:
+        roleta_id (str): ID de roleta usado como valor de exemplo
+
+    Returns:
+        List[Dict[str, Any]]: Consultas no formato aceito por `explicar_consulta`
+    """
+    agora = datetime.now()
+    inicio_dia = datetime(agora.year, agora.month, agora.day)
+
+    return [
+        # Coleção pequena (uma entrada por mesa): leitura completa é esperada
+        {'descricao': 'roletas ativas', 'colecao': 'roletas',
+         'filtro': {'ativa': True}, 'permite_collscan': True},
+        {'descricao': 'roleta por id', 'colecao': 'roletas',
+         'filtro': {'id': roleta_id}, 'limite': 1},
+        {'descricao': 'últimos números', 'colecao': 'roleta_numeros',
+         'filtro': {'roleta_id': roleta_id}, 'ordenacao': [('timestamp', DESCENDING)], 'limite': 500},
+        {'descricao': 'timestamp de um número', 'colecao': 'roleta_numeros',
+         'filtro': {'roleta_id': roleta_id, 'numero': 0}, 'ordenacao': [('timestamp', DESCENDING)],
+         'pular': 1, 'limite': 1},
+        {'descricao': 'topo por sequência (validação do cache)', 'colecao': 'roleta_numeros',
+         'filtro': {'roleta_id': roleta_id, 'sequencia': {'$exists': True}},
+         'ordenacao': [('sequencia', DESCENDING)], 'limite': 1},
+        {'descricao': 'últimos números por sequência (releitura após conflito)', 'colecao': 'roleta_numeros',
+         'filtro': {'roleta_id': roleta_id, 'sequencia': {'$exists': True}},
+         'ordenacao': [('sequencia', DESCENDING)], 'limite': 20},
+        {'descricao': 'números depois de uma sequência (consumidor por consulta)', 'colecao': 'roleta_numeros',
+         'filtro': {'roleta_id': roleta_id, 'sequencia': {'$exists': True, '$gt': 0}},
+         'ordenacao': [('sequencia', ASCENDING)], 'limite': 500},
+        {'descricao': 'números depois da matriz gravada', 'colecao': 'roleta_numeros',
+         'filtro': {'roleta_id': roleta_id, 'timestamp': {'$gte': inicio_dia}},
+         'ordenacao': [('timestamp', ASCENDING)]},
+        {'descricao': 'roletas com números (aquecimento do cache)', 'colecao': 'roleta_numeros',
+         'tipo': 'distinct', 'campo': 'roleta_id'},
+        {'descricao': 'números do dia', 'colecao': 'roleta_numeros',
+         'filtro': {'roleta_id': roleta_id,
+                    'timestamp': {'$gte': inicio_dia, '$lte': inicio_dia + timedelta(days=1)}}},
+        {'descricao': 'números de todas as roletas no intervalo (estatísticas globais)', 'colecao': 'roleta_numeros',
+         'filtro': {'roleta_id': {'$in': [roleta_id]}, 'timestamp': {'$gte': inicio_dia, '$lt': agora},
+                    'numero': {'$gte': 0, '$lte': 36}}},
+        {'descricao': 'estatísticas diárias', 'colecao': 'roleta_estatisticas_diarias',
+         'filtro': {'roleta_id': roleta_id, 'data': inicio_dia.strftime("%Y-%m-%d")}, 'limite': 1},
+        {'descricao': 'upsert de sequência', 'colecao': 'roleta_sequencias',
+         'filtro': {'roleta_id': roleta_id, 'tipo': 'cor', 'valor': 'vermelho', 'inicio_timestamp': agora},
+         'limite': 1},
+        {'descricao': 'sequências recentes', 'colecao': 'roleta_sequencias',
+         'filtro': {'roleta_id': roleta_id}, 'ordenacao': [('fim_timestamp', DESCENDING), ('_id', DESCENDING)],
+         'limite': 101},
+        {'descricao': 'sequências por tipo, valor e comprimento', 'colecao': 'roleta_sequencias',
+         'filtro': {'roleta_id': roleta_id, 'tipo': 'cor', 'valor': 'vermelho', 'comprimento': {'$gte': 5},
+                    'fim_timestamp': {'$gte': inicio_dia, '$lt': agora}},
+         'ordenacao': [('fim_timestamp', DESCENDING), ('_id', DESCENDING)], 'limite': 101},
+        {'descricao': 'página seguinte de sequências', 'colecao': 'roleta_sequencias',
+         'filtro': {'roleta_id': roleta_id, 'tipo': 'cor',
+                    '$or': [{'fim_timestamp': {'$lt': agora}},
+                            {'fim_timestamp': agora, '_id': {'$lt': ObjectId('f' * 24)}}]},
+         'ordenacao': [('fim_timestamp', DESCENDING), ('_id', DESCENDING)], 'limite': 101},
+        {'descricao': 'agregados de um intervalo', 'colecao': 'roleta_rollups',
+         'filtro': {'roleta_id': roleta_id, 'inicio': {'$gte': inicio_dia - timedelta(days=14), '$lt': agora},
+                    'fim': {'$gt': inicio_dia - timedelta(days=7)}}},
+        {'descricao': 'agregados a compactar', 'colecao': 'roleta_rollups',
+         'filtro': {'granularidade': 'hora', 'inicio': {'$lt': inicio_dia}, 'lote': {'$exists': False}}},
+        {'descricao': 'resumo da roleta', 'colecao': 'roleta_resumos',
+         'filtro': {'_id': roleta_id}, 'limite': 1},
+        {'descricao': 'matriz de transição gravada', 'colecao': 'roleta_matrizes_transicao',
+         'filtro': {'_id': roleta_id}, 'limite': 1},
+        {'descricao': 'transições de estratégia recentes', 'colecao': 'estrategia_transicoes',
+         'filtro': {'roleta_id': roleta_id}, 'ordenacao': [('timestamp', DESCENDING)], 'limite': 100},
+        {'descricao': 'transições de estratégia a arquivar', 'colecao': 'estrategia_transicoes',
+         'filtro': {'roleta_id': roleta_id, 'timestamp': {'$lt': inicio_dia - timedelta(days=90)}}},
+    ]
+
+def aplicar_indices(db: Database, remover_nao_usados: bool = False) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Cria os índices declarados que não existem e, opcionalmente, remove os não declarados
+
+    Args:
+        db (Database): Banco de dados
+        remover_nao_usados (bool, optional): Remover índices não declarados. Defaults to False.
+
+    Returns:
+        Dict[str, Dict[str, List[str]]]: Índices criados e removidos por coleção
+    """
+    alteracoes = {}
+
+    for nome_colecao, indices in INDICES_REQUERIDOS.items():
+        colecao = db[nome_colecao]
+        existentes = colecao.index_information()
+        criados, removidos = [], []
+
+        for indice in indices:
+            if indice['nome'] not in existentes:
+                colecao.create_index(indice['chaves'], name=indice['nome'], **indice.get('opcoes', {}))
+                criados.append(indice['nome'])
+                logger.info(f"Índice '{indice['nome']}' criado para coleção '{nome_colecao}'")
+
+        if remover_nao_usados:
+            declarados = {indice['nome'] for indice in indices}
+            for nome_indice in existentes:
+                if nome_indice != '_id_' and nome_indice not in declarados:
+                    colecao.drop_index(nome_indice)
+                    removidos.append(nome_indice)
+                    logger.info(f"Índice não usado '{nome_indice}' removido da coleção '{nome_colecao}'")
+
+        alteracoes[nome_colecao] = {'criados': criados, 'removidos': removidos}
+
+    return alteracoes
+
+def explicar_consulta(db: Database, consulta: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Executa explain() para uma forma de consulta
+
+    Args:
+        db (Database): Banco de dados
+        consulta (Dict[str, Any]): Forma de consulta (ver `formas_consulta`)
+
+    Returns:
+        Dict[str, Any]: Resultado do explain
+    """
+    colecao = db[consulta['colecao']]
+    tipo = consulta.get('tipo', 'find')
+
+    if tipo == 'distinct':
+        return db.command('explain', {'distinct': consulta['colecao'], 'key': consulta['campo'],
+                                      'query': consulta.get('filtro', {})})
+    if tipo == 'aggregate':
+        return db.command('explain', {'aggregate': consulta['colecao'], 'pipeline': consulta['pipeline'],
+                                      'cursor': {}})
+
+    cursor = colecao.find(consulta.get('filtro', {}))
+    if consulta.get('ordenacao'):
+        cursor = cursor.sort(consulta['ordenacao'])
+    if consulta.get('pular'):
+        cursor = cursor.skip(consulta['pular'])
+    if consulta.get('limite'):
+        cursor = cursor.limit(consulta['limite'])
+    return cursor.explain()
+
+def _planos_vencedores(explicacao: Any) -> Iterator[Dict[str, Any]]:
+    """Percorre o resultado do explain e retorna todos os planos vencedores"""
+    if isinstance(explicacao, dict):
+        for chave, valor in explicacao.items():
+            if chave == 'winningPlan' and isinstance(valor, dict):
+                yield valor
+            else:
+                yield from _planos_vencedores(valor)
+    elif isinstance(explicacao, list):
+        for item in explicacao:
+            yield from _planos_vencedores(item)
+
+def _estagios(plano: Any) -> Iterator[str]:
+    """Percorre um plano de execução e retorna os nomes dos estágios"""
+    if isinstance(plano, dict):
+        if isinstance(plano.get('stage'), str):
+            yield plano['stage']
+        for valor in plano.values():
+            yield from _estagios(valor)
+    elif isinstance(plano, list):
+        for item in plano:
+            yield from _estagios(item)
+
+def verificar_consultas(db: Database, roleta_id: str = None) -> List[str]:
+    """
+    Verifica com explain() que nenhuma consulta do código faz COLLSCAN ou ordenação em memória
+
+    Args:
+        db (Database): Banco de dados
+        roleta_id (str, optional): ID de roleta para os valores de exemplo.
+            Defaults to None (usa uma roleta existente).
+
+    Returns:
+        List[str]: Problemas encontrados (vazia se todas as consultas estiverem cobertas)
+    """
+    if roleta_id is None:
+        exemplo = db['roleta_numeros'].find_one({}, {'roleta_id': 1})
+        roleta_id = exemplo['roleta_id'] if exemplo else 'verificacao-indices'
+
+    problemas = []
+    for consulta in formas_consulta(roleta_id):
+        try:
+            explicacao = explicar_consulta(db, consulta)
+        except Exception as e:
+            problemas.append(f"{consulta['descricao']}: erro no explain: {str(e)}")
+            continue
+
+        estagios = set()
+        for plano in _planos_vencedores(explicacao):
+            estagios.update(_estagios(plano))
+
+        if 'COLLSCAN' in estagios and not consulta.get('permite_collscan'):
+            problemas.append(f"{consulta['descricao']}: COLLSCAN em '{consulta['colecao']}'")
+        if 'SORT' in estagios:
+            problemas.append(f"{consulta['descricao']}: ordenação em memória em '{consulta['colecao']}'")
+
+    return problemas
+
+def main():
+    """
+    Função principal da linha de comando
+    """
+    parser = argparse.ArgumentParser(description="Gerenciador de índices do MongoDB")
+    parser.add_argument('--aplicar', action='store_true', help="Criar os índices declarados que faltam")
+    parser.add_argument('--remover-nao-usados', action='store_true', help="Remover índices não declarados")
+    parser.add_argument('--verificar', action='store_true', help="Verificar os planos das consultas com explain()")
+    parser.add_argument('--roleta-id', help="ID de roleta usado nas consultas de verificação")
+    args = parser.parse_args()
+
+    from mongo_config import conectar_mongodb
+    client, db = conectar_mongodb()
+
+    if args.aplicar or args.remover_nao_usados:
+        for colecao, alteracoes in aplicar_indices(db, args.remover_nao_usados).items():
+            print(f"{colecao}: criados={alteracoes['criados']} removidos={alteracoes['removidos']}")
+
+    if args.verificar:
+        problemas = verificar_consultas(db, args.roleta_id)
+        for problema in problemas:
+            print(f"[PROBLEMA] {problema}")
+        if problemas:
+            return 1
+        print("Todas as consultas usam índices sem ordenação em memória")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
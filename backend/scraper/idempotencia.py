@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Posições de sequência dos números a gravar e detecção de releituras
+
+O scraper lê na página o número atual e os anteriores (histórico visível, do mais
+recente para o mais antigo). Alinhando esse histórico com os últimos números gravados
+da roleta, cada sorteio recebe sempre a mesma posição `sequencia`, qualquer que seja o
+processo que o leu e o atraso da sua leitura:
+
+- histórico igual ao topo gravado: nada novo (releitura);
+- histórico deslocado para trás (página antiga de um scraper atrasado): nada novo;
+- histórico que continua o topo gravado depois de k números: os k números são novos,
+  inclusive quando repetem o anterior (uma repetição legítima, 1 giro em 37).
+
+Dois processos que leem o mesmo sorteio planejam a mesma posição; o índice único
+(roleta_id, sequencia) rejeita a segunda gravação e quem perdeu relê o topo e
+replaneja. Sem histórico (API, itens antigos do spool), um número igual ao último
+gravado só é releitura quando os horários de origem estão a menos de
+INTERVALO_RELEITURA um do outro.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional
+
+# Números do histórico que precisam coincidir com os gravados para aceitar um alinhamento
+# (com 5 números visíveis, uma leitura recupera até 2 sorteios perdidos)
+MINIMO_SOBREPOSICAO = 3
+
+# Números gravados lidos para alinhar um histórico (o dobro do histórico visível na página)
+PROFUNDIDADE_ALINHAMENTO = 10
+
+# Um mesmo número lido de novo dentro deste intervalo é o mesmo sorteio (uma rodada leva mais)
+INTERVALO_RELEITURA = timedelta(seconds=20)
+
+def _deslocamentos(tamanho_historico: int, tamanho_gravados: int):
+    """0, 1, -1, 2, -2...: o alinhamento mais próximo do topo gravado vence"""
+    yield 0
+    for distancia in range(1, max(tamanho_historico, tamanho_gravados)):
+        if distancia < tamanho_historico:
+            yield distancia
+        if distancia < tamanho_gravados:
+            yield -distancia
+
+def alinhar_historico(historico: List[int], gravados: List[int]) -> Optional[int]:
+    """
+    Alinha o histórico visível com os últimos números gravados
+
+    Args:
+        historico (List[int]): Números da página, do mais recente para o mais antigo
+        gravados (List[int]): Últimos números gravados, do mais recente para o mais antigo
+
+    Returns:
+        Optional[int]: Quantidade de números novos no início do histórico (0 para releituras,
+            inclusive de páginas atrasadas), ou None se nenhum alinhamento é confiável
+    """
+    if not historico or not gravados:
+        return None
+    for deslocamento in _deslocamentos(len(historico), len(gravados)):
+        # historico[i] corresponde a gravados[i - deslocamento]
+        inicio = max(deslocamento, 0)
+        pares = [(historico[i], gravados[i - deslocamento])
+                 for i in range(inicio, len(historico)) if 0 <= i - deslocamento < len(gravados)]
+        # Com sobreposição curta, uma coincidência na borda passaria por alinhamento
+        if not pares or len(pares) < min(MINIMO_SOBREPOSICAO, len(historico) - 1, len(gravados)):
+            continue
+        if all(lido == gravado for lido, gravado in pares):
+            return inicio
+    return None
+
+def eh_releitura(ultimo: Optional[Dict[str, Any]], numero: int, timestamp: Any) -> bool:
+    """
+    Regra sem histórico: o mesmo número do topo, lido dentro de INTERVALO_RELEITURA
+
+    Args:
+        ultimo (Dict[str, Any], optional): Último número gravado (numero e timestamp)
+        numero (int): Número lido
+        timestamp: Horário de origem da leitura (datetime)
+
+    Returns:
+        bool: True se é uma releitura do sorteio gravado
+    """
+    if ultimo is None or ultimo.get('numero') != numero:
+        return False
+    anterior = ultimo.get('timestamp')
+    if not isinstance(anterior, datetime) or not isinstance(timestamp, datetime):
+        # Sem horários comparáveis, ficar com o caso mais comum
+        return True
+    try:
+        return abs(timestamp.replace(tzinfo=None) - anterior.replace(tzinfo=None)) < INTERVALO_RELEITURA
+    except (TypeError, OverflowError):
+        return True
+
+def planejar_insercao(gravados: List[Dict[str, Any]], itens: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Decide quais números de um lote são novos e a posição de cada um
+
+    Args:
+        gravados (List[Dict[str, Any]]): Últimos números gravados da roleta (numero, timestamp
+            como datetime e sequencia), do mais recente para o mais antigo
+        itens (List[Dict[str, Any]]): Leituras em ordem cronológica: numero, timestamp
+            (datetime) e, opcionalmente, historico (números da página, começando pelo lido)
+
+    Returns:
+        List[Dict[str, Any]]: Números a gravar, em ordem: item (índice da leitura de origem),
+            numero, timestamp, sequencia e historico (o histórico visível no sorteio)
+    """
+    # A ordem que vale é a da sequência: relógios de processos diferentes não concordam
+    cauda = sorted(({'numero': doc.get('numero'), 'timestamp': doc.get('timestamp'),
+                     'sequencia': int(doc.get('sequencia') or 0)} for doc in gravados),
+                   key=lambda doc: doc['sequencia'], reverse=True)
+    planejados = []
+
+    for indice, item in enumerate(itens):
+        numero = item['numero']
+        timestamp = item['timestamp']
+        historico = [int(n) for n in item.get('historico') or []]
+
+        novos = None
+        if len(historico) >= 2 and historico[0] == numero:
+            quantidade = alinhar_historico(historico, [doc['numero'] for doc in cauda])
+            if quantidade is not None:
+                # Do mais antigo para o mais recente, cada um com o histórico que a página tinha nele
+                novos = [(historico[j], historico[j:]) for j in range(quantidade - 1, -1, -1)]
+        if novos is None:
+            novos = [] if cauda and eh_releitura(cauda[0], numero, timestamp) else [(numero, historico or None)]
+
+        for ordem, (novo, historico_novo) in enumerate(novos):
+            # Números que a página mostrou sem que tenham sido lidos: horário desconhecido,
+            # anterior ao da leitura para manter a ordem cronológica
+            instante = timestamp - timedelta(milliseconds=len(novos) - 1 - ordem)
+            sequencia = (cauda[0]['sequencia'] if cauda else 0) + 1
+            planejados.append({'item': indice, 'numero': novo, 'timestamp': instante,
+                               'sequencia': sequencia, 'historico': historico_novo})
+            cauda.insert(0, {'numero': novo, 'timestamp': instante, 'sequencia': sequencia})
+
+    return planejados
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Números quentes e frios por roleta nas últimas N jogadas (padrão: 50, 100 e 500)
+
+Cada roleta guarda os últimos giros num buffer circular do tamanho da maior janela e,
+por janela, a contagem dos 37 números e a ordem dos números por contagem. Um giro soma 1
+ao número que entra em cada janela e subtrai 1 do que sai dela; como as contagens mudam
+de 1 em 1, a ordem é mantida trocando o número com a borda do seu bloco de contagens
+iguais, sem reordenar. Ler os quentes/frios é fatiar a ordem: nada é lido do banco.
+
+Cada janela também conta, por distância na roda (roda.DISTANCIA), os pares de giros
+consecutivos: o giro que entra soma o par com o anterior e o que sai subtrai o par com
+o seguinte. Daí saem os acertos de vizinhos e, das contagens, os setores da roda.
+"""
+
+import threading
+from typing import Dict, List, Any, Optional, Iterable, Sequence
+
+from config import JANELAS_FREQUENCIA
+from rastreador_sequencias import posicao_giro
+from roda import SETORES, DISTANCIA, DISTANCIA_MAXIMA, acertos_vizinhos
+
+class _Janela:
+    """Contagens e ordem por contagem (decrescente) dos números de uma janela"""
+
+    __slots__ = ('tamanho', 'contagens', 'ordem', 'indice', 'primeiro', 'ultimo', 'distancias')
+
+    def __init__(self, tamanho: int):
+        self.tamanho = tamanho
+        self.contagens = [0] * 37
+        # Pares de giros consecutivos da janela por distância na roda
+        self.distancias = [0] * (DISTANCIA_MAXIMA + 1)
+        self.ordem = list(range(37))
+        self.indice = list(range(37))
+        # Primeira e última posição em `ordem` de cada contagem presente
+        self.primeiro = {0: 0}
+        self.ultimo = {0: 36}
+
+    def _trocar(self, i: int, j: int) -> None:
+        a, b = self.ordem[i], self.ordem[j]
+        self.ordem[i], self.ordem[j] = b, a
+        self.indice[a], self.indice[b] = j, i
+
+    def somar(self, numero: int) -> None:
+        contagem = self.contagens[numero]
+        j = self.primeiro[contagem]
+        self._trocar(self.indice[numero], j)
+        if self.ultimo[contagem] == j:
+            del self.primeiro[contagem], self.ultimo[contagem]
+        else:
+            self.primeiro[contagem] = j + 1
+        self.contagens[numero] = contagem + 1
+        self.ultimo[contagem + 1] = j
+        self.primeiro.setdefault(contagem + 1, j)
+
+    def subtrair(self, numero: int) -> None:
+        contagem = self.contagens[numero]
+        j = self.ultimo[contagem]
+        self._trocar(self.indice[numero], j)
+        if self.primeiro[contagem] == j:
+            del self.primeiro[contagem], self.ultimo[contagem]
+        else:
+            self.ultimo[contagem] = j - 1
+        self.contagens[numero] = contagem - 1
+        self.primeiro[contagem - 1] = j
+        self.ultimo.setdefault(contagem - 1, j)
+
+class _EstadoRoleta:
+    """Buffer circular dos últimos giros e janelas de uma roleta"""
+
+    __slots__ = ('buffer', 'total', 'janelas', 'ultima_posicao')
+
+    def __init__(self, tamanhos: Sequence[int]):
+        self.buffer = [0] * max(tamanhos)
+        self.total = 0
+        self.janelas = [_Janela(tamanho) for tamanho in tamanhos]
+        self.ultima_posicao = None
+
+    def aplicar(self, numero: int) -> None:
+        capacidade = len(self.buffer)
+        anterior = self.buffer[(self.total - 1) % capacidade] if self.total else None
+        for janela in self.janelas:
+            if self.total >= janela.tamanho:
+                saida = self.total - janela.tamanho
+                saindo = self.buffer[saida % capacidade]
+                janela.subtrair(saindo)
+                if janela.tamanho > 1:
+                    janela.distancias[DISTANCIA[saindo][self.buffer[(saida + 1) % capacidade]]] -= 1
+            if anterior is not None and janela.tamanho > 1:
+                janela.distancias[DISTANCIA[anterior][numero]] += 1
+            janela.somar(numero)
+        self.buffer[self.total % capacidade] = numero
+        self.total += 1
+
+class JanelasFrequencia:
+    """Mantém as contagens das janelas de todas as roletas"""
+
+    def __init__(self, tamanhos: Sequence[int] = JANELAS_FREQUENCIA):
+        """
+        Args:
+            tamanhos (Sequence[int], optional): Tamanhos das janelas em giros. Defaults to JANELAS_FREQUENCIA.
+        """
+        self.tamanhos = tuple(sorted(set(tamanhos)))
+        self.tamanho_maximo = self.tamanhos[-1]
+        self._estados: Dict[str, _EstadoRoleta] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, documento: Dict[str, Any]) -> bool:
+        """
+        Aplica um número às janelas da roleta
+
+        Args:
+            documento (Dict[str, Any]): Documento de roleta_numeros (roleta_id, numero, timestamp, sequencia)
+
+        Returns:
+            bool: True se aplicado, False se o número já havia sido aplicado ou é inválido
+        """
+        roleta_id = documento.get('roleta_id')
+        numero = documento.get('numero')
+        if roleta_id is None or not isinstance(numero, int) or not 0 <= numero <= 36:
+            return False
+
+        posicao = posicao_giro(documento)
+        with self._lock:
+            estado = self._estados.get(roleta_id)
+            if estado is None:
+                estado = self._estados[roleta_id] = _EstadoRoleta(self.tamanhos)
+            if estado.ultima_posicao is not None and posicao <= estado.ultima_posicao:
+                return False
+            estado.ultima_posicao = posicao
+            estado.aplicar(numero)
+        return True
+
+    def reconstruir(self, roleta_id: str, documentos: Iterable[Dict[str, Any]]) -> None:
+        """
+        Recria as janelas de uma roleta a partir dos últimos números
+
+        Args:
+            roleta_id (str): ID da roleta
+            documentos (Iterable[Dict[str, Any]]): Documentos em ordem cronológica
+        """
+        estado = _EstadoRoleta(self.tamanhos)
+        for documento in documentos:
+            numero = documento.get('numero')
+            if isinstance(numero, int) and 0 <= numero <= 36:
+                estado.ultima_posicao = posicao_giro(documento)
+                estado.aplicar(numero)
+        with self._lock:
+            self._estados[roleta_id] = estado
+
+    def obter(self, roleta_id: str, quantidade: int = 5) -> Optional[Dict[str, Any]]:
+        """
+        Obtém os números quentes e frios de cada janela
+
+        Args:
+            roleta_id (str): ID da roleta
+            quantidade (int, optional): Números quentes e frios por janela. Defaults to 5.
+
+        Returns:
+            Optional[Dict[str, Any]]: Por tamanho de janela, giros contados, quentes, frios e
+                contagem de cada número; None se a roleta não tem números
+        """
+        quantidade = max(0, min(quantidade, 37))
+        with self._lock:
+            estado = self._estados.get(roleta_id)
+            if estado is None:
+                return None
+            janelas = {}
+            for janela in estado.janelas:
+                contagens = janela.contagens
+                janelas[str(janela.tamanho)] = {
+                    'giros': min(estado.total, janela.tamanho),
+                    'quentes': [{'numero': n, 'contagem': contagens[n]} for n in janela.ordem[:quantidade]],
+                    'frios': [{'numero': n, 'contagem': contagens[n]}
+                              for n in reversed(janela.ordem[37 - quantidade:])],
+                    'contagens': list(contagens)
+                }
+            return janelas
+
+    def obter_roda(self, roleta_id: str, casas: Sequence[int] = (1, 2, 3, 4)) -> Optional[Dict[str, Any]]:
+        """
+        Obtém os setores da roda e os acertos por distância de cada janela
+
+        Args:
+            roleta_id (str): ID da roleta
+            casas (Sequence[int], optional): Quantidades de vizinhos avaliadas. Defaults to (1, 2, 3, 4).
+
+        Returns:
+            Optional[Dict[str, Any]]: Por tamanho de janela, giros contados, giros por setor,
+                pares de giros consecutivos por distância na roda (índice = casas) e acertos
+                de vizinhos; None se a roleta não tem números
+        """
+        casas = tuple(n for n in casas if 0 <= n <= DISTANCIA_MAXIMA)
+        with self._lock:
+            estado = self._estados.get(roleta_id)
+            if estado is None:
+                return None
+            janelas = {}
+            for janela in estado.janelas:
+                contagens = janela.contagens
+                janelas[str(janela.tamanho)] = {
+                    'giros': min(estado.total, janela.tamanho),
+                    'setores': {nome: sum(contagens[n] for n in numeros) for nome, numeros in SETORES.items()},
+                    'distancias': list(janela.distancias),
+                    'vizinhos': acertos_vizinhos(janela.distancias, casas)
+                }
+            return janelas
+
+    def roletas(self) -> List[str]:
+        """IDs das roletas acompanhadas"""
+        with self._lock:
+            return list(self._estados)
@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Matriz de transição 37×37 por roleta ("o que saiu depois de X"), mantida em memória
+
+Cada roleta tem uma matriz NumPy de contagens de primeira ordem: a célula [a, b] conta
+quantas vezes b saiu logo depois de a, e cada giro soma 1 a uma célula. Com
+MATRIZ_SEGUNDA_ORDEM ativo, um dicionário esparso conta também os trios (a, b, c),
+indexados por (a·37 + b)·37 + c; só os trios que já aconteceram ocupam memória.
+
+As contagens cobrem todo o histórico da roleta. A cada MATRIZ_PERSISTENCIA_SEGUNDOS as
+matrizes alteradas são gravadas em `roleta_matrizes_transicao` como blobs binários
+compactados (uint32 little-endian + zlib); na inicialização cada roleta volta do blob
+e aplica só os números gravados depois dele. Sem blob, a primeira carga lê o histórico
+inteiro da roleta, o que pode levar minutos: as fontes de dados carregam numa thread
+(`carregar_em_segundo_plano`, com `obter` devolvendo None até a roleta ficar pronta) e o
+blob pode ser gerado antes, fora do processo, com `python matriz_transicao.py reconstruir`.
+Só o processo que grava os números (o scraper) grava as matrizes; a API só as lê.
+
+Uma matriz só passa a existir em memória (e a ser gravada) depois de montada a partir do
+blob ou do histórico completo: giros de uma roleta ainda não carregada esperam a carga, e
+uma carga que falha (ex.: banco fora do ar na partida) é repetida a cada
+INTERVALO_NOVA_CARGA segundos, sem nunca gravar por cima do blob uma matriz parcial.
+
+Uso:
+    python matriz_transicao.py reconstruir [--roleta-id ID]
+    python matriz_transicao.py mostrar --roleta-id ID [--numero N]
+"""
+
+import sys
+import time
+import zlib
+import atexit
+import argparse
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Iterable
+
+import numpy as np
+from pymongo import UpdateOne, ASCENDING
+from pymongo.database import Database
+
+from config import logger, MATRIZ_SEGUNDA_ORDEM, MATRIZ_PERSISTENCIA_SEGUNDOS
+from rastreador_sequencias import posicao_giro
+
+COLECAO_MATRIZES = 'roleta_matrizes_transicao'
+
+# Versão do formato dos blobs gravados
+FORMATO_BLOB = 1
+
+# Segundos até repetir a carga de uma roleta que falhou
+INTERVALO_NOVA_CARGA = 30.0
+
+class _EstadoRoleta:
+    """Contagens de transição e últimos números de uma roleta"""
+
+    __slots__ = ('primeira', 'segunda', 'anterior', 'penultimo', 'total', 'ultima_posicao',
+                 'ultimo_timestamp', 'alterada')
+
+    def __init__(self, segunda_ordem: bool):
+        self.primeira = np.zeros((37, 37), dtype=np.uint32)
+        self.segunda: Optional[Dict[int, int]] = {} if segunda_ordem else None
+        self.anterior: Optional[int] = None
+        self.penultimo: Optional[int] = None
+        self.total = 0
+        self.ultima_posicao = None
+        self.ultimo_timestamp: Optional[datetime] = None
+        self.alterada = False
+
+    def aplicar(self, numero: int, documento: Dict[str, Any]) -> None:
+        if self.anterior is not None:
+            self.primeira[self.anterior, numero] += 1
+            if self.segunda is not None and self.penultimo is not None:
+                chave = (self.penultimo * 37 + self.anterior) * 37 + numero
+                self.segunda[chave] = self.segunda.get(chave, 0) + 1
+        self.penultimo, self.anterior = self.anterior, numero
+        self.total += 1
+        self.ultima_posicao = posicao_giro(documento)
+        self.ultimo_timestamp = documento.get('timestamp') or self.ultimo_timestamp
+        self.alterada = True
+
+def serializar(roleta_id: str, estado: _EstadoRoleta) -> Dict[str, Any]:
+    """
+    Converte o estado de uma roleta no documento de `roleta_matrizes_transicao`
+
+    Args:
+        roleta_id (str): ID da roleta
+        estado (_EstadoRoleta): Contagens da roleta
+
+    Returns:
+        Dict[str, Any]: Documento com as matrizes como blobs compactados
+    """
+    segunda = None
+    if estado.segunda:
+        chaves = np.fromiter(sorted(estado.segunda), dtype='<u4', count=len(estado.segunda))
+        contagens = np.fromiter((estado.segunda[int(c)] for c in chaves), dtype='<u4', count=len(chaves))
+        segunda = zlib.compress(chaves.tobytes() + contagens.tobytes())
+
+    tipo_posicao, valor_posicao = estado.ultima_posicao if estado.ultima_posicao is not None else (None, None)
+    return {
+        '_id': roleta_id,
+        'roleta_id': roleta_id,
+        'formato': FORMATO_BLOB,
+        'primeira_ordem': zlib.compress(estado.primeira.astype('<u4').tobytes()),
+        'segunda_ordem': segunda,
+        'anterior': estado.anterior,
+        'penultimo': estado.penultimo,
+        'total_giros': estado.total,
+        'ultima_sequencia': valor_posicao if tipo_posicao == 0 else None,
+        'ultimo_timestamp': estado.ultimo_timestamp,
+        'atualizado_em': datetime.now()
+    }
+
+def desserializar(documento: Dict[str, Any], segunda_ordem: bool) -> _EstadoRoleta:
+    """
+    Recria o estado de uma roleta a partir do documento gravado
+
+    Args:
+        documento (Dict[str, Any]): Documento de `roleta_matrizes_transicao`
+        segunda_ordem (bool): Manter as contagens de segunda ordem
+
+    Returns:
+        _EstadoRoleta: Estado da roleta
+    """
+    estado = _EstadoRoleta(segunda_ordem)
+    estado.primeira = np.frombuffer(zlib.decompress(documento['primeira_ordem']), dtype='<u4') \
+        .astype(np.uint32).reshape(37, 37)
+    if segunda_ordem and documento.get('segunda_ordem'):
+        valores = np.frombuffer(zlib.decompress(documento['segunda_ordem']), dtype='<u4')
+        metade = len(valores) // 2
+        estado.segunda = dict(zip(valores[:metade].tolist(), valores[metade:].tolist()))
+    estado.anterior = documento.get('anterior')
+    estado.penultimo = documento.get('penultimo')
+    estado.total = documento.get('total_giros', 0)
+    estado.ultimo_timestamp = documento.get('ultimo_timestamp')
+    estado.ultima_posicao = posicao_giro({'sequencia': documento.get('ultima_sequencia'),
+                                          'timestamp': estado.ultimo_timestamp})
+    return estado
+
+def _aplicar_documento(estado: _EstadoRoleta, documento: Dict[str, Any]) -> bool:
+    """Aplica um giro ao estado se for válido e posterior ao último aplicado"""
+    numero = documento.get('numero')
+    if not isinstance(numero, int) or not 0 <= numero <= 36:
+        return False
+    if estado.ultima_posicao is not None and posicao_giro(documento) <= estado.ultima_posicao:
+        return False
+    estado.aplicar(numero, documento)
+    return True
+
+class MatrizesTransicao:
+    """Mantém as matrizes de transição de todas as roletas e as grava periodicamente"""
+
+    def __init__(self, db: Database = None, segunda_ordem: bool = MATRIZ_SEGUNDA_ORDEM,
+                 intervalo: float = MATRIZ_PERSISTENCIA_SEGUNDOS,
+                 intervalo_nova_carga: float = INTERVALO_NOVA_CARGA):
+        """
+        Args:
+            db (Database, optional): Banco de dados. Defaults to None (conexão de mongo_config na primeira gravação).
+            segunda_ordem (bool, optional): Contar também os trios. Defaults to MATRIZ_SEGUNDA_ORDEM.
+            intervalo (float, optional): Segundos entre gravações. Defaults to MATRIZ_PERSISTENCIA_SEGUNDOS.
+            intervalo_nova_carga (float, optional): Segundos até repetir uma carga que falhou.
+                Defaults to INTERVALO_NOVA_CARGA.
+        """
+        self.db = db
+        self.segunda_ordem = segunda_ordem
+        self.intervalo = intervalo
+        self.intervalo_nova_carga = intervalo_nova_carga
+        self._estados: Dict[str, _EstadoRoleta] = {}
+        # Giros registrados enquanto a roleta carrega, aplicados quando a carga termina
+        self._pendentes: Dict[str, List[Dict[str, Any]]] = {}
+        # Cargas agendadas: roleta -> instante (time.monotonic) da próxima tentativa
+        self._cargas: Dict[str, float] = {}
+        self._nova_carga = threading.Event()
+        self._thread_carga: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._thread = None
+
+    def _banco(self) -> Database:
+        if self.db is None:
+            from mongo_config import conectar_mongodb
+            self.db = conectar_mongodb()[1]
+        return self.db
+
+    def registrar(self, documento: Dict[str, Any]) -> bool:
+        """
+        Soma um giro à matriz da roleta
+
+        Args:
+            documento (Dict[str, Any]): Documento de roleta_numeros (roleta_id, numero, timestamp, sequencia)
+
+        Returns:
+            bool: True se aplicado (ou guardado até o fim da carga da roleta, agendada se
+                ainda não estiver), False se o número já havia sido aplicado ou é inválido
+        """
+        roleta_id = documento.get('roleta_id')
+        numero = documento.get('numero')
+        if roleta_id is None or not isinstance(numero, int) or not 0 <= numero <= 36:
+            return False
+
+        with self._lock:
+            estado = self._estados.get(roleta_id)
+            if estado is None:
+                self._agendar_carga(roleta_id)
+                self._pendentes[roleta_id].append(documento)
+                return True
+            return _aplicar_documento(estado, documento)
+
+    def reconstruir(self, roleta_id: str, documentos: Iterable[Dict[str, Any]],
+                    estado: Optional[_EstadoRoleta] = None) -> int:
+        """
+        Recria a matriz de uma roleta a partir dos seus números
+
+        Args:
+            roleta_id (str): ID da roleta
+            documentos (Iterable[Dict[str, Any]]): Documentos em ordem cronológica
+            estado (_EstadoRoleta, optional): Estado de partida (ex.: o último gravado); os
+                documentos já aplicados a ele são ignorados. Defaults to None (matriz vazia).
+
+        Returns:
+            int: Giros aplicados
+        """
+        estado = estado or _EstadoRoleta(self.segunda_ordem)
+        aplicados = sum(1 for documento in documentos if _aplicar_documento(estado, documento))
+        with self._lock:
+            # Os giros que chegaram durante a carga e que ela não leu
+            for documento in self._pendentes.pop(roleta_id, ()):
+                aplicados += _aplicar_documento(estado, documento)
+            self._estados[roleta_id] = estado
+        return aplicados
+
+    def carregar(self, roleta_id: str) -> int:
+        """
+        Carrega a matriz gravada de uma roleta e aplica os números gravados depois dela
+
+        Args:
+            roleta_id (str): ID da roleta
+
+        Returns:
+            int: Giros aplicados a partir de roleta_numeros (-1 em caso de erro; os giros
+                pendentes da roleta continuam guardados para a próxima tentativa)
+        """
+        try:
+            db = self._banco()
+            gravado = db[COLECAO_MATRIZES].find_one({'_id': roleta_id})
+            estado = desserializar(gravado, self.segunda_ordem) if gravado else None
+            filtro = {'roleta_id': roleta_id}
+            if estado is not None and estado.ultimo_timestamp is not None:
+                filtro['timestamp'] = {'$gte': estado.ultimo_timestamp}
+            documentos = db.roleta_numeros.find(filtro, {'numero': 1, 'timestamp': 1, 'sequencia': 1, '_id': 0}) \
+                .sort('timestamp', ASCENDING)
+            return self.reconstruir(roleta_id, documentos, estado)
+        except Exception as e:
+            logger.error(f"Erro ao carregar matriz de transição da roleta {roleta_id}: {str(e)}")
+            return -1
+
+    def carregar_em_segundo_plano(self, roleta_ids: Iterable[str]) -> Optional[threading.Thread]:
+        """
+        Carrega as matrizes das roletas numa thread, sem atrasar a inicialização do processo.
+        Até a carga de uma roleta terminar, `obter` devolve None e `carregando` True para ela;
+        cargas que falham são repetidas a cada `intervalo_nova_carga` segundos.
+
+        Args:
+            roleta_ids (Iterable[str]): IDs das roletas
+
+        Returns:
+            Optional[threading.Thread]: Thread da carga (termina quando todas as roletas
+                agendadas estiverem carregadas), ou None se não há o que carregar
+        """
+        with self._lock:
+            for roleta_id in roleta_ids:
+                if roleta_id not in self._estados:
+                    self._agendar_carga(roleta_id)
+            return self._thread_carga
+
+    def _agendar_carga(self, roleta_id: str) -> None:
+        """Agenda a carga de uma roleta e garante a thread de carga; chamado com o lock"""
+        self._pendentes.setdefault(roleta_id, [])
+        if roleta_id in self._cargas:
+            return
+        self._cargas[roleta_id] = 0.0
+        self._nova_carga.set()
+        if self._thread_carga is None:
+            self._thread_carga = threading.Thread(target=self._executar_cargas,
+                                                  name="matrizes-transicao-carga", daemon=True)
+            self._thread_carga.start()
+
+    def _executar_cargas(self) -> None:
+        inicio = time.monotonic()
+        carregadas = 0
+        while True:
+            with self._lock:
+                if not self._cargas:
+                    self._thread_carga = None
+                    break
+                agora = time.monotonic()
+                prontas = [roleta_id for roleta_id, quando in self._cargas.items() if quando <= agora]
+                espera = min(self._cargas.values()) - agora
+                self._nova_carga.clear()
+            if not prontas:
+                self._nova_carga.wait(espera)
+                continue
+
+            for roleta_id in prontas:
+                sucesso = self.carregar(roleta_id) >= 0
+                with self._lock:
+                    if sucesso:
+                        self._cargas.pop(roleta_id, None)
+                        carregadas += 1
+                    else:
+                        self._cargas[roleta_id] = time.monotonic() + self.intervalo_nova_carga
+
+        logger.info(f"Matrizes de transição carregadas: {carregadas} roletas "
+                    f"em {time.monotonic() - inicio:.1f}s")
+
+    def carregando(self, roleta_id: str) -> bool:
+        """Indica se a matriz da roleta ainda está sendo carregada"""
+        with self._lock:
+            return roleta_id in self._pendentes
+
+    def obter(self, roleta_id: str, numero: Optional[int] = None,
+              anterior: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Obtém as contagens de transição de uma roleta
+
+        Args:
+            roleta_id (str): ID da roleta
+            numero (int, optional): Devolver só a linha deste número (o que saiu depois dele). Defaults to None.
+            anterior (int, optional): Com `numero`, usar a contagem de segunda ordem: o que saiu
+                depois de `anterior` seguido de `numero`. Defaults to None.
+
+        Returns:
+            Optional[Dict[str, Any]]: Giros contados, último número e a matriz 37×37 (ou a linha
+                pedida, com o total); None se a roleta não tem números
+        """
+        with self._lock:
+            estado = self._estados.get(roleta_id)
+            if estado is None:
+                return None
+            resultado = {'giros': estado.total, 'ultimo_numero': estado.anterior}
+            if numero is None:
+                resultado['matriz'] = estado.primeira.tolist()
+                return resultado
+
+            if anterior is None:
+                seguintes = estado.primeira[numero].tolist()
+            elif estado.segunda is None:
+                return dict(resultado, erro='Contagens de segunda ordem desativadas (MATRIZ_SEGUNDA_ORDEM)')
+            else:
+                base = (anterior * 37 + numero) * 37
+                seguintes = [estado.segunda.get(base + c, 0) for c in range(37)]
+                resultado['anterior'] = anterior
+
+        resultado.update({'numero': numero, 'total': sum(seguintes), 'seguintes': seguintes})
+        return resultado
+
+    def persistir(self) -> int:
+        """
+        Grava as matrizes alteradas desde a última gravação, em um único bulk_write
+
+        Returns:
+            int: Quantidade de roletas gravadas
+        """
+        with self._lock:
+            alteradas = [(roleta_id, estado) for roleta_id, estado in self._estados.items() if estado.alterada]
+            documentos = [serializar(roleta_id, estado) for roleta_id, estado in alteradas]
+            for _, estado in alteradas:
+                estado.alterada = False
+
+        if not documentos:
+            return 0
+
+        try:
+            self._banco()[COLECAO_MATRIZES].bulk_write(
+                [UpdateOne({'_id': documento['_id']}, {'$set': documento}, upsert=True) for documento in documentos],
+                ordered=False
+            )
+            return len(documentos)
+        except Exception as e:
+            logger.error(f"Erro ao gravar matrizes de transição: {str(e)}")
+            # Regravar na próxima janela
+            with self._lock:
+                for _, estado in alteradas:
+                    estado.alterada = True
+            return 0
+
+    def iniciar(self) -> 'MatrizesTransicao':
+        """Inicia a thread de gravação periódica"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._executar, name="matrizes-transicao", daemon=True)
+            self._thread.start()
+        # Não perder os giros desde a última gravação ao encerrar o processo
+        atexit.register(self.parar)
+        return self
+
+    def parar(self) -> None:
+        """Interrompe a thread e grava o que estiver pendente"""
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(self.intervalo + 1)
+        self.persistir()
+
+    def _executar(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            self.persistir()
+
+    def roletas(self) -> List[str]:
+        """IDs das roletas acompanhadas"""
+        with self._lock:
+            return list(self._estados)
+
+def main():
+    parser = argparse.ArgumentParser(description="Matrizes de transição por roleta")
+    parser.add_argument('comando', choices=['reconstruir', 'mostrar'])
+    parser.add_argument('--roleta-id', help="Somente esta roleta")
+    parser.add_argument('--numero', type=int, help="Linha da matriz a mostrar")
+    args = parser.parse_args()
+
+    from mongo_config import conectar_mongodb
+    client, db = conectar_mongodb()
+    matrizes = MatrizesTransicao(db)
+
+    if args.comando == 'reconstruir':
+        roleta_ids = [args.roleta_id] if args.roleta_id else db.roleta_numeros.distinct('roleta_id')
+        for roleta_id in roleta_ids:
+            documentos = db.roleta_numeros.find({'roleta_id': roleta_id},
+                                                {'numero': 1, 'timestamp': 1, 'sequencia': 1, '_id': 0}) \
+                .sort('timestamp', ASCENDING)
+            print(f"{roleta_id}: {matrizes.reconstruir(roleta_id, documentos)} giros")
+        print(f"Matrizes gravadas: {matrizes.persistir()}")
+        sys.exit(0)
+
+    if not args.roleta_id:
+        print("Falha: --roleta-id é obrigatório para mostrar")
+        sys.exit(1)
+    if matrizes.carregar(args.roleta_id) < 0:
+        print("Falha: erro ao carregar a matriz")
+        sys.exit(1)
+    resultado = matrizes.obter(args.roleta_id, args.numero)
+    if resultado is None:
+        print("Roleta sem números")
+        sys.exit(1)
+    if args.numero is None:
+        for numero, linha in enumerate(resultado['matriz']):
+            print(f"{numero:2d}: {' '.join(f'{c:3d}' for c in linha)}")
+    else:
+        mais_frequentes = sorted(range(37), key=lambda n: -resultado['seguintes'][n])[:5]
+        print(f"Depois de {args.numero} ({resultado['total']} vezes): "
+              + ', '.join(f"{n} ({resultado['seguintes'][n]})" for n in mais_frequentes))
+    sys.exit(0)
+
+if __name__ == "__main__":
+    main()
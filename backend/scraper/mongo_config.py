@@ -8,104 +8,109 @@ Módulo de configuração e utilitários para MongoDB
 import os
 import logging
 from datetime import datetime
-from typing import Dict, Any, Tuple, Dict
+import threading
+from typing import Dict, Any, Tuple, Optional
 from pymongo import MongoClient, ASCENDING, DESCENDING
 from pymongo.collection import Collection
 from pymongo.database import Database
 
-from config import MONGODB_URI, MONGODB_DB_NAME, logger
+from config import MONGODB_URI, MONGODB_DB_NAME, MONGODB_REMOVER_INDICES_NAO_USADOS, logger
+from gerenciador_indices import aplicar_indices, versao_indices
+
+# Cliente compartilhado pelo processo, criado na primeira chamada de conectar_mongodb
+_client: Optional[MongoClient] = None
+_db: Optional[Database] = None
+_colecoes: Optional[Dict[str, Collection]] = None
+_conexao_lock = threading.Lock()
+
+# Coleção com a versão do esquema (índices) já aplicada ao banco
+COLECAO_ESQUEMA = '_esquema'
 
 def conectar_mongodb() -> Tuple[MongoClient, Database]:
     """
-    Estabelece conexão com MongoDB
+    Obtém a conexão com o MongoDB, estabelecendo-a na primeira chamada do processo.
+    Chamadas seguintes reutilizam o mesmo cliente (e seu pool de conexões).
     
     Returns:
         Tuple[MongoClient, Database]: Cliente MongoDB e objeto de banco de dados
     """
-    try:
-        # Conectar ao MongoDB sem configuração de pool
-        client = MongoClient(MONGODB_URI)
-        db = client[MONGODB_DB_NAME]
-        
-        # Verificar conexão
-        db.command('ping')
-        logger.info(f"Conexão MongoDB estabelecida com sucesso: {MONGODB_URI}")
+    global _client, _db
+    
+    if _client is not None:
+        return _client, _db
+    
+    with _conexao_lock:
+        if _client is not None:
+            return _client, _db
+        try:
+            client = MongoClient(MONGODB_URI, serverSelectionTimeoutMS=5000)
+            db = client[MONGODB_DB_NAME]
+            
+            # Verificar conexão
+            db.command('ping')
+            logger.info(f"Conexão MongoDB estabelecida com sucesso: {MONGODB_URI}")
+            
+            _client, _db = client, db
+            return client, db
+        except Exception as e:
+            logger.error(f"Erro ao conectar ao MongoDB: {str(e)}")
+            raise
+
+def garantir_esquema(db: Database, remover_nao_usados: bool = False) -> bool:
+    """
+    Aplica os índices declarados apenas se a versão registrada no banco for diferente
+    da versão atual de gerenciador_indices
+    
+    Args:
+        db (Database): Banco de dados
+        remover_nao_usados (bool, optional): Remover índices não declarados. Defaults to False.
         
-        return client, db
-    except Exception as e:
-        logger.error(f"Erro ao conectar ao MongoDB: {str(e)}")
-        raise
+    Returns:
+        bool: True se os índices foram (re)aplicados, False se o esquema já estava em dia
+    """
+    versao = versao_indices()
+    registro = db[COLECAO_ESQUEMA].find_one({'_id': 'indices'})
+    if registro and registro.get('versao') == versao and not remover_nao_usados:
+        return False
+    
+    aplicar_indices(db, remover_nao_usados=remover_nao_usados)
+    db[COLECAO_ESQUEMA].update_one(
+        {'_id': 'indices'},
+        {'$set': {'versao': versao, 'aplicado_em': datetime.now()}},
+        upsert=True
+    )
+    logger.info(f"Esquema de índices atualizado para a versão {versao}")
+    return True
 
-def inicializar_colecoes() -> Dict[str, Collection]:
+def inicializar_colecoes(db: Database = None) -> Dict[str, Collection]:
     """
-    Inicializa as coleções do MongoDB e configura índices
+    Inicializa as coleções do MongoDB e configura índices (uma vez por processo)
+    
+    Args:
+        db (Database, optional): Banco de dados. Defaults to None (conexão compartilhada).
     
     Returns:
         Dict[str, Collection]: Dicionário com as coleções
     """
+    global _colecoes
+    
+    if _colecoes is not None and db is None:
+        return _colecoes
+    
     try:
         # Conectar ao MongoDB
-        client, db = conectar_mongodb()
+        if db is None:
+            client, db = conectar_mongodb()
+        
+        # Criar índices declarados que faltam, se a versão do esquema mudou
+        garantir_esquema(db, remover_nao_usados=MONGODB_REMOVER_INDICES_NAO_USADOS)
         
         # Inicializar dicionário de coleções
         colecoes = {}
+        for nome_colecao in ['roletas', 'roleta_numeros', 'roleta_estatisticas_diarias', 'roleta_sequencias']:
+            colecoes[nome_colecao] = db[nome_colecao]
         
-        # Colecão "roletas"
-        colecoes['roletas'] = db['roletas']
-        
-        # Criar índices para coleção "roletas" se não existirem
-        if 'nome_1' not in colecoes['roletas'].index_information():
-            colecoes['roletas'].create_index([('nome', ASCENDING)])
-            logger.info("Índice 'nome' criado para coleção 'roletas'")
-        
-        # Coleção "roleta_numeros"
-        colecoes['roleta_numeros'] = db['roleta_numeros']
-        
-        # Criar índices para coleção "roleta_numeros" se não existirem
-        indices_numeros = colecoes['roleta_numeros'].index_information()
-        
-        if 'roleta_id_1_timestamp_-1' not in indices_numeros:
-            colecoes['roleta_numeros'].create_index([
-                ('roleta_id', ASCENDING), 
-                ('timestamp', DESCENDING)
-            ])
-            logger.info("Índice 'roleta_id_timestamp' criado para coleção 'roleta_numeros'")
-        
-        if 'numero_1' not in indices_numeros:
-            colecoes['roleta_numeros'].create_index([('numero', ASCENDING)])
-            logger.info("Índice 'numero' criado para coleção 'roleta_numeros'")
-        
-        if 'cor_1' not in indices_numeros:
-            colecoes['roleta_numeros'].create_index([('cor', ASCENDING)])
-            logger.info("Índice 'cor' criado para coleção 'roleta_numeros'")
-        
-        # Coleção "roleta_estatisticas_diarias"
-        colecoes['roleta_estatisticas_diarias'] = db['roleta_estatisticas_diarias']
-        
-        # Criar índices para coleção "roleta_estatisticas_diarias" se não existirem
-        indices_estat = colecoes['roleta_estatisticas_diarias'].index_information()
-        
-        if 'roleta_id_1_data_1' not in indices_estat:
-            colecoes['roleta_estatisticas_diarias'].create_index([
-                ('roleta_id', ASCENDING), 
-                ('data', ASCENDING)
-            ], unique=True)
-            logger.info("Índice 'roleta_id_data' criado para coleção 'roleta_estatisticas_diarias'")
-        
-        # Coleção "roleta_sequencias"
-        colecoes['roleta_sequencias'] = db['roleta_sequencias']
-        
-        # Criar índices para coleção "roleta_sequencias" se não existirem
-        indices_seq = colecoes['roleta_sequencias'].index_information()
-        
-        if 'roleta_id_1_tipo_1_comprimento_-1' not in indices_seq:
-            colecoes['roleta_sequencias'].create_index([
-                ('roleta_id', ASCENDING), 
-                ('tipo', ASCENDING),
-                ('comprimento', DESCENDING)
-            ])
-            logger.info("Índice 'roleta_id_tipo_comprimento' criado para coleção 'roleta_sequencias'")
-        
+        _colecoes = colecoes
         logger.info("Todas as coleções inicializadas com sucesso")
         return colecoes
     except Exception as e:
@@ -180,6 +185,21 @@ def numero_para_documento(
         "criado_em": datetime.now()
     }
 
+def proxima_sequencia(ultimo_documento: Dict[str, Any] = None) -> int:
+    """
+    Calcula a posição de sequência do próximo número de uma roleta
+    
+    Args:
+        ultimo_documento (Dict[str, Any], optional): Último número registrado da roleta.
+            Documentos antigos, gravados antes do campo existir, contam como posição 0.
+        
+    Returns:
+        int: Próxima posição de sequência
+    """
+    if not ultimo_documento:
+        return 1
+    return int(ultimo_documento.get('sequencia') or 0) + 1
+
 def estatistica_diaria_para_documento(roleta_id: str, data: datetime, dados_estatisticos: dict) -> dict:
     """
     Converte estatísticas diárias para um documento MongoDB
@@ -235,10 +255,3 @@ def sequencia_para_documento(roleta_id: str, tipo: str, valor: str,
         documento["fim_timestamp"] = fim
         
     return documento
-
-# Inicializar conexão quando o módulo é importado
-if __name__ != "__main__":
-    try:
-        conectar_mongodb()
-    except Exception as e:
-        logger.error(f"Erro ao inicializar conexão MongoDB: {str(e)}") 
\ No newline at end of file
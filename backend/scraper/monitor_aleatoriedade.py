@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Monitor de aleatoriedade por roleta, atualizado a cada giro
+
+Sobre as últimas MONITOR_JANELA jogadas de cada roleta são mantidos:
+
+- qui-quadrado de aderência dos 37 números: com as contagens n_i e a soma dos quadrados
+  S = Σ n_i², o estatístico é 37·S/N − N, e entrar ou sair um número muda S em 2·n_i ± 1;
+- teste de sequências de Wald–Wolfowitz para cor e paridade (o zero é ignorado): contam-se
+  as trocas entre giros vizinhos, ajustadas quando um giro entra ou sai da janela;
+- deriva: o mesmo qui-quadrado nas últimas MONITOR_JANELA_CURTA jogadas, que reage rápido
+  a mudanças bruscas (ex.: erro de leitura do scraper repetindo números).
+
+Tudo é O(1) por giro. Os p-valores usam a aproximação de Wilson–Hilferty para o
+qui-quadrado e a normal para as sequências. Quando o p-valor de um indicador fica abaixo de
+MONITOR_P_ALERTA, o monitor avisa uma vez (`ativo`); o alerta só termina (`resolvido`)
+quando o p-valor volta acima de MONITOR_P_RESOLUCAO (por padrão 10× o de alerta) e, depois
+de resolvido, só volta a ser avisado passados MONITOR_ESPERA_ALERTA giros. Sem essa folga,
+um p-valor oscilando em torno do limite alternaria `ativo`/`resolvido` a cada giro.
+
+Taxa de alertas falsos: numa roleta justa, simulada por 8 milhões de giros com os padrões
+(p-valores 0,001 e 0,01, espera de 100 giros, janelas de 1000 e 100), houve cerca de um
+alerta de deriva a cada 7 mil giros e um dos três testes da janela longa a cada 27 mil,
+ou seja, um alerta falso a cada ~5.600 giros por roleta. Com MONITOR_P_ALERTA=0,01 (e
+resolução em 0,1) a taxa fica cerca de 6 vezes maior.
+"""
+
+import math
+import threading
+from collections import deque
+from typing import Dict, List, Any, Optional, Callable, Iterable
+
+from classificacao import COR, PARIDADE, NEUTRO
+from config import (logger, MONITOR_JANELA, MONITOR_JANELA_CURTA, MONITOR_P_ALERTA,
+                    MONITOR_P_RESOLUCAO, MONITOR_ESPERA_ALERTA)
+from rastreador_sequencias import posicao_giro
+
+# Dimensões binárias do teste de sequências: (tipo, tabela de classificação)
+DIMENSOES_SEQUENCIAS = (('cor', COR), ('paridade', PARIDADE))
+
+# Giros não neutros mínimos para o teste de sequências
+MINIMO_SEQUENCIAS = 20
+
+GRAUS_LIBERDADE = 36
+
+def p_valor_qui_quadrado(valor: float, graus: int = GRAUS_LIBERDADE) -> float:
+    """
+    P-valor (cauda superior) do qui-quadrado pela aproximação de Wilson–Hilferty
+
+    Args:
+        valor (float): Estatístico qui-quadrado
+        graus (int, optional): Graus de liberdade. Defaults to 36.
+
+    Returns:
+        float: Probabilidade de um valor igual ou maior sob a hipótese de roleta justa
+    """
+    return 0.5 * math.erfc(z_qui_quadrado(valor, graus) / math.sqrt(2))
+
+def z_qui_quadrado(valor: float, graus: int = GRAUS_LIBERDADE) -> float:
+    """Qui-quadrado convertido em z (Wilson–Hilferty)"""
+    fator = 2 / (9 * graus)
+    return ((max(valor, 0.0) / graus) ** (1 / 3) - (1 - fator)) / math.sqrt(fator)
+
+class _QuiQuadrado:
+    """Contagens dos 37 números numa janela e soma dos quadrados"""
+
+    __slots__ = ('tamanho', 'contagens', 'soma_quadrados', 'total')
+
+    def __init__(self, tamanho: int):
+        self.tamanho = tamanho
+        self.contagens = [0] * 37
+        self.soma_quadrados = 0
+        self.total = 0
+
+    def somar(self, numero: int) -> None:
+        self.soma_quadrados += 2 * self.contagens[numero] + 1
+        self.contagens[numero] += 1
+        self.total += 1
+
+    def subtrair(self, numero: int) -> None:
+        self.soma_quadrados -= 2 * self.contagens[numero] - 1
+        self.contagens[numero] -= 1
+        self.total -= 1
+
+    def valor(self) -> float:
+        return 37 * self.soma_quadrados / self.total - self.total if self.total else 0.0
+
+class _Sequencias:
+    """Giros não neutros de uma dimensão binária na janela e trocas entre vizinhos"""
+
+    __slots__ = ('giros', 'contagens', 'trocas')
+
+    def __init__(self):
+        self.giros = deque()
+        self.contagens: Dict[str, int] = {}
+        self.trocas = 0
+
+    def somar(self, indice: int, valor: str) -> None:
+        if self.giros and self.giros[-1][1] != valor:
+            self.trocas += 1
+        self.giros.append((indice, valor))
+        self.contagens[valor] = self.contagens.get(valor, 0) + 1
+
+    def remover_anteriores(self, indice: int) -> None:
+        if self.giros and self.giros[0][0] < indice:
+            _, valor = self.giros.popleft()
+            self.contagens[valor] -= 1
+            if self.giros and self.giros[0][1] != valor:
+                self.trocas -= 1
+
+    def resultado(self) -> Optional[Dict[str, Any]]:
+        n1, n2 = (list(self.contagens.values()) + [0, 0])[:2]
+        n = n1 + n2
+        if n < MINIMO_SEQUENCIAS or n1 == 0 or n2 == 0:
+            return None
+        esperado = 2 * n1 * n2 / n + 1
+        variancia = 2 * n1 * n2 * (2 * n1 * n2 - n) / (n * n * (n - 1))
+        if variancia <= 0:
+            return None
+        sequencias = self.trocas + 1
+        z = (sequencias - esperado) / math.sqrt(variancia)
+        return {'sequencias': sequencias, 'esperado': round(esperado, 2), 'z': round(z, 3),
+                'p_valor': math.erfc(abs(z) / math.sqrt(2))}
+
+class _EstadoRoleta:
+    """Buffer circular dos últimos giros e indicadores de uma roleta"""
+
+    __slots__ = ('buffer', 'total', 'longa', 'curta', 'sequencias', 'ultima_posicao', 'alertas', 'resolvidos')
+
+    def __init__(self, janela: int, janela_curta: int):
+        self.buffer = [0] * janela
+        self.total = 0
+        self.longa = _QuiQuadrado(janela)
+        self.curta = _QuiQuadrado(janela_curta)
+        self.sequencias = {tipo: _Sequencias() for tipo, _ in DIMENSOES_SEQUENCIAS}
+        self.ultima_posicao = None
+        self.alertas = set()
+        # Giro (total) em que cada alerta foi resolvido pela última vez
+        self.resolvidos: Dict[str, int] = {}
+
+    def aplicar(self, numero: int) -> None:
+        capacidade = len(self.buffer)
+        for janela in (self.longa, self.curta):
+            if self.total >= janela.tamanho:
+                janela.subtrair(self.buffer[(self.total - janela.tamanho) % capacidade])
+            janela.somar(numero)
+        for tipo, tabela in DIMENSOES_SEQUENCIAS:
+            sequencias = self.sequencias[tipo]
+            sequencias.remover_anteriores(self.total - capacidade + 1)
+            if tabela[numero] != NEUTRO[tipo]:
+                sequencias.somar(self.total, tabela[numero])
+        self.buffer[self.total % capacidade] = numero
+        self.total += 1
+
+    def indicadores(self) -> Dict[str, Any]:
+        qui_quadrado = self.longa.valor()
+        deriva = self.curta.valor()
+        return {
+            'giros': self.longa.total,
+            'qui_quadrado': {
+                'valor': round(qui_quadrado, 3), 'graus_liberdade': GRAUS_LIBERDADE,
+                'p_valor': p_valor_qui_quadrado(qui_quadrado) if self.longa.total else None,
+                'janela': self.longa.tamanho, 'completa': self.longa.total >= self.longa.tamanho
+            },
+            'sequencias': {tipo: self.sequencias[tipo].resultado() for tipo, _ in DIMENSOES_SEQUENCIAS},
+            'deriva': {
+                'qui_quadrado': round(deriva, 3),
+                'pontuacao': round(z_qui_quadrado(deriva), 3) if self.curta.total else None,
+                'p_valor': p_valor_qui_quadrado(deriva) if self.curta.total else None,
+                'janela': self.curta.tamanho, 'completa': self.curta.total >= self.curta.tamanho
+            },
+            'alertas': sorted(self.alertas)
+        }
+
+def _p_valores(indicadores: Dict[str, Any]) -> Dict[str, float]:
+    """P-valor de cada indicador que pode alertar (janelas ainda incompletas não alertam)"""
+    p_valores = {}
+    for nome in ('qui_quadrado', 'deriva'):
+        if indicadores[nome]['completa']:
+            p_valores[nome] = indicadores[nome]['p_valor']
+    for tipo, resultado in indicadores['sequencias'].items():
+        if indicadores['qui_quadrado']['completa'] and resultado is not None:
+            p_valores[f'sequencias_{tipo}'] = resultado['p_valor']
+    return p_valores
+
+def _alertas(estado: _EstadoRoleta, p_valores: Dict[str, float], p_alerta: float,
+             p_resolucao: float, espera: int) -> set:
+    """
+    Alertas ativos depois do giro: um alerta ativo continua enquanto o p-valor não passar de
+    p_resolucao; um novo exige p-valor abaixo de p_alerta e `espera` giros desde a última
+    resolução do mesmo alerta
+    """
+    alertas = set()
+    for nome, p_valor in p_valores.items():
+        if nome in estado.alertas:
+            if p_valor < p_resolucao:
+                alertas.add(nome)
+        elif p_valor < p_alerta and estado.total - estado.resolvidos.get(nome, -espera) >= espera:
+            alertas.add(nome)
+    for nome in estado.alertas - alertas:
+        estado.resolvidos[nome] = estado.total
+    return alertas
+
+class MonitorAleatoriedade:
+    """Mantém os indicadores de aleatoriedade de todas as roletas e avisa sobre desvios"""
+
+    def __init__(self, janela: int = MONITOR_JANELA, janela_curta: int = MONITOR_JANELA_CURTA,
+                 p_alerta: float = MONITOR_P_ALERTA, p_resolucao: Optional[float] = MONITOR_P_RESOLUCAO,
+                 espera: int = MONITOR_ESPERA_ALERTA,
+                 ao_alertar: Optional[Callable[[str, Dict[str, Any]], None]] = None):
+        """
+        Args:
+            janela (int, optional): Jogadas do qui-quadrado e do teste de sequências. Defaults to MONITOR_JANELA.
+            janela_curta (int, optional): Jogadas do indicador de deriva. Defaults to MONITOR_JANELA_CURTA.
+            p_alerta (float, optional): P-valor abaixo do qual um indicador alerta. Defaults to MONITOR_P_ALERTA.
+            p_resolucao (float, optional): P-valor acima do qual um alerta termina; None usa
+                10× p_alerta. Defaults to MONITOR_P_RESOLUCAO.
+            espera (int, optional): Giros depois de resolvido até o mesmo alerta poder voltar.
+                Defaults to MONITOR_ESPERA_ALERTA.
+            ao_alertar (Callable, optional): Chamado com (roleta_id, alerta) quando um alerta começa ou termina
+        """
+        self.janela = max(janela, janela_curta)
+        self.janela_curta = janela_curta
+        self.p_alerta = p_alerta
+        self.p_resolucao = max(p_resolucao if p_resolucao is not None else 10 * p_alerta, p_alerta)
+        self.espera = espera
+        self.ao_alertar = ao_alertar
+        self._estados: Dict[str, _EstadoRoleta] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, documento: Dict[str, Any]) -> bool:
+        """
+        Aplica um número aos indicadores da roleta e avisa sobre alertas novos ou resolvidos
+
+        Args:
+            documento (Dict[str, Any]): Documento de roleta_numeros (roleta_id, numero, timestamp, sequencia)
+
+        Returns:
+            bool: True se aplicado, False se o número já havia sido aplicado ou é inválido
+        """
+        roleta_id = documento.get('roleta_id')
+        numero = documento.get('numero')
+        if roleta_id is None or not isinstance(numero, int) or not 0 <= numero <= 36:
+            return False
+
+        posicao = posicao_giro(documento)
+        with self._lock:
+            estado = self._estados.get(roleta_id)
+            if estado is None:
+                estado = self._estados[roleta_id] = _EstadoRoleta(self.janela, self.janela_curta)
+            if estado.ultima_posicao is not None and posicao <= estado.ultima_posicao:
+                return False
+            estado.ultima_posicao = posicao
+            estado.aplicar(numero)
+
+            indicadores = estado.indicadores()
+            alertas = _alertas(estado, _p_valores(indicadores), self.p_alerta, self.p_resolucao, self.espera)
+            mudancas = [(nome, 'ativo') for nome in sorted(alertas - estado.alertas)]
+            mudancas += [(nome, 'resolvido') for nome in sorted(estado.alertas - alertas)]
+            estado.alertas = alertas
+            indicadores['alertas'] = sorted(alertas)
+
+        if mudancas and self.ao_alertar is not None:
+            for nome, situacao in mudancas:
+                try:
+                    self.ao_alertar(roleta_id, {'alerta': nome, 'estado': situacao, 'indicadores': indicadores})
+                except Exception as e:
+                    logger.error(f"Erro ao notificar alerta de aleatoriedade da roleta {roleta_id}: {str(e)}")
+        return True
+
+    def reconstruir(self, roleta_id: str, documentos: Iterable[Dict[str, Any]]) -> None:
+        """
+        Recria os indicadores de uma roleta a partir dos últimos números, sem emitir alertas
+
+        Args:
+            roleta_id (str): ID da roleta
+            documentos (Iterable[Dict[str, Any]]): Documentos em ordem cronológica
+        """
+        estado = _EstadoRoleta(self.janela, self.janela_curta)
+        for documento in documentos:
+            numero = documento.get('numero')
+            if isinstance(numero, int) and 0 <= numero <= 36:
+                estado.ultima_posicao = posicao_giro(documento)
+                estado.aplicar(numero)
+        estado.alertas = _alertas(estado, _p_valores(estado.indicadores()), self.p_alerta,
+                                  self.p_resolucao, self.espera)
+        with self._lock:
+            self._estados[roleta_id] = estado
+
+    def obter(self, roleta_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtém os indicadores de aleatoriedade de uma roleta
+
+        Args:
+            roleta_id (str): ID da roleta
+
+        Returns:
+            Optional[Dict[str, Any]]: Qui-quadrado, sequências, deriva e alertas ativos, ou None se
+                a roleta não tem números
+        """
+        with self._lock:
+            estado = self._estados.get(roleta_id)
+            return estado.indicadores() if estado is not None else None
+
+    def alertas_ativos(self) -> Dict[str, List[str]]:
+        """Alertas ativos por roleta (somente roletas com algum alerta)"""
+        with self._lock:
+            return {roleta_id: sorted(estado.alertas) for roleta_id, estado in self._estados.items() if estado.alertas}
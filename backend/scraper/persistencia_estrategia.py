@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Persistência em lote do estado da estratégia e histórico de transições
+
+O estado atual de cada roleta é acumulado em memória e gravado em `roletas` uma vez
+por janela (ESTRATEGIA_JANELA_SEGUNDOS), com um único bulk_write para todas as mesas.
+O histórico deixa de ser uma cópia completa por giro: só mudanças da máquina de
+estados (troca de estado, de gatilho, vitória ou derrota) viram documentos compactos
+em `estrategia_transicoes`.
+"""
+
+import atexit
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.database import Database
+from pymongo.errors import BulkWriteError
+
+from resumos import COLECAO_RESUMOS, operacao_estrategia
+from config import logger, ESTRATEGIA_JANELA_SEGUNDOS
+
+COLECAO_TRANSICOES = 'estrategia_transicoes'
+
+# Campos que definem o estado da máquina de estados; qualquer mudança é uma transição
+CAMPOS_TRANSICAO = ('estado_estrategia', 'numero_gatilho', 'vitorias', 'derrotas')
+
+def _chave_estado(dados: Dict[str, Any]) -> Tuple:
+    return tuple(dados.get(campo) for campo in CAMPOS_TRANSICAO)
+
+def transicao_para_documento(roleta_id: str, roleta_nome: str, anterior: Optional[Tuple],
+                             dados: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Monta o documento compacto de uma transição
+
+    Args:
+        roleta_id (str): ID da roleta
+        roleta_nome (str): Nome da roleta
+        anterior (Optional[Tuple]): Estado anterior (valores de CAMPOS_TRANSICAO) ou None
+        dados (Dict[str, Any]): Novo estado da estratégia
+
+    Returns:
+        Dict[str, Any]: Documento para `estrategia_transicoes`
+    """
+    estado_anterior, _, vitorias_anteriores, derrotas_anteriores = anterior or (None, None, None, None)
+
+    if vitorias_anteriores is not None and (dados.get('vitorias') or 0) > vitorias_anteriores:
+        tipo = 'vitoria'
+    elif derrotas_anteriores is not None and (dados.get('derrotas') or 0) > derrotas_anteriores:
+        tipo = 'derrota'
+    else:
+        tipo = 'estado'
+
+    return {
+        'roleta_id': roleta_id,
+        'roleta_nome': roleta_nome,
+        'tipo': tipo,
+        'de': estado_anterior,
+        'para': dados.get('estado_estrategia'),
+        'numero_gatilho': dados.get('numero_gatilho'),
+        'terminais_gatilho': dados.get('terminais_gatilho'),
+        'vitorias': dados.get('vitorias'),
+        'derrotas': dados.get('derrotas'),
+        'ultimo_numero': dados.get('ultimo_numero'),
+        'timestamp': datetime.now()
+    }
+
+class PersistenciaEstrategia:
+    """Acumula atualizações de estratégia e as grava em lote por uma thread daemon"""
+
+    def __init__(self, db: Database, janela: float = ESTRATEGIA_JANELA_SEGUNDOS):
+        """
+        Args:
+            db (Database): Banco de dados
+            janela (float, optional): Intervalo entre gravações, em segundos
+        """
+        self.db = db
+        self.janela = janela
+        self._pendentes: Dict[str, Dict[str, Any]] = {}
+        self._transicoes: List[Dict[str, Any]] = []
+        self._ultimo_estado: Dict[str, Tuple] = {}
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._thread = None
+        self.atualizacoes_recebidas = 0
+        self.gravacoes = 0
+
+    def _carregar_estado(self, roleta_id: str) -> None:
+        """Lê do banco o último estado gravado, na primeira atualização da roleta no processo"""
+        if roleta_id in self._ultimo_estado:
+            return
+        documento = self.db.roletas.find_one({'_id': roleta_id}, {campo: 1 for campo in CAMPOS_TRANSICAO})
+        with self._lock:
+            self._ultimo_estado.setdefault(roleta_id, _chave_estado(documento) if documento else None)
+
+    def registrar(self, roleta_id: str, roleta_nome: str, dados: Dict[str, Any]) -> bool:
+        """
+        Registra o estado atual da estratégia de uma roleta para a próxima gravação
+
+        Args:
+            roleta_id (str): ID da roleta (chave _id em `roletas`)
+            roleta_nome (str): Nome da roleta
+            dados (Dict[str, Any]): Campos da estratégia a gravar em `roletas`
+
+        Returns:
+            bool: True (a gravação é assíncrona; erros são registrados no log)
+        """
+        self._carregar_estado(roleta_id)
+        atual = _chave_estado(dados)
+
+        with self._lock:
+            anterior = self._ultimo_estado.get(roleta_id)
+            self._pendentes.setdefault(roleta_id, {}).update(dados)
+            if atual != anterior:
+                self._transicoes.append(transicao_para_documento(roleta_id, roleta_nome, anterior, dados))
+                self._ultimo_estado[roleta_id] = atual
+            self.atualizacoes_recebidas += 1
+
+        if self._thread is None or not self._thread.is_alive():
+            self.iniciar()
+        return True
+
+    def descarregar(self) -> int:
+        """
+        Grava imediatamente o estado pendente de todas as roletas e as transições
+
+        Returns:
+            int: Quantidade de roletas atualizadas
+        """
+        with self._lock:
+            pendentes, self._pendentes = self._pendentes, {}
+            transicoes, self._transicoes = self._transicoes, []
+
+        if not pendentes and not transicoes:
+            return 0
+
+        try:
+            if pendentes:
+                self.db.roletas.bulk_write(
+                    [UpdateOne({'_id': roleta_id}, {'$set': campos}, upsert=True)
+                     for roleta_id, campos in pendentes.items()],
+                    ordered=False
+                )
+                operacoes_resumo = [operacao for operacao in
+                                    (operacao_estrategia(roleta_id, campos) for roleta_id, campos in pendentes.items())
+                                    if operacao is not None]
+                if operacoes_resumo:
+                    self.db[COLECAO_RESUMOS].bulk_write(operacoes_resumo, ordered=False)
+            if transicoes:
+                try:
+                    self.db[COLECAO_TRANSICOES].insert_many(transicoes, ordered=False)
+                except BulkWriteError as e:
+                    # Transições já gravadas em uma tentativa anterior mantêm o mesmo _id
+                    if any(erro.get('code') != 11000 for erro in e.details.get('writeErrors', [])):
+                        raise
+            self.gravacoes += 1
+            return len(pendentes)
+        except Exception as e:
+            logger.error(f"Erro ao gravar estado da estratégia: {str(e)}")
+            # Devolver à fila sem sobrescrever atualizações mais novas
+            with self._lock:
+                for roleta_id, campos in pendentes.items():
+                    self._pendentes[roleta_id] = dict(campos, **self._pendentes.get(roleta_id, {}))
+                self._transicoes[:0] = transicoes
+            return 0
+
+    def iniciar(self) -> 'PersistenciaEstrategia':
+        """Inicia a thread de gravação periódica"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._executar, name="persistencia-estrategia", daemon=True)
+            self._thread.start()
+        return self
+
+    def parar(self) -> None:
+        """Interrompe a thread e grava o que estiver pendente"""
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(self.janela * 2 + 1)
+        self.descarregar()
+
+    def _executar(self) -> None:
+        while not self._parar.wait(self.janela):
+            self.descarregar()
+
+_persistencia: Optional[PersistenciaEstrategia] = None
+_persistencia_lock = threading.Lock()
+
+def obter_persistencia(db: Database = None) -> PersistenciaEstrategia:
+    """
+    Obtém a instância do processo, criando-a na primeira chamada
+
+    Args:
+        db (Database, optional): Banco de dados. Defaults to None (conexão de mongo_config).
+
+    Returns:
+        PersistenciaEstrategia: Instância compartilhada
+    """
+    global _persistencia
+    with _persistencia_lock:
+        if _persistencia is None:
+            if db is None:
+                from mongo_config import conectar_mongodb
+                client, db = conectar_mongodb()
+            _persistencia = PersistenciaEstrategia(db)
+            # Não perder a última janela ao encerrar o processo
+            atexit.register(_persistencia.parar)
+        return _persistencia
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Sequências em andamento por roleta, mantidas em memória
+
+Cada giro atualiza, em tempo constante, a sequência atual de cada dimensão (cor,
+paridade, dúzia, coluna, metade e setor da roda) com as tabelas de classificacao.py e
+a mesma regra de analytics.detectar_sequencias: o zero não interrompe a sequência e
+conta no comprimento (no setor ele é 'voisins', como qualquer outro número). O estado
+é reconstruído na inicialização a partir dos últimos números e alimentado pelo caminho
+de inserção e pelo change stream; números repetidos ou fora de ordem (mesmo
+`sequencia` ou anterior) são ignorados.
+"""
+
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Callable, Iterable
+
+from classificacao import COR, PARIDADE, DUZIA, COLUNA, METADE, NEUTRO
+from roda import SETOR
+from config import logger
+
+# Dimensões acompanhadas: (tipo, tabela de classificação)
+DIMENSOES_RASTREADAS = (
+    ('cor', COR), ('paridade', PARIDADE), ('duzia', DUZIA), ('coluna', COLUNA), ('metade', METADE),
+    ('setor', SETOR)
+)
+
+# Números lidos para reconstruir o estado quando o cache de números está desativado
+PROFUNDIDADE_RECONSTRUCAO = 500
+
+class _EstadoRoleta:
+    """Sequência atual de cada dimensão de uma roleta"""
+
+    __slots__ = ('valores', 'comprimentos', 'inicios', 'ultima_posicao')
+
+    def __init__(self):
+        self.valores: List[Optional[str]] = [None] * len(DIMENSOES_RASTREADAS)
+        self.comprimentos: List[int] = [0] * len(DIMENSOES_RASTREADAS)
+        self.inicios: List[Any] = [None] * len(DIMENSOES_RASTREADAS)
+        self.ultima_posicao = None
+
+def posicao_giro(documento: Dict[str, Any]):
+    """Chave de ordem do número: `sequencia` quando existir, senão o timestamp"""
+    sequencia = documento.get('sequencia')
+    return (0, sequencia) if sequencia is not None else (-1, documento.get('timestamp') or datetime.min)
+
+class RastreadorSequencias:
+    """Mantém as sequências atuais de todas as roletas e avisa quem acompanha as mudanças"""
+
+    def __init__(self, ao_atualizar: Optional[Callable[[str, Dict[str, Any]], None]] = None):
+        """
+        Args:
+            ao_atualizar (Callable, optional): Chamado com (roleta_id, sequencias) após cada giro
+        """
+        self.ao_atualizar = ao_atualizar
+        self._estados: Dict[str, _EstadoRoleta] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _aplicar(estado: _EstadoRoleta, numero: int, timestamp: Any) -> None:
+        for d, (tipo, tabela) in enumerate(DIMENSOES_RASTREADAS):
+            valor = tabela[numero]
+            if valor == estado.valores[d] or (valor == NEUTRO[tipo] and estado.valores[d] is not None):
+                estado.comprimentos[d] += 1
+            elif valor != NEUTRO[tipo]:
+                estado.valores[d] = valor
+                estado.comprimentos[d] = 1
+                estado.inicios[d] = timestamp
+
+    def registrar(self, documento: Dict[str, Any]) -> bool:
+        """
+        Aplica um número às sequências da roleta
+
+        Args:
+            documento (Dict[str, Any]): Documento de roleta_numeros (roleta_id, numero, timestamp, sequencia)
+
+        Returns:
+            bool: True se o estado mudou, False se o número já havia sido aplicado
+        """
+        roleta_id = documento.get('roleta_id')
+        numero = documento.get('numero')
+        if roleta_id is None or not isinstance(numero, int) or not 0 <= numero <= 36:
+            return False
+
+        posicao = posicao_giro(documento)
+        with self._lock:
+            estado = self._estados.get(roleta_id)
+            if estado is None:
+                estado = self._estados[roleta_id] = _EstadoRoleta()
+            if estado.ultima_posicao is not None and posicao <= estado.ultima_posicao:
+                return False
+            estado.ultima_posicao = posicao
+            self._aplicar(estado, numero, documento.get('timestamp'))
+            sequencias = self._exportar(estado)
+
+        if self.ao_atualizar is not None:
+            try:
+                self.ao_atualizar(roleta_id, sequencias)
+            except Exception as e:
+                logger.error(f"Erro ao notificar sequências da roleta {roleta_id}: {str(e)}")
+        return True
+
+    def reconstruir(self, roleta_id: str, documentos: Iterable[Dict[str, Any]]) -> None:
+        """
+        Recria o estado de uma roleta a partir dos últimos números
+
+        Args:
+            roleta_id (str): ID da roleta
+            documentos (Iterable[Dict[str, Any]]): Documentos em ordem cronológica
+        """
+        estado = _EstadoRoleta()
+        for documento in documentos:
+            numero = documento.get('numero')
+            if isinstance(numero, int) and 0 <= numero <= 36:
+                estado.ultima_posicao = posicao_giro(documento)
+                self._aplicar(estado, numero, documento.get('timestamp'))
+        with self._lock:
+            self._estados[roleta_id] = estado
+
+    @staticmethod
+    def _exportar(estado: _EstadoRoleta) -> Dict[str, Any]:
+        sequencias = {}
+        for d, (tipo, _) in enumerate(DIMENSOES_RASTREADAS):
+            inicio = estado.inicios[d]
+            sequencias[tipo] = {
+                'valor': estado.valores[d],
+                'comprimento': estado.comprimentos[d],
+                'inicio_timestamp': inicio.isoformat() if isinstance(inicio, datetime) else inicio
+            }
+        return sequencias
+
+    def obter(self, roleta_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtém as sequências atuais de uma roleta
+
+        Args:
+            roleta_id (str): ID da roleta
+
+        Returns:
+            Optional[Dict[str, Any]]: Sequência por dimensão, ou None se a roleta não tem números
+        """
+        with self._lock:
+            estado = self._estados.get(roleta_id)
+            return self._exportar(estado) if estado is not None else None
+
+    def obter_todas(self) -> Dict[str, Dict[str, Any]]:
+        """Sequências atuais de todas as roletas acompanhadas"""
+        with self._lock:
+            return {roleta_id: self._exportar(estado) for roleta_id, estado in self._estados.items()}
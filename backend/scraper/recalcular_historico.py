@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Recálculo em paralelo das estatísticas diárias, sequências e agregados horários
+
+O histórico é dividido em partições (roleta, dia), distribuídas num pool de processos.
+Cada partição lê os números do dia uma única vez (mais os últimos números do dia anterior
+e o primeiro do dia seguinte, para as sequências que atravessam a meia-noite) e deriva
+tudo nessa passada:
+
+- o documento de roleta_estatisticas_diarias (mesmos contadores de `calcular_estatisticas_diarias`);
+- as sequências encerradas no dia (`sequencias_fechadas`), gravadas com upserts; sequências
+  do dia que a detecção atual não encontra mais são removidas;
+- os agregados horários de roleta_rollups, quando o dia ainda não foi compactado numa semana.
+
+O dia de hoje nunca é recalculado (ele é mantido pela ingestão), e cada partição
+concluída é registrada em recalculo_particoes: uma execução interrompida continua de onde
+parou com o mesmo --execucao.
+
+Uso:
+    python recalcular_historico.py [--inicio 2024-01-01] [--fim 2024-06-30] [--roleta-id ID]
+                                   [--workers 4] [--execucao nome] [--reiniciar]
+"""
+
+import sys
+import time
+import uuid
+import argparse
+import multiprocessing
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.database import Database
+
+from config import logger
+
+COLECAO_CHECKPOINTS = 'recalculo_particoes'
+
+# Números do dia anterior lidos para as sequências que começam antes da meia-noite
+NUMEROS_DIA_ANTERIOR = 200
+
+def listar_particoes(db: Database, inicio: Optional[datetime] = None, fim: Optional[datetime] = None,
+                     roleta_ids: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+    """
+    Lista as partições (roleta_id, dia) com números, sem o dia de hoje
+
+    Args:
+        db (Database): Banco de dados
+        inicio (datetime, optional): Primeiro dia. Defaults to None (desde o início).
+        fim (datetime, optional): Último dia (inclusivo). Defaults to None (até ontem).
+        roleta_ids (List[str], optional): Roletas. Defaults to None (todas).
+
+    Returns:
+        List[Tuple[str, str]]: Partições em ordem de roleta e dia
+    """
+    hoje = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    limite = min(fim + timedelta(days=1), hoje) if fim else hoje
+    filtro: Dict[str, Any] = {'timestamp': {'$lt': limite}}
+    if inicio:
+        filtro['timestamp']['$gte'] = inicio
+    if roleta_ids:
+        filtro['roleta_id'] = {'$in': list(roleta_ids)}
+
+    grupos = db.roleta_numeros.aggregate([
+        {'$match': filtro},
+        {'$group': {'_id': {'roleta_id': '$roleta_id',
+                            'dia': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$timestamp'}}}}}
+    ], allowDiskUse=True)
+    return sorted((grupo['_id']['roleta_id'], grupo['_id']['dia']) for grupo in grupos)
+
+def derivar_particao(roleta_id: str, numeros: List[Dict[str, Any]], anteriores: List[Dict[str, Any]],
+                     seguintes: List[Dict[str, Any]], inicio_dia: datetime,
+                     janela_completa: bool = True) -> Dict[str, Any]:
+    """
+    Deriva numa passada os artefatos de um dia a partir dos seus números
+
+    Args:
+        roleta_id (str): ID da roleta
+        numeros (List[Dict[str, Any]]): Números do dia em ordem cronológica
+        anteriores (List[Dict[str, Any]]): Últimos números antes do dia, em ordem cronológica
+        seguintes (List[Dict[str, Any]]): Primeiro número depois do dia (encerra a última sequência)
+        inicio_dia (datetime): Meia-noite do dia
+        janela_completa (bool, optional): False se `anteriores` pode ter cortado o início
+            de uma sequência. Defaults to True.
+
+    Returns:
+        Dict[str, Any]: contadores (estatísticas diárias), sequencias (encerradas no dia) e
+            horas (contagem por número em cada hora)
+    """
+    from analytics import contadores_completos, sequencias_fechadas
+
+    fim_dia = inicio_dia + timedelta(days=1)
+
+    horas: Dict[datetime, Counter] = defaultdict(Counter)
+    for documento in numeros:
+        horas[documento['timestamp'].replace(minute=0, second=0, microsecond=0)][documento['numero']] += 1
+
+    sequencias = [
+        sequencia for sequencia in sequencias_fechadas(roleta_id, anteriores + numeros + seguintes, janela_completa)
+        if inicio_dia <= sequencia['fim_timestamp'] < fim_dia
+    ]
+    for sequencia in sequencias:
+        # Posições relativas à lista usada na detecção não têm significado fora dela
+        sequencia.pop('inicio', None)
+        sequencia.pop('fim', None)
+
+    return {
+        'contadores': contadores_completos(documento['numero'] for documento in numeros),
+        'sequencias': sequencias,
+        'horas': horas
+    }
+
+def processar_particao(roleta_id: str, dia: str, marca: str) -> Dict[str, Any]:
+    """
+    Recalcula uma partição (executado nos processos do pool)
+
+    Args:
+        roleta_id (str): ID da roleta
+        dia (str): Dia no formato YYYY-MM-DD
+        marca (str): Identificador desta execução, gravado nas sequências recalculadas
+
+    Returns:
+        Dict[str, Any]: Números lidos, sequências gravadas e removidas e horas gravadas
+    """
+    from analytics import CAMPOS_FORMATO_ANTIGO
+    from mongo_config import conectar_mongodb
+    from rollups import COLECAO_ROLLUPS, id_rollup, fim_periodo
+
+    client, db = conectar_mongodb()
+    inicio_dia = datetime.strptime(dia, "%Y-%m-%d")
+    fim_dia = inicio_dia + timedelta(days=1)
+    projecao = {'numero': 1, 'timestamp': 1, '_id': 0}
+    ordem = [('timestamp', 1), ('sequencia', 1)]
+
+    validos = {'$gte': 0, '$lte': 36}
+
+    numeros = list(db.roleta_numeros.find(
+        {'roleta_id': roleta_id, 'timestamp': {'$gte': inicio_dia, '$lt': fim_dia}, 'numero': validos}, projecao
+    ).sort(ordem).batch_size(5000))
+    anteriores = list(db.roleta_numeros.find(
+        {'roleta_id': roleta_id, 'timestamp': {'$lt': inicio_dia}, 'numero': validos}, projecao
+    ).sort([('timestamp', -1), ('sequencia', -1)]).limit(NUMEROS_DIA_ANTERIOR))
+    anteriores.reverse()
+    seguintes = list(db.roleta_numeros.find(
+        {'roleta_id': roleta_id, 'timestamp': {'$gte': fim_dia}, 'numero': validos}, projecao
+    ).sort(ordem).limit(1))
+
+    derivados = derivar_particao(roleta_id, numeros, anteriores, seguintes, inicio_dia,
+                                 janela_completa=len(anteriores) < NUMEROS_DIA_ANTERIOR)
+    agora = datetime.now()
+
+    # Estatísticas diárias
+    db.roleta_estatisticas_diarias.update_one(
+        {'roleta_id': roleta_id, 'data': dia},
+        {
+            '$set': dict(derivados['contadores'], formato='contadores', atualizado_em=agora),
+            '$setOnInsert': {'criado_em': agora},
+            '$unset': {campo: '' for campo in CAMPOS_FORMATO_ANTIGO}
+        },
+        upsert=True
+    )
+
+    # Sequências encerradas no dia; as que não foram reencontradas nesta execução são removidas
+    if derivados['sequencias']:
+        db.roleta_sequencias.bulk_write([
+            UpdateOne(
+                {'roleta_id': roleta_id, 'tipo': sequencia['tipo'], 'valor': sequencia['valor'],
+                 'inicio_timestamp': sequencia['inicio_timestamp']},
+                {'$set': dict(sequencia, atualizado_em=agora, recalculo=marca), '$setOnInsert': {'criado_em': agora}},
+                upsert=True
+            )
+            for sequencia in derivados['sequencias']
+        ], ordered=False)
+    removidas = db.roleta_sequencias.delete_many({
+        'roleta_id': roleta_id, 'fim_timestamp': {'$gte': inicio_dia, '$lt': fim_dia}, 'recalculo': {'$ne': marca}
+    }).deleted_count
+
+    # Agregados horários, a menos que o dia já esteja somado numa semana
+    horas_gravadas = 0
+    if db[COLECAO_ROLLUPS].find_one({'roleta_id': roleta_id, 'granularidade': 'semana',
+                                     'inicio': {'$lte': inicio_dia}, 'fim': {'$gte': fim_dia}}, {'_id': 1}) is None:
+        db[COLECAO_ROLLUPS].delete_many({'roleta_id': roleta_id, 'granularidade': {'$in': ['hora', 'dia']},
+                                         'inicio': {'$gte': inicio_dia, '$lt': fim_dia}})
+        if derivados['horas']:
+            db[COLECAO_ROLLUPS].bulk_write([
+                UpdateOne(
+                    {'_id': id_rollup(roleta_id, 'hora', hora)},
+                    {'$set': {'roleta_id': roleta_id, 'granularidade': 'hora', 'inicio': hora,
+                              'fim': fim_periodo(hora, 'hora'), 'total_numeros': sum(contagem.values()),
+                              'contagem_numeros': {str(n): c for n, c in contagem.items()}}},
+                    upsert=True
+                )
+                for hora, contagem in derivados['horas'].items()
+            ], ordered=False)
+            horas_gravadas = len(derivados['horas'])
+
+    return {'numeros': len(numeros), 'sequencias': len(derivados['sequencias']),
+            'sequencias_removidas': removidas, 'horas': horas_gravadas}
+
+def recalcular(db: Database, particoes: List[Tuple[str, str]], execucao: str = 'padrao',
+               workers: int = 4) -> Dict[str, int]:
+    """
+    Recalcula as partições ainda não concluídas nesta execução, em paralelo
+
+    Args:
+        db (Database): Banco de dados (checkpoints)
+        particoes (List[Tuple[str, str]]): Partições (roleta_id, dia)
+        execucao (str, optional): Nome da execução usado nos checkpoints. Defaults to 'padrao'.
+        workers (int, optional): Processos do pool. Defaults to 4.
+
+    Returns:
+        Dict[str, int]: Totais de partições, números, sequências e falhas
+    """
+    concluidas = {documento['_id'].split('|', 1)[1] for documento in db[COLECAO_CHECKPOINTS].find(
+        {'execucao': execucao}, {'_id': 1})}
+    pendentes = [particao for particao in particoes if f"{particao[0]}|{particao[1]}" not in concluidas]
+    totais = Counter(particoes=0, ignoradas=len(particoes) - len(pendentes), falhas=0)
+    marca = uuid.uuid4().hex
+    inicio = time.perf_counter()
+
+    # spawn: cada processo abre o seu próprio cliente MongoDB (clientes não sobrevivem a fork)
+    contexto = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=contexto) as executor:
+        futuros = {executor.submit(processar_particao, roleta_id, dia, marca): (roleta_id, dia)
+                   for roleta_id, dia in pendentes}
+        for futuro in as_completed(futuros):
+            roleta_id, dia = futuros[futuro]
+            try:
+                resultado = futuro.result()
+            except Exception as e:
+                totais['falhas'] += 1
+                logger.error(f"Erro ao recalcular {roleta_id} em {dia}: {str(e)}")
+                continue
+
+            db[COLECAO_CHECKPOINTS].update_one(
+                {'_id': f"{execucao}|{roleta_id}|{dia}"},
+                {'$set': dict(resultado, execucao=execucao, concluido_em=datetime.now())},
+                upsert=True
+            )
+            totais['particoes'] += 1
+            totais.update({campo: resultado[campo] for campo in ('numeros', 'sequencias', 'sequencias_removidas', 'horas')})
+            if totais['particoes'] % 100 == 0:
+                logger.info(f"Recálculo: {totais['particoes']}/{len(pendentes)} partições "
+                            f"em {time.perf_counter() - inicio:.1f} s")
+
+    return dict(totais)
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalcula estatísticas diárias, sequências e agregados do histórico")
+    parser.add_argument('--inicio', default=None, help="Primeiro dia (YYYY-MM-DD)")
+    parser.add_argument('--fim', default=None, help="Último dia (YYYY-MM-DD, padrão: ontem)")
+    parser.add_argument('--roleta-id', action='append', help="Roleta a recalcular (padrão: todas)")
+    parser.add_argument('--workers', type=int, default=4, help="Processos em paralelo")
+    parser.add_argument('--execucao', default='padrao', help="Nome da execução (checkpoints para retomar)")
+    parser.add_argument('--reiniciar', action='store_true', help="Descarta os checkpoints da execução")
+    args = parser.parse_args()
+
+    from mongo_config import conectar_mongodb
+    client, db = conectar_mongodb()
+
+    if args.reiniciar:
+        db[COLECAO_CHECKPOINTS].delete_many({'execucao': args.execucao})
+
+    inicio = datetime.strptime(args.inicio, "%Y-%m-%d") if args.inicio else None
+    fim = datetime.strptime(args.fim, "%Y-%m-%d") if args.fim else None
+    particoes = listar_particoes(db, inicio, fim, args.roleta_id)
+
+    t0 = time.perf_counter()
+    totais = recalcular(db, particoes, args.execucao, args.workers)
+    print(f"Recálculo concluído em {time.perf_counter() - t0:.1f} s: {totais}")
+    sys.exit(1 if totais['falhas'] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Resumo desnormalizado por roleta (coleção roleta_resumos)
+
+Um documento por roleta (_id = roleta_id) com os últimos números, os contadores do dia,
+as sequências em andamento e o estado da estratégia, para que o painel seja respondido
+com uma única leitura pela chave primária.
+
+Cada número inserido gera um update com pipeline de agregação, aplicado atomicamente
+pelo servidor: o número entra na frente de `ultimos` ($concatArrays + $slice), os
+contadores de `hoje` recomeçam quando a data muda e as sequências crescem ou reiniciam.
+Números com `sequencia` menor ou igual à última aplicada são ignorados, então reenvios
+e gravações concorrentes fora de ordem não corrompem o resumo.
+"""
+
+import sys
+import argparse
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+from pymongo import UpdateOne
+from pymongo.database import Database
+
+from classificacao import COR, PARIDADE, METADE
+from config import logger
+
+COLECAO_RESUMOS = 'roleta_resumos'
+
+# Quantidade de números mantidos em `ultimos`
+ULTIMOS_RESUMO = 50
+
+# Campos do estado da estratégia copiados para o resumo
+CAMPOS_ESTRATEGIA_RESUMO = (
+    'estado_estrategia', 'numero_gatilho', 'terminais_gatilho',
+    'vitorias', 'derrotas', 'sugestao_display', 'updated_at'
+)
+
+def classificar_numero(numero: int) -> Dict[str, Optional[str]]:
+    """
+    Classifica um número nas categorias acompanhadas pelo resumo
+
+    Args:
+        numero (int): Número sorteado
+
+    Returns:
+        Dict[str, Optional[str]]: cor, paridade e altura (None para o zero)
+    """
+    if numero == 0:
+        return {'cor': None, 'paridade': None, 'altura': None}
+    return {'cor': COR[numero], 'paridade': PARIDADE[numero], 'altura': METADE[numero]}
+
+def _hoje_vazio(dia: str) -> Dict[str, Any]:
+    """Contadores do dia zerados"""
+    return {'data': dia, 'total': 0, **{campo: 0 for campo in _contadores(classificar_numero(0))}}
+
+def _contadores(classes: Dict[str, Optional[str]]) -> Dict[str, int]:
+    """Incrementos dos contadores do dia para um número"""
+    return {
+        'vermelhos': int(classes['cor'] == 'vermelho'),
+        'pretos': int(classes['cor'] == 'preto'),
+        'zeros': int(classes['cor'] is None),
+        'pares': int(classes['paridade'] == 'par'),
+        'impares': int(classes['paridade'] == 'impar'),
+        'baixos': int(classes['altura'] == 'baixo'),
+        'altos': int(classes['altura'] == 'alto')
+    }
+
+def operacao_resumo(documento: Dict[str, Any]) -> UpdateOne:
+    """
+    Monta o update atômico do resumo para um número inserido em roleta_numeros
+
+    Args:
+        documento (Dict[str, Any]): Documento inserido (roleta_id, numero, cor, timestamp, sequencia)
+
+    Returns:
+        UpdateOne: Update com pipeline e upsert na coleção roleta_resumos
+    """
+    numero = documento['numero']
+    timestamp = documento.get('timestamp') or datetime.now()
+    sequencia = documento.get('sequencia')
+    dia = timestamp.strftime("%Y-%m-%d")
+    classes = classificar_numero(numero)
+    incrementos = _contadores(classes)
+
+    # Aplicar apenas números mais novos que o último aplicado
+    if sequencia is None:
+        novo = True
+    else:
+        novo = {'$gt': [sequencia, {'$ifNull': ['$ultima_sequencia', -1]}]}
+
+    def se_novo(valor, campo):
+        return {'$cond': [novo, valor, f'${campo}']}
+
+    mesmo_dia = {'$eq': [{'$ifNull': ['$hoje.data', None]}, dia]}
+    hoje = {'data': dia, 'total': {'$cond': [mesmo_dia, {'$add': ['$hoje.total', 1]}, 1]}}
+    for campo, incremento in incrementos.items():
+        hoje[campo] = {'$cond': [mesmo_dia, {'$add': [{'$ifNull': [f'$hoje.{campo}', 0]}, incremento]}, incremento]}
+
+    # O zero não interrompe a sequência e conta no comprimento (mesma regra de analytics.detectar_sequencias)
+    sequencias = {}
+    for tipo, valor in classes.items():
+        atual = f'$sequencias_atuais.{tipo}'
+        if valor is None:
+            sequencias[tipo] = {'$cond': [
+                {'$ne': [{'$ifNull': [f'{atual}.valor', None]}, None]},
+                {'valor': f'{atual}.valor', 'comprimento': {'$add': [f'{atual}.comprimento', 1]}},
+                atual
+            ]}
+        else:
+            sequencias[tipo] = {'$cond': [
+                {'$eq': [{'$ifNull': [f'{atual}.valor', None]}, valor]},
+                {'valor': valor, 'comprimento': {'$add': [f'{atual}.comprimento', 1]}},
+                {'valor': valor, 'comprimento': 1}
+            ]}
+
+    item = {
+        'numero': numero,
+        'cor': documento.get('cor'),
+        'timestamp': timestamp,
+        'sequencia': sequencia
+    }
+
+    return UpdateOne({'_id': documento['roleta_id']}, [{'$set': {
+        'roleta_nome': se_novo(documento.get('roleta_nome'), 'roleta_nome'),
+        'ultimo_numero': se_novo(numero, 'ultimo_numero'),
+        'ultima_sequencia': se_novo(sequencia, 'ultima_sequencia'),
+        'ultimos': se_novo({'$slice': [
+            {'$concatArrays': [{'$literal': [item]}, {'$ifNull': ['$ultimos', []]}]},
+            ULTIMOS_RESUMO
+        ]}, 'ultimos'),
+        'hoje': se_novo(hoje, 'hoje'),
+        'sequencias_atuais': se_novo(sequencias, 'sequencias_atuais'),
+        'atualizado_em': se_novo(datetime.now(), 'atualizado_em')
+    }}], upsert=True)
+
+def operacao_estrategia(roleta_id: str, dados: Dict[str, Any]) -> Optional[UpdateOne]:
+    """
+    Monta o update do estado da estratégia no resumo
+
+    Args:
+        roleta_id (str): ID da roleta
+        dados (Dict[str, Any]): Campos da estratégia gravados em `roletas`
+
+    Returns:
+        Optional[UpdateOne]: Update com upsert, ou None se não houver campos de estratégia
+    """
+    campos = {f'estrategia.{campo}': dados[campo] for campo in CAMPOS_ESTRATEGIA_RESUMO if campo in dados}
+    if not campos:
+        return None
+    return UpdateOne({'_id': roleta_id}, {'$set': campos}, upsert=True)
+
+def atualizar_resumo(db: Database, documentos: List[Dict[str, Any]]) -> bool:
+    """
+    Aplica ao resumo os números inseridos, em ordem, com um único bulk_write
+
+    Args:
+        db (Database): Banco de dados
+        documentos (List[Dict[str, Any]]): Documentos inseridos em ordem cronológica
+
+    Returns:
+        bool: True se o resumo foi atualizado, False em caso de erro
+    """
+    if not documentos:
+        return True
+    try:
+        db[COLECAO_RESUMOS].bulk_write([operacao_resumo(doc) for doc in documentos], ordered=True)
+        return True
+    except Exception as e:
+        logger.error(f"Erro ao atualizar resumo da roleta {documentos[0].get('roleta_id')}: {str(e)}")
+        return False
+
+def reconstruir_resumo(db: Database, roleta_id: str) -> bool:
+    """
+    Recria o resumo de uma roleta a partir de roleta_numeros (reparo e carga inicial)
+
+    Reaplica os números de hoje ou os últimos ULTIMOS_RESUMO, o que for maior; as
+    sequências em andamento ficam limitadas a essa janela.
+
+    Args:
+        db (Database): Banco de dados
+        roleta_id (str): ID da roleta
+
+    Returns:
+        bool: True se recriado, False se a roleta não tem números ou em caso de erro
+    """
+    try:
+        inicio_dia = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        hoje = db.roleta_numeros.count_documents({'roleta_id': roleta_id, 'timestamp': {'$gte': inicio_dia}})
+        documentos = list(db.roleta_numeros.find({'roleta_id': roleta_id})
+                          .sort([('timestamp', -1), ('sequencia', -1)])
+                          .limit(max(hoje, ULTIMOS_RESUMO)))
+        if not documentos:
+            return False
+
+        estrategia = db.roletas.find_one({'_id': roleta_id}, {campo: 1 for campo in CAMPOS_ESTRATEGIA_RESUMO})
+
+        db[COLECAO_RESUMOS].delete_one({'_id': roleta_id})
+        documentos.reverse()
+        if not atualizar_resumo(db, documentos):
+            return False
+        if estrategia:
+            operacao = operacao_estrategia(roleta_id, estrategia)
+            if operacao is not None:
+                db[COLECAO_RESUMOS].bulk_write([operacao])
+        return True
+    except Exception as e:
+        logger.error(f"Erro ao reconstruir resumo da roleta {roleta_id}: {str(e)}")
+        return False
+
+def obter_resumo(db: Database, roleta_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Lê o resumo de uma roleta, recriando-o se ainda não existir
+
+    Args:
+        db (Database): Banco de dados
+        roleta_id (str): ID da roleta
+
+    Returns:
+        Optional[Dict[str, Any]]: Resumo com datas em ISO, ou None se a roleta não tem números.
+            Os contadores de `hoje` vêm zerados se a roleta ainda não girou no dia.
+    """
+    resumo = db[COLECAO_RESUMOS].find_one({'_id': roleta_id})
+    if resumo is None or 'ultimos' not in resumo:
+        if not reconstruir_resumo(db, roleta_id):
+            return None
+        resumo = db[COLECAO_RESUMOS].find_one({'_id': roleta_id})
+
+    resumo['roleta_id'] = resumo.pop('_id')
+    # `hoje` só recomeça no próximo número gravado: até lá, os contadores são de outro dia
+    dia = datetime.now().strftime("%Y-%m-%d")
+    if (resumo.get('hoje') or {}).get('data') != dia:
+        resumo['hoje'] = _hoje_vazio(dia)
+    for item in resumo.get('ultimos', []):
+        if isinstance(item.get('timestamp'), datetime):
+            item['timestamp'] = item['timestamp'].isoformat()
+    if isinstance(resumo.get('atualizado_em'), datetime):
+        resumo['atualizado_em'] = resumo['atualizado_em'].isoformat()
+    return resumo
+
+def main():
+    parser = argparse.ArgumentParser(description="Recria os resumos das roletas a partir de roleta_numeros")
+    parser.add_argument('--roleta-id', action='append', help="Roleta a recriar (padrão: todas)")
+    args = parser.parse_args()
+
+    from mongo_config import conectar_mongodb
+    client, db = conectar_mongodb()
+
+    roletas = args.roleta_id or db.roleta_numeros.distinct('roleta_id')
+    falhas = 0
+    for roleta_id in roletas:
+        if reconstruir_resumo(db, roleta_id):
+            print(f"Resumo recriado: {roleta_id}")
+        else:
+            falhas += 1
+            print(f"Falha ao recriar resumo: {roleta_id}")
+
+    sys.exit(1 if falhas else 0)
+
+if __name__ == "__main__":
+    main()
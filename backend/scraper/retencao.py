@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Retenção e arquivamento do histórico de números e estratégias
+
+Documentos mais antigos que RETENCAO_DIAS são exportados para arquivos JSONL
+comprimidos, particionados por data (<coleção>/data=AAAA-MM-DD/parte-*.jsonl.gz),
+e então removidos do MongoDB em lotes. O leitor de arquivos permite consultar o
+histórico arquivado junto com o histórico ainda presente no banco.
+
+Uso:
+    python retencao.py [--dias 90] [--colecao roleta_numeros] [--simular]
+    python retencao.py --consultar <roleta_id> --inicio AAAA-MM-DD [--fim AAAA-MM-DD]
+"""
+
+import os
+import sys
+import gzip
+import zlib
+import argparse
+from datetime import datetime, timedelta, date
+from typing import Dict, List, Any, Iterator, Optional
+
+from bson import json_util
+from pymongo.database import Database
+
+from config import logger, RETENCAO_DIAS, RETENCAO_ARQUIVO_DIR, RETENCAO_LOTE
+
+# Coleções sujeitas à retenção: campo de data e se ele é datetime ou string ISO
+COLECOES_RETENCAO: Dict[str, Dict[str, str]] = {
+    'roleta_numeros': {'campo': 'timestamp', 'tipo': 'data'},
+    'estrategia_historico': {'campo': 'timestamp', 'tipo': 'iso'},
+    'estrategia_historico_novo': {'campo': 'timestamp', 'tipo': 'iso'},
+    'estrategia_transicoes': {'campo': 'timestamp', 'tipo': 'data'},
+}
+
+def _data_documento(documento: Dict[str, Any], campo: str) -> Optional[date]:
+    """Obtém a data (dia) de um documento a partir do campo de timestamp"""
+    valor = documento.get(campo)
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, str) and len(valor) >= 10:
+        try:
+            return date.fromisoformat(valor[:10])
+        except ValueError:
+            return None
+    return None
+
+def _diretorio_particao(diretorio: str, colecao: str, dia: date) -> str:
+    """Caminho do diretório da partição de uma coleção em um dia"""
+    return os.path.join(diretorio, colecao, f"data={dia.isoformat()}")
+
+class _EscritorParticoes:
+    """
+    Mantém um arquivo por partição durante uma execução, com um membro gzip por lote:
+    cada lote é fechado (trailer gravado) e sincronizado antes da remoção no banco
+    """
+
+    def __init__(self, diretorio: str, colecao: str):
+        self.diretorio = diretorio
+        self.colecao = colecao
+        self.sufixo = datetime.now().strftime("%Y%m%d%H%M%S")
+        self._brutos: Dict[date, Any] = {}
+        self._membros: Dict[date, gzip.GzipFile] = {}
+
+    def escrever(self, dia: date, documento: Dict[str, Any]) -> None:
+        membro = self._membros.get(dia)
+        if membro is None:
+            bruto = self._brutos.get(dia)
+            if bruto is None:
+                caminho = _diretorio_particao(self.diretorio, self.colecao, dia)
+                os.makedirs(caminho, exist_ok=True)
+                bruto = open(os.path.join(caminho, f"parte-{self.sufixo}.jsonl.gz"), 'ab')
+                self._brutos[dia] = bruto
+            membro = gzip.GzipFile(fileobj=bruto, mode='ab')
+            self._membros[dia] = membro
+        linha = json_util.dumps(documento, json_options=json_util.RELAXED_JSON_OPTIONS)
+        membro.write(linha.encode('utf-8') + b"\n")
+
+    def concluir_lote(self) -> None:
+        """Fecha os membros gzip abertos e grava em disco, antes de remover o lote do banco"""
+        for dia, membro in self._membros.items():
+            # Fechar o GzipFile grava o trailer do membro e mantém o arquivo aberto
+            membro.close()
+            bruto = self._brutos[dia]
+            bruto.flush()
+            os.fsync(bruto.fileno())
+        self._membros.clear()
+
+    def fechar(self) -> None:
+        self.concluir_lote()
+        for bruto in self._brutos.values():
+            bruto.close()
+        self._brutos.clear()
+
+def _consultas_arquivamento(db: Database, colecao: str, filtro: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Consultas usadas para percorrer os documentos antigos de uma coleção.
+    Em roleta_numeros e estrategia_transicoes a varredura é feita por roleta para usar
+    o índice (roleta_id, timestamp).
+    """
+    if colecao in ('roleta_numeros', 'estrategia_transicoes'):
+        for roleta_id in db[colecao].distinct('roleta_id'):
+            yield dict(filtro, roleta_id=roleta_id)
+    else:
+        yield filtro
+
+def arquivar_colecao(db: Database, colecao: str, dias: int = RETENCAO_DIAS,
+                     diretorio: str = RETENCAO_ARQUIVO_DIR, lote: int = RETENCAO_LOTE,
+                     simular: bool = False) -> int:
+    """
+    Exporta para arquivos e remove do banco os documentos mais antigos que `dias`
+
+    Args:
+        db (Database): Banco de dados
+        colecao (str): Nome da coleção (uma das COLECOES_RETENCAO)
+        dias (int, optional): Idade máxima dos documentos mantidos no banco
+        diretorio (str, optional): Diretório raiz dos arquivos
+        lote (int, optional): Documentos por lote de remoção
+        simular (bool, optional): Apenas contar, sem exportar nem remover. Defaults to False.
+
+    Returns:
+        int: Quantidade de documentos arquivados (ou que seriam arquivados)
+    """
+    definicao = COLECOES_RETENCAO[colecao]
+    campo = definicao['campo']
+    corte = datetime.now() - timedelta(days=dias)
+    valor_corte = corte if definicao['tipo'] == 'data' else corte.isoformat()
+    filtro_base = {campo: {'$lt': valor_corte}}
+
+    if simular:
+        return sum(db[colecao].count_documents(filtro)
+                   for filtro in _consultas_arquivamento(db, colecao, filtro_base))
+
+    escritor = _EscritorParticoes(diretorio, colecao)
+    total = 0
+    try:
+        for filtro in _consultas_arquivamento(db, colecao, filtro_base):
+            ids: List[Any] = []
+            for documento in db[colecao].find(filtro).batch_size(lote):
+                dia = _data_documento(documento, campo) or corte.date()
+                escritor.escrever(dia, documento)
+                ids.append(documento['_id'])
+
+                if len(ids) >= lote:
+                    escritor.concluir_lote()
+                    db[colecao].delete_many({'_id': {'$in': ids}})
+                    total += len(ids)
+                    ids = []
+
+            if ids:
+                escritor.concluir_lote()
+                db[colecao].delete_many({'_id': {'$in': ids}})
+                total += len(ids)
+    finally:
+        escritor.fechar()
+
+    logger.info(f"{total} documentos arquivados da coleção '{colecao}' (anteriores a {corte.date()})")
+    return total
+
+def _ler_partes(caminho: str) -> Iterator[Dict[str, Any]]:
+    """
+    Lê os documentos de um arquivo de partição. Uma execução interrompida deixa o último
+    membro gzip sem trailer: os documentos dele continuam no banco (a remoção só acontece
+    depois do fechamento do membro), então a leitura para ali sem erro.
+    """
+    try:
+        with gzip.open(caminho, 'rt', encoding='utf-8') as arquivo:
+            for linha in arquivo:
+                # Linha cortada no fim de um membro truncado
+                if not linha.endswith("\n"):
+                    break
+                yield json_util.loads(linha)
+    except (EOFError, gzip.BadGzipFile, zlib.error) as e:
+        logger.warning(f"Arquivo de retenção truncado, lido até o último lote completo: {caminho} ({str(e)})")
+
+def ler_arquivo(colecao: str, inicio: datetime = None, fim: datetime = None,
+                roleta_id: str = None, diretorio: str = RETENCAO_ARQUIVO_DIR) -> Iterator[Dict[str, Any]]:
+    """
+    Lê documentos arquivados de uma coleção, partição por partição em ordem de data.
+    O arquivamento percorre a coleção roleta a roleta, então cada partição (um dia) é
+    ordenada na leitura pelo campo de data e, no empate, por `sequencia`.
+
+    Args:
+        colecao (str): Nome da coleção
+        inicio (datetime, optional): Início do intervalo (inclusivo)
+        fim (datetime, optional): Fim do intervalo (exclusivo)
+        roleta_id (str, optional): Filtrar por roleta
+        diretorio (str, optional): Diretório raiz dos arquivos
+
+    Yields:
+        Dict[str, Any]: Documentos arquivados
+    """
+    raiz = os.path.join(diretorio, colecao)
+    if not os.path.isdir(raiz):
+        return
+
+    campo = COLECOES_RETENCAO.get(colecao, {}).get('campo', 'timestamp')
+    for particao in sorted(os.listdir(raiz)):
+        if not particao.startswith('data='):
+            continue
+        dia = date.fromisoformat(particao[len('data='):])
+        if inicio is not None and dia < inicio.date():
+            continue
+        if fim is not None and dia > fim.date():
+            continue
+
+        # Uma execução interrompida pode ter arquivado o mesmo documento duas vezes
+        vistos = set()
+        documentos = []
+        caminho = os.path.join(raiz, particao)
+        for nome in sorted(os.listdir(caminho)):
+            if not nome.endswith('.jsonl.gz'):
+                continue
+            for documento in _ler_partes(os.path.join(caminho, nome)):
+                chave = str(documento.get('_id'))
+                if chave in vistos:
+                    continue
+                vistos.add(chave)
+
+                if roleta_id is not None and documento.get('roleta_id') != roleta_id:
+                    continue
+                valor = documento.get(campo)
+                if isinstance(valor, str):
+                    valor = datetime.fromisoformat(valor)
+                if isinstance(valor, datetime):
+                    if inicio is not None and valor < inicio:
+                        continue
+                    if fim is not None and valor >= fim:
+                        continue
+                else:
+                    valor = datetime.min
+                sequencia = documento.get('sequencia')
+                documentos.append((valor, sequencia if isinstance(sequencia, int) else -1, len(documentos), documento))
+
+        documentos.sort(key=lambda item: item[:3])
+        for *_, documento in documentos:
+            yield documento
+
+def consultar_numeros(db: Database, roleta_id: str, inicio: datetime, fim: datetime = None,
+                      diretorio: str = RETENCAO_ARQUIVO_DIR) -> Iterator[Dict[str, Any]]:
+    """
+    Consulta os números de uma roleta em um intervalo, combinando arquivo e banco
+
+    Args:
+        db (Database): Banco de dados
+        roleta_id (str): ID da roleta
+        inicio (datetime): Início do intervalo (inclusivo)
+        fim (datetime, optional): Fim do intervalo (exclusivo). Defaults to None (agora).
+        diretorio (str, optional): Diretório raiz dos arquivos
+
+    Yields:
+        Dict[str, Any]: Documentos em ordem cronológica
+    """
+    filtro = {'roleta_id': roleta_id, 'timestamp': {'$gte': inicio}}
+    if fim is not None:
+        filtro['timestamp']['$lt'] = fim
+
+    # Só os arquivados a partir do primeiro número ainda no banco podem estar repetidos nele
+    primeiro = db['roleta_numeros'].find_one(filtro, {'timestamp': 1}, sort=[('timestamp', 1)])
+    vistos = set()
+    for documento in ler_arquivo('roleta_numeros', inicio, fim, roleta_id, diretorio):
+        if primeiro is not None and documento.get('timestamp') is not None \
+                and documento['timestamp'] >= primeiro['timestamp']:
+            vistos.add(documento['_id'])
+        yield documento
+
+    for documento in db['roleta_numeros'].find(filtro).sort('timestamp', 1):
+        # Documentos arquivados por uma execução interrompida antes da remoção
+        if documento['_id'] in vistos:
+            continue
+        yield documento
+
+def main():
+    """
+    Função principal da linha de comando
+    """
+    parser = argparse.ArgumentParser(description="Retenção e arquivamento do histórico")
+    parser.add_argument('--dias', type=int, default=RETENCAO_DIAS, help="Idade máxima mantida no banco")
+    parser.add_argument('--colecao', choices=list(COLECOES_RETENCAO), help="Arquivar apenas uma coleção")
+    parser.add_argument('--diretorio', default=RETENCAO_ARQUIVO_DIR, help="Diretório dos arquivos")
+    parser.add_argument('--simular', action='store_true', help="Apenas contar os documentos")
+    parser.add_argument('--consultar', metavar='ROLETA_ID',
+                        help="Imprimir em JSONL os números da roleta no intervalo, do arquivo e do banco")
+    parser.add_argument('--inicio', type=datetime.fromisoformat, help="Início da consulta (inclusivo)")
+    parser.add_argument('--fim', type=datetime.fromisoformat, help="Fim da consulta (exclusivo)")
+    args = parser.parse_args()
+
+    from mongo_config import conectar_mongodb
+    client, db = conectar_mongodb()
+
+    if args.consultar:
+        if args.inicio is None:
+            parser.error("--consultar requer --inicio")
+        for documento in consultar_numeros(db, args.consultar, args.inicio, args.fim, args.diretorio):
+            print(json_util.dumps(documento, json_options=json_util.RELAXED_JSON_OPTIONS))
+        return 0
+
+    colecoes = [args.colecao] if args.colecao else list(COLECOES_RETENCAO)
+    for colecao in colecoes:
+        total = arquivar_colecao(db, colecao, args.dias, args.diretorio, simular=args.simular)
+        print(f"{colecao}: {total} documentos {'a arquivar' if args.simular else 'arquivados'}")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Geometria da roda da roleta europeia: ordem física, setores e vizinhos
+
+Como em classificacao.py, tudo é calculado uma vez na importação e indexado pelo
+número: o setor é uma tupla de 37 posições e a distância entre dois números na roda é
+uma tabela 37×37. Consultar qualquer uma delas é uma leitura, sem laços; os acertos de
+vizinhos a ±N casas saem do histograma dessas distâncias (ver acertos_vizinhos).
+"""
+
+from typing import Dict, List, Tuple
+
+# Números na ordem em que aparecem na roda, no sentido horário a partir do zero
+ORDEM_RODA = (0, 32, 15, 19, 4, 21, 2, 25, 17, 34, 6, 27, 13, 36, 11, 30, 8, 23, 10,
+              5, 24, 16, 33, 1, 20, 14, 31, 9, 22, 18, 29, 7, 28, 12, 35, 3, 26)
+
+# Posição de cada número na roda (índice em ORDEM_RODA)
+POSICAO_RODA = tuple(ORDEM_RODA.index(n) for n in range(37))
+
+# Setores clássicos da roda: voisins du zéro (22 a 25, passando pelo zero), tiers du
+# cylindre (27 a 33, lado oposto) e orphelins (os dois arcos restantes)
+SETORES = {
+    'voisins': frozenset({22, 18, 29, 7, 28, 12, 35, 3, 26, 0, 32, 15, 19, 4, 21, 2, 25}),
+    'tiers': frozenset({27, 13, 36, 11, 30, 8, 23, 10, 5, 24, 16, 33}),
+    'orphelins': frozenset({17, 34, 6, 1, 20, 14, 31, 9}),
+}
+
+SETOR = tuple(next(nome for nome, numeros in SETORES.items() if n in numeros) for n in range(37))
+
+# Maior distância possível entre dois números (meia volta)
+DISTANCIA_MAXIMA = len(ORDEM_RODA) // 2
+
+def _distancia(a: int, b: int) -> int:
+    diferenca = abs(POSICAO_RODA[a] - POSICAO_RODA[b])
+    return min(diferenca, 37 - diferenca)
+
+# Distância em casas entre dois números, pelo caminho mais curto: DISTANCIA[a][b]
+DISTANCIA = tuple(tuple(_distancia(a, b) for b in range(37)) for a in range(37))
+
+def distancia(a: int, b: int) -> int:
+    """
+    Distância entre dois números na roda
+
+    Args:
+        a (int): Primeiro número (0 a 36)
+        b (int): Segundo número (0 a 36)
+
+    Returns:
+        int: Casas entre os dois pelo caminho mais curto (0 a 18)
+    """
+    return DISTANCIA[a][b]
+
+def vizinhos(numero: int, casas: int) -> List[int]:
+    """
+    Números a até `casas` posições de um número, na ordem da roda
+
+    Args:
+        numero (int): Número central (0 a 36)
+        casas (int): Vizinhos de cada lado (0 a 18)
+
+    Returns:
+        List[int]: 2·casas + 1 números, do vizinho mais à esquerda ao mais à direita
+    """
+    posicao = POSICAO_RODA[numero]
+    return [ORDEM_RODA[(posicao + deslocamento) % 37] for deslocamento in range(-casas, casas + 1)]
+
+def acertos_vizinhos(distancias: List[int], casas: Tuple[int, ...]) -> Dict[str, Dict[str, float]]:
+    """
+    Resume um histograma de distâncias entre giros consecutivos em acertos de vizinhos
+
+    Args:
+        distancias (List[int]): Giros por distância ao giro anterior (índices 0 a 18)
+        casas (Tuple[int, ...]): Quantidades de vizinhos avaliadas (ex.: (1, 2, 3))
+
+    Returns:
+        Dict[str, Dict[str, float]]: Por quantidade de casas, acertos (giro a até N casas do
+            anterior), taxa observada e taxa esperada numa roda justa ((2N + 1) / 37)
+    """
+    total = sum(distancias)
+    resultado = {}
+    for n in casas:
+        acertos = sum(distancias[:n + 1])
+        resultado[str(n)] = {
+            'acertos': acertos,
+            'taxa': round(acertos / total, 4) if total else 0.0,
+            'esperado': round((2 * n + 1) / 37, 4)
+        }
+    return resultado
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Agregados pré-calculados por hora, dia e semana (coleção roleta_rollups)
+
+Cada número inserido soma 1 ao agregado da sua hora ($inc com upsert). A compactação
+junta as horas de dias encerrados em agregados diários e os dias de semanas encerradas
+em agregados semanais, mantendo a coleção pequena. Um intervalo qualquer é respondido
+somando os agregados contidos nele; as bordas não cobertas (ex.: parte de uma semana
+compactada) são contadas direto em roleta_numeros.
+
+A compactação é idempotente: as fontes são marcadas com um lote, o destino registra
+os lotes já somados e só então as fontes são removidas; uma execução interrompida é
+concluída pela próxima.
+
+Uso:
+    python rollups.py compactar
+    python rollups.py reconstruir [--dias 30] [--roleta-id ID]
+    python rollups.py benchmark [--dias 7]
+"""
+
+import sys
+import time
+import uuid
+import argparse
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.database import Database
+
+from classificacao import DIMENSOES
+from config import logger, ROLLUPS_HORAS_COMPACTAR, ROLLUPS_DIAS_COMPACTAR
+
+COLECAO_ROLLUPS = 'roleta_rollups'
+
+GRANULARIDADES = ('hora', 'dia', 'semana')
+
+def inicio_periodo(momento: datetime, granularidade: str) -> datetime:
+    """
+    Início do período (hora, dia ou semana iniciada na segunda-feira) que contém um instante
+
+    Args:
+        momento (datetime): Instante
+        granularidade (str): 'hora', 'dia' ou 'semana'
+
+    Returns:
+        datetime: Início do período
+    """
+    if granularidade == 'hora':
+        return momento.replace(minute=0, second=0, microsecond=0)
+    dia = momento.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularidade == 'dia':
+        return dia
+    return dia - timedelta(days=dia.weekday())
+
+def fim_periodo(inicio: datetime, granularidade: str) -> datetime:
+    """Fim (exclusivo) do período iniciado em `inicio`"""
+    return inicio + {'hora': timedelta(hours=1), 'dia': timedelta(days=1), 'semana': timedelta(weeks=1)}[granularidade]
+
+def id_rollup(roleta_id: str, granularidade: str, inicio: datetime) -> str:
+    """Chave determinística do agregado"""
+    return f"{roleta_id}:{granularidade}:{inicio.strftime('%Y%m%d%H')}"
+
+def incrementar_rollups(db: Database, documentos: List[Dict[str, Any]]) -> bool:
+    """
+    Soma os números inseridos aos agregados horários, com um upsert $inc por roleta e hora
+
+    Args:
+        db (Database): Banco de dados
+        documentos (List[Dict[str, Any]]): Documentos inseridos em roleta_numeros
+
+    Returns:
+        bool: True se os agregados foram atualizados
+    """
+    grupos: Dict[Tuple[str, datetime], Counter] = defaultdict(Counter)
+    for documento in documentos:
+        hora = inicio_periodo(documento['timestamp'], 'hora')
+        grupos[(documento['roleta_id'], hora)][documento['numero']] += 1
+
+    if not grupos:
+        return True
+
+    try:
+        db[COLECAO_ROLLUPS].bulk_write([
+            UpdateOne(
+                {'_id': id_rollup(roleta_id, 'hora', hora)},
+                {
+                    '$inc': dict({f'contagem_numeros.{n}': c for n, c in contagem.items()},
+                                 total_numeros=sum(contagem.values())),
+                    '$setOnInsert': {'roleta_id': roleta_id, 'granularidade': 'hora',
+                                     'inicio': hora, 'fim': fim_periodo(hora, 'hora')}
+                },
+                upsert=True
+            )
+            for (roleta_id, hora), contagem in grupos.items()
+        ], ordered=False)
+        return True
+    except Exception as e:
+        logger.error(f"Erro ao atualizar agregados horários: {str(e)}")
+        return False
+
+def _somar(destino: Counter, documento: Dict[str, Any]) -> None:
+    for numero, contagem in documento.get('contagem_numeros', {}).items():
+        destino[int(numero)] += contagem
+
+def _compactar_nivel(db: Database, origem: str, destino: str, limite: datetime) -> int:
+    """
+    Junta os agregados `origem` anteriores a `limite` nos agregados `destino`
+
+    Returns:
+        int: Quantidade de agregados de origem compactados
+    """
+    colecao = db[COLECAO_ROLLUPS]
+    limite = inicio_periodo(limite, destino)
+
+    # Fase 1: marcar as fontes ainda não marcadas com um lote por destino
+    lotes: Dict[str, str] = {}
+    marcacoes = []
+    for documento in colecao.find({'granularidade': origem, 'inicio': {'$lt': limite}, 'lote': {'$exists': False}},
+                                  {'roleta_id': 1, 'inicio': 1}):
+        alvo = id_rollup(documento['roleta_id'], destino, inicio_periodo(documento['inicio'], destino))
+        lote = lotes.setdefault(alvo, uuid.uuid4().hex)
+        marcacoes.append(UpdateOne({'_id': documento['_id'], 'lote': {'$exists': False}},
+                                   {'$set': {'lote': lote, 'alvo': alvo}}))
+    if marcacoes:
+        colecao.bulk_write(marcacoes, ordered=False)
+
+    # Fase 2: somar cada lote ao destino uma única vez; fase 3: remover as fontes
+    por_lote: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for documento in colecao.find({'granularidade': origem, 'lote': {'$exists': True}}):
+        por_lote[documento['lote']].append(documento)
+
+    compactados = 0
+    for lote, fontes in por_lote.items():
+        contagem = Counter()
+        for fonte in fontes:
+            _somar(contagem, fonte)
+        alvo = fontes[0]['alvo']
+        inicio = inicio_periodo(fontes[0]['inicio'], destino)
+
+        # Lote já somado numa execução interrompida antes da remoção: só remover as fontes
+        if colecao.find_one({'_id': alvo, 'lotes': lote}, {'_id': 1}) is None:
+            colecao.update_one(
+                {'_id': alvo},
+                {
+                    '$inc': dict({f'contagem_numeros.{n}': c for n, c in contagem.items()},
+                                 total_numeros=sum(contagem.values())),
+                    '$push': {'lotes': lote},
+                    '$setOnInsert': {'roleta_id': fontes[0]['roleta_id'], 'granularidade': destino,
+                                     'inicio': inicio, 'fim': fim_periodo(inicio, destino)}
+                },
+                upsert=True
+            )
+        colecao.delete_many({'lote': lote, 'granularidade': origem})
+        compactados += len(fontes)
+
+    return compactados
+
+def compactar(db: Database, agora: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Compacta horas antigas em dias e dias antigos em semanas
+
+    Args:
+        db (Database): Banco de dados
+        agora (datetime, optional): Referência de tempo. Defaults to None (agora).
+
+    Returns:
+        Dict[str, int]: Agregados compactados por granularidade de origem
+    """
+    agora = agora or datetime.now()
+    return {
+        'hora': _compactar_nivel(db, 'hora', 'dia', agora - timedelta(hours=ROLLUPS_HORAS_COMPACTAR)),
+        'dia': _compactar_nivel(db, 'dia', 'semana', agora - timedelta(days=ROLLUPS_DIAS_COMPACTAR))
+    }
+
+def agregar_bruto(db: Database, roleta_id: str, inicio: datetime, fim: datetime) -> Counter:
+    """
+    Conta os números de um intervalo direto em roleta_numeros (bordas e comparação)
+
+    Returns:
+        Counter: Contagem por número
+    """
+    contagem = Counter()
+    for grupo in db.roleta_numeros.aggregate([
+        {'$match': {'roleta_id': roleta_id, 'timestamp': {'$gte': inicio, '$lt': fim}}},
+        {'$group': {'_id': '$numero', 'contagem': {'$sum': 1}}}
+    ]):
+        if isinstance(grupo['_id'], int):
+            contagem[grupo['_id']] += grupo['contagem']
+    return contagem
+
+def _lacunas(inicio: datetime, fim: datetime, cobertos: List[Tuple[datetime, datetime]]) -> List[Tuple[datetime, datetime]]:
+    """Partes de [inicio, fim) não cobertas pelos intervalos (ordenados) dos agregados"""
+    lacunas = []
+    cursor = inicio
+    for a, b in cobertos:
+        if a > cursor:
+            lacunas.append((cursor, a))
+        cursor = max(cursor, b)
+    if cursor < fim:
+        lacunas.append((cursor, fim))
+    return lacunas
+
+def contagem_intervalo(db: Database, roleta_id: str, inicio: datetime, fim: datetime) -> Tuple[Counter, Dict[str, int]]:
+    """
+    Soma os agregados contidos em [inicio, fim) e conta as bordas em roleta_numeros
+
+    Returns:
+        Tuple[Counter, Dict[str, int]]: Contagem por número e quantidade de agregados e consultas brutas usados
+    """
+    documentos = list(db[COLECAO_ROLLUPS].find(
+        {'roleta_id': roleta_id, 'inicio': {'$gte': inicio - timedelta(weeks=1), '$lt': fim}, 'fim': {'$gt': inicio}},
+        {'granularidade': 1, 'inicio': 1, 'fim': 1, 'contagem_numeros': 1}))
+
+    # Agregados que cruzam as bordas não servem; horas que chegaram atrasadas dentro do
+    # mesmo período também não, pois parte daquele período já foi compactada nele
+    parciais = [(d['inicio'], d['fim']) for d in documentos if d['inicio'] < inicio or d['fim'] > fim]
+
+    contagem = Counter()
+    cobertos = []
+    usados = Counter()
+    for documento in documentos:
+        a, b = documento['inicio'], documento['fim']
+        if a < inicio or b > fim or any(a < pb and b > pa for pa, pb in parciais):
+            continue
+        _somar(contagem, documento)
+        cobertos.append((a, b))
+        usados[documento['granularidade']] += 1
+
+    cobertos.sort()
+    for a, b in _lacunas(inicio, fim, cobertos):
+        contagem.update(agregar_bruto(db, roleta_id, a, b))
+        usados['bruto'] += 1
+
+    return contagem, dict(usados)
+
+def estatisticas_periodo(db: Database, roleta_id: str, inicio: datetime, fim: datetime) -> Dict[str, Any]:
+    """
+    Estatísticas de um intervalo a partir dos agregados, no formato das estatísticas diárias
+
+    Args:
+        db (Database): Banco de dados
+        roleta_id (str): ID da roleta
+        inicio (datetime): Início do intervalo (inclusivo)
+        fim (datetime): Fim do intervalo (exclusivo)
+
+    Returns:
+        Dict[str, Any]: Estatísticas do intervalo, ou {'erro': ...} em caso de falha
+    """
+    try:
+        from analytics import montar_estatisticas
+
+        contagem, usados = contagem_intervalo(db, roleta_id, inicio, fim)
+        documento = {
+            'roleta_id': roleta_id,
+            'formato': 'contadores',
+            'total_numeros': sum(contagem.values()),
+            'contagem_numeros': {str(n): c for n, c in contagem.items()}
+        }
+        for campo, tabela in DIMENSOES.items():
+            distribuicao = Counter()
+            for numero, quantidade in contagem.items():
+                distribuicao[tabela[numero]] += quantidade
+            documento[campo] = dict(distribuicao)
+
+        estatisticas = montar_estatisticas(documento)
+        estatisticas.update({'inicio': inicio.isoformat(), 'fim': fim.isoformat(), 'agregados': usados})
+        return estatisticas
+    except Exception as e:
+        logger.error(f"Erro ao calcular estatísticas do período para roleta {roleta_id}: {str(e)}")
+        return {'roleta_id': roleta_id, 'erro': str(e)}
+
+def reconstruir_rollups(db: Database, roleta_id: str, inicio: datetime, fim: datetime) -> int:
+    """
+    Recria os agregados horários de um intervalo a partir de roleta_numeros
+
+    Agregados de qualquer granularidade contidos no intervalo são substituídos.
+
+    Returns:
+        int: Quantidade de agregados horários gravados
+    """
+    inicio = inicio_periodo(inicio, 'semana')
+    fim = fim_periodo(inicio_periodo(fim, 'hora'), 'hora')
+
+    contagens: Dict[datetime, Counter] = defaultdict(Counter)
+    for documento in db.roleta_numeros.find(
+            {'roleta_id': roleta_id, 'timestamp': {'$gte': inicio, '$lt': fim}},
+            {'numero': 1, 'timestamp': 1, '_id': 0}).batch_size(10000):
+        contagens[inicio_periodo(documento['timestamp'], 'hora')][documento['numero']] += 1
+
+    db[COLECAO_ROLLUPS].delete_many({'roleta_id': roleta_id, 'inicio': {'$gte': inicio}, 'fim': {'$lte': fim}})
+    if contagens:
+        db[COLECAO_ROLLUPS].bulk_write([
+            UpdateOne(
+                {'_id': id_rollup(roleta_id, 'hora', hora)},
+                {'$set': {'roleta_id': roleta_id, 'granularidade': 'hora', 'inicio': hora,
+                          'fim': fim_periodo(hora, 'hora'), 'total_numeros': sum(contagem.values()),
+                          'contagem_numeros': {str(n): c for n, c in contagem.items()}}},
+                upsert=True
+            )
+            for hora, contagem in contagens.items()
+        ], ordered=False)
+    return len(contagens)
+
+def main():
+    parser = argparse.ArgumentParser(description="Agregados por hora, dia e semana")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+    subparsers.add_parser('compactar', help="Compacta horas em dias e dias em semanas")
+    reconstruir = subparsers.add_parser('reconstruir', help="Recria os agregados a partir de roleta_numeros")
+    reconstruir.add_argument('--dias', type=int, default=30)
+    reconstruir.add_argument('--roleta-id', action='append')
+    benchmark = subparsers.add_parser('benchmark', help="Compara a consulta por agregados com a agregação bruta")
+    benchmark.add_argument('--dias', type=int, default=7)
+    benchmark.add_argument('--roleta-id', action='append')
+    args = parser.parse_args()
+
+    from mongo_config import conectar_mongodb
+    client, db = conectar_mongodb()
+    agora = datetime.now()
+
+    if args.comando == 'compactar':
+        print(f"Agregados compactados: {compactar(db, agora)}")
+    elif args.comando == 'reconstruir':
+        for roleta_id in args.roleta_id or db.roleta_numeros.distinct('roleta_id'):
+            horas = reconstruir_rollups(db, roleta_id, agora - timedelta(days=args.dias), agora)
+            print(f"{roleta_id}: {horas} agregados horários")
+        print(f"Agregados compactados: {compactar(db, agora)}")
+    else:
+        inicio = inicio_periodo(agora - timedelta(days=args.dias), 'hora')
+        fim = fim_periodo(inicio_periodo(agora, 'hora'), 'hora')
+        for roleta_id in args.roleta_id or db.roleta_numeros.distinct('roleta_id'):
+            t0 = time.perf_counter()
+            por_agregados, usados = contagem_intervalo(db, roleta_id, inicio, fim)
+            t1 = time.perf_counter()
+            bruto = agregar_bruto(db, roleta_id, inicio, fim)
+            t2 = time.perf_counter()
+            situacao = "iguais" if por_agregados == bruto else "DIFERENTES"
+            print(f"{roleta_id}: agregados {(t1 - t0) * 1000:.1f} ms {usados}, "
+                  f"bruto {(t2 - t1) * 1000:.1f} ms ({sum(bruto.values())} números), {situacao}")
+
+    sys.exit(0)
+
+if __name__ == "__main__":
+    main()
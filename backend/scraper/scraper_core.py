@@ -716,7 +716,8 @@ class DataSourceInterface:
         """
         raise NotImplementedError("Método não implementado")
     
-    def inserir_numero(self, roleta_id: str, roleta_nome: str, numero: int, cor: str, timestamp: str) -> bool:
+    def inserir_numero(self, roleta_id: str, roleta_nome: str, numero: int, cor: str, timestamp: str,
+                       historico: List[int] = None) -> bool:
         """
         Insere um novo número para uma roleta
         
@@ -726,6 +727,8 @@ class DataSourceInterface:
             numero (int): Número sorteado
             cor (str): Cor do número
             timestamp (str): Timestamp do evento
+            historico (List[int], optional): Números visíveis na página, começando por `numero`
+                e do mais recente para o mais antigo. Defaults to None.
             
         Returns:
             bool: True se inserido com sucesso, False caso contrário
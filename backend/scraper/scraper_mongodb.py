@@ -25,21 +25,17 @@ from webdriver_manager.chrome import ChromeDriverManager
 from config import CASINO_URL, roleta_permitida_por_id, MAX_CICLOS, MAX_ERROS_CONSECUTIVOS
 from event_manager import event_manager
 
-# Importar funções para processar estratégias
-try:
-    from run_real_scraper import generate_display_suggestion, process_new_number
-except ImportError:
-    # Fallback simples caso o módulo não esteja disponível
-    def generate_display_suggestion(estado, terminais):
-        if estado == "NEUTRAL":
-            return "AGUARDANDO GATILHO"
-        elif estado == "TRIGGER" and terminais:
-            return f"APOSTAR EM: {','.join(map(str, terminais))}"
-        elif estado == "POST_GALE_NEUTRAL" and terminais:
-            return f"GALE EM: {','.join(map(str, terminais))}"
-        elif estado == "MORTO":
-            return "AGUARDANDO PRÓXIMO CICLO"
-        return ""
+def generate_display_suggestion(estado, terminais):
+    """Sugestão de exibição (mesma regra de run_real_scraper, sem importá-lo no carregamento)"""
+    if estado == "NEUTRAL":
+        return "AGUARDANDO GATILHO"
+    elif estado == "TRIGGER" and terminais:
+        return f"APOSTAR EM: {','.join(map(str, terminais))}"
+    elif estado == "POST_GALE_NEUTRAL" and terminais:
+        return f"GALE EM: {','.join(map(str, terminais))}"
+    elif estado == "MORTO":
+        return "AGUARDANDO PRÓXIMO CICLO"
+    return ""
 
 # Configurar logging minimalista - apenas erros críticos
 logging.basicConfig(level=logging.CRITICAL)
@@ -58,17 +54,6 @@ driver_global = None
 # Ambiente
 IS_PRODUCTION = os.environ.get('PRODUCTION', False)
 
-# Variáveis de controle para evitar duplicações
-ultimo_numero_por_roleta = {}
-ultimo_timestamp_por_roleta = {}
-# Dicionário para armazenar a assinatura visual única de cada atualização de roleta
-assinaturas_roletas = {}
-# Histórico de números por roleta para deduplicação rigorosa
-historico_numeros_por_roleta = {}  # {id_roleta: [(numero, timestamp), ...]}
-max_historico_por_roleta = 24      # Quantidade de números a manter no histórico
-# Histórico da sequência completa de números por roleta
-sequencias_por_roleta = {}  # {id_roleta: [num1, num2, num3, num4, num5]}
-
 # Variáveis de controle adicionais para o scraping
 roletas_verificadas = {}  # Timestamp da última verificação para cada roleta
 roletas_com_ruido = {}    # Contador de ruído para cada roleta
@@ -234,8 +219,8 @@ def cor_numero(num):
     vermelhos = {1, 3, 5, 7, 9, 12, 14, 16, 18, 19, 21, 23, 25, 27, 30, 32, 34, 36}
     return 'vermelho' if num in vermelhos else 'preto'
 
-def novo_numero(db, id_roleta, roleta_nome, numero, numero_hook=None):
-    """Minimalista para novo número"""
+def novo_numero(db, id_roleta, roleta_nome, numero, numero_hook=None, historico=None):
+    """Minimalista para novo número (historico: números visíveis na página, do mais recente)"""
     try:
         if isinstance(numero, str):
             num_int = int(re.sub(r'[^\d]', '', numero))
@@ -249,7 +234,11 @@ def novo_numero(db, id_roleta, roleta_nome, numero, numero_hook=None):
         ts = datetime.now().isoformat()
         
         db.garantir_roleta_existe(id_roleta, roleta_nome)
-        db.inserir_numero(id_roleta, roleta_nome, num_int, cor, ts)
+        
+        # A fonte de dados descarta releituras do mesmo sorteio (inserção idempotente); o
+        # histórico visível fixa a posição do número e distingue repetições legítimas
+        if not db.inserir_numero(id_roleta, roleta_nome, num_int, cor, ts, historico=historico):
+            return False
         
         # Saída com nome completo e cor por extenso
         print(f"{roleta_nome}:{num_int}:{cor}")
@@ -342,36 +331,20 @@ def novo_numero(db, id_roleta, roleta_nome, numero, numero_hook=None):
     except:
         return False
 
-def processar_numeros(db, id_roleta, roleta_nome, numeros_novos, numero_hook=None):
-    """Processamento de números com controle rigoroso de duplicações usando comparação de sequências"""
-    global ultimo_numero_por_roleta, ultimo_timestamp_por_roleta, assinaturas_roletas, historico_numeros_por_roleta, sequencias_por_roleta
+def processar_numeros(db, id_roleta, roleta_nome, numeros_novos, numero_hook=None, historico=None):
+    """
+    Processamento de números detectados para uma roleta.
+    A deduplicação é feita pela fonte de dados: releituras do mesmo sorteio,
+    inclusive vindas de outros processos do scraper, não são inseridas. O histórico
+    visível na página (lido por ext_numeros) permite a ela alinhar cada leitura.
+    """
     global ultima_atividade_roleta, intervalos_adaptativos
     
     if not numeros_novos or len(numeros_novos) == 0:
         return False
     
-    # Obter os últimos números do banco de dados
-    existentes = []
-    try:
-        if hasattr(db, 'obter_numeros_recentes'):
-            nums = db.obter_numeros_recentes(id_roleta, limite=10)
-            existentes = [n.get('numero') for n in nums]
-    except Exception as e:
-        print(f"Erro ao obter números recentes: {str(e)}")
-    
-    # Tempo mínimo entre atualizações da mesma roleta (em segundos)
-    # Usado apenas como medida de segurança, não como critério principal
-    min_tempo_entre_atualizacoes = 5
     tempo_atual = time.time()
     
-    # Inicializar o histórico para esta roleta se ainda não existir
-    if id_roleta not in historico_numeros_por_roleta:
-        historico_numeros_por_roleta[id_roleta] = []
-    
-    # Inicializar a sequência para esta roleta se ainda não existir
-    if id_roleta not in sequencias_por_roleta:
-        sequencias_por_roleta[id_roleta] = []
-    
     ok = False
     for num_str in numeros_novos:
         try:
@@ -394,85 +367,9 @@ def processar_numeros(db, id_roleta, roleta_nome, numeros_novos, numero_hook=Non
                 print(f"Ignorando número inválido: {n}")
                 continue
             
-            # VERIFICAÇÃO 1: Criar uma assinatura para esta detecção
-            # Combinação de roleta + número + timestamp arredondado para intervalos de 3 segundos
-            timestamp_arredondado = int(tempo_atual / 3) * 3
-            assinatura_atual = f"{id_roleta}_{n}_{timestamp_arredondado}"
-            
-            # Se já vimos esta assinatura muito recentemente, ignorar
-            if assinatura_atual in assinaturas_roletas:
-                ultimo_uso = assinaturas_roletas[assinatura_atual]
-                if tempo_atual - ultimo_uso < min_tempo_entre_atualizacoes:
-                    print(f"[DUPLICADO-ASSINATURA] Ignorando assinatura duplicada para {roleta_nome}: {n} (já vista há {tempo_atual - ultimo_uso:.1f}s)")
-                    continue
-            
-            # VERIFICAÇÃO 2: Verificar se é o mesmo número que o último registrado para esta roleta
-            ultimo_numero = ultimo_numero_por_roleta.get(id_roleta)
-            ultimo_timestamp = ultimo_timestamp_por_roleta.get(id_roleta, 0)
-            
-            # Se for o mesmo número E tiver passado muito pouco tempo, ignorar
-            # (isso é apenas uma salvaguarda contra duplicações extremamente rápidas)
-            if (ultimo_numero == n and 
-                (tempo_atual - ultimo_timestamp) < min_tempo_entre_atualizacoes):
-                print(f"[DUPLICADO-ULTIMO] Ignorando número repetido {n} para {roleta_nome} (extremamente recente: {tempo_atual - ultimo_timestamp:.1f}s)")
-                continue
-            
-            # VERIFICAÇÃO 3: Verificar a sequência atual de números da roleta
-            sequencia_atual = sequencias_por_roleta.get(id_roleta, [])
-            
-            # Se há uma sequência anterior E este número já está no topo da sequência, é duplicado
-            if sequencia_atual and n == sequencia_atual[0]:
-                print(f"[DUPLICADO-SEQUENCIA] Ignorando número {n} para {roleta_nome} (já está no topo da sequência atual)")
-                continue
-            
-            # VERIFICAÇÃO 4: Se for o mesmo número que o último do banco de dados, requer mais cuidado
-            if existentes and n == existentes[0]:
-                # Verificar se esse mesmo número foi extraído muito recentemente
-                if (tempo_atual - ultimo_timestamp) < min_tempo_entre_atualizacoes:
-                    print(f"[DUPLICADO-DB] Ignorando número duplicado {n} para {roleta_nome} (já existe no DB, muito recente)")
-                    continue
-                # Se passou tempo suficiente, pode ser um sorteio legítimo do mesmo número
-                print(f"[REPETIDO-VÁLIDO] Aceitando número repetido {n} para {roleta_nome} (tempo suficiente: {tempo_atual - ultimo_timestamp:.1f}s)")
-            
-            # VERIFICAÇÃO FINAL: Verificar os números mais recentes no BD para esta roleta
-            if existentes and n in existentes[:3] and tempo_atual - ultimo_timestamp < 10:
-                # É muito improvável que o mesmo número apareça entre os últimos 3 em menos de 10 segundos
-                print(f"[DUPLICADO-RECENTE] Ignorando número {n} para {roleta_nome} (já está entre os 3 últimos no DB em menos de 10s)")
-                continue
-            
-            # Se chegou até aqui, o número é considerado novo
-            if novo_numero(db, id_roleta, roleta_nome, n, numero_hook):
+            if novo_numero(db, id_roleta, roleta_nome, n, numero_hook, historico):
                 print(f"[ACEITO] Número {n} para {roleta_nome} aceito como novo")
                 
-                # Atualizar o cache local
-                ultimo_numero_por_roleta[id_roleta] = n
-                ultimo_timestamp_por_roleta[id_roleta] = tempo_atual
-                # Registrar a assinatura desta atualização
-                assinaturas_roletas[assinatura_atual] = tempo_atual
-                
-                # Adicionar ao histórico de números
-                historico_numeros_por_roleta[id_roleta].append((n, tempo_atual))
-                # Manter apenas os últimos números no histórico
-                if len(historico_numeros_por_roleta[id_roleta]) > max_historico_por_roleta:
-                    historico_numeros_por_roleta[id_roleta] = historico_numeros_por_roleta[id_roleta][-max_historico_por_roleta:]
-                
-                # Atualizar a sequência da roleta (colocar o novo número no topo)
-                sequencias_por_roleta[id_roleta] = [n] + sequencia_atual
-                # Manter apenas os últimos 5 números na sequência
-                if len(sequencias_por_roleta[id_roleta]) > 5:
-                    sequencias_por_roleta[id_roleta] = sequencias_por_roleta[id_roleta][:5]
-                
-                # Limitar o tamanho do dicionário de assinaturas (evitar vazamento de memória)
-                if len(assinaturas_roletas) > 1000:
-                    # Remover as assinaturas mais antigas
-                    assinaturas_antigas = sorted(
-                        assinaturas_roletas.items(),
-                        key=lambda x: x[1]
-                    )[:500]  # Manter apenas as 500 mais recentes
-                    for assinatura, _ in assinaturas_antigas:
-                        if assinatura in assinaturas_roletas:
-                            del assinaturas_roletas[assinatura]
-                
                 # NOVO: Atualizar o sistema adaptativo quando um novo número é aceito
                 ultima_atividade_roleta[id_roleta] = tempo_atual
                 # Reduzir o intervalo para esta roleta, pois está ativa
@@ -562,7 +459,7 @@ def monitor_roleta_thread(drv, db, id_roleta, titulo, elem, numero_hook):
                         print(f"[THREAD] Roleta {titulo} ({id_roleta[:5]}) não é mais considerada ruidosa")
                 
                 # Processar os números encontrados
-                sucesso = processar_numeros(db, id_roleta, titulo, [numero], numero_hook)
+                sucesso = processar_numeros(db, id_roleta, titulo, [numero], numero_hook, sequencia)
                 
                 # Atualizar timestamp de atividade apenas se processou números
                 if sucesso:
@@ -657,7 +554,7 @@ def scrape_roletas_sequencial(db, driver=None, numero_hook=None):
                         # Se encontrou um número, processá-lo
                         if numero is not None:
                             # Processar o número encontrado
-                            processar_numeros(db, id_roleta, titulo, [numero], numero_hook)
+                            processar_numeros(db, id_roleta, titulo, [numero], numero_hook, sequencia)
                         
                     except Exception as e:
                         print(f"[SEQUENCIAL] Erro ao processar roleta: {str(e)}")
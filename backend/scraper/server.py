@@ -12,16 +12,21 @@ import time
 import threading
 import logging
 import queue
-from datetime import datetime
+from datetime import datetime, timedelta
 from flask import Flask, jsonify, request, Response
 from flask_cors import CORS
 import hashlib
 import uuid
 
 # Importações locais
-from data_source_mongo import MongoDataSource
+from data_source_mongo import MongoDataSource, decodificar_cursor_sequencias
 from event_manager import event_manager, EventManager
-from config import DEFAULT_HOST, DEFAULT_PORT, API_VERSION
+from consumidor_alteracoes import ConsumidorAlteracoes
+from resumos import obter_resumo
+from analise_vetorizada import calcular_intervalo
+from rollups import estatisticas_periodo
+from estatisticas_globais import calcular_estatisticas_globais
+from config import DEFAULT_HOST, DEFAULT_PORT, API_VERSION, CONSUMIDOR_ALTERACOES_ATIVO, SEQUENCIAS_CACHE_SEGUNDOS
 
 # Configurar logger
 logger = logging.getLogger('runcash_api')
@@ -35,7 +40,40 @@ allowed_origins = os.environ.get('ALLOWED_ORIGINS', 'https://runcashnew-frontend
 CORS(app, resources={r"/api/*": {"origins": allowed_origins.split(','), "supports_credentials": True}})
 
 # Fonte de dados
-data_source = MongoDataSource()
+data_source = MongoDataSource(gravar_matrizes=False)
+
+# Eventos de números e estratégias gravados por qualquer processo (scraper, scripts); sem
+# replica set o consumidor consulta o banco por `sequencia` em vez do change stream
+consumidor_alteracoes = None
+if CONSUMIDOR_ALTERACOES_ATIVO:
+    consumidor_alteracoes = ConsumidorAlteracoes(data_source.db, nome='api', data_source=data_source).iniciar()
+
+def notificar_sequencias(roleta_id: str, sequencias: dict) -> None:
+    """Envia aos clientes SSE as sequências em andamento após cada número"""
+    event_manager.notify_clients({
+        "type": "streak_update",
+        "roleta_id": roleta_id,
+        "sequencias": sequencias,
+        "timestamp": datetime.now().isoformat()
+    })
+
+data_source.rastreador.ao_atualizar = notificar_sequencias
+
+def notificar_alerta_aleatoriedade(roleta_id: str, alerta: dict) -> None:
+    """Envia aos clientes SSE os alertas do monitor de aleatoriedade (início e fim)"""
+    logger.warning(f"Alerta de aleatoriedade na roleta {roleta_id}: {alerta['alerta']} {alerta['estado']}")
+    event_manager.notify_clients({
+        "type": "randomness_alert",
+        "roleta_id": roleta_id,
+        **alerta,
+        "timestamp": datetime.now().isoformat()
+    })
+
+data_source.monitor.ao_alertar = notificar_alerta_aleatoriedade
+
+def consumidor_alteracoes_ativo() -> bool:
+    """Indica se os eventos SSE estão sendo gerados pelo consumidor (change stream ou consulta)"""
+    return consumidor_alteracoes is not None and consumidor_alteracoes.ativo
 
 @app.route('/api/status')
 def api_status():
@@ -43,7 +81,10 @@ def api_status():
     return jsonify({
         "status": "online",
         "version": API_VERSION,
-        "timestamp": datetime.now().isoformat()
+        "timestamp": datetime.now().isoformat(),
+        "cache": data_source.estatisticas_cache(),
+        "change_stream": consumidor_alteracoes_ativo(),
+        "consumidor_alteracoes": consumidor_alteracoes.modo if consumidor_alteracoes is not None else None
     })
 
 @app.route('/api/roletas', methods=['GET'])
@@ -160,6 +201,324 @@ def get_roulette_numbers(roulette_id):
     print(f"[API] Formatted response for '{roulette['nome']}': {len(numbers)} numbers")
     return jsonify(response)
 
+@app.route('/api/roletas/<roleta_id>/resumo', methods=['GET'])
+def get_roleta_resumo(roleta_id):
+    """Retorna o resumo da roleta (últimos números, contadores do dia, sequências e estratégia) em uma leitura"""
+    try:
+        resumo = obter_resumo(data_source.db, roleta_id)
+        if not resumo:
+            return jsonify({'error': 'Roleta não encontrada'}), 404
+        return jsonify(resumo)
+    except Exception as e:
+        logger.error(f"Erro ao obter resumo da roleta: {str(e)}")
+        return jsonify({'error': f'Erro ao obter resumo da roleta: {str(e)}'}), 500
+
+@app.route('/api/roulettes/<roulette_id>/summary', methods=['GET'])
+def get_roulette_summary(roulette_id):
+    """Returns the roulette summary (latest numbers, daily counters, streaks and strategy) in one read"""
+    try:
+        summary = obter_resumo(data_source.db, roulette_id)
+        if not summary:
+            return jsonify({'error': 'Roulette not found'}), 404
+        return jsonify(summary)
+    except Exception as e:
+        logger.error(f"Error getting roulette summary: {str(e)}")
+        return jsonify({'error': f'Error getting roulette summary: {str(e)}'}), 500
+
+@app.route('/api/roletas/<roleta_id>/sequencias-atuais', methods=['GET'])
+def get_roleta_sequencias_atuais(roleta_id):
+    """Retorna as sequências em andamento da roleta (cor, paridade, dúzia, coluna, metade e setor da roda), mantidas em memória"""
+    sequencias = data_source.obter_sequencias_atuais(roleta_id)
+    if sequencias is None:
+        return jsonify({'error': 'Roleta não encontrada'}), 404
+    return jsonify({"roleta_id": roleta_id, "sequencias": sequencias})
+
+@app.route('/api/roulettes/<roulette_id>/streaks', methods=['GET'])
+def get_roulette_streaks(roulette_id):
+    """Returns the current streaks of the roulette (colour, parity, dozen, column, half and wheel sector), kept in memory"""
+    streaks = data_source.obter_sequencias_atuais(roulette_id)
+    if streaks is None:
+        return jsonify({'error': 'Roulette not found'}), 404
+    return jsonify({"roulette_id": roulette_id, "streaks": streaks})
+
+@app.route('/api/roletas/<roleta_id>/quentes-frios', methods=['GET'])
+def get_roleta_quentes_frios(roleta_id):
+    """Retorna os números quentes e frios das últimas 50/100/500 jogadas, mantidos em memória"""
+    try:
+        quantidade = int(request.args.get('quantidade', 5))
+    except ValueError:
+        return jsonify({'error': 'Parâmetro quantidade inválido'}), 400
+    janelas = data_source.obter_quentes_frios(roleta_id, quantidade)
+    if janelas is None:
+        return jsonify({'error': 'Roleta não encontrada'}), 404
+    return jsonify({"roleta_id": roleta_id, "janelas": janelas})
+
+@app.route('/api/roulettes/<roulette_id>/hot-cold', methods=['GET'])
+def get_roulette_hot_cold(roulette_id):
+    """Returns the hot and cold numbers of the last 50/100/500 spins, kept in memory"""
+    try:
+        count = int(request.args.get('quantidade', 5))
+    except ValueError:
+        return jsonify({'error': 'Invalid quantidade parameter'}), 400
+    windows = data_source.obter_quentes_frios(roulette_id, count)
+    if windows is None:
+        return jsonify({'error': 'Roulette not found'}), 404
+    return jsonify({"roulette_id": roulette_id, "windows": windows})
+
+def casas_da_requisicao():
+    """Lê o parâmetro `casas` (ex.: '1,2,3') das quantidades de vizinhos na roda"""
+    return tuple(int(n) for n in request.args.get('casas', '1,2,3,4').split(',') if n.strip())
+
+@app.route('/api/roletas/<roleta_id>/roda', methods=['GET'])
+def get_roleta_roda(roleta_id):
+    """Retorna setores da roda (voisins/tiers/orphelins), distâncias entre giros e acertos de vizinhos das últimas jogadas"""
+    try:
+        casas = casas_da_requisicao()
+    except ValueError:
+        return jsonify({'error': 'Parâmetro casas inválido'}), 400
+    janelas = data_source.obter_roda(roleta_id, casas)
+    if janelas is None:
+        return jsonify({'error': 'Roleta não encontrada'}), 404
+    return jsonify({"roleta_id": roleta_id, "janelas": janelas})
+
+@app.route('/api/roulettes/<roulette_id>/wheel', methods=['GET'])
+def get_roulette_wheel(roulette_id):
+    """Returns wheel sectors (voisins/tiers/orphelins), distances between spins and neighbour hits of the last spins"""
+    try:
+        neighbours = casas_da_requisicao()
+    except ValueError:
+        return jsonify({'error': 'Invalid casas parameter'}), 400
+    windows = data_source.obter_roda(roulette_id, neighbours)
+    if windows is None:
+        return jsonify({'error': 'Roulette not found'}), 404
+    return jsonify({"roulette_id": roulette_id, "windows": windows})
+
+def numeros_da_requisicao():
+    """Lê `numero` e `anterior` (0 a 36, opcionais) da query string"""
+    numeros = []
+    for parametro in ('numero', 'anterior'):
+        valor = request.args.get(parametro)
+        numero = int(valor) if valor not in (None, '') else None
+        if numero is not None and not 0 <= numero <= 36:
+            raise ValueError(parametro)
+        numeros.append(numero)
+    return numeros
+
+@app.route('/api/roletas/<roleta_id>/transicoes', methods=['GET'])
+def get_roleta_transicoes(roleta_id):
+    """Retorna a matriz de transição 37×37 da roleta (o que saiu depois de cada número), mantida em memória"""
+    try:
+        numero, anterior = numeros_da_requisicao()
+    except ValueError:
+        return jsonify({'error': 'Parâmetros numero/anterior devem estar entre 0 e 36'}), 400
+    transicoes = data_source.obter_transicoes(roleta_id, numero, anterior)
+    if transicoes is None and data_source.matrizes.carregando(roleta_id):
+        return jsonify({'error': 'Matriz de transição em carregamento'}), 503
+    if transicoes is None:
+        return jsonify({'error': 'Roleta não encontrada'}), 404
+    if 'erro' in transicoes:
+        return jsonify({'error': transicoes['erro']}), 400
+    return jsonify({"roleta_id": roleta_id, "transicoes": transicoes})
+
+@app.route('/api/roulettes/<roulette_id>/transitions', methods=['GET'])
+def get_roulette_transitions(roulette_id):
+    """Returns the roulette's 37×37 transition matrix (what followed each number), kept in memory"""
+    try:
+        number, previous = numeros_da_requisicao()
+    except ValueError:
+        return jsonify({'error': 'numero/anterior parameters must be between 0 and 36'}), 400
+    transitions = data_source.obter_transicoes(roulette_id, number, previous)
+    if transitions is None and data_source.matrizes.carregando(roulette_id):
+        return jsonify({'error': 'Transition matrix is loading'}), 503
+    if transitions is None:
+        return jsonify({'error': 'Roulette not found'}), 404
+    if 'erro' in transitions:
+        return jsonify({'error': transitions['erro']}), 400
+    return jsonify({"roulette_id": roulette_id, "transitions": transitions})
+
+@app.route('/api/roletas/<roleta_id>/aleatoriedade', methods=['GET'])
+def get_roleta_aleatoriedade(roleta_id):
+    """Retorna os indicadores do monitor de aleatoriedade (qui-quadrado, sequências de cor/paridade e deriva)"""
+    indicadores = data_source.obter_aleatoriedade(roleta_id)
+    if indicadores is None:
+        return jsonify({'error': 'Roleta não encontrada'}), 404
+    return jsonify({"roleta_id": roleta_id, "indicadores": indicadores})
+
+@app.route('/api/roulettes/<roulette_id>/randomness', methods=['GET'])
+def get_roulette_randomness(roulette_id):
+    """Returns the randomness monitor indicators (chi-square, colour/parity runs test and drift)"""
+    indicators = data_source.obter_aleatoriedade(roulette_id)
+    if indicators is None:
+        return jsonify({'error': 'Roulette not found'}), 404
+    return jsonify({"roulette_id": roulette_id, "indicators": indicators})
+
+def intervalo_da_requisicao(dias_padrao: int = 30):
+    """Lê `inicio` e `fim` (YYYY-MM-DD ou ISO) da query string; um fim só com a data inclui o dia"""
+    fim_texto = request.args.get('fim')
+    inicio_texto = request.args.get('inicio')
+    fim = datetime.fromisoformat(fim_texto) if fim_texto else datetime.now()
+    if fim_texto and len(fim_texto) == 10:
+        fim += timedelta(days=1)
+    inicio = datetime.fromisoformat(inicio_texto) if inicio_texto else fim - timedelta(days=dias_padrao)
+    return inicio, fim
+
+@app.route('/api/roletas/<roleta_id>/estatisticas-intervalo', methods=['GET'])
+def get_roleta_estatisticas_intervalo(roleta_id):
+    """Estatísticas de um intervalo (padrão: últimos 30 dias): frequências, distribuições, sequências e quentes/frios"""
+    try:
+        inicio, fim = intervalo_da_requisicao()
+        quantidade = int(request.args.get('quantidade', 5))
+    except ValueError:
+        return jsonify({'error': 'Parâmetros inválidos: use inicio/fim no formato YYYY-MM-DD'}), 400
+    
+    estatisticas = calcular_intervalo(data_source.db, roleta_id, inicio, fim, quantidade)
+    if 'erro' in estatisticas:
+        return jsonify({'error': estatisticas['erro']}), 500
+    return jsonify(estatisticas)
+
+@app.route('/api/roulettes/<roulette_id>/range-stats', methods=['GET'])
+def get_roulette_range_stats(roulette_id):
+    """Statistics for a date range (default: last 30 days): frequencies, distributions, streaks and hot/cold numbers"""
+    try:
+        start, end = intervalo_da_requisicao()
+        count = int(request.args.get('quantidade', 5))
+    except ValueError:
+        return jsonify({'error': 'Invalid parameters: use inicio/fim as YYYY-MM-DD'}), 400
+    
+    stats = calcular_intervalo(data_source.db, roulette_id, start, end, count)
+    if 'erro' in stats:
+        return jsonify({'error': stats['erro']}), 500
+    return jsonify(stats)
+
+@app.route('/api/roletas/<roleta_id>/estatisticas-periodo', methods=['GET'])
+def get_roleta_estatisticas_periodo(roleta_id):
+    """Frequências e distribuições de um intervalo (padrão: últimos 7 dias) somando os agregados por hora/dia/semana"""
+    try:
+        inicio, fim = intervalo_da_requisicao(dias_padrao=7)
+    except ValueError:
+        return jsonify({'error': 'Parâmetros inválidos: use inicio/fim no formato YYYY-MM-DD'}), 400
+    
+    estatisticas = estatisticas_periodo(data_source.db, roleta_id, inicio, fim)
+    if 'erro' in estatisticas:
+        return jsonify({'error': estatisticas['erro']}), 500
+    return jsonify(estatisticas)
+
+@app.route('/api/roulettes/<roulette_id>/period-stats', methods=['GET'])
+def get_roulette_period_stats(roulette_id):
+    """Frequencies and distributions for a date range (default: last 7 days) summed from hourly/daily/weekly rollups"""
+    try:
+        start, end = intervalo_da_requisicao(dias_padrao=7)
+    except ValueError:
+        return jsonify({'error': 'Invalid parameters: use inicio/fim as YYYY-MM-DD'}), 400
+    
+    stats = estatisticas_periodo(data_source.db, roulette_id, start, end)
+    if 'erro' in stats:
+        return jsonify({'error': stats['erro']}), 500
+    return jsonify(stats)
+
+@app.route('/api/estatisticas/globais', methods=['GET'])
+def get_estatisticas_globais():
+    """Estatísticas de cada roleta e do conjunto num intervalo (padrão: último dia), com uma única agregação"""
+    try:
+        inicio, fim = intervalo_da_requisicao(dias_padrao=1)
+    except ValueError:
+        return jsonify({'error': 'Parâmetros inválidos: use inicio/fim no formato YYYY-MM-DD'}), 400
+    
+    roleta_ids = request.args.getlist('roleta_id') or None
+    estatisticas = calcular_estatisticas_globais(data_source.db, inicio, fim, roleta_ids)
+    if 'erro' in estatisticas:
+        return jsonify({'error': estatisticas['erro']}), 500
+    return jsonify(estatisticas)
+
+@app.route('/api/statistics/global', methods=['GET'])
+def get_global_statistics():
+    """Statistics for every roulette and overall for a date range (default: last day), in a single aggregation"""
+    try:
+        start, end = intervalo_da_requisicao(dias_padrao=1)
+    except ValueError:
+        return jsonify({'error': 'Invalid parameters: use inicio/fim as YYYY-MM-DD'}), 400
+    
+    roulette_ids = request.args.getlist('roleta_id') or None
+    stats = calcular_estatisticas_globais(data_source.db, start, end, roulette_ids)
+    if 'erro' in stats:
+        return jsonify({'error': stats['erro']}), 500
+    return jsonify(stats)
+
+# Páginas de sequências já consultadas: (roleta_id, parâmetros) -> (instante, resultado)
+cache_sequencias = {}
+cache_sequencias_lock = threading.Lock()
+CACHE_SEQUENCIAS_MAXIMO = 1000
+
+def consultar_sequencias(roleta_id: str):
+    """
+    Lê os filtros de sequências da query string e consulta a fonte de dados, com cache de
+    SEQUENCIAS_CACHE_SEGUNDOS; a resposta leva ETag e responde 304 a If-None-Match
+    
+    Raises:
+        ValueError: Se algum parâmetro for inválido
+    """
+    chave = (roleta_id, tuple(sorted(request.args.items(multi=True))))
+    agora = time.time()
+    with cache_sequencias_lock:
+        em_cache = cache_sequencias.get(chave)
+    
+    if em_cache is not None and agora - em_cache[0] < SEQUENCIAS_CACHE_SEGUNDOS:
+        resultado = em_cache[1]
+    else:
+        inicio = request.args.get('inicio')
+        fim = request.args.get('fim')
+        cursor = request.args.get('cursor')
+        comprimento_minimo = request.args.get('comprimento_minimo')
+        resultado = data_source.obter_sequencias(
+            roleta_id,
+            tipo=request.args.get('tipo'),
+            valor=request.args.get('valor'),
+            comprimento_minimo=int(comprimento_minimo) if comprimento_minimo else None,
+            inicio=datetime.fromisoformat(inicio) if inicio else None,
+            fim=datetime.fromisoformat(fim) if fim else None,
+            limite=max(1, min(int(request.args.get('limite', 50)), 500)),
+            apos=decodificar_cursor_sequencias(cursor) if cursor else None
+        )
+        if 'erro' not in resultado:
+            with cache_sequencias_lock:
+                if len(cache_sequencias) >= CACHE_SEQUENCIAS_MAXIMO:
+                    cache_sequencias.clear()
+                cache_sequencias[chave] = (agora, resultado)
+    
+    return resultado
+
+def resposta_com_etag(dados: dict):
+    """Resposta JSON com ETag e max-age; devolve 304 quando o cliente já tem a mesma versão"""
+    resposta = jsonify(dados)
+    resposta.add_etag()
+    resposta.cache_control.max_age = SEQUENCIAS_CACHE_SEGUNDOS
+    return resposta.make_conditional(request)
+
+@app.route('/api/roletas/<roleta_id>/sequencias', methods=['GET'])
+def get_roleta_sequencias(roleta_id):
+    """Sequências encerradas da roleta, filtradas por tipo, valor, comprimento mínimo e período, paginadas por cursor"""
+    try:
+        resultado = consultar_sequencias(roleta_id)
+    except ValueError as e:
+        return jsonify({'error': f'Parâmetros inválidos: {str(e)}'}), 400
+    
+    if 'erro' in resultado:
+        return jsonify({'error': resultado['erro']}), 500
+    return resposta_com_etag({"roleta_id": roleta_id, **resultado})
+
+@app.route('/api/roulettes/<roulette_id>/sequences', methods=['GET'])
+def get_roulette_sequences(roulette_id):
+    """Closed streaks of the roulette filtered by type, value, minimum length and period, with cursor pagination"""
+    try:
+        result = consultar_sequencias(roulette_id)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameters: {str(e)}'}), 400
+    
+    if 'erro' in result:
+        return jsonify({'error': result['erro']}), 500
+    return resposta_com_etag({"roulette_id": roulette_id, "sequences": result['sequencias'],
+                              "next_cursor": result['proximo_cursor']})
+
 @app.route('/api/roletas/<roleta_id>/numeros', methods=['POST'])
 def add_roleta_numero(roleta_id):
     """Adiciona um novo número para uma roleta específica"""
@@ -194,15 +553,16 @@ def add_roleta_numero(roleta_id):
     sucesso = data_source.inserir_numero(roleta_id, roleta['nome'], numero, cor, timestamp)
     
     if sucesso:
-        # Notificar clientes SSE sobre o novo número
-        event_manager.notify_clients({
-            "type": "new_number",
-            "roleta_id": roleta_id,
-            "roleta_nome": roleta['nome'],
-            "numero": numero,
-            "cor": cor,
-            "timestamp": timestamp
-        })
+        # Notificar clientes SSE sobre o novo número (o change stream já o faz quando ativo)
+        if not consumidor_alteracoes_ativo():
+            event_manager.notify_clients({
+                "type": "new_number",
+                "roleta_id": roleta_id,
+                "roleta_nome": roleta['nome'],
+                "numero": numero,
+                "cor": cor,
+                "timestamp": timestamp
+            })
         
         return jsonify({
             "success": True,
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Spool local (write-ahead) de números para quando o MongoDB não está disponível
+
+Quando uma gravação falha por indisponibilidade do banco, o circuito abre: os números
+passam a ser anexados a segmentos JSONL em disco (spool-*.jsonl), com fsync em lote,
+e a ingestão segue sem esperar o banco. Uma thread de drenagem testa o banco
+periodicamente e, quando ele volta, regrava os segmentos em lote e os remove. O
+circuito só fecha quando o spool está vazio, preservando a ordem dos números por roleta.
+
+A regravação é idempotente: números cujo (número, timestamp) já estão no banco são
+descartados, então uma drenagem interrompida pode simplesmente ser repetida.
+
+Vários processos (scraper, API) podem usar o mesmo SPOOL_DIR: cada um mantém uma trava
+exclusiva (flock; msvcrt no Windows) no segmento em que está escrevendo, e a drenagem só
+lê e remove segmentos que consegue travar, ou seja, os fechados e os de processos que já
+terminaram. Números que o banco recusa por outro motivo que não a conexão vão para
+rejeitados-*.jsonl, no mesmo formato; renomeados para spool-*.jsonl, são drenados de novo.
+"""
+
+import os
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Any, Optional, IO
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+from pymongo.errors import ConnectionFailure
+
+from config import logger, SPOOL_DIR, SPOOL_FSYNC_MS
+
+# Linhas por segmento antes de abrir um novo
+LINHAS_POR_SEGMENTO = 10000
+
+# Números regravados por chamada a inserir_numeros durante a drenagem
+LOTE_DRENAGEM = 500
+
+# Intervalo entre tentativas de drenagem (segundos)
+INTERVALO_DRENAGEM = 2.0
+
+# Últimos números enfileirados mantidos por roleta, para detectar releituras
+RECENTES_POR_ROLETA = 10
+
+def _travar(arquivo: IO, esperar: bool = False) -> bool:
+    """
+    Trava o arquivo para este processo (a trava é liberada ao fechá-lo)
+
+    Returns:
+        bool: False se outro processo já tem a trava e `esperar` é False
+    """
+    try:
+        if fcntl is not None:
+            fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX | (0 if esperar else fcntl.LOCK_NB))
+        else:
+            # O primeiro byte, o mesmo para quem escreve e para quem drena
+            arquivo.seek(0)
+            msvcrt.locking(arquivo.fileno(), msvcrt.LK_LOCK if esperar else msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+def _ate_milissegundo(valor: Any) -> Optional[str]:
+    """Normaliza um timestamp para ISO com precisão de milissegundos (a do MongoDB)"""
+    if isinstance(valor, str):
+        try:
+            valor = datetime.fromisoformat(valor)
+        except ValueError:
+            return None
+    if not isinstance(valor, datetime):
+        return None
+    return valor.replace(microsecond=valor.microsecond // 1000 * 1000, tzinfo=None).isoformat()
+
+class SpoolLocal:
+    """Fila durável em disco, com disjuntor e drenagem em segundo plano"""
+
+    def __init__(self, diretorio: str = SPOOL_DIR, fsync_ms: int = SPOOL_FSYNC_MS):
+        """
+        Args:
+            diretorio (str, optional): Diretório dos segmentos
+            fsync_ms (int, optional): Intervalo máximo entre fsyncs, em milissegundos
+        """
+        self.diretorio = diretorio
+        self.intervalo_fsync = fsync_ms / 1000.0
+        os.makedirs(diretorio, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._arquivo = None
+        self._linhas_segmento = 0
+        self._sujo = False
+        self._aberto = False
+        self._ultimos: Dict[str, deque] = {}
+        self._parar = threading.Event()
+        self._thread = None
+        self.enfileirados = 0
+        self.drenados = 0
+        self.rejeitados = 0
+
+        # Segmentos de uma execução anterior ainda não drenados (os de outros processos
+        # ativos estão travados e ficam com eles)
+        for segmento in self._segmentos():
+            arquivo = self._reservar(segmento)
+            if arquivo is not None:
+                with arquivo:
+                    for item in self._ler_segmento(arquivo):
+                        self._lembrar(item)
+        if self._ultimos:
+            logger.warning(f"Spool local com números pendentes em {diretorio}; drenagem pendente")
+
+    def _segmentos(self) -> List[str]:
+        atual = self._arquivo.name if self._arquivo is not None else None
+        return sorted(caminho for caminho in (os.path.join(self.diretorio, nome) for nome in os.listdir(self.diretorio)
+                                              if nome.startswith('spool-') and nome.endswith('.jsonl'))
+                      if caminho != atual)
+
+    @contextmanager
+    def _trava_diretorio(self):
+        """Serializa a criação de segmentos com a reserva deles pela drenagem, entre processos"""
+        with open(os.path.join(self.diretorio, 'spool.lock'), 'a') as trava:
+            _travar(trava, esperar=True)
+            yield
+
+    def _reservar(self, segmento: str) -> Optional[IO]:
+        """
+        Abre e trava um segmento que nenhum outro processo está escrevendo ou drenando
+
+        Returns:
+            Optional[IO]: Arquivo aberto e travado, ou None se o segmento está em uso ou já foi removido
+        """
+        with self._trava_diretorio():
+            try:
+                arquivo = open(segmento, 'r', encoding='utf-8')
+            except FileNotFoundError:
+                return None
+            if not _travar(arquivo):
+                arquivo.close()
+                return None
+        if os.fstat(arquivo.fileno()).st_nlink == 0:
+            # Outra drenagem terminou e removeu o segmento enquanto esta esperava
+            arquivo.close()
+            return None
+        return arquivo
+
+    def _segmentos_livres(self) -> bool:
+        """Indica se há segmentos que este processo pode drenar"""
+        for segmento in self._segmentos():
+            arquivo = self._reservar(segmento)
+            if arquivo is not None:
+                arquivo.close()
+                return True
+        return False
+
+    @staticmethod
+    def _ler_segmento(arquivo: IO):
+        for linha in arquivo:
+            try:
+                yield json.loads(linha)
+            except ValueError:
+                # Última linha incompleta de uma queda durante a escrita
+                continue
+
+    @staticmethod
+    def _remover(arquivo: IO, segmento: str) -> None:
+        """Remove um segmento reservado, ainda travado (no Windows só depois de fechá-lo)"""
+        try:
+            os.remove(segmento)
+        except PermissionError:
+            arquivo.close()
+            os.remove(segmento)
+        finally:
+            arquivo.close()
+
+    def ativo(self) -> bool:
+        """Indica se as gravações devem ir para o spool (circuito aberto ou números pendentes)"""
+        with self._lock:
+            return self._aberto or self._arquivo is not None or bool(self._ultimos)
+
+    def abrir_circuito(self, motivo: str = "") -> None:
+        """Passa a desviar as gravações para o spool"""
+        with self._lock:
+            if not self._aberto:
+                logger.warning(f"MongoDB indisponível, gravando números no spool local: {motivo}")
+            self._aberto = True
+
+    def _lembrar(self, item: Dict[str, Any]) -> None:
+        recentes = self._ultimos.setdefault(item['roleta_id'], deque(maxlen=RECENTES_POR_ROLETA))
+        timestamp = item.get('timestamp')
+        try:
+            timestamp = datetime.fromisoformat(timestamp) if isinstance(timestamp, str) else timestamp
+        except ValueError:
+            timestamp = None
+        recentes.appendleft({'numero': item['numero'], 'timestamp': timestamp})
+
+    def ultimo_numero(self, roleta_id: str) -> Optional[int]:
+        """Último número enfileirado para uma roleta, se houver números pendentes"""
+        with self._lock:
+            recentes = self._ultimos.get(roleta_id)
+            return recentes[0]['numero'] if recentes else None
+
+    def recentes(self, roleta_id: str) -> List[Dict[str, Any]]:
+        """Últimos números pendentes de uma roleta (numero e timestamp), do mais recente para o mais antigo"""
+        with self._lock:
+            return list(self._ultimos.get(roleta_id, ()))
+
+    def adicionar(self, item: Dict[str, Any]) -> None:
+        """
+        Anexa um número ao segmento atual (fsync em até SPOOL_FSYNC_MS)
+
+        Args:
+            item (Dict[str, Any]): roleta_id, roleta_nome, numero, cor, timestamp (ISO) e,
+                opcionalmente, historico (números visíveis na página)
+        """
+        linha = json.dumps(item, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._arquivo is None or self._linhas_segmento >= LINHAS_POR_SEGMENTO:
+                self._rotacionar()
+            self._arquivo.write(linha)
+            self._arquivo.flush()
+            self._linhas_segmento += 1
+            self._sujo = True
+            self._lembrar(item)
+            self.enfileirados += 1
+
+    def _rotacionar(self) -> None:
+        """Fecha o segmento atual (com fsync) e abre um novo; chamado com o lock"""
+        self._fechar_segmento()
+        nome = f"spool-{datetime.now().strftime('%Y%m%d%H%M%S%f')}-{os.getpid()}.jsonl"
+        # Travado antes que uma drenagem de outro processo possa reservá-lo
+        with self._trava_diretorio():
+            self._arquivo = open(os.path.join(self.diretorio, nome), 'a', encoding='utf-8')
+            _travar(self._arquivo, esperar=True)
+        self._linhas_segmento = 0
+
+    def _fechar_segmento(self) -> None:
+        if self._arquivo is not None:
+            self._arquivo.flush()
+            os.fsync(self._arquivo.fileno())
+            self._arquivo.close()
+            self._arquivo = None
+            self._sujo = False
+
+    def sincronizar(self) -> None:
+        """Garante em disco tudo o que foi anexado"""
+        with self._lock:
+            if self._sujo and self._arquivo is not None:
+                os.fsync(self._arquivo.fileno())
+                self._sujo = False
+
+    def drenar(self, destino) -> int:
+        """
+        Regrava no destino o segmento atual e os segmentos fechados que ninguém está usando
+
+        Args:
+            destino: Fonte de dados com `inserir_numeros` e `obter_numeros_recentes`
+
+        Returns:
+            int: Quantidade de números regravados
+
+        Raises:
+            ConnectionFailure: Se o banco ficar indisponível durante a drenagem
+        """
+        with self._lock:
+            self._fechar_segmento()
+            segmentos = self._segmentos()
+
+        total = 0
+        for segmento in segmentos:
+            arquivo = self._reservar(segmento)
+            if arquivo is None:
+                # Segmento atual de outro processo, ou já sendo drenado por outro
+                continue
+            try:
+                lote = []
+                for item in self._ler_segmento(arquivo):
+                    lote.append(item)
+                    if len(lote) >= LOTE_DRENAGEM:
+                        total += self._regravar(destino, lote)
+                        lote = []
+                if lote:
+                    total += self._regravar(destino, lote)
+            except BaseException:
+                arquivo.close()
+                raise
+            self._remover(arquivo, segmento)
+
+        # Fechar o circuito só se nada chegou durante a drenagem
+        with self._lock:
+            if self._arquivo is None and not self._segmentos_livres():
+                self._ultimos.clear()
+                self._aberto = False
+                if total:
+                    logger.info(f"Spool local drenado: {total} números regravados no MongoDB")
+
+        self.drenados += total
+        return total
+
+    def _regravar(self, destino, itens: List[Dict[str, Any]]) -> int:
+        """Regrava um lote, descartando números que já estão no banco e rejeitando os recusados"""
+        por_roleta: Dict[str, List[Dict[str, Any]]] = {}
+        for item in itens:
+            por_roleta.setdefault(item['roleta_id'], []).append(item)
+
+        pendentes = []
+        for roleta_id, itens_roleta in por_roleta.items():
+            existentes = {
+                (doc.get('numero'), _ate_milissegundo(doc.get('timestamp')))
+                for doc in destino.obter_numeros_recentes(roleta_id, limite=len(itens_roleta) + LOTE_DRENAGEM)
+            }
+            pendentes.extend(item for item in itens_roleta
+                             if (item['numero'], _ate_milissegundo(item.get('timestamp'))) not in existentes)
+
+        if not pendentes:
+            return 0
+        falhas: List[Dict[str, Any]] = []
+        inseridos = destino.inserir_numeros(pendentes, falhas=falhas)
+        if falhas:
+            self._rejeitar(falhas)
+        return inseridos
+
+    def _rejeitar(self, itens: List[Dict[str, Any]]) -> None:
+        """Guarda em rejeitados-*.jsonl os números que o banco recusou, para não perdê-los com o segmento"""
+        caminho = os.path.join(self.diretorio, f"rejeitados-{datetime.now().strftime('%Y%m%d')}.jsonl")
+        with open(caminho, 'a', encoding='utf-8') as arquivo:
+            for item in itens:
+                arquivo.write(json.dumps(item, ensure_ascii=False) + "\n")
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        self.rejeitados += len(itens)
+        logger.error(f"{len(itens)} números do spool local recusados pelo banco, guardados em {caminho}")
+
+    def iniciar_drenagem(self, destino) -> 'SpoolLocal':
+        """
+        Inicia a thread que faz os fsyncs em lote e drena o spool quando o banco responde
+
+        Args:
+            destino: Fonte de dados com `disponivel`, `inserir_numeros` e `obter_numeros_recentes`
+        """
+        def executar():
+            proxima_drenagem = 0.0
+            while not self._parar.wait(self.intervalo_fsync):
+                self.sincronizar()
+                if time.time() < proxima_drenagem or not self.ativo():
+                    continue
+                proxima_drenagem = time.time() + INTERVALO_DRENAGEM
+                if not destino.disponivel():
+                    continue
+                try:
+                    self.drenar(destino)
+                except ConnectionFailure as e:
+                    self.abrir_circuito(str(e))
+                except Exception as e:
+                    logger.error(f"Erro ao drenar spool local: {str(e)}")
+
+        self._thread = threading.Thread(target=executar, name="spool-local", daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self) -> None:
+        """Interrompe a drenagem e fecha o segmento atual, liberando-o para outros processos"""
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(INTERVALO_DRENAGEM + 1)
+        with self._lock:
+            self._fechar_segmento()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Estado do spool para monitoramento"""
+        with self._lock:
+            return {
+                "circuito_aberto": self._aberto,
+                "roletas_pendentes": len(self._ultimos),
+                "enfileirados": self.enfileirados,
+                "drenados": self.drenados,
+                "rejeitados": self.rejeitados
+            }
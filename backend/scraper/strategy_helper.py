@@ -5,13 +5,13 @@
 Funções auxiliares para a integração da estratégia com o MongoDB
 """
 
-import os
 import logging
-import pymongo
 from datetime import datetime
 import json
 from typing import List, Dict, Any, Optional
 
+from persistencia_estrategia import obter_persistencia
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO, 
                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -28,6 +28,7 @@ def atualizar_estrategia(
 ) -> bool:
     """
     Função simplificada para atualizar dados de estratégia no MongoDB
+    (gravação em lote via persistencia_estrategia, em até ESTRATEGIA_JANELA_SEGUNDOS)
     
     Args:
         roleta_id: ID da roleta (string)
@@ -42,13 +43,6 @@ def atualizar_estrategia(
         bool: True se atualizado com sucesso, False caso contrário
     """
     try:
-        # Conectar ao MongoDB
-        mongodb_uri = os.environ.get('MONGODB_URI', 'mongodb://localhost:27017/runcash')
-        db_name = os.environ.get('MONGODB_DB_NAME', 'runcash')
-        
-        client = pymongo.MongoClient(mongodb_uri, serverSelectionTimeoutMS=5000)
-        db = client[db_name]
-        
         # Garantir que os tipos de dados estão corretos
         roleta_nome_str = str(roleta_nome) if roleta_nome is not None else "Roleta Desconhecida"
         estado_str = str(estado) if estado is not None else "NEUTRAL"
@@ -68,31 +62,10 @@ def atualizar_estrategia(
             'nome': roleta_nome_str
         }
         
-        # Atualizar a coleção de roletas (principal)
-        logger.info(f"Atualizando roleta {roleta_nome_str} (ID: {roleta_id}) com estado: {estado_str}")
-        resultado_roleta = db.roletas.update_one(
-            {'_id': roleta_id},
-            {'$set': dados_roleta},
-            upsert=True
-        )
-        
-        # Criar documento para coleção de histórico
-        dados_historico = {
-            'roleta_id': roleta_id,
-            'roleta_nome': roleta_nome_str,
-            'estado_estrategia': estado_str,
-            'numero_gatilho': numero_gatilho_int,
-            'terminais_gatilho': terminais_list,
-            'vitorias': vitorias_int,
-            'derrotas': derrotas_int,
-            'timestamp': datetime.now().isoformat()
-        }
-        
-        # Inserir na coleção de histórico nova (que criamos sem validação)
-        logger.info(f"Salvando histórico para roleta {roleta_nome_str}")
-        resultado_historico = db.estrategia_historico_novo.insert_one(dados_historico)
-        
-        return bool(resultado_roleta.acknowledged)
+        # O estado é gravado em lote pela persistência compartilhada, que também
+        # registra o histórico apenas quando a máquina de estados muda
+        logger.debug(f"Atualizando roleta {roleta_nome_str} (ID: {roleta_id}) com estado: {estado_str}")
+        return obter_persistencia().registrar(roleta_id, roleta_nome_str, dados_roleta)
     
     except Exception as e:
         logger.error(f"Erro ao atualizar estratégia: {str(e)}")
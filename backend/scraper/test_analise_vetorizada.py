@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script para testar o motor vetorizado contra a detecção de sequências de analytics (não requer MongoDB)
+"""
+
+import sys
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from analytics import sequencias_fechadas
+from analise_vetorizada import DIMENSOES_VETORIZADAS, Historico, codificar_execucoes, distribuicoes, estatisticas_intervalo, quentes_frios
+
+def test_analise_vetorizada():
+    """
+    Verifica frequências, distribuições e que as sequências encerradas (>= 3) são as mesmas de analytics
+    """
+    gerador = random.Random(7)
+    lista = [gerador.choice([0] * 4 + list(range(37))) for _ in range(2000)]
+    numeros = np.array(lista, dtype=np.uint8)
+
+    inicio = datetime(2024, 1, 1)
+    documentos = [{'numero': n, 'timestamp': inicio + timedelta(seconds=i)} for i, n in enumerate(lista)]
+    esperadas = Counter((s['tipo'], s['valor'], s['comprimento']) for s in sequencias_fechadas('r1', documentos))
+
+    obtidas = Counter()
+    for tipo in ('cor', 'paridade', 'duzia', 'coluna', 'metade'):
+        nomes = DIMENSOES_VETORIZADAS[tipo][1]
+        _, comprimentos, valores = codificar_execucoes(numeros, tipo)
+        # A última sequência ainda está em andamento
+        for comprimento, valor in zip(comprimentos[:-1], valores[:-1]):
+            if comprimento >= 3:
+                obtidas[(tipo, nomes[valor], int(comprimento))] += 1
+    assert obtidas == esperadas, "sequências diferentes de analytics.sequencias_fechadas"
+
+    assert distribuicoes(numeros)['cor']['verde'] == lista.count(0)
+
+    historico = Historico('r1', numeros, np.arange(len(lista), dtype=np.int64) * 1000)
+    estatisticas = estatisticas_intervalo(historico)
+    assert estatisticas['frequencias'] == [lista.count(n) for n in range(37)]
+    assert estatisticas['quentes'][0]['contagem'] == max(estatisticas['frequencias'])
+
+    atrasados = quentes_frios(np.array([1, 2, 3, 1], dtype=np.uint8), quantidade=2)['atrasados']
+    assert atrasados[0] == {'numero': 0, 'giros': 4} and atrasados[1]['giros'] == 4
+
+if __name__ == "__main__":
+    try:
+        test_analise_vetorizada()
+        print("Motor de análise vetorizado funcionando")
+    except AssertionError as e:
+        print(f"Falha: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script para testar o cache dos últimos números (não requer MongoDB)
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+
+from cache_numeros import CacheNumerosRecentes
+
+def test_cache_numeros():
+    """
+    Verifica as cópias devolvidas pelo cache e a validade do seu conteúdo
+    """
+    inicio = datetime(2024, 1, 1, 12)
+    documentos = [{'_id': i, 'numero': i, 'sequencia': i, 'timestamp': inicio + timedelta(seconds=i)}
+                  for i in range(5, 0, -1)]
+
+    cache = CacheNumerosRecentes(profundidade=10, validade=0.05)
+    cache.carregar('r1', documentos)
+
+    # Alterar o que foi carregado, lido ou adicionado não altera o cache
+    documentos[0]['numero'] = 36
+    lidos = cache.obter('r1', 3)
+    lidos[0]['numero'] = 36
+    assert [documento['numero'] for documento in cache.obter('r1', 5)] == [5, 4, 3, 2, 1]
+    cache.obter_por_numero('r1', 4, 0)['numero'] = 36
+    assert cache.obter_por_numero('r1', 4, 0)['numero'] == 4
+
+    novo = {'_id': 6, 'numero': 6, 'sequencia': 6, 'timestamp': inicio + timedelta(seconds=6)}
+    cache.adicionar('r1', novo)
+    novo['numero'] = 36
+    assert cache.obter('r1', 1)[0]['numero'] == 6
+
+    # Dentro da validade não há o que conferir; depois dela, o topo a comparar com o banco
+    assert cache.expirado('r1') is None
+    time.sleep(0.06)
+    assert cache.expirado('r1') == 6
+    cache.confirmar('r1')
+    assert cache.expirado('r1') is None
+    assert cache.expirado('r2') is None
+
+if __name__ == "__main__":
+    try:
+        test_cache_numeros()
+        print("Cache de números funcionando")
+    except AssertionError as e:
+        print(f"Falha: {str(e)}")
+        sys.exit(1)
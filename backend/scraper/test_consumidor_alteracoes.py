@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script para testar o consumidor de change streams contra um replica set local
+(o modo de consulta, sem replica set, é testado no mongomock se ele estiver instalado)
+
+O teste do change stream requer um MongoDB em replica set (um nó basta):
+    mongod --replSet rs0 --dbpath /tmp/rs0 --port 27017
+    mongosh --eval "rs.initiate()"
+    MONGODB_URI="mongodb://localhost:27017/?replicaSet=rs0" python test_consumidor_alteracoes.py
+"""
+
+import sys
+import time
+import uuid
+import queue
+import unittest
+from datetime import datetime
+
+from banco_teste import exigir_mongodb
+from mongo_config import conectar_mongodb, numero_para_documento
+from event_manager import EventManager
+from consumidor_alteracoes import ConsumidorAlteracoes, COLECAO_TOKENS, evento_de_alteracao
+
+def _aguardar_evento(fila, roleta_id, tipo, timeout=10):
+    """Aguarda um evento de um tipo para a roleta de teste"""
+    limite = time.time() + timeout
+    while time.time() < limite:
+        try:
+            evento = fila.get(timeout=0.5)
+        except queue.Empty:
+            continue
+        if evento.get('type') == tipo and evento.get('roleta_id') == roleta_id:
+            return evento
+    return None
+
+def test_consumidor_alteracoes():
+    """
+    Verifica que inserções e atualizações de estratégia viram eventos SSE e que
+    o consumidor retoma do token salvo, entregando o que foi gravado enquanto parado
+    """
+    exigir_mongodb()
+    client, db = conectar_mongodb()
+    roleta_id = f"teste-change-stream-{uuid.uuid4()}"
+    nome_consumidor = f"teste-{uuid.uuid4()}"
+
+    gerenciador = EventManager()
+    fila = gerenciador.register_client()
+    consumidor = ConsumidorAlteracoes(db, nome=nome_consumidor, gerenciador_eventos=gerenciador).iniciar()
+
+    try:
+        # Dar tempo para o fluxo abrir antes de escrever
+        time.sleep(2)
+        assert consumidor.ativo, "Consumidor inativo (o MongoDB é um replica set?)"
+
+        db.roleta_numeros.insert_one(numero_para_documento(roleta_id, "Roleta Teste", 17))
+        evento = _aguardar_evento(fila, roleta_id, "new_number")
+        assert evento is not None and evento['numero'] == 17, "Evento de novo número não recebido"
+
+        db.roletas.update_one(
+            {'_id': roleta_id},
+            {'$set': {'estado_estrategia': 'TRIGGER', 'numero_gatilho': 17, 'terminais_gatilho': [7, 27, 37],
+                      'vitorias': 0, 'derrotas': 0, 'nome': "Roleta Teste"}},
+            upsert=True
+        )
+        evento = _aguardar_evento(fila, roleta_id, "strategy_update")
+        assert evento is not None and evento['estado'] == 'TRIGGER', "Evento de estratégia não recebido"
+
+        # Só o placar muda: o evento sai do documento completo, com estado e nome
+        db.roletas.update_one({'_id': roleta_id}, {'$set': {'vitorias': 1}})
+        evento = _aguardar_evento(fila, roleta_id, "strategy_update")
+        assert evento is not None and evento['vitorias'] == 1, "Evento de placar não recebido"
+        assert evento['estado'] == 'TRIGGER' and evento['roleta_nome'] == "Roleta Teste"
+
+        # Parar, escrever e retomar a partir do token salvo
+        consumidor.parar()
+        db.roleta_numeros.insert_one(numero_para_documento(roleta_id, "Roleta Teste", 5, timestamp=datetime.now()))
+        consumidor = ConsumidorAlteracoes(db, nome=nome_consumidor, gerenciador_eventos=gerenciador).iniciar()
+        evento = _aguardar_evento(fila, roleta_id, "new_number")
+        assert evento is not None and evento['numero'] == 5, "Evento gravado com o consumidor parado não recebido"
+    finally:
+        consumidor.parar()
+        gerenciador.unregister_client(fila)
+        db.roleta_numeros.delete_many({'roleta_id': roleta_id})
+        db.roletas.delete_one({'_id': roleta_id})
+        db[COLECAO_TOKENS].delete_one({'_id': nome_consumidor})
+
+def test_evento_de_alteracao():
+    """
+    Atualização de estratégia que só muda o placar: os campos vêm de fullDocument (updateLookup)
+    """
+    evento = evento_de_alteracao({
+        'ns': {'coll': 'roletas'}, 'operationType': 'update', 'documentKey': {'_id': 'r1'},
+        'updateDescription': {'updatedFields': {'vitorias': 3, 'updated_at': '2024-01-01T12:00:00'}},
+        'fullDocument': {'_id': 'r1', 'nome': "Roleta Teste", 'estado_estrategia': 'TRIGGER',
+                         'numero_gatilho': 17, 'terminais_gatilho': [7, 27, 37, 4], 'vitorias': 3, 'derrotas': 1}
+    })
+    assert evento['type'] == 'strategy_update' and evento['roleta_id'] == 'r1'
+    assert evento['estado'] == 'TRIGGER' and evento['roleta_nome'] == "Roleta Teste"
+    assert evento['vitorias'] == 3 and evento['derrotas'] == 1 and evento['terminais_gatilho'] == [7, 27, 37]
+
+def test_consumidor_consulta():
+    """
+    Modo de consulta (MongoDB sem replica set), no mongomock: números gravados depois
+    da partida e estratégias atualizadas viram eventos SSE e chegam ao cache
+    """
+    try:
+        import mongomock
+    except ImportError:
+        print("mongomock não instalado; teste do modo de consulta ignorado")
+        return
+
+    import consumidor_alteracoes
+    intervalo = consumidor_alteracoes.INTERVALO_CONSULTA
+    consumidor_alteracoes.INTERVALO_CONSULTA = 0.05
+    db = mongomock.MongoClient().db
+    roleta_id = "teste-consulta"
+    for sequencia, numero in enumerate([5, 17], start=1):
+        documento = numero_para_documento(roleta_id, "Roleta Teste", numero)
+        documento['sequencia'] = sequencia
+        db.roleta_numeros.insert_one(documento)
+
+    class Fonte:
+        def __init__(self):
+            self.aplicados = []
+
+        def aplicar_numero_externo(self, documento):
+            self.aplicados.append(documento['numero'])
+
+    gerenciador = EventManager()
+    fila = gerenciador.register_client()
+    fonte = Fonte()
+    consumidor = ConsumidorAlteracoes(db, nome="teste", data_source=fonte,
+                                      gerenciador_eventos=gerenciador).iniciar(consulta=True)
+    try:
+        time.sleep(0.2)
+        assert consumidor.modo == 'consulta' and fonte.aplicados == []
+
+        for sequencia, numero in enumerate([0, 32], start=3):
+            documento = numero_para_documento(roleta_id, "Roleta Teste", numero)
+            documento['sequencia'] = sequencia
+            db.roleta_numeros.insert_one(documento)
+        assert _aguardar_evento(fila, roleta_id, "new_number", timeout=2)['numero'] == 0
+        assert _aguardar_evento(fila, roleta_id, "new_number", timeout=2)['numero'] == 32
+
+        db.roletas.insert_one({'_id': roleta_id, 'nome': "Roleta Teste", 'estado_estrategia': 'TRIGGER',
+                               'updated_at': datetime.now().isoformat()})
+        evento = _aguardar_evento(fila, roleta_id, "strategy_update", timeout=2)
+        assert evento is not None and evento['estado'] == 'TRIGGER'
+        assert fonte.aplicados == [0, 32]
+    finally:
+        consumidor.parar()
+        gerenciador.unregister_client(fila)
+        consumidor_alteracoes.INTERVALO_CONSULTA = intervalo
+
+if __name__ == "__main__":
+    try:
+        test_evento_de_alteracao()
+        test_consumidor_consulta()
+        test_consumidor_alteracoes()
+        print("Consumidor de change streams funcionando")
+    except unittest.SkipTest as e:
+        print(f"Teste ignorado: {str(e)}")
+    except AssertionError as e:
+        print(f"Falha: {str(e)}")
+        sys.exit(1)
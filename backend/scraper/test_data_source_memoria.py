@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script para testar a fonte de dados em memória e o snapshot binário (não requer MongoDB)
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+from data_source_memoria import InMemoryDataSource
+
+def test_data_source_memoria():
+    """
+    Verifica inserção idempotente, leituras e que o snapshot restaura o mesmo estado
+    """
+    fonte = InMemoryDataSource()
+    roleta_id = fonte.garantir_roleta_existe("teste-memoria", "Roleta Teste")
+
+    inicio = datetime.now().replace(microsecond=0) - timedelta(minutes=10)
+    for i, numero in enumerate([5, 17, 0, 32]):
+        assert fonte.inserir_numero(roleta_id, "Roleta Teste", numero,
+                                    timestamp=(inicio + timedelta(minutes=i)).isoformat())
+    # Releitura do mesmo sorteio (segundos depois) e repetição legítima (na rodada seguinte)
+    assert not fonte.inserir_numero(roleta_id, "Roleta Teste", 32,
+                                    timestamp=(inicio + timedelta(minutes=3, seconds=5)).isoformat())
+    assert fonte.inserir_numero(roleta_id, "Roleta Teste", 32,
+                                timestamp=(inicio + timedelta(minutes=4)).isoformat())
+    assert fonte.obter_ultimos_numeros(roleta_id, 3) == [32, 32, 0]
+    assert fonte.obter_timestamp_numero(roleta_id, 17, 0) == (inicio + timedelta(minutes=1)).isoformat()
+
+    fonte.atualizar_dados_estrategia(roleta_id, "Roleta Teste", "TRIGGER", 17, 5, [7, 27, 37], [], 1, 0, 17)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "snapshot.bin")
+        assert fonte.salvar_snapshot(caminho)
+
+        restaurada = InMemoryDataSource()
+        assert restaurada.restaurar_snapshot(caminho)
+
+    assert restaurada.obter_numeros_recentes(roleta_id, 10) == fonte.obter_numeros_recentes(roleta_id, 10)
+    assert restaurada.obter_roletas()[0]['estado_estrategia'] == "TRIGGER"
+    assert restaurada.obter_estatisticas_diarias(roleta_id)['total_numeros'] == \
+        fonte.obter_estatisticas_diarias(roleta_id)['total_numeros']
+
+if __name__ == "__main__":
+    try:
+        test_data_source_memoria()
+        print("Fonte de dados em memória funcionando")
+    except AssertionError as e:
+        print(f"Falha: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script para testar a fonte de dados SQLite (não requer MongoDB)
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+from data_source_sqlite import SqliteDataSource
+
+def test_data_source_sqlite():
+    """
+    Verifica inserção idempotente, leituras, estatísticas e estratégia na fonte SQLite
+    """
+    with tempfile.TemporaryDirectory() as diretorio:
+        fonte = SqliteDataSource(os.path.join(diretorio, "teste.db"))
+        try:
+            roleta_id = fonte.garantir_roleta_existe("teste-sqlite", "Roleta Teste")
+            assert fonte.garantir_roleta_existe("teste-sqlite", "Roleta Teste") == roleta_id
+
+            inicio = datetime.now().replace(microsecond=0) - timedelta(minutes=10)
+            for i, numero in enumerate([5, 17, 0, 32]):
+                assert fonte.inserir_numero(roleta_id, "Roleta Teste", numero,
+                                            timestamp=(inicio + timedelta(minutes=i)).isoformat())
+
+            # Releitura do último número (segundos depois) não gera nova linha
+            releitura = (inicio + timedelta(minutes=3, seconds=5)).isoformat()
+            assert not fonte.inserir_numero(roleta_id, "Roleta Teste", 32, timestamp=releitura)
+            assert fonte.obter_ultimos_numeros(roleta_id, 10) == [32, 0, 17, 5]
+
+            # Lote: o primeiro item é releitura do topo e é descartado
+            assert fonte.inserir_numeros([
+                {'roleta_id': roleta_id, 'roleta_nome': "Roleta Teste", 'numero': 32, 'timestamp': releitura},
+                {'roleta_id': roleta_id, 'roleta_nome': "Roleta Teste", 'numero': 17},
+                {'roleta_id': roleta_id, 'roleta_nome': "Roleta Teste", 'numero': 1},
+            ]) == 2
+            recentes = fonte.obter_numeros_recentes(roleta_id, 3)
+            assert [doc['numero'] for doc in recentes] == [1, 17, 32]
+            assert [doc['sequencia'] for doc in recentes] == [6, 5, 4]
+            assert recentes[0]['cor'] == 'vermelho'
+
+            assert fonte.obter_timestamp_numero(roleta_id, 17, 1) == (inicio + timedelta(minutes=1)).isoformat()
+
+            estatisticas = fonte.obter_estatisticas_diarias(roleta_id)
+            if inicio.date() == datetime.now().date():
+                assert estatisticas['total_numeros'] == 6
+                assert estatisticas['distribuicao_cores']['verde'] == 1
+
+            assert fonte.atualizar_dados_estrategia(roleta_id, "Roleta Teste", "TRIGGER", 17, 5,
+                                                    [7, 27, 37], [5, 15, 25], 1, 0, 17)
+            roleta = [r for r in fonte.obter_roletas() if r['id'] == roleta_id][0]
+            assert roleta['estado_estrategia'] == "TRIGGER"
+            assert roleta['terminais_gatilho'] == [7, 27, 37]
+        finally:
+            fonte.fechar()
+
+if __name__ == "__main__":
+    try:
+        test_data_source_sqlite()
+        print("Fonte de dados SQLite funcionando")
+    except AssertionError as e:
+        print(f"Falha: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script para comparar as estatísticas globais (agregação no servidor) com o cálculo em Python
+"""
+
+import sys
+import time
+import random
+import unittest
+from datetime import datetime, timedelta
+
+from banco_teste import exigir_mongodb
+from mongo_config import conectar_mongodb
+from estatisticas_globais import calcular_estatisticas_globais, calcular_estatisticas_por_roleta
+
+def test_estatisticas_globais():
+    """
+    Grava números de teste num dia antigo e verifica que a agregação e o cálculo roleta a
+    roleta dão o mesmo resultado
+    """
+    exigir_mongodb()
+    client, db = conectar_mongodb()
+    inicio = datetime(2001, 1, 1)
+    fim = inicio + timedelta(days=1)
+    roletas = [f"teste-globais-{i}" for i in range(3)]
+    gerador = random.Random(7)
+    db.roleta_numeros.insert_many([
+        {'roleta_id': roleta_id, 'numero': gerador.randint(0, 36), 'sequencia': i,
+         'timestamp': inicio + timedelta(seconds=30 * i)}
+        for roleta_id in roletas for i in range(1000)
+    ])
+
+    try:
+        t0 = time.perf_counter()
+        agregado = calcular_estatisticas_globais(db, inicio, fim, roletas)
+        t1 = time.perf_counter()
+        referencia = calcular_estatisticas_por_roleta(db, inicio, fim, roletas)
+        t2 = time.perf_counter()
+        print(f"Agregação: {(t1 - t0) * 1000:.1f} ms, Python: {(t2 - t1) * 1000:.1f} ms")
+
+        assert 'erro' not in agregado, agregado.get('erro')
+        assert agregado['global']['total_numeros'] == 3000
+        assert agregado == referencia, "Agregação difere do cálculo em Python"
+    finally:
+        db.roleta_numeros.delete_many({'roleta_id': {'$in': roletas}})
+
+if __name__ == "__main__":
+    try:
+        test_estatisticas_globais()
+        print("Estatísticas globais iguais ao cálculo em Python")
+    except unittest.SkipTest as e:
+        print(f"Teste ignorado: {str(e)}")
+    except AssertionError as e:
+        print(f"Falha: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script para testar as posições de sequência planejadas a partir do histórico visível
+(não requer MongoDB; a parte com MongoDataSource roda se o mongomock estiver instalado)
+"""
+
+import sys
+import random
+from datetime import datetime, timedelta
+
+from banco_teste import mongodb_em_memoria
+from idempotencia import alinhar_historico, planejar_insercao
+
+VISIVEIS = 5
+
+def _leitura(numero, timestamp, historico=None):
+    return {'numero': numero, 'timestamp': timestamp, 'historico': historico}
+
+def _gravar(banco, planejados):
+    """Insere em ordem no 'índice único' (sequencia -> número) e para no primeiro conflito"""
+    for indice, planejado in enumerate(planejados):
+        if planejado['sequencia'] in banco:
+            return indice
+        banco[planejado['sequencia']] = (planejado['numero'], planejado['timestamp'])
+    return None
+
+def _cauda(banco, quantidade=10):
+    return [{'numero': banco[s][0], 'timestamp': banco[s][1], 'sequencia': s}
+            for s in sorted(banco, reverse=True)[:quantidade]]
+
+def test_idempotencia():
+    """
+    Releituras, páginas atrasadas, repetições legítimas e escritores concorrentes
+    """
+    inicio = datetime(2024, 1, 1, 12)
+
+    # Alinhamento: topo igual, página atrasada, números novos
+    assert alinhar_historico([9, 0, 32, 17, 5], [9, 0, 32, 17, 5]) == 0
+    assert alinhar_historico([0, 32, 17, 5, 8], [9, 0, 32, 17, 5]) == 0
+    assert alinhar_historico([4, 9, 0, 32, 17], [9, 0, 32, 17, 5]) == 1
+    assert alinhar_historico([4, 4, 9, 0, 32], [9, 0, 32, 17, 5]) == 2
+    # Uma coincidência isolada na borda não basta
+    assert alinhar_historico([9, 0, 32, 17, 17], [17, 5, 17, 17, 5]) is None
+
+    gravados = [{'numero': n, 'timestamp': inicio - timedelta(seconds=40 * i), 'sequencia': 10 - i}
+                for i, n in enumerate([17, 5, 32])]
+
+    # Repetição legítima: a página mostra 17 duas vezes
+    planejados = planejar_insercao(gravados, [_leitura(17, inicio + timedelta(seconds=40), [17, 17, 5, 32])])
+    assert [(p['numero'], p['sequencia']) for p in planejados] == [(17, 11)]
+    # Releitura do topo e página atrasada de um scraper lento
+    assert planejar_insercao(gravados, [_leitura(17, inicio + timedelta(seconds=41), [17, 5, 32])]) == []
+    assert planejar_insercao(gravados, [_leitura(5, inicio + timedelta(seconds=90), [5, 32])]) == []
+
+    # Sem histórico: só o horário de origem separa releitura de repetição
+    assert planejar_insercao(gravados, [_leitura(17, inicio + timedelta(seconds=5))]) == []
+    assert len(planejar_insercao(gravados, [_leitura(17, inicio + timedelta(seconds=35))])) == 1
+
+    # Lote com números perdidos entre leituras: cada um na sua posição, em ordem cronológica
+    planejados = planejar_insercao(gravados, [_leitura(1, inicio + timedelta(seconds=120), [1, 2, 17, 5, 32])])
+    assert [(p['numero'], p['sequencia']) for p in planejados] == [(2, 11), (1, 12)]
+    assert planejados[0]['timestamp'] < planejados[1]['timestamp']
+
+    # Escritores concorrentes com leituras atrasadas e topo desatualizado
+    gerador = random.Random(5)
+    sorteios = [gerador.randint(0, 36) for _ in range(400)]
+    sorteios[100:103] = [7, 7, 7]
+    banco = {}
+    caudas = [[], [], []]
+    for giro in range(len(sorteios)):
+        agora = inicio + timedelta(seconds=40 * giro)
+        for escritor in gerador.sample(range(3), 3):
+            # Cada escritor lê a página com até 1 giro de atraso; o escritor 0 nunca atrasa
+            atraso = 0 if escritor == 0 else gerador.randint(0, 1)
+            visto = giro - atraso
+            if visto < 0:
+                continue
+            historico = sorteios[max(0, visto + 1 - VISIVEIS):visto + 1][::-1]
+            itens = [_leitura(historico[0], agora + timedelta(seconds=escritor), historico)]
+            for tentativa in range(3):
+                planejados = planejar_insercao(caudas[escritor], itens)
+                conflito = _gravar(banco, planejados)
+                # O topo em memória só é relido depois de um conflito
+                caudas[escritor] = _cauda(banco) if conflito is not None else (
+                    [{'numero': p['numero'], 'timestamp': p['timestamp'], 'sequencia': p['sequencia']}
+                     for p in reversed(planejados)] + caudas[escritor])[:10]
+                if conflito is None:
+                    break
+                itens = itens[planejados[conflito]['item']:]
+
+    assert [banco[s][0] for s in sorted(banco)] == sorteios
+    assert sorted(banco) == list(range(1, len(sorteios) + 1))
+
+def test_idempotencia_mongodb():
+    """
+    Dois MongoDataSource no mesmo banco (mongomock) disputando os mesmos sorteios
+    """
+    try:
+        import mongomock
+    except ImportError:
+        print("mongomock não instalado; teste com MongoDataSource ignorado")
+        return
+
+    with mongodb_em_memoria():
+        from data_source_mongo import MongoDataSource
+
+        primeiro, segundo = MongoDataSource(gravar_matrizes=False), MongoDataSource(gravar_matrizes=False)
+        inicio = datetime(2024, 1, 1, 12)
+        roleta_id = 'teste-idempotencia'
+        primeiro.colecoes['roleta_numeros'].delete_many({'roleta_id': roleta_id})
+
+        def ler(fonte, segundos, historico):
+            return fonte.inserir_numero(roleta_id, "Roleta Teste", historico[0],
+                                        timestamp=(inicio + timedelta(seconds=segundos)).isoformat(),
+                                        historico=historico)
+
+        assert ler(primeiro, 0, [5])
+        assert ler(primeiro, 40, [17, 5])
+        assert not ler(segundo, 41, [17, 5])           # mesmo sorteio lido pelo outro processo
+        assert ler(segundo, 80, [17, 17, 5])           # repetição legítima
+        assert not ler(primeiro, 81, [17, 17, 5])      # topo em cache desatualizado: conflito e releitura
+        assert not ler(segundo, 90, [17, 5])           # página atrasada
+        assert ler(primeiro, 200, [9, 0, 17, 17, 5])   # dois sorteios perdidos
+
+        documentos = primeiro.colecoes['roleta_numeros'].find({'roleta_id': roleta_id}).sort('sequencia', 1)
+        assert [(d['sequencia'], d['numero']) for d in documentos] == [(1, 5), (2, 17), (3, 17), (4, 0), (5, 9)]
+
+if __name__ == "__main__":
+    try:
+        test_idempotencia()
+        test_idempotencia_mongodb()
+        print("Posições de sequência idempotentes")
+    except AssertionError as e:
+        print(f"Falha: {str(e)}")
+        sys.exit(1)
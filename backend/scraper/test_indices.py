@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script para verificar que as consultas do sistema usam índices no MongoDB
+"""
+
+import sys
+import unittest
+
+from banco_teste import exigir_mongodb
+from mongo_config import conectar_mongodb
+from gerenciador_indices import aplicar_indices, verificar_consultas
+
+def test_consultas_usam_indices():
+    """
+    Aplica os índices declarados e verifica com explain() que nenhuma consulta
+    faz COLLSCAN ou ordenação em memória
+    """
+    exigir_mongodb()
+    client, db = conectar_mongodb()
+    aplicar_indices(db)
+
+    problemas = verificar_consultas(db)
+    for problema in problemas:
+        print(f"[PROBLEMA] {problema}")
+
+    assert not problemas, f"{len(problemas)} consultas sem índice adequado"
+
+if __name__ == "__main__":
+    try:
+        test_consultas_usam_indices()
+        print("Todas as consultas usam índices")
+    except unittest.SkipTest as e:
+        print(f"Teste ignorado: {str(e)}")
+    except AssertionError as e:
+        print(f"Falha: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script para testar as janelas de números quentes/frios (não requer MongoDB)
+"""
+
+import sys
+import random
+from collections import Counter
+
+from janelas_frequencia import JanelasFrequencia
+
+def test_janelas_frequencia():
+    """
+    Compara contagens e ordem das janelas com a contagem direta dos últimos giros
+    """
+    gerador = random.Random(42)
+    numeros = [gerador.randint(0, 36) for _ in range(1200)]
+    janelas = JanelasFrequencia((10, 50, 500))
+
+    for i, numero in enumerate(numeros):
+        assert janelas.registrar({'roleta_id': 'r1', 'numero': numero, 'sequencia': i})
+        if i % 97 == 0 or i == len(numeros) - 1:
+            resultado = janelas.obter('r1', quantidade=37)
+            for tamanho, janela in resultado.items():
+                esperado = Counter(numeros[max(0, i + 1 - int(tamanho)):i + 1])
+                assert janela['contagens'] == [esperado[n] for n in range(37)]
+                quentes = [item['contagem'] for item in janela['quentes']]
+                assert quentes == sorted(quentes, reverse=True)
+                assert janela['frios'][0]['contagem'] == min(esperado[n] for n in range(37))
+
+    assert not janelas.registrar({'roleta_id': 'r1', 'numero': 5, 'sequencia': 3})
+    reconstruidas = JanelasFrequencia((10, 50, 500))
+    reconstruidas.reconstruir('r1', [{'numero': n, 'sequencia': i} for i, n in enumerate(numeros)])
+    assert reconstruidas.obter('r1')['500']['contagens'] == janelas.obter('r1')['500']['contagens']
+    assert janelas.obter('r2') is None
+
+if __name__ == "__main__":
+    try:
+        test_janelas_frequencia()
+        print("Janelas de frequência funcionando")
+    except AssertionError as e:
+        print(f"Falha: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script para testar as matrizes de transição e seus blobs (não requer MongoDB)
+"""
+
+import sys
+import time
+import random
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+
+from pymongo.errors import ConnectionFailure
+
+from matriz_transicao import MatrizesTransicao, serializar, desserializar
+
+def test_matriz_transicao():
+    """
+    Compara as contagens incrementais com a contagem direta e confere a ida e volta pelo blob
+    """
+    gerador = random.Random(11)
+    inicio = datetime(2024, 1, 1)
+    documentos = [{'roleta_id': 'r1', 'numero': gerador.randint(0, 36), 'sequencia': i,
+                   'timestamp': inicio + timedelta(seconds=30 * i)} for i in range(3000)]
+    numeros = [documento['numero'] for documento in documentos]
+    pares = Counter(zip(numeros, numeros[1:]))
+    trios = Counter(zip(numeros, numeros[1:], numeros[2:]))
+
+    # Roleta nova: a carga completa não encontra números e os giros seguintes são somados
+    matrizes = MatrizesTransicao(segunda_ordem=True)
+    assert matrizes.reconstruir('r1', []) == 0
+    for documento in documentos[:2000]:
+        assert matrizes.registrar(documento)
+    assert not matrizes.registrar(documentos[1500])
+
+    # Retomar do blob gravado e aplicar só os números seguintes
+    estado = desserializar(serializar('r1', matrizes._estados['r1']), segunda_ordem=True)
+    retomadas = MatrizesTransicao(segunda_ordem=True)
+    assert retomadas.reconstruir('r1', documentos, estado) == 1000
+
+    resultado = retomadas.obter('r1')
+    assert resultado['giros'] == 3000 and resultado['ultimo_numero'] == numeros[-1]
+    assert resultado['matriz'] == [[pares[(a, b)] for b in range(37)] for a in range(37)]
+
+    linha = retomadas.obter('r1', numero=17)
+    assert linha['seguintes'] == [pares[(17, b)] for b in range(37)]
+    assert linha['total'] == sum(1 for a in numeros[:-1] if a == 17)
+    segunda = retomadas.obter('r1', numero=5, anterior=32)
+    assert segunda['seguintes'] == [trios[(32, 5, c)] for c in range(37)]
+
+    sem_segunda = MatrizesTransicao(segunda_ordem=False)
+    sem_segunda.reconstruir('r1', documentos)
+    assert 'erro' in sem_segunda.obter('r1', numero=5, anterior=32)
+    assert sem_segunda.obter('r2') is None
+
+def test_matriz_transicao_carga():
+    """
+    Carga em segundo plano: nada é servido até ela terminar e os giros registrados
+    enquanto isso são aplicados uma única vez, depois dos que ela leu
+    """
+    inicio = datetime(2024, 1, 1)
+    documentos = [{'roleta_id': 'r1', 'numero': i % 37, 'sequencia': i,
+                   'timestamp': inicio + timedelta(seconds=30 * i)} for i in range(100)]
+    liberar = threading.Event()
+
+    class CargaLenta(MatrizesTransicao):
+        def carregar(self, roleta_id):
+            # O banco devolve os 90 primeiros giros, depois de demorar
+            liberar.wait(5)
+            return self.reconstruir(roleta_id, documentos[:90])
+
+    matrizes = CargaLenta()
+    thread = matrizes.carregar_em_segundo_plano(['r1'])
+    for documento in documentos[85:]:
+        assert matrizes.registrar(documento)
+    assert matrizes.carregando('r1') and matrizes.obter('r1') is None
+
+    liberar.set()
+    thread.join(5)
+    assert not matrizes.carregando('r1')
+    resultado = matrizes.obter('r1')
+    assert resultado['giros'] == 100 and resultado['ultimo_numero'] == documentos[-1]['numero']
+    assert not matrizes.registrar(documentos[95])
+
+def test_matriz_transicao_carga_falha():
+    """
+    Uma carga que falha deixa a roleta pendente, sem matriz a gravar, e é repetida
+    """
+    inicio = datetime(2024, 1, 1)
+    documentos = [{'roleta_id': 'r1', 'numero': i % 37, 'sequencia': i,
+                   'timestamp': inicio + timedelta(seconds=30 * i)} for i in range(100)]
+
+    class BancoForaDoAr:
+        def __getitem__(self, nome):
+            raise ConnectionFailure("banco fora do ar")
+
+    class CargaInstavel(MatrizesTransicao):
+        tentativas = 0
+
+        def carregar(self, roleta_id):
+            self.tentativas += 1
+            if self.tentativas == 1:
+                return super().carregar(roleta_id)
+            return self.reconstruir(roleta_id, documentos[:90])
+
+    matrizes = CargaInstavel(BancoForaDoAr(), intervalo_nova_carga=0.2)
+    for documento in documentos[85:]:
+        assert matrizes.registrar(documento)
+    espera = time.monotonic() + 5
+    while matrizes.tentativas == 0 and time.monotonic() < espera:
+        time.sleep(0.01)
+    # Depois da falha: nada a servir e, principalmente, nada a gravar por cima do blob
+    assert matrizes.carregando('r1') and matrizes.obter('r1') is None
+    assert matrizes.persistir() == 0 and matrizes.roletas() == []
+
+    while matrizes.carregando('r1') and time.monotonic() < espera:
+        time.sleep(0.01)
+    assert matrizes.tentativas == 2
+    assert matrizes.obter('r1')['giros'] == 100
+
+if __name__ == "__main__":
+    try:
+        test_matriz_transicao()
+        test_matriz_transicao_carga()
+        test_matriz_transicao_carga_falha()
+        print("Matrizes de transição funcionando")
+    except AssertionError as e:
+        print(f"Falha: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script para testar o monitor de aleatoriedade (não requer MongoDB)
+"""
+
+import sys
+import math
+import random
+
+from classificacao import COR
+from monitor_aleatoriedade import MonitorAleatoriedade
+
+def _qui_quadrado(numeros):
+    esperado = len(numeros) / 37
+    return sum((numeros.count(n) - esperado) ** 2 / esperado for n in range(37))
+
+def _sequencias_cor(numeros):
+    cores = [COR[n] for n in numeros if n != 0]
+    return 1 + sum(1 for a, b in zip(cores, cores[1:]) if a != b)
+
+def test_monitor_aleatoriedade():
+    """
+    Confere os estatísticos incrementais com o cálculo direto na janela e verifica que
+    uma leitura travada num número gera um alerta
+    """
+    gerador = random.Random(3)
+    numeros = [gerador.randint(0, 36) for _ in range(700)]
+    alertas = []
+    monitor = MonitorAleatoriedade(janela=300, janela_curta=50,
+                                   ao_alertar=lambda roleta_id, alerta: alertas.append(alerta))
+
+    for i, numero in enumerate(numeros):
+        assert monitor.registrar({'roleta_id': 'r1', 'numero': numero, 'sequencia': i})
+    indicadores = monitor.obter('r1')
+    assert math.isclose(indicadores['qui_quadrado']['valor'], _qui_quadrado(numeros[-300:]), abs_tol=1e-3)
+    assert math.isclose(indicadores['deriva']['qui_quadrado'], _qui_quadrado(numeros[-50:]), abs_tol=1e-3)
+    assert indicadores['sequencias']['cor']['sequencias'] == _sequencias_cor(numeros[-300:])
+    assert indicadores['alertas'] == [] and alertas == []
+
+    # Scraper repetindo o mesmo número
+    for i in range(len(numeros), len(numeros) + 40):
+        monitor.registrar({'roleta_id': 'r1', 'numero': 17, 'sequencia': i})
+    assert 'deriva' in monitor.obter('r1')['alertas']
+    assert any(alerta['alerta'] == 'deriva' and alerta['estado'] == 'ativo' for alerta in alertas)
+    assert not monitor.registrar({'roleta_id': 'r1', 'numero': 5, 'sequencia': 3})
+
+def test_monitor_aleatoriedade_histerese():
+    """
+    Um alerta só termina com o p-valor acima do limite de resolução e, resolvido, só volta
+    depois da espera
+    """
+    gerador = random.Random(7)
+    avisos = []
+    monitor = MonitorAleatoriedade(janela=300, janela_curta=50, p_alerta=0.001, espera=100,
+                                   ao_alertar=lambda roleta_id, alerta: avisos.append(alerta))
+    assert monitor.p_resolucao == 0.01
+    numeros = [gerador.randint(0, 36) for _ in range(300)] + [17] * 40
+    for i, numero in enumerate(numeros):
+        monitor.registrar({'roleta_id': 'r1', 'numero': numero, 'sequencia': i})
+    assert 'deriva' in monitor.obter('r1')['alertas']
+    while not any(aviso['estado'] == 'resolvido' for aviso in avisos if aviso['alerta'] == 'deriva'):
+        numeros.append(gerador.randint(0, 36))
+        monitor.registrar({'roleta_id': 'r1', 'numero': numeros[-1], 'sequencia': len(numeros)})
+        # Até resolver, nenhum giro com p-valor abaixo da resolução tira o alerta
+        if 'deriva' not in monitor.obter('r1')['alertas']:
+            assert monitor.obter('r1')['deriva']['p_valor'] >= 0.01
+        assert len(numeros) < 2000
+
+    deriva = [aviso for aviso in avisos if aviso['alerta'] == 'deriva']
+    assert [aviso['estado'] for aviso in deriva] == ['ativo', 'resolvido']
+    assert deriva[-1]['indicadores']['deriva']['p_valor'] >= 0.01
+
+    # A leitura trava de novo logo depois: o alerta espera 100 giros para voltar
+    for giro in range(1, 101):
+        numeros.append(17)
+        monitor.registrar({'roleta_id': 'r1', 'numero': 17, 'sequencia': len(numeros)})
+        deriva = [aviso for aviso in avisos if aviso['alerta'] == 'deriva']
+        assert len(deriva) == (3 if giro == 100 else 2)
+    assert deriva[-1]['estado'] == 'ativo'
+
+if __name__ == "__main__":
+    try:
+        test_monitor_aleatoriedade()
+        test_monitor_aleatoriedade_histerese()
+        print("Monitor de aleatoriedade funcionando")
+    except AssertionError as e:
+        print(f"Falha: {str(e)}")
+        sys.exit(1)
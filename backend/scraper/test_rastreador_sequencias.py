@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script para testar o rastreador de sequências em andamento (não requer MongoDB)
+"""
+
+import sys
+from datetime import datetime, timedelta
+
+from rastreador_sequencias import RastreadorSequencias
+
+def test_rastreador_sequencias():
+    """
+    Verifica a regra do zero, a reconstrução e que números repetidos são ignorados
+    """
+    inicio = datetime(2024, 1, 1)
+    documentos = [{'roleta_id': 'r1', 'numero': numero, 'sequencia': i, 'timestamp': inicio + timedelta(seconds=i)}
+                  for i, numero in enumerate([2, 4, 0, 6, 19, 21, 0])]
+
+    notificacoes = []
+    rastreador = RastreadorSequencias(ao_atualizar=lambda roleta_id, sequencias: notificacoes.append(roleta_id))
+    for documento in documentos:
+        assert rastreador.registrar(documento)
+    assert not rastreador.registrar(documentos[-1])
+    assert len(notificacoes) == len(documentos)
+
+    sequencias = rastreador.obter('r1')
+    # 19, 21 e o zero final: o zero não interrompe e conta no comprimento
+    assert sequencias['cor'] == {'valor': 'vermelho', 'comprimento': 3,
+                                 'inicio_timestamp': documentos[4]['timestamp'].isoformat()}
+    assert sequencias['paridade']['valor'] == 'impar' and sequencias['paridade']['comprimento'] == 3
+    assert sequencias['duzia']['valor'] == 'segunda'
+
+    reconstruido = RastreadorSequencias()
+    reconstruido.reconstruir('r1', documentos)
+    assert reconstruido.obter('r1') == sequencias
+    assert reconstruido.obter('r2') is None
+
+if __name__ == "__main__":
+    try:
+        test_rastreador_sequencias()
+        print("Rastreador de sequências funcionando")
+    except AssertionError as e:
+        print(f"Falha: {str(e)}")
+        sys.exit(1)
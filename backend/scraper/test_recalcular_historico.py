@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script para testar a derivação das partições do recálculo histórico (não requer MongoDB)
+"""
+
+import sys
+import random
+from datetime import datetime, timedelta
+
+from analytics import contadores_completos, sequencias_fechadas
+from recalcular_historico import derivar_particao
+
+def test_derivar_particao():
+    """
+    Divide três dias em partições e verifica que contadores e sequências somados batem
+    com o cálculo sobre o histórico inteiro, sem perder as sequências da meia-noite
+    """
+    gerador = random.Random(11)
+    inicio = datetime(2024, 3, 1)
+    historico = [{'numero': gerador.randint(0, 36), 'timestamp': inicio + timedelta(minutes=3 * i)}
+                 for i in range(3 * 480)]
+    esperadas = sequencias_fechadas('r1', historico)
+
+    sequencias = []
+    for d in range(3):
+        inicio_dia = inicio + timedelta(days=d)
+        fim_dia = inicio_dia + timedelta(days=1)
+        numeros = [n for n in historico if inicio_dia <= n['timestamp'] < fim_dia]
+        anteriores = [n for n in historico if n['timestamp'] < inicio_dia]
+        seguintes = [n for n in historico if n['timestamp'] >= fim_dia][:1]
+
+        derivados = derivar_particao('r1', numeros, anteriores, seguintes, inicio_dia)
+        assert derivados['contadores'] == contadores_completos(n['numero'] for n in numeros)
+        assert sum(sum(contagem.values()) for contagem in derivados['horas'].values()) == len(numeros)
+        sequencias.extend(derivados['sequencias'])
+
+    chave = lambda s: (s['tipo'], s['valor'], s['inicio_timestamp'], s['fim_timestamp'], s['comprimento'])
+    assert sorted(map(chave, sequencias)) == sorted(map(chave, esperadas))
+
+if __name__ == "__main__":
+    try:
+        test_derivar_particao()
+        print("Derivação das partições igual ao cálculo sobre o histórico inteiro")
+    except AssertionError as e:
+        print(f"Falha: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script para testar a leitura do resumo das roletas (roda se o mongomock estiver instalado)
+"""
+
+import sys
+from datetime import datetime, timedelta
+
+from resumos import COLECAO_RESUMOS, obter_resumo
+
+def test_resumos():
+    """
+    Os contadores do dia anterior não aparecem como sendo de hoje antes do primeiro giro do dia
+    """
+    try:
+        import mongomock
+    except ImportError:
+        print("mongomock não instalado; teste do resumo ignorado")
+        return
+
+    db = mongomock.MongoClient().runcash
+    agora = datetime.now()
+    ontem = (agora - timedelta(days=1)).strftime("%Y-%m-%d")
+    contadores = {'vermelhos': 3, 'pretos': 1, 'zeros': 1, 'pares': 2, 'impares': 2, 'baixos': 3, 'altos': 1}
+    db[COLECAO_RESUMOS].insert_many([
+        {'_id': 'r1', 'ultimo_numero': 5, 'ultimos': [{'numero': 5, 'timestamp': agora - timedelta(days=1)}],
+         'hoje': {'data': ontem, 'total': 5, **contadores}},
+        {'_id': 'r2', 'ultimo_numero': 5, 'ultimos': [{'numero': 5, 'timestamp': agora}],
+         'hoje': {'data': agora.strftime("%Y-%m-%d"), 'total': 5, **contadores}},
+    ])
+
+    hoje = obter_resumo(db, 'r1')['hoje']
+    assert hoje['data'] == agora.strftime("%Y-%m-%d")
+    assert hoje['total'] == 0 and all(hoje[campo] == 0 for campo in contadores)
+    assert obter_resumo(db, 'r2')['hoje'] == {'data': agora.strftime("%Y-%m-%d"), 'total': 5, **contadores}
+    # O documento gravado não muda: o próximo número recomeça o dia
+    assert db[COLECAO_RESUMOS].find_one({'_id': 'r1'})['hoje']['data'] == ontem
+
+if __name__ == "__main__":
+    try:
+        test_resumos()
+        print("Resumo das roletas funcionando")
+    except AssertionError as e:
+        print(f"Falha: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script para testar o arquivamento e a leitura dos arquivos de retenção (não requer MongoDB;
+a ida e volta pelo banco roda se o mongomock estiver instalado)
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+
+from retencao import _EscritorParticoes, arquivar_colecao, consultar_numeros, ler_arquivo
+
+def _documento(i, inicio):
+    return {'_id': i, 'roleta_id': 'r1', 'numero': i % 37, 'timestamp': inicio + timedelta(minutes=i)}
+
+def test_retencao_queda():
+    """
+    Queda entre a gravação em disco e o fechamento do membro gzip: os lotes fechados são
+    lidos e o membro truncado não gera erro
+    """
+    inicio = datetime(2024, 1, 1, 10)
+    with tempfile.TemporaryDirectory() as diretorio:
+        escritor = _EscritorParticoes(diretorio, 'roleta_numeros')
+        for i in range(10):
+            escritor.escrever(inicio.date(), _documento(i, inicio))
+        escritor.concluir_lote()
+
+        # Segundo lote em disco, mas sem o trailer do membro: o estado após uma queda
+        for i in range(10, 20):
+            escritor.escrever(inicio.date(), _documento(i, inicio))
+        membro = escritor._membros[inicio.date()]
+        membro.flush()
+        os.fsync(membro.fileobj.fileno())
+        particao = os.path.join(diretorio, 'roleta_numeros', f"data={inicio.date().isoformat()}")
+        nome = os.listdir(particao)[0]
+        copia = os.path.join(diretorio, 'copia', 'roleta_numeros', f"data={inicio.date().isoformat()}")
+        os.makedirs(copia)
+        shutil.copy(os.path.join(particao, nome), copia)
+        escritor.fechar()
+
+        # Cortar também no meio do membro, fora do limite de um flush
+        caminho = os.path.join(copia, nome)
+        with open(caminho, 'rb') as arquivo:
+            dados = arquivo.read()
+        with open(caminho, 'wb') as arquivo:
+            arquivo.write(dados[:-5])
+
+        lidos = [documento['_id'] for documento in ler_arquivo('roleta_numeros', diretorio=os.path.join(diretorio, 'copia'))]
+        assert lidos[:10] == list(range(10)) and lidos == sorted(set(lidos))
+        assert [documento['_id'] for documento in ler_arquivo('roleta_numeros', diretorio=diretorio)] == list(range(20))
+
+def test_retencao_ordem():
+    """
+    A leitura de cada partição segue o timestamp (e a sequência no empate), mesmo que os
+    documentos tenham sido arquivados fora de ordem ou por roleta
+    """
+    inicio = datetime(2024, 1, 1, 10)
+    with tempfile.TemporaryDirectory() as diretorio:
+        escritor = _EscritorParticoes(diretorio, 'roleta_numeros')
+        for i in reversed(range(10)):
+            escritor.escrever(inicio.date(), dict(_documento(i, inicio), roleta_id=f"r{i % 2}"))
+        escritor.escrever(inicio.date(), dict(_documento(11, inicio), timestamp=inicio, roleta_id="r0", sequencia=2))
+        escritor.escrever(inicio.date(), dict(_documento(10, inicio), timestamp=inicio, roleta_id="r0", sequencia=1))
+        escritor.fechar()
+
+        lidos = [documento['_id'] for documento in ler_arquivo('roleta_numeros', diretorio=diretorio)]
+        assert lidos[:3] == [0, 10, 11] and lidos[3:] == list(range(1, 10))
+        assert [documento['_id'] for documento in ler_arquivo('roleta_numeros', roleta_id='r1', diretorio=diretorio)] == [1, 3, 5, 7, 9]
+
+def test_retencao_mongodb():
+    """
+    Arquivamento em lotes e consulta combinada de arquivo e banco (mongomock)
+    """
+    try:
+        import mongomock
+    except ImportError:
+        print("mongomock não instalado; teste de arquivamento ignorado")
+        return
+
+    db = mongomock.MongoClient().db
+    inicio = datetime.now().replace(microsecond=0) - timedelta(days=100)
+    db.roleta_numeros.insert_many([_documento(i, inicio) for i in range(50)])
+    db.roleta_numeros.insert_one(dict(_documento(50, inicio), timestamp=datetime.now() - timedelta(days=1)))
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        assert arquivar_colecao(db, 'roleta_numeros', dias=90, diretorio=diretorio, lote=7) == 50
+        assert db.roleta_numeros.count_documents({}) == 1
+        consultados = [documento['_id'] for documento in consultar_numeros(db, 'r1', inicio, diretorio=diretorio)]
+        assert consultados == list(range(51))
+
+if __name__ == "__main__":
+    try:
+        test_retencao_queda()
+        test_retencao_ordem()
+        test_retencao_mongodb()
+        print("Retenção funcionando")
+    except AssertionError as e:
+        print(f"Falha: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script para testar a geometria da roda e as janelas de distâncias (não requer MongoDB)
+"""
+
+import sys
+import random
+from collections import Counter
+
+from janelas_frequencia import JanelasFrequencia
+from roda import ORDEM_RODA, SETOR, SETORES, distancia, vizinhos
+
+def test_roda():
+    """
+    Confere as tabelas da roda e compara as janelas com a contagem direta dos giros
+    """
+    assert sorted(ORDEM_RODA) == list(range(37))
+    assert sum(len(numeros) for numeros in SETORES.values()) == 37
+    assert SETOR[0] == 'voisins' and SETOR[27] == 'tiers' and SETOR[1] == 'orphelins'
+    assert distancia(0, 26) == 1 and distancia(0, 10) == 18 and distancia(5, 5) == 0
+    assert vizinhos(0, 2) == [3, 26, 0, 32, 15]
+    for n in range(37):
+        for casas in (0, 1, 4, 18):
+            assert sorted(m for m in range(37) if distancia(n, m) <= casas) == sorted(vizinhos(n, casas))
+
+    gerador = random.Random(7)
+    numeros = [gerador.randint(0, 36) for _ in range(800)]
+    janelas = JanelasFrequencia((1, 10, 100))
+    for i, numero in enumerate(numeros):
+        janelas.registrar({'roleta_id': 'r1', 'numero': numero, 'sequencia': i})
+        if i % 53 == 0 or i == len(numeros) - 1:
+            for tamanho, janela in janelas.obter_roda('r1', casas=(1, 3)).items():
+                ultimos = numeros[max(0, i + 1 - int(tamanho)):i + 1]
+                pares = Counter(distancia(a, b) for a, b in zip(ultimos, ultimos[1:]))
+                assert janela['distancias'] == [pares[d] for d in range(19)]
+                assert janela['setores'] == {nome: sum(SETOR[n] == nome for n in ultimos) for nome in SETORES}
+                assert janela['vizinhos']['3']['acertos'] == sum(pares[d] for d in range(4))
+
+    assert janelas.obter_roda('r2') is None
+
+if __name__ == "__main__":
+    try:
+        test_roda()
+        print("Geometria da roda funcionando")
+    except AssertionError as e:
+        print(f"Falha: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script para testar o spool local e sua drenagem idempotente (não requer MongoDB)
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+
+from banco_teste import mongodb_em_memoria
+from spool_local import SpoolLocal
+from data_source_memoria import InMemoryDataSource
+
+def test_spool_local():
+    """
+    Verifica que o spool sobrevive a um reinício, drena em ordem e não duplica ao repetir
+    """
+    destino = InMemoryDataSource()
+    roleta_id = destino.garantir_roleta_existe("teste-spool", "Roleta Teste")
+    inicio = datetime.now() - timedelta(minutes=10)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        spool = SpoolLocal(diretorio, fsync_ms=10)
+        spool.abrir_circuito("teste")
+        for i, numero in enumerate([5, 17, 0, 32]):
+            spool.adicionar({'roleta_id': roleta_id, 'roleta_nome': "Roleta Teste", 'numero': numero,
+                             'cor': None, 'timestamp': (inicio + timedelta(seconds=i)).isoformat()})
+        spool.sincronizar()
+        assert spool.ativo() and spool.ultimo_numero(roleta_id) == 32
+
+        # Outro processo no mesmo diretório não toca o segmento que este está escrevendo
+        outro = SpoolLocal(diretorio, fsync_ms=10)
+        assert not outro.ativo() and outro.drenar(destino) == 0
+        spool.adicionar({'roleta_id': roleta_id, 'roleta_nome': "Roleta Teste", 'numero': 8,
+                         'cor': None, 'timestamp': (inicio + timedelta(seconds=4)).isoformat()})
+        spool.parar()
+
+        # Um novo processo encontra os números pendentes
+        reiniciado = SpoolLocal(diretorio, fsync_ms=10)
+        assert reiniciado.ativo() and reiniciado.ultimo_numero(roleta_id) == 8
+
+        copia = os.path.join(diretorio, "copia")
+        os.makedirs(copia)
+        for nome in os.listdir(diretorio):
+            if nome.endswith('.jsonl'):
+                shutil.copy(os.path.join(diretorio, nome), copia)
+
+        assert reiniciado.drenar(destino) == 5
+        assert not reiniciado.ativo()
+        assert destino.obter_ultimos_numeros(roleta_id, 10) == [8, 32, 0, 17, 5]
+
+        # Drenar de novo os mesmos segmentos (queda antes da remoção) não duplica
+        assert SpoolLocal(copia, fsync_ms=10).drenar(destino) == 0
+        assert destino.obter_ultimos_numeros(roleta_id, 10) == [8, 32, 0, 17, 5]
+
+        # Números recusados pelo destino não somem com o segmento
+        rejeitado = SpoolLocal(diretorio, fsync_ms=10)
+        rejeitado.adicionar({'roleta_id': roleta_id, 'roleta_nome': "Roleta Teste", 'numero': 40,
+                             'cor': None, 'timestamp': (inicio + timedelta(seconds=5)).isoformat()})
+        assert rejeitado.drenar(destino) == 0 and not rejeitado.ativo()
+        assert rejeitado.estatisticas()['rejeitados'] == 1
+        arquivos = [nome for nome in os.listdir(diretorio) if nome.endswith('.jsonl')]
+        assert len(arquivos) == 1 and arquivos[0].startswith('rejeitados-')
+
+def test_spool_drenagem_mongodb():
+    """
+    Drenagem para o MongoDataSource (mongomock): conflitos vão direto ao banco, sem voltar
+    ao spool, e garantir_roleta_existe não consulta o banco com o spool ativo
+    """
+    try:
+        import mongomock
+    except ImportError:
+        print("mongomock não instalado; teste com MongoDataSource ignorado")
+        return
+
+    with mongodb_em_memoria():
+        from data_source_mongo import MongoDataSource
+        fonte = MongoDataSource(gravar_matrizes=False)
+        roleta_id = "teste-spool-mongodb"
+        fonte.colecoes['roleta_numeros'].delete_many({'roleta_id': roleta_id})
+        inicio = datetime.now() - timedelta(minutes=10)
+
+        with tempfile.TemporaryDirectory() as diretorio:
+            fonte.spool = SpoolLocal(diretorio, fsync_ms=10)
+            assert fonte.inserir_numero(roleta_id, "Roleta Teste", 5, timestamp=inicio.isoformat(), historico=[5])
+
+            fonte.spool.abrir_circuito("teste")
+            roleta_uuid = fonte.garantir_roleta_existe(roleta_id, "Roleta Teste")
+            assert fonte.colecoes['roletas'].count_documents({'_id': roleta_uuid}) == 0
+
+            for i, historico in enumerate([[17, 5], [0, 17, 5]], start=1):
+                assert fonte.inserir_numero(roleta_id, "Roleta Teste", historico[0],
+                                            timestamp=(inicio + timedelta(seconds=40 * i)).isoformat(),
+                                            historico=historico)
+
+            # Outro processo gravou o 17 enquanto este estava sem banco: o cache está atrasado
+            fonte.colecoes['roleta_numeros'].insert_one({
+                'roleta_id': roleta_id, 'roleta_nome': "Roleta Teste", 'numero': 17, 'cor': 'preto',
+                'timestamp': inicio + timedelta(seconds=41), 'sequencia': 2})
+
+            assert fonte.spool.drenar(fonte) == 1
+            assert not fonte.spool.ativo() and fonte.spool.estatisticas()['enfileirados'] == 2
+            documentos = fonte.colecoes['roleta_numeros'].find({'roleta_id': roleta_id}).sort('sequencia', 1)
+            assert [(d['sequencia'], d['numero']) for d in documentos] == [(1, 5), (2, 17), (3, 0)]
+
+            # Com o banco de volta a roleta é criada uma vez; depois não há mais consulta
+            assert fonte.garantir_roleta_existe(roleta_id, "Roleta Teste") == roleta_uuid
+            fonte.colecoes['roletas'].delete_one({'_id': roleta_uuid})
+            fonte.garantir_roleta_existe(roleta_id, "Roleta Teste")
+            assert fonte.colecoes['roletas'].count_documents({'_id': roleta_uuid}) == 0
+
+if __name__ == "__main__":
+    try:
+        test_spool_local()
+        test_spool_drenagem_mongodb()
+        print("Spool local OK")
+    except AssertionError as e:
+        print(f"Falha: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script para verificar o orçamento de tempo de importação dos módulos principais
+
+Cada módulo é importado em um processo novo com o MongoDB apontando para um endereço
+inacessível: nenhuma importação deve abrir conexão ou carregar módulos pesados que
+só são usados depois da inicialização.
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+# Tempo máximo de importação por módulo, em segundos
+ORCAMENTO_SEGUNDOS = 1.0
+
+# Módulo importado -> módulos que não devem ser carregados junto com ele
+MODULOS = {
+    'mongo_config': ['analytics', 'data_source_mongo'],
+    'data_source_mongo': ['analytics', 'run_real_scraper'],
+    'scraper_mongodb': ['run_real_scraper', 'data_source_mongo', 'analytics'],
+    'strategy_helper': ['data_source_mongo', 'analytics'],
+    'analytics': [],
+}
+
+CODIGO = """
+import sys, time, json
+inicio = time.perf_counter()
+import {modulo}
+print(json.dumps({{'tempo': time.perf_counter() - inicio, 'modulos': list(sys.modules)}}))
+"""
+
+def _importar(modulo: str) -> dict:
+    """Importa um módulo em um subprocesso e retorna o tempo e os módulos carregados"""
+    ambiente = dict(os.environ, MONGODB_URI="mongodb://127.0.0.1:1/runcash")
+    resultado = subprocess.run(
+        [sys.executable, "-c", CODIGO.format(modulo=modulo)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=ambiente, capture_output=True, text=True, timeout=60
+    )
+    assert resultado.returncode == 0, f"Falha ao importar {modulo}: {resultado.stderr[-500:]}"
+    return json.loads(resultado.stdout.strip().splitlines()[-1])
+
+def test_tempo_importacao():
+    """
+    Verifica que os módulos principais importam dentro do orçamento e sem dependências tardias
+    """
+    for modulo, proibidos in MODULOS.items():
+        medicao = _importar(modulo)
+        print(f"{modulo}: {medicao['tempo'] * 1000:.0f} ms")
+        assert medicao['tempo'] < ORCAMENTO_SEGUNDOS, \
+            f"{modulo} levou {medicao['tempo']:.2f}s para importar (orçamento: {ORCAMENTO_SEGUNDOS}s)"
+        carregados = [nome for nome in proibidos if nome in medicao['modulos']]
+        assert not carregados, f"{modulo} carregou na importação: {', '.join(carregados)}"
+
+if __name__ == "__main__":
+    try:
+        test_tempo_importacao()
+        print("Tempos de importação dentro do orçamento")
+    except AssertionError as e:
+        print(f"Falha: {str(e)}")
+        sys.exit(1)